@@ -1,4 +1,5 @@
 """Cloud Synchronization Module for Edge-Cloud Communication."""
 from .synchronizer import CloudSynchronizer
+from .protocol import EntityStore, LocalEdgeNode
 
-__all__ = ['CloudSynchronizer']
+__all__ = ['CloudSynchronizer', 'EntityStore', 'LocalEdgeNode']
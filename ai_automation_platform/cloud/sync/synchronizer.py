@@ -1,13 +1,19 @@
 """Cloud Synchronizer for Edge-Cloud Communication."""
 import asyncio
+import heapq
 import logging
 import json
 import time
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 
+import aiosqlite
+
+from .protocol import EntityStore, LocalEdgeNode, decode_frame, default_frame_codec, encode_frame
+
 logger = logging.getLogger(__name__)
 
 class SyncDirection(Enum):
@@ -74,19 +80,73 @@ class SyncRequest:
         data['conflict_resolution'] = ConflictResolutionStrategy(data['conflict_resolution'])
         return cls(**data)
 
+@dataclass
+class NodeSyncState:
+    """Per-lane high-water marks for one edge node.
+
+    ``sent_hwm`` is the last cloud log sequence the edge acknowledged and
+    ``received_hwm`` the last edge log sequence applied in the cloud.
+    """
+    sent_hwm: List[int]
+    received_hwm: List[int]
+
 class CloudSynchronizer:
     """Manages synchronization between cloud and edge nodes."""
     
-    def __init__(self, db_url: str = "sqlite:///sync.db"):
+    def __init__(
+        self,
+        db_url: str = "sqlite:///sync.db",
+        node_id: str = "cloud",
+        workers_per_node: int = 4,
+        frame_size: int = 500,
+        store: Optional[EntityStore] = None,
+        retry_base_delay: float = 2.0,
+        max_retry_delay: float = 60.0,
+        finished_retention: float = 3600.0,
+        max_finished_requests: int = 10000
+    ):
         """Initialize the CloudSynchronizer.
         
         Args:
             db_url: Database URL for persistence
+            node_id: ID of this node in version vectors
+            workers_per_node: Concurrent transfer lanes per edge node; each
+                entity always syncs through the same lane
+            frame_size: Maximum number of changes per frame
+            store: Entity store holding the cloud's side of the synced data
+            retry_base_delay: Delay before the first retry; doubles per attempt
+            max_retry_delay: Upper bound on the retry delay
+            finished_retention: Seconds a finished request stays queryable
+            max_finished_requests: Finished requests kept at most; the oldest
+                are forgotten first
         """
         self.db_url = db_url
+        self.node_id = node_id
+        self.workers_per_node = workers_per_node
+        self.frame_size = frame_size
+        self.store = store or EntityStore(node_id, cloud_node_id=node_id)
+        self.codec = default_frame_codec()
+        self.retry_base_delay = retry_base_delay
+        self.max_retry_delay = max_retry_delay
+        self.finished_retention = finished_retention
+        self.max_finished_requests = max_finished_requests
         self._lock = asyncio.Lock()
         self._sync_queues: Dict[str, asyncio.Queue] = {}
         self._active_syncs: Dict[str, asyncio.Task] = {}
+        # Enqueue time (monotonic) of each queued request, oldest first per node
+        self._queued_at: Dict[str, Dict[str, float]] = {}
+        self._in_flight: Dict[str, int] = {}
+        # Delay queue of (due monotonic time, tie breaker, request) served by one timer task
+        self._retry_heap: List[Tuple[float, int, SyncRequest]] = []
+        self._retry_counter = 0
+        self._retry_wakeup = asyncio.Event()
+        self._retry_task: Optional[asyncio.Task] = None
+        self._edge_nodes: Dict[str, LocalEdgeNode] = {}
+        self._node_states: Dict[str, NodeSyncState] = {}
+        self._requests: Dict[str, SyncRequest] = {}
+        self._completions: Dict[str, asyncio.Event] = {}
+        # Finish time (monotonic) of each finished request, oldest first
+        self._finished: Dict[str, float] = {}
         self._initialized = False
         self._db_pool = None
     
@@ -110,20 +170,75 @@ class CloudSynchronizer:
         logger.info("CloudSynchronizer initialized")
     
     async def _create_db_pool(self):
-        """Create a database connection pool."""
-        # In a real implementation, this would create an async DB connection pool
+        """Open the SQLite database named by ``db_url``."""
         logger.info(f"Creating database connection pool for {self.db_url}")
-        return {}
+        scheme, _, path = self.db_url.partition(":///")
+        if not scheme.startswith("sqlite"):
+            raise ValueError(f"Unsupported sync database URL: {self.db_url}")
+        db = await aiosqlite.connect(path)
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        return db
     
     async def _create_tables(self):
         """Create database tables if they don't exist."""
-        # In a real implementation, this would execute CREATE TABLE statements
         logger.info("Ensuring database tables exist for synchronization")
+        await self._db_pool.executescript("""
+            CREATE TABLE IF NOT EXISTS sync_requests (
+                request_id TEXT PRIMARY KEY,
+                edge_node_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                next_attempt_at REAL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sync_requests_status ON sync_requests(status);
+        """)
+        await self._db_pool.commit()
     
     async def _load_pending_requests(self):
-        """Load pending sync requests from the database."""
-        # In a real implementation, this would load all pending sync requests
+        """Load pending sync requests from the database.
+
+        Requests that were in progress when the process stopped run again;
+        requests waiting on a retry keep their remaining backoff. Finished
+        requests of earlier runs can no longer be queried and are deleted.
+        """
         logger.info("Loading pending sync requests from database")
+        await self._db_pool.execute(
+            "DELETE FROM sync_requests WHERE status NOT IN (?, ?)",
+            (SyncStatus.PENDING.value, SyncStatus.IN_PROGRESS.value)
+        )
+        await self._db_pool.commit()
+        async with self._db_pool.execute(
+            "SELECT data, next_attempt_at FROM sync_requests WHERE status IN (?, ?)",
+            (SyncStatus.PENDING.value, SyncStatus.IN_PROGRESS.value)
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        for data, next_attempt_at in rows:
+            sync_request = SyncRequest.from_dict(json.loads(data))
+            if sync_request.request_id in self._requests:
+                continue
+            sync_request.status = SyncStatus.PENDING
+            self._requests[sync_request.request_id] = sync_request
+            self._completions[sync_request.request_id] = asyncio.Event()
+            if next_attempt_at:
+                self._schedule_retry(sync_request, next_attempt_at - time.time())
+            else:
+                self._enqueue(sync_request)
+        logger.info(f"Loaded {len(rows)} pending sync requests")
+    
+    def register_edge_node(self, edge_node_id: str, transport: LocalEdgeNode):
+        """Register the transport used to reach an edge node.
+
+        Any object with LocalEdgeNode's ``receive_frame``/``fetch_frame``
+        coroutines can serve as the transport.
+        """
+        self._edge_nodes[edge_node_id] = transport
+        if edge_node_id not in self._node_states:
+            self._node_states[edge_node_id] = NodeSyncState(
+                sent_hwm=[0] * self.workers_per_node,
+                received_hwm=[0] * self.workers_per_node
+            )
     
     async def queue_sync(
         self,
@@ -155,16 +270,12 @@ class CloudSynchronizer:
             conflict_resolution=conflict_resolution,
             metadata=metadata or {}
         )
+        self._requests[request_id] = sync_request
+        self._completions[request_id] = asyncio.Event()
+        await self._save_sync_request(sync_request)
         
         # Add to the appropriate queue
-        queue = await self._get_or_create_queue(edge_node_id)
-        await queue.put(sync_request)
-        
-        # Start processing if not already running
-        if edge_node_id not in self._active_syncs or self._active_syncs[edge_node_id].done():
-            self._active_syncs[edge_node_id] = asyncio.create_task(
-                self._process_sync_requests(edge_node_id)
-            )
+        self._enqueue(sync_request)
         
         logger.info(f"Queued sync request {request_id} for edge node {edge_node_id}")
         return request_id
@@ -176,11 +287,11 @@ class CloudSynchronizer:
             request_id: ID of the sync request
             
         Returns:
-            Status information, or None if not found
+            Status information, or None if unknown or past its retention
         """
-        # In a real implementation, this would query the database
         logger.debug(f"Getting status for sync request {request_id}")
-        return None
+        sync_request = self._requests.get(request_id)
+        return sync_request.to_dict() if sync_request else None
     
     async def cancel_sync(self, request_id: str) -> bool:
         """Cancel a pending sync request.
@@ -191,8 +302,20 @@ class CloudSynchronizer:
         Returns:
             True if the request was cancelled, False otherwise
         """
-        # In a real implementation, this would update the request status in the database
         logger.info(f"Canceling sync request {request_id}")
+        sync_request = self._requests.get(request_id)
+        if sync_request is None or sync_request.status != SyncStatus.PENDING:
+            return False
+        
+        # Queued and scheduled copies are skipped once the request is no longer pending
+        sync_request.status = SyncStatus.FAILED
+        sync_request.error = "Cancelled"
+        sync_request.updated_at = datetime.utcnow()
+        sync_request.metadata.pop("next_attempt_at", None)
+        self._queued_at.get(sync_request.edge_node_id, {}).pop(request_id, None)
+        await self._save_sync_request(sync_request)
+        self._complete(sync_request)
+        await self._evict_finished()
         return True
     
     async def sync_edge_node(
@@ -218,29 +341,18 @@ class CloudSynchronizer:
             direction=direction,
             metadata=metadata
         )
+        # Held here: the finished request may be evicted before this task resumes
+        sync_request = self._requests[request_id]
         
         # Wait for completion with timeout
         try:
-            start_time = time.monotonic()
-            while True:
-                status = await self.get_sync_status(request_id)
-                
-                if status is None:
-                    return {"status": "error", "error": "Sync request not found"}
-                
-                if status["status"] in ("completed", "failed", "conflict"):
-                    return status
-                
-                # Check for timeout
-                if time.monotonic() - start_time > timeout:
-                    return {
-                        "status": "error",
-                        "error": f"Sync timed out after {timeout} seconds"
-                    }
-                
-                # Wait a bit before checking again
-                await asyncio.sleep(1.0)
-                
+            await asyncio.wait_for(self._completions[request_id].wait(), timeout)
+            return sync_request.to_dict()
+        except asyncio.TimeoutError:
+            return {
+                "status": "error",
+                "error": f"Sync timed out after {timeout} seconds"
+            }
         except asyncio.CancelledError:
             # Handle cancellation
             await self.cancel_sync(request_id)
@@ -250,20 +362,24 @@ class CloudSynchronizer:
         """Close the cloud synchronizer and release resources."""
         logger.info("Closing CloudSynchronizer")
         
-        # Cancel all active sync tasks
-        for task in self._active_syncs.values():
+        # Cancel all active sync tasks and the retry timer
+        tasks = list(self._active_syncs.values())
+        if self._retry_task:
+            tasks.append(self._retry_task)
+            self._retry_task = None
+        for task in tasks:
             task.cancel()
         
         # Wait for tasks to complete
-        if self._active_syncs:
-            await asyncio.wait(
-                [task for task in self._active_syncs.values() if not task.done()],
-                timeout=5.0
-            )
+        pending = [task for task in tasks if not task.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=5.0)
+        self._active_syncs.clear()
         
         # Close database connection
         if self._db_pool:
             logger.info("Closing database connection pool")
+            await self._db_pool.close()
             self._db_pool = None
         
         self._initialized = False
@@ -275,6 +391,70 @@ class CloudSynchronizer:
             self._sync_queues[edge_node_id] = asyncio.Queue()
         return self._sync_queues[edge_node_id]
     
+    def _enqueue(self, sync_request: SyncRequest):
+        """Put a request on its node's queue and make sure a worker is running."""
+        edge_node_id = sync_request.edge_node_id
+        if edge_node_id not in self._sync_queues:
+            self._sync_queues[edge_node_id] = asyncio.Queue()
+        self._sync_queues[edge_node_id].put_nowait(sync_request)
+        self._queued_at.setdefault(edge_node_id, {})[sync_request.request_id] = time.monotonic()
+        
+        # Start processing if not already running
+        if edge_node_id not in self._active_syncs or self._active_syncs[edge_node_id].done():
+            self._active_syncs[edge_node_id] = asyncio.create_task(
+                self._process_sync_requests(edge_node_id)
+            )
+    
+    def _schedule_retry(self, sync_request: SyncRequest, delay: float):
+        """Re-queue a request after ``delay`` seconds without holding a worker."""
+        due = time.monotonic() + max(delay, 0.0)
+        self._retry_counter += 1
+        heapq.heappush(self._retry_heap, (due, self._retry_counter, sync_request))
+        if self._retry_heap[0][2] is sync_request:
+            self._retry_wakeup.set()  # new earliest deadline
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_task = asyncio.create_task(self._run_retry_timer())
+    
+    async def _run_retry_timer(self):
+        """Move due retries back onto their node queues."""
+        while True:
+            try:
+                now = time.monotonic()
+                while self._retry_heap and self._retry_heap[0][0] <= now:
+                    _, _, sync_request = heapq.heappop(self._retry_heap)
+                    if sync_request.status == SyncStatus.PENDING:
+                        sync_request.metadata.pop("next_attempt_at", None)
+                        self._enqueue(sync_request)
+                
+                self._retry_wakeup.clear()
+                timeout = self._retry_heap[0][0] - now if self._retry_heap else None
+                try:
+                    await asyncio.wait_for(self._retry_wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+    
+    def get_queue_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-node queue depth, in-flight and scheduled retries, and oldest queued age."""
+        now = time.monotonic()
+        retries: Dict[str, int] = {}
+        for _, _, sync_request in self._retry_heap:
+            if sync_request.status == SyncStatus.PENDING:
+                retries[sync_request.edge_node_id] = retries.get(sync_request.edge_node_id, 0) + 1
+        
+        metrics = {}
+        for edge_node_id in set(self._queued_at) | set(retries) | set(self._in_flight):
+            queued = self._queued_at.get(edge_node_id, {})
+            oldest = next(iter(queued.values()), None)
+            metrics[edge_node_id] = {
+                "queue_depth": len(queued),
+                "in_flight": self._in_flight.get(edge_node_id, 0),
+                "scheduled_retries": retries.get(edge_node_id, 0),
+                "oldest_queued_age_seconds": now - oldest if oldest is not None else 0.0
+            }
+        return metrics
+    
     async def _process_sync_requests(self, edge_node_id: str):
         """Process sync requests for an edge node."""
         queue = await self._get_or_create_queue(edge_node_id)
@@ -283,7 +463,12 @@ class CloudSynchronizer:
             try:
                 # Get the next sync request
                 sync_request = await queue.get()
+                self._queued_at.get(edge_node_id, {}).pop(sync_request.request_id, None)
+                if sync_request.status != SyncStatus.PENDING:
+                    queue.task_done()  # cancelled while queued
+                    continue
                 
+                self._in_flight[edge_node_id] = self._in_flight.get(edge_node_id, 0) + 1
                 try:
                     # Process the sync request
                     await self._process_sync_request(sync_request)
@@ -300,8 +485,10 @@ class CloudSynchronizer:
                     
                     # Save the updated request
                     await self._save_sync_request(sync_request)
+                    self._complete(sync_request)
                 finally:
                     # Mark the task as done
+                    self._in_flight[edge_node_id] -= 1
                     queue.task_done()
                     
             except asyncio.CancelledError:
@@ -332,8 +519,12 @@ class CloudSynchronizer:
             if sync_request.direction in (SyncDirection.EDGE_TO_CLOUD, SyncDirection.BIDIRECTIONAL):
                 await self._sync_edge_to_cloud(sync_request)
             
-            # Mark as completed
-            sync_request.status = SyncStatus.COMPLETED
+            # Mark as completed; unresolved manual conflicts are surfaced on the request
+            if self._sync_stats(sync_request)["conflicts"]:
+                sync_request.status = SyncStatus.CONFLICT
+            else:
+                sync_request.status = SyncStatus.COMPLETED
+            sync_request.error = None
             sync_request.updated_at = datetime.utcnow()
             
         except Exception as e:
@@ -356,17 +547,61 @@ class CloudSynchronizer:
                     f"(attempt {sync_request.retry_count}/{sync_request.max_retries})"
                 )
                 
-                # Re-queue for retry with exponential backoff
-                delay = min(2 ** sync_request.retry_count, 60)  # Cap at 60 seconds
-                await asyncio.sleep(delay)
-                
-                # Re-queue the request
-                queue = await self._get_or_create_queue(sync_request.edge_node_id)
-                await queue.put(sync_request)
+                # Re-queue for retry with exponential backoff; the timer task
+                # re-queues it, so this worker moves on to the next request
+                delay = min(self.retry_base_delay * 2 ** (sync_request.retry_count - 1), self.max_retry_delay)
+                sync_request.status = SyncStatus.PENDING
+                sync_request.metadata["next_attempt_at"] = time.time() + delay
+                await self._save_sync_request(sync_request)
+                self._schedule_retry(sync_request, delay)
                 return
         
         # Save the final state
         await self._save_sync_request(sync_request)
+        self._complete(sync_request)
+        await self._evict_finished()
+    
+    def _complete(self, sync_request: SyncRequest):
+        """Wake callers waiting on a request that reached a final state."""
+        self._finished[sync_request.request_id] = time.monotonic()
+        completion = self._completions.get(sync_request.request_id)
+        if completion:
+            completion.set()
+    
+    async def _evict_finished(self):
+        """Forget finished requests past the retention age or count, with their rows."""
+        cutoff = time.monotonic() - self.finished_retention
+        excess = len(self._finished) - self.max_finished_requests
+        expired = []
+        for request_id, finished_at in self._finished.items():
+            if finished_at >= cutoff and len(expired) >= excess:
+                break
+            expired.append(request_id)
+        if not expired:
+            return
+        
+        for request_id in expired:
+            del self._finished[request_id]
+            self._requests.pop(request_id, None)
+            self._completions.pop(request_id, None)
+        if self._db_pool is not None:
+            await self._db_pool.executemany(
+                "DELETE FROM sync_requests WHERE request_id = ?", [(request_id,) for request_id in expired]
+            )
+            await self._db_pool.commit()
+    
+    def _sync_stats(self, sync_request: SyncRequest) -> Dict[str, int]:
+        """Transfer counters for a request, accumulated across retries."""
+        return sync_request.metadata.setdefault("sync_stats", {
+            "changes_sent": 0, "frames_sent": 0, "bytes_sent": 0,
+            "changes_received": 0, "frames_received": 0, "bytes_received": 0,
+            "conflicts": 0
+        })
+    
+    def _get_transport(self, edge_node_id: str) -> Tuple[LocalEdgeNode, NodeSyncState]:
+        if edge_node_id not in self._edge_nodes:
+            raise ValueError(f"Edge node {edge_node_id} is not registered")
+        return self._edge_nodes[edge_node_id], self._node_states[edge_node_id]
     
     async def _sync_cloud_to_edge(self, sync_request: SyncRequest):
         """Synchronize data from cloud to edge."""
@@ -375,17 +610,32 @@ class CloudSynchronizer:
             f"(edge: {sync_request.edge_node_id})"
         )
         
-        # In a real implementation, this would:
-        # 1. Identify what data needs to be sent to the edge
-        # 2. Package the data efficiently
-        # 3. Transfer the data to the edge node
-        # 4. Handle any conflicts that arise
-        
-        # Simulate some work
-        await asyncio.sleep(1.0)
+        transport, state = self._get_transport(sync_request.edge_node_id)
+        await asyncio.gather(*(
+            self._push_lane(sync_request, transport, state, lane) for lane in range(self.workers_per_node)
+        ))
         
         logger.info("Cloud to edge sync completed successfully")
     
+    async def _push_lane(self, sync_request: SyncRequest, transport: LocalEdgeNode,
+                         state: NodeSyncState, lane: int):
+        """Ship one lane's changes since the edge's last acknowledgement."""
+        stats = self._sync_stats(sync_request)
+        while True:
+            since = state.sent_hwm[lane]
+            changes, through = self.store.collect(
+                since, lane, self.workers_per_node,
+                exclude_origin=sync_request.edge_node_id, max_changes=self.frame_size
+            )
+            if through == since:
+                return
+            frame = encode_frame(self.codec, lane, since + 1, through, changes,
+                                 sync_request.conflict_resolution.value)
+            state.sent_hwm[lane] = await transport.receive_frame(self.node_id, frame)
+            stats["changes_sent"] += len(changes)
+            stats["frames_sent"] += 1
+            stats["bytes_sent"] += len(frame)
+    
     async def _sync_edge_to_cloud(self, sync_request: SyncRequest):
         """Synchronize data from edge to cloud."""
         logger.info(
@@ -393,19 +643,44 @@ class CloudSynchronizer:
             f"(edge: {sync_request.edge_node_id})"
         )
         
-        # In a real implementation, this would:
-        # 1. Contact the edge node to get changes
-        # 2. Process and validate the received data
-        # 3. Apply the changes to the cloud
-        # 4. Handle any conflicts that arise
-        
-        # Simulate some work
-        await asyncio.sleep(1.0)
+        transport, state = self._get_transport(sync_request.edge_node_id)
+        await asyncio.gather(*(
+            self._pull_lane(sync_request, transport, state, lane) for lane in range(self.workers_per_node)
+        ))
         
         logger.info("Edge to cloud sync completed successfully")
     
+    async def _pull_lane(self, sync_request: SyncRequest, transport: LocalEdgeNode,
+                         state: NodeSyncState, lane: int):
+        """Fetch and apply one lane's edge changes since the last applied frame."""
+        stats = self._sync_stats(sync_request)
+        strategy = sync_request.conflict_resolution.value
+        while True:
+            frame = await transport.fetch_frame(
+                self.node_id, lane, self.workers_per_node, state.received_hwm[lane], self.frame_size, strategy
+            )
+            if frame is None:
+                return
+            data = decode_frame(self.codec, frame)
+            conflicts = len(self.store.conflicts)
+            for change in data["changes"]:
+                self.store.apply(change, strategy)
+            state.received_hwm[lane] = data["last_seq"]
+            stats["changes_received"] += len(data["changes"])
+            stats["frames_received"] += 1
+            stats["bytes_received"] += len(frame)
+            stats["conflicts"] += len(self.store.conflicts) - conflicts
+    
     async def _save_sync_request(self, sync_request: SyncRequest) -> bool:
         """Save a sync request to the database."""
-        # In a real implementation, this would save to the database
         logger.debug(f"Saving sync request {sync_request.request_id}")
+        if self._db_pool is None:
+            return False
+        await self._db_pool.execute(
+            "INSERT OR REPLACE INTO sync_requests (request_id, edge_node_id, status, next_attempt_at, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (sync_request.request_id, sync_request.edge_node_id, sync_request.status.value,
+             sync_request.metadata.get("next_attempt_at"), json.dumps(sync_request.to_dict()))
+        )
+        await self._db_pool.commit()
         return True
@@ -53,7 +53,19 @@ from .database import (
 from .caching import (
     CacheManager,
     CacheKey,
+    CachePipeline,
+    CacheBackend,
+    RedisBackend,
+    AsyncRedisBackend,
+    InMemoryBackend,
+    BoundedMemoryBackend,
+    TieredBackend,
+    EvictionPolicy,
+    LRUPolicy,
+    LFUPolicy,
+    TinyLFUPolicy,
     cached,
+    CachedCallMetrics,
     cache,
     CacheInvalidationStrategy,
     TimeBasedInvalidation,
@@ -63,6 +75,16 @@ from .caching import (
     init_cache,
     close_cache,
 )
+from .serialization import (
+    CacheCodec,
+    Serializer,
+    JSONSerializer,
+    OrjsonSerializer,
+    MsgpackSerializer,
+    PickleSerializer,
+    SchemaVersionMismatch,
+    get_serializer,
+)
 from .utils import (
     generate_id,
     get_timestamp,
@@ -76,8 +98,12 @@ from .utils import (
     chunked,
     Singleton,
     LRUCache,
+    ThreadSafeLRUCache,
+    AsyncLRUCache,
     RateLimiter,
     ExpiringDict,
+    ThreadSafeExpiringDict,
+    AsyncExpiringDict,
 )
 
 __all__ = [
@@ -125,7 +151,19 @@ __all__ = [
     # Caching
     'CacheManager',
     'CacheKey',
+    'CachePipeline',
+    'CacheBackend',
+    'RedisBackend',
+    'AsyncRedisBackend',
+    'InMemoryBackend',
+    'BoundedMemoryBackend',
+    'TieredBackend',
+    'EvictionPolicy',
+    'LRUPolicy',
+    'LFUPolicy',
+    'TinyLFUPolicy',
     'cached',
+    'CachedCallMetrics',
     'cache',
     'CacheInvalidationStrategy',
     'TimeBasedInvalidation',
@@ -135,6 +173,16 @@ __all__ = [
     'init_cache',
     'close_cache',
     
+    # Serialization
+    'CacheCodec',
+    'Serializer',
+    'JSONSerializer',
+    'OrjsonSerializer',
+    'MsgpackSerializer',
+    'PickleSerializer',
+    'SchemaVersionMismatch',
+    'get_serializer',
+    
     # Utils
     'generate_id',
     'get_timestamp',
@@ -148,6 +196,10 @@ __all__ = [
     'chunked',
     'Singleton',
     'LRUCache',
+    'ThreadSafeLRUCache',
+    'AsyncLRUCache',
     'RateLimiter',
     'ExpiringDict',
+    'ThreadSafeExpiringDict',
+    'AsyncExpiringDict',
 ]
@@ -1,14 +1,21 @@
 import asyncio
-import json
+import heapq
+import inspect
 import logging
+import math
+import random
+import time
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union, cast
 
 import redis
+from redis import asyncio as redis_asyncio
 from pydantic import BaseModel
 
 from .config import settings
+from .serialization import CacheCodec, SchemaVersionMismatch, to_primitive
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,9 @@ logger = logging.getLogger(__name__)
 T = TypeVar('T')
 R = TypeVar('R')
 
+# Sentinel distinguishing a cache miss from a cached None
+_MISSING = object()
+
 class CacheKey:
     """Helper class for generating cache keys."""
     
@@ -64,12 +74,147 @@ class CacheBackend:
         """Get a key's time to live in seconds."""
         raise NotImplementedError
     
+    async def pttl(self, key: str) -> int:
+        """Get a key's time to live in milliseconds.
+        
+        Like ``ttl``, returns -2 for a missing key and -1 for one without
+        expiry. The default derives it from ``ttl``.
+        """
+        ttl = await self.ttl(key)
+        return ttl * 1000 if ttl > 0 else ttl
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several values from the cache, in key order."""
+        return list(await asyncio.gather(*[self.get(key) for key in keys]))
+    
+    async def mset(
+        self,
+        mapping: Dict[str, bytes],
+        expire: Optional[int] = None
+    ) -> None:
+        """Set several values in the cache."""
+        await asyncio.gather(*[
+            self.set(key, value, expire=expire) for key, value in mapping.items()
+        ])
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several values from the cache."""
+        await asyncio.gather(*[self.delete(key) for key in keys])
+    
+    async def execute_pipeline(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Execute a batch of ``(method, args)`` operations.
+        
+        Backends that support pipelining send the whole batch in a single
+        round trip; the default implementation runs the operations in order.
+        """
+        return [await getattr(self, name)(*args) for name, args in ops]
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Atomically add cache keys to each tag's key set.
+        
+        A tag set expires no earlier than the longest-lived key added to it.
+        """
+        raise NotImplementedError
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys currently recorded under a tag."""
+        raise NotImplementedError
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Atomically drop tag sets and delete every key they contain.
+        
+        Returns the set of cache keys that were invalidated.
+        """
+        raise NotImplementedError
+    
     async def close(self) -> None:
         """Close the cache connection."""
         pass
 
+# Maximum number of keys passed to a single Redis DEL/UNLINK/SADD command
+REDIS_BATCH_SIZE = 10000
+
+# TTL given to a tag set holding a key without expiry: far enough out to
+# never lapse, but still a TTL, so EXPIRE NX on a later add leaves it alone
+TAG_SET_NO_EXPIRY_TTL = 100 * 365 * 24 * 3600
+
+class TagIndex:
+    """In-process tag -> keys index with a reverse key -> tags map.
+    
+    The reverse map lets backends drop a key from all of its tags in
+    O(tags per key) when the key is deleted, evicted or expires, so tag
+    sets never accumulate dead keys.
+    """
+    
+    def __init__(self):
+        self._members: Dict[str, Set[str]] = defaultdict(set)
+        self._key_tags: Dict[str, Set[str]] = defaultdict(set)
+    
+    def add(self, tag_keys: List[str], keys: List[str]) -> None:
+        """Record each key under each tag."""
+        for tag_key in tag_keys:
+            self._members[tag_key].update(keys)
+        for key in keys:
+            self._key_tags[key].update(tag_keys)
+    
+    def members(self, tag_key: str) -> Set[str]:
+        """Get a copy of the keys recorded under a tag."""
+        return set(self._members.get(tag_key, ()))
+    
+    def pop(self, tag_keys: List[str]) -> Set[str]:
+        """Remove tags and return the union of their keys."""
+        keys: Set[str] = set()
+        for tag_key in tag_keys:
+            keys |= self._members.pop(tag_key, set())
+        return keys
+    
+    def discard_key(self, key: str) -> None:
+        """Forget a key that is no longer cached."""
+        for tag_key in self._key_tags.pop(key, ()):
+            members = self._members.get(tag_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._members[tag_key]
+    
+    def clear(self) -> None:
+        """Remove every tag."""
+        self._members.clear()
+        self._key_tags.clear()
+
+def _queue_tag_add(pipe: Any, tag_keys: List[str], keys: List[str], expire: Optional[int]) -> None:
+    """Queue SADD and TTL commands for a tag update on a Redis pipeline.
+    
+    EXPIRE NX gives a new tag set the key's TTL and EXPIRE GT only ever
+    extends it, so the set outlives all of its members (Redis >= 7.0).
+    Keys without expiry count as TAG_SET_NO_EXPIRY_TTL rather than
+    PERSIST, which a later EXPIRE NX would undo.
+    """
+    ttl = TAG_SET_NO_EXPIRY_TTL if expire is None else expire
+    for tag_key in tag_keys:
+        for i in range(0, len(keys), REDIS_BATCH_SIZE):
+            pipe.sadd(tag_key, *keys[i:i + REDIS_BATCH_SIZE])
+        pipe.expire(tag_key, ttl, nx=True)
+        pipe.expire(tag_key, ttl, gt=True)
+
+def _queue_tag_invalidation(pipe: Any, tag_keys: List[str]) -> None:
+    """Queue reading and dropping tag sets on a Redis transaction pipeline."""
+    for tag_key in tag_keys:
+        pipe.smembers(tag_key)
+    pipe.delete(*tag_keys)
+
 class RedisBackend(CacheBackend):
-    """Redis cache backend using redis-py."""
+    """Redis cache backend using the synchronous redis-py client.
+    
+    Every call blocks the event loop for a full network round trip. Prefer
+    AsyncRedisBackend in async services; this backend is kept for callers
+    that share a synchronous client.
+    """
     
     def __init__(self, redis_url: str = None):
         """Initialize the Redis backend."""
@@ -123,18 +268,219 @@ class RedisBackend(CacheBackend):
         ttl = redis.ttl(key)
         return ttl if ttl is not None else -1
     
+    async def pttl(self, key: str) -> int:
+        """Get a key's time to live in milliseconds."""
+        redis = self._get_redis()
+        pttl = redis.pttl(key)
+        return pttl if pttl is not None else -1
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Atomically add cache keys to native Redis tag sets."""
+        if not tag_keys or not keys:
+            return
+        pipe = self._get_redis().pipeline(transaction=True)
+        _queue_tag_add(pipe, tag_keys, keys, expire)
+        pipe.execute()
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys recorded under a tag."""
+        return {member.decode() for member in self._get_redis().smembers(tag_key)}
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Atomically drop tag sets, then delete their keys in one round trip."""
+        if not tag_keys:
+            return set()
+        redis = self._get_redis()
+        pipe = redis.pipeline(transaction=True)
+        _queue_tag_invalidation(pipe, tag_keys)
+        results = pipe.execute()
+        keys = set().union(*results[:len(tag_keys)])
+        if keys:
+            members = list(keys)
+            pipe = redis.pipeline(transaction=False)
+            for i in range(0, len(members), REDIS_BATCH_SIZE):
+                pipe.unlink(*members[i:i + REDIS_BATCH_SIZE])
+            pipe.execute()
+        return {key.decode() for key in keys}
+    
     async def close(self) -> None:
         """Close the Redis connection."""
         if self._redis is not None:
             self._redis.close()
             self._redis = None
 
+class AsyncRedisBackend(CacheBackend):
+    """Non-blocking Redis cache backend using redis.asyncio.
+    
+    Connections are drawn from a shared pool so concurrent requests run
+    their round trips in parallel instead of queueing behind each other.
+    """
+    
+    def __init__(self, redis_url: str = None, max_connections: int = 50):
+        """Initialize the async Redis backend."""
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.max_connections = max_connections
+        self._pool: Optional[redis_asyncio.BlockingConnectionPool] = None
+        self._redis: Optional[redis_asyncio.Redis] = None
+    
+    def _get_redis(self) -> redis_asyncio.Redis:
+        """Get a pooled async Redis client."""
+        if self._redis is None:
+            # A blocking pool makes bursts wait for a free connection
+            # instead of failing with "Too many connections"
+            self._pool = redis_asyncio.BlockingConnectionPool.from_url(
+                self.redis_url,
+                decode_responses=False,
+                max_connections=self.max_connections,
+                timeout=5,
+                socket_connect_timeout=5,
+                socket_timeout=5,
+                retry_on_timeout=True
+            )
+            self._redis = redis_asyncio.Redis(connection_pool=self._pool)
+        return self._redis
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value from Redis."""
+        return await self._get_redis().get(key)
+    
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        """Set a value in Redis."""
+        await self._get_redis().set(key, value, ex=expire)
+    
+    async def delete(self, key: str) -> None:
+        """Delete a value from Redis."""
+        await self._get_redis().delete(key)
+    
+    async def exists(self, key: str) -> bool:
+        """Check if a key exists in Redis."""
+        return bool(await self._get_redis().exists(key))
+    
+    async def expire(self, key: str, ttl: int) -> None:
+        """Set a key's time to live in seconds."""
+        await self._get_redis().expire(key, ttl)
+    
+    async def ttl(self, key: str) -> int:
+        """Get a key's time to live in seconds."""
+        ttl = await self._get_redis().ttl(key)
+        return ttl if ttl is not None else -1
+    
+    async def pttl(self, key: str) -> int:
+        """Get a key's time to live in milliseconds."""
+        pttl = await self._get_redis().pttl(key)
+        return pttl if pttl is not None else -1
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several values from Redis with a single MGET."""
+        if not keys:
+            return []
+        return await self._get_redis().mget(keys)
+    
+    async def mset(
+        self,
+        mapping: Dict[str, bytes],
+        expire: Optional[int] = None
+    ) -> None:
+        """Set several values in Redis in one pipelined round trip."""
+        if not mapping:
+            return
+        if expire is None:
+            await self._get_redis().mset(mapping)
+            return
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several values from Redis with a single DEL."""
+        if keys:
+            await self._get_redis().delete(*keys)
+    
+    async def execute_pipeline(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Send a batch of operations to Redis in a single round trip."""
+        if not ops:
+            return []
+        async with self._get_redis().pipeline(transaction=False) as pipe:
+            for name, args in ops:
+                if name == "set":
+                    key, value, expire = (tuple(args) + (None,))[:3]
+                    pipe.set(key, value, ex=expire)
+                else:
+                    getattr(pipe, name)(*args)
+            results = await pipe.execute()
+        
+        normalized = []
+        for (name, _), result in zip(ops, results):
+            if name == "exists":
+                result = bool(result)
+            elif name in ("ttl", "pttl"):
+                result = result if result is not None else -1
+            elif name in ("set", "delete", "expire"):
+                result = None
+            normalized.append(result)
+        return normalized
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Atomically add cache keys to native Redis tag sets in one round trip."""
+        if not tag_keys or not keys:
+            return
+        async with self._get_redis().pipeline(transaction=True) as pipe:
+            _queue_tag_add(pipe, tag_keys, keys, expire)
+            await pipe.execute()
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys recorded under a tag."""
+        return {member.decode() for member in await self._get_redis().smembers(tag_key)}
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Atomically drop tag sets, then delete their keys in one round trip.
+        
+        Reading and deleting the tag sets happens in one MULTI/EXEC, so keys
+        tagged concurrently either land in the dropped set and are
+        invalidated, or start a fresh set; none are silently lost.
+        """
+        if not tag_keys:
+            return set()
+        redis = self._get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            _queue_tag_invalidation(pipe, tag_keys)
+            results = await pipe.execute()
+        keys = set().union(*results[:len(tag_keys)])
+        if keys:
+            members = list(keys)
+            async with redis.pipeline(transaction=False) as pipe:
+                for i in range(0, len(members), REDIS_BATCH_SIZE):
+                    pipe.unlink(*members[i:i + REDIS_BATCH_SIZE])
+                await pipe.execute()
+        return {key.decode() for key in keys}
+    
+    async def close(self) -> None:
+        """Close the Redis client and release pooled connections."""
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            await self._pool.disconnect()
+            self._redis = None
+            self._pool = None
+
 class InMemoryBackend(CacheBackend):
     """In-memory cache backend for testing and development."""
     
     def __init__(self):
         """Initialize the in-memory cache."""
         self._cache: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._tags = TagIndex()
     
     async def get(self, key: str) -> Optional[bytes]:
         """Get a value from the in-memory cache."""
@@ -144,6 +490,7 @@ class InMemoryBackend(CacheBackend):
         value, expiry = self._cache[key]
         if expiry is not None and expiry < datetime.now().timestamp():
             del self._cache[key]
+            self._tags.discard_key(key)
             return None
             
         return value
@@ -164,6 +511,7 @@ class InMemoryBackend(CacheBackend):
         """Delete a value from the in-memory cache."""
         if key in self._cache:
             del self._cache[key]
+            self._tags.discard_key(key)
     
     async def exists(self, key: str) -> bool:
         """Check if a key exists in the in-memory cache."""
@@ -173,6 +521,7 @@ class InMemoryBackend(CacheBackend):
         _, expiry = self._cache[key]
         if expiry is not None and expiry < datetime.now().timestamp():
             del self._cache[key]
+            self._tags.discard_key(key)
             return False
             
         return True
@@ -198,20 +547,648 @@ class InMemoryBackend(CacheBackend):
             return -2
             
         return int(expiry - now)
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Record cache keys under each tag."""
+        self._tags.add(tag_keys, keys)
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys recorded under a tag."""
+        return self._tags.members(tag_key)
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Drop tags and delete every key they contain."""
+        keys = self._tags.pop(tag_keys)
+        for key in keys:
+            await self.delete(key)
+        return keys
+    
+    def clear(self) -> None:
+        """Remove every entry and tag."""
+        self._cache.clear()
+        self._tags.clear()
+
+# Eviction policies for the bounded in-memory tier
+class EvictionPolicy:
+    """Base class for eviction policies used by BoundedMemoryBackend.
+    
+    The backend reports every insert, access and removal; the policy picks
+    the next victim when the cache is over capacity and may refuse to admit
+    a new key that is less valuable than the victim it would displace.
+    """
+    
+    def on_insert(self, key: str) -> None:
+        """Track a newly inserted key."""
+        raise NotImplementedError
+    
+    def on_access(self, key: str) -> None:
+        """Record a hit on a tracked key."""
+        raise NotImplementedError
+    
+    def on_remove(self, key: str) -> None:
+        """Stop tracking a key."""
+        raise NotImplementedError
+    
+    def victim(self) -> Optional[str]:
+        """Return the key that should be evicted next."""
+        raise NotImplementedError
+    
+    def admit(self, candidate: str, victim: str) -> bool:
+        """Decide whether ``candidate`` may displace ``victim``."""
+        return True
+    
+    def clear(self) -> None:
+        """Forget all tracked keys."""
+        raise NotImplementedError
+
+class LRUPolicy(EvictionPolicy):
+    """Least-recently-used eviction in O(1) per operation."""
+    
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+    
+    def on_insert(self, key: str) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+    
+    def on_access(self, key: str) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+    
+    def on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+    
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+    
+    def clear(self) -> None:
+        self._order.clear()
+
+class LFUPolicy(EvictionPolicy):
+    """Least-frequently-used eviction in O(1) per operation.
+    
+    Keys are grouped into frequency buckets; ties within a bucket are broken
+    by recency so the oldest of the least-used keys goes first.
+    """
+    
+    def __init__(self):
+        self._freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = defaultdict(OrderedDict)
+        self._min_freq = 0
+    
+    def on_insert(self, key: str) -> None:
+        if key in self._freq:
+            self.on_access(key)
+            return
+        self._freq[key] = 1
+        self._buckets[1][key] = None
+        self._min_freq = 1
+    
+    def on_access(self, key: str) -> None:
+        freq = self._freq.get(key)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets[freq + 1][key] = None
+    
+    def on_remove(self, key: str) -> None:
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = min(self._buckets, default=0)
+    
+    def victim(self) -> Optional[str]:
+        bucket = self._buckets.get(self._min_freq)
+        if not bucket:
+            return None
+        return next(iter(bucket))
+    
+    def clear(self) -> None:
+        self._freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+class CountMinSketch:
+    """Approximate frequency counter with periodic aging (halving)."""
+    
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: int = None):
+        self.width = width
+        self.depth = depth
+        self.sample_size = sample_size or width * 10
+        self._rows = [[0] * width for _ in range(depth)]
+        self._seeds = [0x9E3779B1 * (i + 1) for i in range(depth)]
+        self._additions = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key)
+        return [((h ^ seed) * 0x01000193 & 0xFFFFFFFF) % self.width for seed in self._seeds]
+    
+    def increment(self, key: str) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+    
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+    
+    def _age(self) -> None:
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] >>= 1
+        self._additions //= 2
+    
+    def clear(self) -> None:
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] = 0
+        self._additions = 0
+
+class TinyLFUPolicy(LRUPolicy):
+    """LRU eviction guarded by a TinyLFU admission filter.
+    
+    A count-min sketch remembers how often keys were requested, including
+    keys that are not cached. A new key only displaces the LRU victim when
+    it has been seen more often, which keeps one-off scans from flushing
+    the hot working set.
+    """
+    
+    def __init__(self, sketch_width: int = 4096):
+        super().__init__()
+        self.sketch = CountMinSketch(width=sketch_width)
+    
+    def on_insert(self, key: str) -> None:
+        self.sketch.increment(key)
+        super().on_insert(key)
+    
+    def on_access(self, key: str) -> None:
+        self.sketch.increment(key)
+        super().on_access(key)
+    
+    def record_miss(self, key: str) -> None:
+        """Count a request for a key that is not cached."""
+        self.sketch.increment(key)
+    
+    def admit(self, candidate: str, victim: str) -> bool:
+        return self.sketch.estimate(candidate) > self.sketch.estimate(victim)
+    
+    def clear(self) -> None:
+        super().clear()
+        self.sketch.clear()
+
+EVICTION_POLICIES: Dict[str, Type[EvictionPolicy]] = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+    "tinylfu": TinyLFUPolicy,
+}
+
+class BoundedMemoryBackend(CacheBackend):
+    """Bounded, size-aware in-process cache backend.
+    
+    Entries are limited by count and by total bytes (key plus value) and are
+    evicted by a pluggable policy. Expired entries are removed lazily on read
+    and proactively by a background sweeper driven by an expiry heap, so
+    memory is reclaimed even for keys that are never read again. Overwrites
+    leave stale heap records behind; the heap is rebuilt from the live
+    entries once it outgrows them by ``HEAP_COMPACTION_FACTOR``.
+    """
+    
+    HEAP_COMPACTION_FACTOR = 2
+    # Small heaps are never worth rebuilding
+    HEAP_COMPACTION_MIN = 1024
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        eviction: Union[str, EvictionPolicy] = "lru",
+        sweep_interval: Optional[float] = 1.0
+    ):
+        """Initialize the bounded in-memory cache.
+        
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of keys and values in bytes
+            eviction: "lru", "lfu", "tinylfu" or an EvictionPolicy instance
+            sweep_interval: Seconds between expiry sweeps (None disables the sweeper)
+        """
+        if isinstance(eviction, str):
+            try:
+                eviction = EVICTION_POLICIES[eviction.lower()]()
+            except KeyError:
+                raise ValueError(f"Unknown eviction policy: {eviction}")
+        
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = eviction
+        self.sweep_interval = sweep_interval
+        
+        self._cache: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._tags = TagIndex()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+    
+    @staticmethod
+    def _entry_size(key: str, value: bytes) -> int:
+        return len(key) + len(value)
+    
+    def _remove(self, key: str, drop_tags: bool = True) -> None:
+        value, _ = self._cache.pop(key)
+        self.current_bytes -= self._entry_size(key, value)
+        self.policy.on_remove(key)
+        if drop_tags:
+            self._tags.discard_key(key)
+    
+    def _lookup(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        return entry
+    
+    def _ensure_sweeper(self) -> None:
+        if self.sweep_interval is None or self._sweeper is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sweeper = loop.create_task(self._sweep_loop())
+    
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep_expired()
+    
+    def sweep_expired(self) -> int:
+        """Remove every expired entry; returns the number removed."""
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expiry, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Skip stale heap records left behind by overwrites and deletes
+            if entry is not None and entry[1] == expiry:
+                self._remove(key)
+                removed += 1
+        self.expirations += removed
+        return removed
+    
+    def _push_expiry(self, expiry: float, key: str) -> None:
+        heap = self._expiry_heap
+        heapq.heappush(heap, (expiry, key))
+        if len(heap) > max(self.HEAP_COMPACTION_MIN, self.HEAP_COMPACTION_FACTOR * len(self._cache)):
+            # Amortized O(1): at least half of the records were stale
+            heap[:] = [(entry[1], k) for k, entry in self._cache.items() if entry[1] is not None]
+            heapq.heapify(heap)
+    
+    def _make_room(self, key: str, size: int, check_admission: bool = True) -> bool:
+        while self._cache and (
+            len(self._cache) >= self.max_entries
+            or self.current_bytes + size > self.max_bytes
+        ):
+            victim = self.policy.victim()
+            if victim is None:
+                break
+            if check_admission and not self.policy.admit(key, victim):
+                self.rejections += 1
+                return False
+            self._remove(victim)
+            self.evictions += 1
+        return True
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value from the bounded cache."""
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            if isinstance(self.policy, TinyLFUPolicy):
+                self.policy.record_miss(key)
+            return None
+        self.hits += 1
+        self.policy.on_access(key)
+        return entry[0]
+    
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None
+    ) -> None:
+        """Set a value, evicting entries if the cache is over capacity."""
+        self._ensure_sweeper()
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            self.rejections += 1
+            return
+        
+        # Updates to cached keys bypass the admission filter
+        replacing = key in self._cache
+        if replacing:
+            self._remove(key, drop_tags=False)
+        if not self._make_room(key, size, check_admission=not replacing):
+            return
+        
+        expiry = time.monotonic() + expire if expire is not None else None
+        self._cache[key] = (value, expiry)
+        self.current_bytes += size
+        self.policy.on_insert(key)
+        if expiry is not None:
+            self._push_expiry(expiry, key)
+    
+    async def delete(self, key: str) -> None:
+        """Delete a value from the bounded cache."""
+        if key in self._cache:
+            self._remove(key)
+    
+    async def exists(self, key: str) -> bool:
+        """Check if a key exists in the bounded cache."""
+        return self._lookup(key) is not None
+    
+    async def expire(self, key: str, ttl: int) -> None:
+        """Set a key's time to live in seconds."""
+        entry = self._lookup(key)
+        if entry is not None:
+            expiry = time.monotonic() + ttl
+            self._cache[key] = (entry[0], expiry)
+            self._push_expiry(expiry, key)
+    
+    async def ttl(self, key: str) -> int:
+        """Get a key's time to live in seconds."""
+        entry = self._lookup(key)
+        if entry is None:
+            return -2
+        if entry[1] is None:
+            return -1
+        return int(entry[1] - time.monotonic())
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Record cache keys under each tag."""
+        self._tags.add(tag_keys, keys)
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys recorded under a tag."""
+        return self._tags.members(tag_key)
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Drop tags and delete every key they contain."""
+        keys = self._tags.pop(tag_keys)
+        for key in keys:
+            await self.delete(key)
+        return keys
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._cache.clear()
+        self._tags.clear()
+        self._expiry_heap.clear()
+        self.policy.clear()
+        self.current_bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and current usage."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "policy": type(self.policy).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
+    
+    async def close(self) -> None:
+        """Stop the background sweeper."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+class TieredBackend(CacheBackend):
+    """Two-tier read-through cache: a bounded in-process L1 in front of an L2.
+    
+    Reads are served from L1 when possible and filled from L2 on a miss.
+    Writes and deletes go to both tiers. L1 entries live at most ``l1_ttl``
+    seconds, which bounds how stale a value can be when another process
+    updates L2.
+    """
+    
+    def __init__(
+        self,
+        l1: Optional[BoundedMemoryBackend] = None,
+        l2: Optional[CacheBackend] = None,
+        l1_ttl: int = 60
+    ):
+        """Initialize the tiered backend."""
+        self.l1 = l1 or BoundedMemoryBackend()
+        self.l2 = l2 or AsyncRedisBackend()
+        self.l1_ttl = l1_ttl
+    
+    def _l1_expire(self, expire: Optional[int]) -> int:
+        return min(expire, self.l1_ttl) if expire is not None else self.l1_ttl
+    
+    async def _fill_l1(self, key: str, value: Optional[bytes], pttl: Optional[int]) -> None:
+        """Copy a value read from L2 into L1, never outliving the L2 entry.
+        
+        ``pttl`` is the L2 entry's remaining lifetime in milliseconds; the
+        fill is skipped when less than a second is left.
+        """
+        if value is None:
+            return
+        if pttl is None or pttl == -1:
+            await self.l1.set(key, value, expire=self.l1_ttl)
+        elif pttl >= 1000:
+            await self.l1.set(key, value, expire=self._l1_expire(pttl // 1000))
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value from L1, falling back to L2."""
+        value = await self.l1.get(key)
+        if value is not None:
+            return value
+        value, pttl = await self.l2.execute_pipeline([("get", (key,)), ("pttl", (key,))])
+        await self._fill_l1(key, value, pttl)
+        return value
+    
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        """Set a value in both tiers."""
+        await self.l2.set(key, value, expire=expire)
+        await self.l1.set(key, value, expire=self._l1_expire(expire))
+    
+    async def delete(self, key: str) -> None:
+        """Delete a value from both tiers."""
+        await self.l1.delete(key)
+        await self.l2.delete(key)
+    
+    async def exists(self, key: str) -> bool:
+        """Check if a key exists in either tier."""
+        return await self.l1.exists(key) or await self.l2.exists(key)
+    
+    async def expire(self, key: str, ttl: int) -> None:
+        """Set a key's time to live in both tiers."""
+        await self.l1.expire(key, self._l1_expire(ttl))
+        await self.l2.expire(key, ttl)
+    
+    async def ttl(self, key: str) -> int:
+        """Get a key's time to live from L2, the authoritative tier."""
+        return await self.l2.ttl(key)
+    
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Get several values, fetching only L1 misses from L2 in one batch."""
+        results = await self.l1.mget(keys)
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            ops = []
+            for i in missing:
+                ops.extend([("get", (keys[i],)), ("pttl", (keys[i],))])
+            fetched = await self.l2.execute_pipeline(ops)
+            for n, i in enumerate(missing):
+                value, pttl = fetched[2 * n], fetched[2 * n + 1]
+                results[i] = value
+                await self._fill_l1(keys[i], value, pttl)
+        return results
+    
+    async def mset(
+        self,
+        mapping: Dict[str, bytes],
+        expire: Optional[int] = None
+    ) -> None:
+        """Set several values in both tiers."""
+        await self.l2.mset(mapping, expire=expire)
+        await self.l1.mset(mapping, expire=self._l1_expire(expire))
+    
+    async def delete_many(self, keys: List[str]) -> None:
+        """Delete several values from both tiers."""
+        await self.l1.delete_many(keys)
+        await self.l2.delete_many(keys)
+    
+    async def execute_pipeline(self, ops: List[Tuple[str, tuple]]) -> List[Any]:
+        """Run a pipeline on L2 and keep L1 coherent with its writes.
+        
+        The remaining lifetime of every key read is fetched in the same
+        round trip so L1 fills never outlive the L2 entry.
+        """
+        ops = list(ops)
+        reads = [args[0] for name, args in ops if name == "get"]
+        results = await self.l2.execute_pipeline(ops + [("pttl", (key,)) for key in reads])
+        pttls = iter(results[len(ops):])
+        results = results[:len(ops)]
+        for (name, args), result in zip(ops, results):
+            if name == "get":
+                await self._fill_l1(args[0], result, next(pttls))
+            elif name in ("set", "delete", "expire"):
+                await self.l1.delete(args[0])
+        return results
+    
+    async def add_to_tags(
+        self,
+        tag_keys: List[str],
+        keys: List[str],
+        expire: Optional[int] = None
+    ) -> None:
+        """Record tags in L2, the tier shared between processes."""
+        await self.l2.add_to_tags(tag_keys, keys, expire=expire)
+    
+    async def tag_members(self, tag_key: str) -> Set[str]:
+        """Get the cache keys recorded under a tag in L2."""
+        return await self.l2.tag_members(tag_key)
+    
+    async def invalidate_tag_keys(self, tag_keys: List[str]) -> Set[str]:
+        """Invalidate tags in L2 and drop the same keys from L1."""
+        keys = await self.l2.invalidate_tag_keys(tag_keys)
+        await self.l1.delete_many(list(keys))
+        return keys
+    
+    def clear(self) -> None:
+        """Drop every L1 entry; L2 is left untouched."""
+        self.l1.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get L1 counters."""
+        return {"l1": self.l1.stats()}
+    
+    async def close(self) -> None:
+        """Close both tiers."""
+        await self.l1.close()
+        await self.l2.close()
 
 class CacheManager:
     """Cache manager with support for multiple backends and invalidation strategies."""
     
-    def __init__(self, backend: Optional[CacheBackend] = None):
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        codec: Optional[CacheCodec] = None
+    ):
         """Initialize the cache manager."""
         self.backend = backend or self._get_default_backend()
-        self._serializer = json
+        self.codec = codec or self._get_default_codec()
+    
+    def _get_default_codec(self) -> CacheCodec:
+        """Get the default value codec based on settings."""
+        try:
+            return CacheCodec(
+                serializer=settings.CACHE_SERIALIZER,
+                compress_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+                schema_version=settings.CACHE_SCHEMA_VERSION
+            )
+        except ImportError as e:
+            logger.warning(f"Falling back to JSON cache serializer: {e}")
+            return CacheCodec(
+                serializer="json",
+                compress_threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+                schema_version=settings.CACHE_SCHEMA_VERSION
+            )
     
     def _get_default_backend(self) -> CacheBackend:
         """Get the default cache backend based on settings."""
         if settings.CACHE_BACKEND == "redis":
-            return RedisBackend()
-        return InMemoryBackend()
+            return AsyncRedisBackend()
+        l1 = BoundedMemoryBackend(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            eviction=settings.CACHE_EVICTION_POLICY
+        )
+        if settings.CACHE_BACKEND == "tiered":
+            return TieredBackend(l1, AsyncRedisBackend(), l1_ttl=settings.CACHE_L1_TTL)
+        return l1
     
     async def get(
         self, 
@@ -225,18 +1202,40 @@ class CacheManager:
             if cached is None:
                 return default
                 
-            data = self._serializer.loads(cached.decode())
-            
-            if model is not None:
-                if isinstance(data, list):
-                    return [model.parse_obj(item) for item in data]
-                return model.parse_obj(data)
-                
-            return data
+            return self._decode(cached, model)
+        except SchemaVersionMismatch:
+            return default
         except Exception as e:
             logger.warning(f"Cache get failed for key {key}: {e}")
             return default
     
+    async def mget(
+        self,
+        keys: List[str],
+        default: Any = None,
+        model: Type[BaseModel] = None
+    ) -> List[Any]:
+        """Get several values from the cache in one backend round trip."""
+        try:
+            cached_values = await self.backend.mget(keys)
+        except Exception as e:
+            logger.warning(f"Cache mget failed for {len(keys)} keys: {e}")
+            return [default] * len(keys)
+        
+        results = []
+        for key, cached in zip(keys, cached_values):
+            if cached is None:
+                results.append(default)
+                continue
+            try:
+                results.append(self._decode(cached, model))
+            except SchemaVersionMismatch:
+                results.append(default)
+            except Exception as e:
+                logger.warning(f"Cache get failed for key {key}: {e}")
+                results.append(default)
+        return results
+    
     async def set(
         self, 
         key: str, 
@@ -246,20 +1245,39 @@ class CacheManager:
     ) -> None:
         """Set a value in the cache."""
         try:
-            if hasattr(value, 'dict'):
-                value = value.dict()
-                
-            serialized = self._serializer.dumps(value).encode()
+            serialized = self._encode(value)
             await self.backend.set(key, serialized, expire=expire)
             
             # Store cache key for each tag
             if tags:
-                for tag in tags:
-                    tag_key = self._get_tag_key(tag)
-                    await self._add_to_tag(tag_key, key, expire)
+                await self.backend.add_to_tags(
+                    [self._get_tag_key(tag) for tag in tags], [key], expire=expire
+                )
         except Exception as e:
             logger.warning(f"Cache set failed for key {key}: {e}")
     
+    async def mset(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[int] = None,
+        tags: List[str] = None
+    ) -> None:
+        """Set several values in the cache in one backend round trip."""
+        try:
+            serialized = {key: self._encode(value) for key, value in mapping.items()}
+            await self.backend.mset(serialized, expire=expire)
+            
+            if tags:
+                await self.backend.add_to_tags(
+                    [self._get_tag_key(tag) for tag in tags], list(mapping), expire=expire
+                )
+        except Exception as e:
+            logger.warning(f"Cache mset failed for {len(mapping)} keys: {e}")
+    
+    def pipeline(self) -> "CachePipeline":
+        """Start a pipeline that batches operations into one round trip."""
+        return CachePipeline(self)
+    
     async def delete(self, key: str) -> None:
         """Delete a value from the cache."""
         try:
@@ -269,66 +1287,271 @@ class CacheManager:
     
     async def invalidate_tag(self, tag: str) -> None:
         """Invalidate all cache entries with the given tag."""
+        await self.invalidate_tags([tag])
+    
+    async def invalidate_tags(self, tags: List[str]) -> int:
+        """Invalidate all cache entries with any of the given tags.
+        
+        The whole group of tags is resolved and invalidated in one backend
+        batch rather than one round trip per tag and key.
+        
+        Returns:
+            Number of cache entries invalidated
+        """
+        if not tags:
+            return 0
         try:
-            tag_key = self._get_tag_key(tag)
-            cache_keys = await self.get(tag_key, default=[])
-            
-            if cache_keys:
-                await asyncio.gather(*[self.delete(key) for key in cache_keys])
-                await self.delete(tag_key)
+            keys = await self.backend.invalidate_tag_keys(
+                [self._get_tag_key(tag) for tag in tags]
+            )
+            return len(keys)
         except Exception as e:
-            logger.warning(f"Cache tag invalidation failed for tag {tag}: {e}")
+            logger.warning(f"Cache tag invalidation failed for tags {tags}: {e}")
+            return 0
     
-    async def invalidate_tags(self, tags: List[str]) -> None:
-        """Invalidate all cache entries with any of the given tags."""
-        await asyncio.gather(*[self.invalidate_tag(tag) for tag in tags])
+    async def tag_members(self, tag: str) -> Set[str]:
+        """Get the cache keys currently recorded under a tag."""
+        try:
+            return await self.backend.tag_members(self._get_tag_key(tag))
+        except Exception as e:
+            logger.warning(f"Cache tag lookup failed for tag {tag}: {e}")
+            return set()
     
     async def clear(self) -> None:
         """Clear the entire cache."""
         # Note: This is a destructive operation and should be used with caution
         # In a real implementation, you might want to only clear a specific prefix
-        if isinstance(self.backend, InMemoryBackend):
-            self.backend._cache.clear()
+        if isinstance(self.backend, (InMemoryBackend, BoundedMemoryBackend, TieredBackend)):
+            self.backend.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get backend cache statistics, if the backend keeps any."""
+        if hasattr(self.backend, "stats"):
+            return self.backend.stats()
+        return {}
     
     async def close(self) -> None:
         """Close the cache connection."""
         await self.backend.close()
     
+    def _encode(self, value: Any) -> bytes:
+        """Serialize a value for storage in the backend."""
+        return self.codec.encode(value)
+    
+    def _decode(self, cached: bytes, model: Type[BaseModel] = None) -> Any:
+        """Deserialize a stored value, optionally into a pydantic model."""
+        return self.codec.decode(cached, model)
+    
     def _get_tag_key(self, tag: str) -> str:
         """Get the cache key for a tag."""
         return f"cache_tag:{tag}"
+
+class CachePipeline:
+    """Buffers cache operations and sends them to the backend together.
     
-    async def _add_to_tag(self, tag_key: str, cache_key: str, expire: Optional[int]) -> None:
-        """Add a cache key to a tag."""
-        try:
-            cache_keys = await self.get(tag_key, default=[])
-            if cache_key not in cache_keys:
-                cache_keys.append(cache_key)
-                await self.backend.set(
-                    tag_key,
-                    self._serializer.dumps(cache_keys).encode(),
-                    expire=expire
-                )
-        except Exception as e:
-            logger.warning(f"Failed to add key {cache_key} to tag {tag_key}: {e}")
+    Operations are queued in call order and executed in a single backend
+    round trip, either explicitly with ``execute()`` or on leaving an
+    ``async with`` block. Results of ``get`` are deserialized like
+    ``CacheManager.get``; write operations yield ``None``.
+    """
+    
+    def __init__(self, manager: CacheManager):
+        """Initialize the pipeline for a cache manager."""
+        self._manager = manager
+        self._ops: List[Tuple[str, tuple]] = []
+        self._models: List[Optional[Type[BaseModel]]] = []
+        self.results: List[Any] = []
+    
+    def get(self, key: str, model: Type[BaseModel] = None) -> "CachePipeline":
+        """Queue a get."""
+        self._ops.append(("get", (key,)))
+        self._models.append(model)
+        return self
+    
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> "CachePipeline":
+        """Queue a set."""
+        self._ops.append(("set", (key, self._manager._encode(value), expire)))
+        self._models.append(None)
+        return self
+    
+    def delete(self, key: str) -> "CachePipeline":
+        """Queue a delete."""
+        self._ops.append(("delete", (key,)))
+        self._models.append(None)
+        return self
+    
+    def expire(self, key: str, ttl: int) -> "CachePipeline":
+        """Queue a TTL update."""
+        self._ops.append(("expire", (key, ttl)))
+        self._models.append(None)
+        return self
+    
+    async def execute(self) -> List[Any]:
+        """Execute all queued operations and return their results."""
+        ops, models = self._ops, self._models
+        self._ops, self._models = [], []
+        
+        raw_results = await self._manager.backend.execute_pipeline(ops)
+        
+        results = []
+        for (name, args), model, raw in zip(ops, models, raw_results):
+            if name == "get" and raw is not None:
+                try:
+                    raw = self._manager._decode(raw, model)
+                except SchemaVersionMismatch:
+                    raw = None
+                except Exception as e:
+                    logger.warning(f"Cache get failed for key {args[0]}: {e}")
+                    raw = None
+            results.append(raw)
+        self.results = results
+        return results
+    
+    async def __aenter__(self) -> "CachePipeline":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
+        if exc_type is None and self._ops:
+            await self.execute()
+        return False
+
+class CachedCallMetrics:
+    """Counters for a function wrapped with @cached."""
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.early_refreshes = 0
+        self.errors = 0
+    
+    def as_dict(self) -> Dict[str, int]:
+        """Get the counters as a dictionary."""
+        return dict(self.__dict__)
+
+# Marker key identifying entries written by @cached
+_CACHED_ENTRY_MARKER = "__cached__"
+
+def _wrap_cached_value(value: Any, ttl: float, compute_time: float) -> Dict[str, Any]:
+    """Wrap a computed value with its soft expiry and recomputation cost."""
+    return {
+        _CACHED_ENTRY_MARKER: 1,
+        "value": to_primitive(value),
+        "soft_expiry": time.time() + ttl,
+        "compute_time": compute_time,
+    }
+
+def _unwrap_cached_value(entry: Any) -> Tuple[Any, Optional[float], float]:
+    """Return (value, soft expiry, compute time) for a cached entry."""
+    if isinstance(entry, dict) and entry.get(_CACHED_ENTRY_MARKER) == 1:
+        return entry["value"], entry["soft_expiry"], entry["compute_time"]
+    # Entries written before soft expiry was tracked are fresh until evicted
+    return entry, None, 0.0
 
 def cached(
     key: str = None,
-    ttl: int = 300,
+    ttl: float = 300,
     tags: List[str] = None,
     key_builder: Callable[..., str] = None,
-    cache_none: bool = True
+    cache_none: bool = True,
+    stale_ttl: float = 0,
+    early_expiration_beta: float = 0.0,
+    single_flight: bool = True
 ):
     """Decorator to cache function results.
     
+    Concurrent misses for the same key are coalesced into one call of the
+    wrapped function (single-flight). With ``stale_ttl`` an expired value
+    is still served for that long while one background call refreshes it
+    (stale-while-revalidate). With ``early_expiration_beta`` callers
+    recompute probabilistically shortly before expiry, weighted by how
+    long the last computation took, so hot keys rarely expire at all.
+    Counters are available as ``wrapper.cache_metrics``.
+    
     Args:
         key: Cache key (can include {arg} placeholders)
         ttl: Time to live in seconds
         tags: List of cache tags for invalidation
         key_builder: Function to generate cache key from function arguments
         cache_none: Whether to cache None results
+        stale_ttl: Seconds an expired value may still be served while refreshing
+        early_expiration_beta: Probabilistic early expiration factor (0 disables, 1 is typical)
+        single_flight: Whether to coalesce concurrent computations of one key
     """
     def decorator(func: Callable[..., R]) -> Callable[..., R]:
+        metrics = CachedCallMetrics()
+        inflight: Dict[str, asyncio.Future] = {}
+        background_refreshes: Dict[str, asyncio.Task] = {}
+        signature = inspect.signature(func)
+        
+        def build_key(args: tuple, kwargs: dict) -> str:
+            if key_builder:
+                return key_builder(*args, **kwargs)
+            if key:
+                # Format key with function arguments
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                return key.format(**bound.arguments)
+            # Default key based on function name and arguments
+            return f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
+        
+        async def compute(cache: CacheManager, cache_key: str, args: tuple, kwargs: dict) -> R:
+            start_time = time.perf_counter()
+            result = await func(*args, **kwargs)
+            compute_time = time.perf_counter() - start_time
+            
+            if result is not None or cache_none:
+                await cache.set(
+                    cache_key,
+                    _wrap_cached_value(result, ttl, compute_time),
+                    expire=math.ceil(ttl + stale_ttl),
+                    tags=tags
+                )
+            return result
+        
+        async def run_once(cache: CacheManager, cache_key: str, args: tuple, kwargs: dict) -> R:
+            if not single_flight:
+                return await compute(cache, cache_key, args, kwargs)
+            
+            future = inflight.get(cache_key)
+            if future is not None:
+                metrics.coalesced += 1
+                return await asyncio.shield(future)
+            
+            future = asyncio.get_running_loop().create_future()
+            inflight[cache_key] = future
+            try:
+                result = await compute(cache, cache_key, args, kwargs)
+                future.set_result(result)
+                return result
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                metrics.errors += 1
+                future.set_exception(e)
+                # Mark as retrieved; coalesced callers still receive the error
+                future.exception()
+                raise
+            finally:
+                inflight.pop(cache_key, None)
+        
+        def refresh_in_background(cache: CacheManager, cache_key: str, args: tuple, kwargs: dict) -> None:
+            if cache_key in inflight or cache_key in background_refreshes:
+                return
+            metrics.refreshes += 1
+            task = asyncio.create_task(run_once(cache, cache_key, args, kwargs))
+            background_refreshes[cache_key] = task
+            
+            def on_done(done: asyncio.Task) -> None:
+                background_refreshes.pop(cache_key, None)
+                if not done.cancelled() and done.exception() is not None:
+                    logger.warning(f"Background refresh failed for key {cache_key}: {done.exception()}")
+            
+            task.add_done_callback(on_done)
+        
         @wraps(func)
         async def wrapper(*args, **kwargs) -> R:
             # Skip caching if disabled
@@ -336,47 +1559,46 @@ def cached(
                 return await func(*args, **kwargs)
             
             # Get cache instance from first argument if it's a method
-            cache = None
+            cache_manager = None
             if args and hasattr(args[0], 'cache'):
-                cache = args[0].cache
+                cache_manager = args[0].cache
             
-            if cache is None:
-                cache = CacheManager()
+            if cache_manager is None:
+                cache_manager = cache
             
-            # Build cache key
-            cache_key = None
-            if key_builder:
-                cache_key = key_builder(*args, **kwargs)
-            elif key:
-                # Format key with function arguments
-                bound_arguments = {}
-                if hasattr(func, '__annotations__'):
-                    # Handle both async and sync functions
-                    if asyncio.iscoroutinefunction(func):
-                        sig = inspect.signature(func)
-                        bound = sig.bind(*args, **kwargs)
-                        bound.apply_defaults()
-                        bound_arguments = bound.arguments
-                
-                cache_key = key.format(**bound_arguments)
-            else:
-                # Default key based on function name and arguments
-                cache_key = f"{func.__module__}:{func.__name__}:{args}:{kwargs}"
+            cache_key = build_key(args, kwargs)
             
             # Try to get from cache
-            result = await cache.get(cache_key)
-            if result is not None or (result is None and not cache_none):
-                return result
-            
-            # Call the wrapped function
-            result = await func(*args, **kwargs)
-            
-            # Cache the result
-            if result is not None or cache_none:
-                await cache.set(cache_key, result, expire=ttl, tags=tags)
+            entry = await cache_manager.get(cache_key, default=_MISSING)
+            if entry is not _MISSING:
+                value, soft_expiry, compute_time = _unwrap_cached_value(entry)
+                now = time.time()
+                
+                if soft_expiry is None or now < soft_expiry:
+                    # XFetch: recompute early with a probability that grows
+                    # as expiry approaches and with the recomputation cost
+                    if (
+                        early_expiration_beta > 0
+                        and soft_expiry is not None
+                        and now - compute_time * early_expiration_beta * math.log(1.0 - random.random()) >= soft_expiry
+                    ):
+                        metrics.early_refreshes += 1
+                        if stale_ttl:
+                            refresh_in_background(cache_manager, cache_key, args, kwargs)
+                            return value
+                        return await run_once(cache_manager, cache_key, args, kwargs)
+                    metrics.hits += 1
+                    return value
+                
+                if stale_ttl:
+                    metrics.stale_hits += 1
+                    refresh_in_background(cache_manager, cache_key, args, kwargs)
+                    return value
             
-            return result
+            metrics.misses += 1
+            return await run_once(cache_manager, cache_key, args, kwargs)
         
+        wrapper.cache_metrics = metrics
         return wrapper
     return decorator
 
@@ -53,8 +53,16 @@ class Settings(BaseSettings):
     REDIS_URL: str = "redis://localhost:6379/0"
     
     # Cache
-    CACHE_BACKEND: str = "redis"
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "redis"  # "redis", "memory" or "tiered" (memory L1 in front of Redis)
     CACHE_TTL: int = 300
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_EVICTION_POLICY: str = "lru"  # "lru", "lfu" or "tinylfu"
+    CACHE_L1_TTL: int = 60
+    CACHE_SERIALIZER: str = "orjson"  # "json", "orjson", "msgpack" or "pickle"
+    CACHE_COMPRESSION_THRESHOLD: Optional[int] = 4096  # bytes; None disables compression
+    CACHE_SCHEMA_VERSION: int = 1  # bump to invalidate entries written with older model shapes
     
     # Database Pool
     DB_POOL_SIZE: int = 10
@@ -0,0 +1,247 @@
+import dataclasses
+import json
+import pickle
+import struct
+import zlib
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional, Type, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from pydantic import BaseModel
+
+class SchemaVersionMismatch(Exception):
+    """Raised when a cached envelope was written under another schema version."""
+
+def _default(value: Any) -> Any:
+    """Convert values the binary/text codecs cannot encode natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+def to_primitive(value: Any) -> Any:
+    """Convert pydantic models and dataclasses to plain data for caching."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "dict") and callable(value.dict):
+        return value.dict()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, list) and value and (
+        isinstance(value[0], BaseModel) or dataclasses.is_dataclass(value[0])
+    ):
+        return [to_primitive(item) for item in value]
+    return value
+
+def from_primitive(data: Any, model: Type[BaseModel]) -> Any:
+    """Rebuild pydantic models from cached plain data."""
+    parse = model.model_validate if hasattr(model, "model_validate") else model.parse_obj
+    if isinstance(data, list):
+        return [parse(item) for item in data]
+    return parse(data)
+
+class Serializer:
+    """Base class for cache value codecs.
+
+    ``codec_id`` is written into every envelope so entries stay readable
+    after the configured serializer changes.
+    """
+
+    name: str = ""
+    codec_id: int = 0
+
+    def dumps(self, value: Any) -> bytes:
+        """Serialize a value to bytes."""
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        """Deserialize bytes to a value."""
+        raise NotImplementedError
+
+class JSONSerializer(Serializer):
+    """Standard library JSON codec."""
+
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_default).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(bytes(data))
+
+class OrjsonSerializer(Serializer):
+    """orjson codec: JSON-compatible output at several times the speed."""
+
+    name = "orjson"
+    codec_id = 2
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required for the orjson cache serializer")
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class MsgpackSerializer(Serializer):
+    """MessagePack binary codec: compact output for numeric-heavy payloads."""
+
+    name = "msgpack"
+    codec_id = 3
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is required for the msgpack cache serializer")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+class PickleSerializer(Serializer):
+    """Pickle protocol 5 codec.
+
+    Only use this when every process that can write to the cache is
+    trusted: unpickling data from an untrusted source can execute code.
+    """
+
+    name = "pickle"
+    codec_id = 4
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=5)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+SERIALIZERS: Dict[str, Type[Serializer]] = {
+    cls.name: cls
+    for cls in (JSONSerializer, OrjsonSerializer, MsgpackSerializer, PickleSerializer)
+}
+
+_SERIALIZERS_BY_ID: Dict[int, Type[Serializer]] = {cls.codec_id: cls for cls in SERIALIZERS.values()}
+
+# Codecs a CacheCodec reads besides its own unless told otherwise; none of them can run code
+SAFE_CODECS = ("json", "orjson", "msgpack")
+
+def get_serializer(name: str) -> Serializer:
+    """Create a serializer by name ("json", "orjson", "msgpack" or "pickle")."""
+    try:
+        return SERIALIZERS[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown cache serializer: {name}")
+
+class CacheCodec:
+    """Encodes cache values into schema-versioned, optionally compressed envelopes.
+
+    Envelope layout (6-byte header followed by the payload)::
+
+        magic (0xCA) | format version | codec id | flags | schema version (uint16)
+
+    Payloads larger than ``compress_threshold`` bytes are zlib-compressed.
+    Entries written under a different ``schema_version`` raise
+    SchemaVersionMismatch on decode so callers can treat them as misses.
+    Values without a header are read as plain JSON written by older
+    releases of the cache layer. Only envelopes from ``allowed_codecs``
+    are decoded; pickle envelopes are rejected unless pickle is the
+    configured serializer or is listed explicitly.
+    """
+
+    MAGIC = 0xCA
+    FORMAT_VERSION = 1
+    FLAG_COMPRESSED = 0x01
+    _HEADER = struct.Struct(">BBBBH")
+
+    def __init__(
+        self,
+        serializer: Union[str, Serializer] = "orjson",
+        compress_threshold: Optional[int] = 4096,
+        compression_level: int = 1,
+        schema_version: int = 1,
+        allowed_codecs: Optional[Iterable[str]] = None
+    ):
+        """Initialize the codec.
+
+        Args:
+            serializer: Serializer instance or name
+            compress_threshold: Compress payloads above this many bytes (None disables)
+            compression_level: zlib compression level (1 = fastest)
+            schema_version: Version stamped on written entries and required on read
+            allowed_codecs: Serializer names accepted on decode besides the configured
+                one (default: json, orjson and msgpack)
+        """
+        if isinstance(serializer, str):
+            serializer = get_serializer(serializer)
+        self.serializer = serializer
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self.schema_version = schema_version
+        names = SAFE_CODECS if allowed_codecs is None else allowed_codecs
+        for name in names:
+            if name.lower() not in SERIALIZERS:
+                raise ValueError(f"Unknown cache serializer: {name}")
+        self.allowed_codec_ids = frozenset(
+            {SERIALIZERS[name.lower()].codec_id for name in names} | {serializer.codec_id}
+        )
+        self._decoders: Dict[int, Serializer] = {serializer.codec_id: serializer}
+
+    def _decoder(self, codec_id: int) -> Serializer:
+        decoder = self._decoders.get(codec_id)
+        if decoder is None:
+            if codec_id not in _SERIALIZERS_BY_ID:
+                raise ValueError(f"Unknown cache codec id: {codec_id}")
+            if codec_id not in self.allowed_codec_ids:
+                raise ValueError(f"Cache codec {_SERIALIZERS_BY_ID[codec_id].name} is not allowed")
+            decoder = self._decoders[codec_id] = _SERIALIZERS_BY_ID[codec_id]()
+        return decoder
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value into an envelope."""
+        payload = self.serializer.dumps(to_primitive(value))
+        flags = 0
+        if self.compress_threshold is not None and len(payload) > self.compress_threshold:
+            payload = zlib.compress(payload, self.compression_level)
+            flags |= self.FLAG_COMPRESSED
+        header = self._HEADER.pack(
+            self.MAGIC, self.FORMAT_VERSION, self.serializer.codec_id, flags, self.schema_version
+        )
+        return header + payload
+
+    def decode(self, data: bytes, model: Type[BaseModel] = None) -> Any:
+        """Deserialize an envelope, optionally into a pydantic model."""
+        if not data or data[0] != self.MAGIC:
+            value = json.loads(data)
+        else:
+            _, _, codec_id, flags, schema_version = self._HEADER.unpack_from(data)
+            if schema_version != self.schema_version:
+                raise SchemaVersionMismatch(
+                    f"Cached schema version {schema_version} != {self.schema_version}"
+                )
+            payload = memoryview(data)[self._HEADER.size:]
+            if flags & self.FLAG_COMPRESSED:
+                payload = zlib.decompress(payload)
+            value = self._decoder(codec_id).loads(payload)
+
+        if model is not None:
+            return from_primitive(value, model)
+        return value
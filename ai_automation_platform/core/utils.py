@@ -1,16 +1,19 @@
 import asyncio
 import hashlib
+import heapq
 import inspect
+import itertools
 import json
 import logging
 import os
 import random
 import string
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timezone
 from functools import wraps
-from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, ParamSpec, Type, TypeVar, Union, cast
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, ParamSpec, Tuple, Type, TypeVar, Union, cast
 
 from pydantic import BaseModel
 
@@ -145,44 +148,116 @@ class Singleton(type):
         return cls._instances[cls]
 
 class LRUCache:
-    """Least Recently Used (LRU) cache implementation."""
+    """Least Recently Used (LRU) cache with O(1) get, set and delete."""
     
     def __init__(self, max_size: int = 1000):
-        self.cache = {}
+        self.cache: "OrderedDict[Any, Any]" = OrderedDict()
         self.max_size = max_size
-        self.order = []
+    
+    def __len__(self) -> int:
+        return len(self.cache)
+    
+    def __contains__(self, key: Any) -> bool:
+        """Check membership without affecting recency."""
+        return key in self.cache
     
     def get(self, key: Any) -> Any:
         """Get a value from the cache."""
-        if key in self.cache:
-            self.order.remove(key)
-            self.order.append(key)
-            return self.cache[key]
-        return None
+        try:
+            value = self.cache[key]
+        except KeyError:
+            return None
+        self.cache.move_to_end(key)
+        return value
     
     def set(self, key: Any, value: Any) -> None:
         """Set a value in the cache."""
         if key in self.cache:
-            self.order.remove(key)
+            self.cache.move_to_end(key)
         elif len(self.cache) >= self.max_size:
-            oldest = self.order.pop(0)
-            del self.cache[oldest]
+            self.cache.popitem(last=False)
         
         self.cache[key] = value
-        self.order.append(key)
     
     def delete(self, key: Any) -> bool:
         """Delete a value from the cache."""
         if key in self.cache:
             del self.cache[key]
-            self.order.remove(key)
             return True
         return False
     
     def clear(self) -> None:
         """Clear the cache."""
         self.cache.clear()
-        self.order.clear()
+
+class ThreadSafeLRUCache(LRUCache):
+    """LRUCache guarded by a lock for use from multiple threads."""
+    
+    def __init__(self, max_size: int = 1000):
+        super().__init__(max_size)
+        self._lock = threading.RLock()
+    
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return super().__contains__(key)
+    
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            return super().get(key)
+    
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            super().set(key, value)
+    
+    def delete(self, key: Any) -> bool:
+        with self._lock:
+            return super().delete(key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+
+class _AsyncLoaderMixin:
+    """Adds a single-flight ``get_or_set`` for coroutine value factories.
+    
+    The synchronous methods never await, so they are already atomic on one
+    event loop. What needs coordinating is the await between a miss and the
+    following set: concurrent callers for the same key wait on a per-key
+    lock and reuse the first caller's result instead of recomputing it.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._key_locks: Dict[Any, List[Any]] = {}
+    
+    async def get_or_set(self, key: Any, factory: Callable[[], Awaitable[T]], *args: Any) -> T:
+        """Return the cached value or compute, store and return it.
+        
+        Args:
+            key: Cache key
+            factory: Coroutine function producing the value on a miss
+            *args: Extra arguments passed to ``set`` (e.g. a TTL)
+        """
+        if key in self:
+            return self.get(key)
+        
+        # [lock, number of callers holding or waiting for it]
+        entry = self._key_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                if key in self:
+                    return self.get(key)
+                value = await factory()
+                self.set(key, value, *args)
+                return value
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+class AsyncLRUCache(_AsyncLoaderMixin, LRUCache):
+    """LRUCache with a single-flight ``get_or_set`` for asyncio code."""
 
 class RateLimiter:
     """Simple rate limiter using token bucket algorithm."""
@@ -239,7 +314,13 @@ class RateLimiter:
             await asyncio.sleep(0.1)
 
 class ExpiringDict:
-    """Dictionary with expiring values."""
+    """Dictionary with expiring values.
+    
+    Expiry times are kept in a min-heap so cleanup only touches entries that
+    have actually expired. Overwritten or deleted keys leave stale heap
+    records behind; they are skipped when popped and the heap is compacted
+    once stale records outnumber live entries.
+    """
     
     def __init__(self, default_ttl: float = 60.0):
         """
@@ -248,13 +329,19 @@ class ExpiringDict:
         Args:
             default_ttl: Default time to live in seconds
         """
-        self.store = {}
+        self.store: Dict[Any, Tuple[Any, float]] = {}
         self.default_ttl = default_ttl
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+    
+    def __len__(self) -> int:
+        """Number of stored entries, including expired ones not yet cleaned up."""
+        return len(self.store)
     
     def __getitem__(self, key: Any) -> Any:
         """Get a value from the dictionary."""
         value, expiry = self.store[key]
-        if time.time() > expiry:
+        if time.monotonic() > expiry:
             del self.store[key]
             raise KeyError(key)
         return value
@@ -286,7 +373,16 @@ class ExpiringDict:
         """
         if ttl is None:
             ttl = self.default_ttl
-        self.store[key] = (value, time.time() + ttl)
+        now = time.monotonic()
+        expiry = now + ttl
+        self.store[key] = (value, expiry)
+        heapq.heappush(self._heap, (expiry, next(self._counter), key))
+        
+        # Amortized cleanup keeps memory bounded without a full scan
+        if self._heap[0][0] < now:
+            self._pop_expired(now)
+        if len(self._heap) > 2 * len(self.store) + 64:
+            self._compact()
     
     def get(self, key: Any, default: Any = None) -> Any:
         """Get a value with a default if not found or expired."""
@@ -295,9 +391,47 @@ class ExpiringDict:
         except KeyError:
             return default
     
+    def _pop_expired(self, now: float) -> int:
+        removed = 0
+        heap = self._heap
+        while heap and heap[0][0] < now:
+            expiry, _, key = heapq.heappop(heap)
+            entry = self.store.get(key)
+            if entry is not None and entry[1] == expiry:
+                del self.store[key]
+                removed += 1
+        return removed
+    
+    def _compact(self) -> None:
+        self._heap = [(expiry, next(self._counter), key) for key, (_, expiry) in self.store.items()]
+        heapq.heapify(self._heap)
+    
     def cleanup(self) -> None:
         """Remove all expired items."""
-        now = time.time()
-        expired_keys = [k for k, (_, expiry) in self.store.items() if now > expiry]
-        for key in expired_keys:
-            del self.store[key]
+        self._pop_expired(time.monotonic())
+
+class ThreadSafeExpiringDict(ExpiringDict):
+    """ExpiringDict guarded by a lock for use from multiple threads."""
+    
+    def __init__(self, default_ttl: float = 60.0):
+        super().__init__(default_ttl)
+        self._lock = threading.RLock()
+    
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            return super().__getitem__(key)
+    
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            super().__delitem__(key)
+    
+    def set(self, key: Any, value: Any, ttl: float = None) -> None:
+        with self._lock:
+            super().set(key, value, ttl)
+    
+    def cleanup(self) -> None:
+        with self._lock:
+            super().cleanup()
+
+class AsyncExpiringDict(_AsyncLoaderMixin, ExpiringDict):
+    """ExpiringDict with a single-flight ``get_or_set`` for asyncio code."""
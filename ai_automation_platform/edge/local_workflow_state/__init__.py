@@ -1,7 +1,7 @@
 """Local Workflow State Management module for the Edge Layer."""
 from .manager import LocalWorkflowStateManager
 from .enums import TaskState, TaskPriority, TaskType
-from .models import TaskStateData, TaskDependency, TaskHistory
+from .models import TaskStateData, TaskDependency, TaskHistoryEntry
 
 __all__ = [
     'LocalWorkflowStateManager',
@@ -10,5 +10,5 @@ __all__ = [
     'TaskType',
     'TaskStateData',
     'TaskDependency',
-    'TaskHistory'
+    'TaskHistoryEntry'
 ]
@@ -3,8 +3,11 @@ import asyncio
 import aiosqlite
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Set, Any, AsyncIterator
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, List, Optional, Set, Any, AsyncIterator, Sequence, Tuple
 from pathlib import Path
 
 from .models import TaskStateData, TaskDependency, TaskHistoryEntry
@@ -12,32 +15,97 @@ from .enums import TaskState, TaskPriority, TaskType
 
 logger = logging.getLogger(__name__)
 
+# One SQL statement and the parameter rows it is executed with
+Statement = Tuple[str, Sequence[tuple]]
+
+INSERT_TASK_SQL = """
+INSERT INTO tasks (
+    task_id, state, task_type, priority, created_at, updated_at, 
+    metadata, max_retries, is_active, unmet_dependencies
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_HISTORY_SQL = """
+INSERT INTO task_history 
+(task_id, timestamp, from_state, to_state, message, data)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+INSERT_DEPENDENCY_SQL = """
+INSERT OR IGNORE INTO task_dependencies 
+(parent_id, child_id, dependency_type)
+VALUES (?, ?, ?)
+"""
+
 class LocalWorkflowStateManager:
     """
     Manages workflow state locally on edge devices with SQLite persistence.
     Provides async CRUD operations for tasks with dependency management.
+
+    Every pending task carries a count of unmet dependencies (persisted in
+    ``tasks.unmet_dependencies``). A parent reaching a terminal state
+    decrements its children's counts, and tasks whose count reaches zero
+    join an insertion-ordered ready queue, so ``find_ready_tasks`` costs
+    O(limit) and never touches the database.
+
+    Writes are applied to the in-memory state immediately and persisted
+    write-behind: a single writer task gathers the mutations queued within
+    ``batch_interval`` seconds into one transaction, and each caller is
+    resumed once the commit holding its mutation is done. A mutation whose
+    commit fails is undone in memory before the error reaches its caller. Reads that miss
+    the cache use a pool of read-only connections, which WAL lets proceed
+    while a write transaction is open.
     """
     
-    def __init__(self, db_path: str = "workflow_state.db"):
+    def __init__(
+        self,
+        db_path: str = "workflow_state.db",
+        batch_interval: float = 0.002,
+        max_batch_size: int = 1000,
+        read_pool_size: int = 2
+    ):
         self.db_path = db_path
+        self.batch_interval = batch_interval
+        self.max_batch_size = max_batch_size
+        self.read_pool_size = read_pool_size
         self._db = None
-        self._lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.write_stats = {"batches": 0, "mutations": 0, "largest_batch": 0, "failed_batches": 0}
         self._cache: Dict[str, TaskStateData] = {}
+        self._unmet: Dict[str, int] = {}  # pending task_id -> unmet dependency count
+        self._dependents: Dict[str, List[Tuple[str, str]]] = {}  # parent_id -> [(child_id, dependency_type)]
+        self._ready: Dict[str, None] = {}  # pending tasks with no unmet dependencies, oldest first
         
     async def initialize(self) -> None:
         """Initialize the database and create tables if they don't exist."""
-        async with self._lock:
-            self._db = await aiosqlite.connect(self.db_path)
-            self._db.row_factory = aiosqlite.Row
-            
-            # Enable WAL mode for better concurrency
-            await self._db.execute("PRAGMA journal_mode=WAL")
-            
-            # Create tables
-            await self._create_tables()
-            
-            # Load existing tasks into cache
-            await self._load_tasks_into_cache()
+        self._db = await aiosqlite.connect(self.db_path)
+        self._db.row_factory = aiosqlite.Row
+        
+        # Enable WAL mode for better concurrency
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        
+        # Create tables
+        await self._create_tables()
+        
+        # Load existing tasks into cache
+        await self._load_tasks_into_cache()
+        await self._load_dependency_index()
+        
+        # Readers only see committed data, so they open after the schema exists
+        if self.read_pool_size > 0 and self.db_path != ":memory:":
+            self._read_pool = asyncio.Queue()
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            for _ in range(self.read_pool_size):
+                reader = await aiosqlite.connect(uri, uri=True)
+                reader.row_factory = aiosqlite.Row
+                self._readers.append(reader)
+                self._read_pool.put_nowait(reader)
+        
+        self._write_queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._writer_loop())
     
     async def _create_tables(self) -> None:
         """Create database tables if they don't exist."""
@@ -53,9 +121,21 @@ class LocalWorkflowStateManager:
             error TEXT,
             retry_count INTEGER DEFAULT 0,
             max_retries INTEGER DEFAULT 3,
-            is_active INTEGER DEFAULT 1
+            is_active INTEGER DEFAULT 1,
+            unmet_dependencies INTEGER NOT NULL DEFAULT 0
         )
         """)
+
+        # Databases created before the dependency counter get it backfilled
+        async with self._db.execute("PRAGMA table_info(tasks)") as cursor:
+            columns = {row["name"] async for row in cursor}
+        if "unmet_dependencies" not in columns:
+            await self._db.execute(
+                "ALTER TABLE tasks ADD COLUMN unmet_dependencies INTEGER NOT NULL DEFAULT 0"
+            )
+            backfill_counters = True
+        else:
+            backfill_counters = False
         
         await self._db.execute("""
         CREATE TABLE IF NOT EXISTS task_dependencies (
@@ -89,70 +169,147 @@ class LocalWorkflowStateManager:
         CREATE INDEX IF NOT EXISTS idx_task_updated ON tasks(updated_at)
         """)
         
+        await self._db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_task_ready ON tasks(state, unmet_dependencies) WHERE is_active = 1
+        """)
+        
+        await self._db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_dependency_child ON task_dependencies(child_id)
+        """)
+        
+        if backfill_counters:
+            await self._recount_unmet_dependencies()
+        
         await self._db.commit()
     
+    async def _recount_unmet_dependencies(self) -> None:
+        """Recompute every task's unmet dependency count in one statement."""
+        await self._db.execute(
+            """
+            UPDATE tasks SET unmet_dependencies = (
+                SELECT COUNT(*) FROM task_dependencies d
+                LEFT JOIN tasks p ON p.task_id = d.parent_id
+                WHERE d.child_id = tasks.task_id AND (
+                    (d.dependency_type = 'completion' AND (p.state IS NULL OR p.state NOT IN (?, ?)))
+                    OR (d.dependency_type = 'success' AND (p.state IS NULL OR p.state != ?))
+                )
+            )
+            """,
+            (TaskState.COMPLETED.value, TaskState.FAILED.value, TaskState.COMPLETED.value)
+        )
+    
     async def _load_tasks_into_cache(self) -> None:
         """Load all active tasks from the database into the cache."""
         async with self._db.execute("SELECT * FROM tasks WHERE is_active = 1") as cursor:
             async for row in cursor:
                 task = await self._row_to_task(row)
                 self._cache[task.task_id] = task
+                if task.state == TaskState.PENDING:
+                    self._unmet[task.task_id] = row["unmet_dependencies"]
+                    if row["unmet_dependencies"] == 0:
+                        self._ready[task.task_id] = None
     
-    async def create_task(self, task_data: Dict[str, Any]) -> TaskStateData:
-        """Create a new task with the given data."""
+    async def _load_dependency_index(self) -> None:
+        """Load the edges that can still release a pending task."""
+        async with self._db.execute(
+            """
+            SELECT d.parent_id, d.child_id, d.dependency_type
+            FROM task_dependencies d
+            JOIN tasks c ON c.task_id = d.child_id
+            WHERE c.state = ? AND c.is_active = 1
+            """,
+            (TaskState.PENDING.value,)
+        ) as cursor:
+            async for row in cursor:
+                self._dependents.setdefault(row["parent_id"], []).append(
+                    (row["child_id"], row["dependency_type"])
+                )
+    
+    def _task_row(self, task: TaskStateData, unmet: int) -> tuple:
+        return (
+            task.task_id,
+            task.state.value,
+            task.task_type.value,
+            task.priority.value,
+            task.created_at.isoformat(),
+            task.updated_at.isoformat(),
+            json.dumps(task.metadata),
+            task.max_retries,
+            1,
+            unmet
+        )
+    
+    def _new_task(self, task_data: Dict[str, Any]) -> TaskStateData:
         task_id = task_data.get("task_id") or str(uuid.uuid4())
+        if task_id in self._cache:
+            raise ValueError(f"Task {task_id} already exists")
         
-        # Create task object
-        task = TaskStateData(
+        return TaskStateData(
             task_id=task_id,
             state=TaskState.PENDING,
-            task_type=TaskType.from_str(task_data.get("task_type", "compute")),
-            priority=TaskPriority.from_str(task_data.get("priority", "normal")),
+            task_type=TaskType.from_string(task_data.get("task_type", "compute")),
+            priority=TaskPriority.from_string(task_data.get("priority", "normal")),
             metadata=task_data.get("metadata", {}),
             max_retries=task_data.get("max_retries", 3)
         )
+    
+    async def create_task(self, task_data: Dict[str, Any]) -> TaskStateData:
+        """Create a new task with the given data."""
+        return (await self.create_tasks_bulk([task_data]))[0]
+    
+    async def create_tasks_bulk(self, tasks_data: List[Dict[str, Any]]) -> List[TaskStateData]:
+        """Create many tasks in one transaction.
         
-        async with self._lock:
-            # Insert task into database
-            await self._db.execute(
-                """
-                INSERT INTO tasks (
-                    task_id, state, task_type, priority, created_at, updated_at, 
-                    metadata, max_retries, is_active
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    task.task_id,
-                    task.state.value,
-                    task.task_type.value,
-                    task.priority.value,
-                    task.created_at.isoformat(),
-                    task.updated_at.isoformat(),
-                    json.dumps(task.metadata),
-                    task.max_retries,
-                    1
-                )
-            )
-            
-            # Add to cache
-            self._cache[task_id] = task
+        Tasks may depend on tasks earlier or later in the same call. Returns
+        once the transaction is committed.
+        """
+        tasks = [self._new_task(task_data) for task_data in tasks_data]
+        if len({task.task_id for task in tasks}) != len(tasks):
+            raise ValueError("Duplicate task ids in bulk create")
+        
+        all_dependencies = [task_data.get("dependencies", []) for task_data in tasks_data]
+        parent_states = await self._load_parent_states(
+            {dep["parent_id"] for dependencies in all_dependencies for dep in dependencies}
+        )
+        
+        for task in tasks:
+            if task.task_id in self._cache:
+                raise ValueError(f"Task {task.task_id} already exists")
+        
+        task_rows, history_rows, dependency_rows = [], [], []
+        linked_parents: Set[str] = set()
+        for task, dependencies in zip(tasks, all_dependencies):
+            edges = self._dependency_edges(dependencies)
+            unmet, waiting = self._resolve_dependencies(edges, parent_states)
             
-            # Add initial history entry
-            await self._add_history_entry(
-                task_id,
-                None,
-                task.state,
-                "Task created"
+            task_rows.append(self._task_row(task, unmet))
+            history_rows.append(self._history_row(task.task_id, None, task.state, "Task created"))
+            dependency_rows.extend(
+                (parent_id, task.task_id, dependency_type) for parent_id, dependency_type in edges.items()
             )
             
-            # Process dependencies if any
-            dependencies = task_data.get("dependencies", [])
-            if dependencies:
-                await self._add_dependencies(task_id, dependencies)
-            
-            await self._db.commit()
+            # Add to cache and dependency index
+            self._cache[task.task_id] = task
+            self._unmet[task.task_id] = unmet
+            if unmet == 0:
+                self._ready[task.task_id] = None
+            for parent_id, dependency_type in waiting:
+                self._dependents.setdefault(parent_id, []).append((task.task_id, dependency_type))
+                linked_parents.add(parent_id)
+        
+        statements = [(INSERT_TASK_SQL, task_rows), (INSERT_HISTORY_SQL, history_rows)]
+        if dependency_rows:
+            statements.append((INSERT_DEPENDENCY_SQL, dependency_rows))
+        
+        try:
+            await self._write(statements)
+        except Exception:
+            for task in tasks:
+                self._forget_task(task.task_id)
+            self._unlink_dependents(linked_parents, {task.task_id for task in tasks})
+            raise
             
-        return task
+        return tasks
     
     async def get_task(self, task_id: str) -> Optional[TaskStateData]:
         """Get a task by ID, first checking cache then database."""
@@ -161,18 +318,17 @@ class LocalWorkflowStateManager:
             return self._cache[task_id]
             
         # If not in cache, try to load from database
-        async with self._lock:
-            async with self._db.execute(
+        async with self._reader() as db:
+            async with db.execute(
                 "SELECT * FROM tasks WHERE task_id = ?", 
                 (task_id,)
             ) as cursor:
                 row = await cursor.fetchone()
-                if not row:
-                    return None
-                    
-                task = await self._row_to_task(row)
-                self._cache[task_id] = task
-                return task
+        if not row:
+            return None
+        
+        task = await self._row_to_task(row)
+        return self._cache.setdefault(task_id, task)
     
     async def update_task_state(
         self,
@@ -193,7 +349,7 @@ class LocalWorkflowStateManager:
             )
             return None
             
-        old_state = task.state
+        old_state, old_updated_at, old_retry_count = task.state, task.updated_at, task.retry_count
         task.state = new_state
         task.updated_at = datetime.utcnow()
         
@@ -201,36 +357,36 @@ class LocalWorkflowStateManager:
         if new_state == TaskState.RETRYING:
             task.retry_count += 1
         
-        async with self._lock:
-            # Update database
-            await self._db.execute(
-                """
-                UPDATE tasks 
-                SET state = ?, updated_at = ?, retry_count = ?
-                WHERE task_id = ?
-                """,
-                (
-                    task.state.value,
-                    task.updated_at.isoformat(),
-                    task.retry_count,
-                    task_id
-                )
-            )
-            
-            # Update cache
-            self._cache[task_id] = task
-            
-            # Add history entry
-            await self._add_history_entry(
-                task_id,
-                old_state,
-                new_state,
-                message,
-                data
-            )
-            
-            await self._db.commit()
-            
+        # Update cache
+        self._cache[task_id] = task
+        old_unmet, was_ready = None, False
+        if old_state == TaskState.PENDING:
+            old_unmet = self._unmet.pop(task_id, None)
+            was_ready = self._ready.pop(task_id, False) is None
+        
+        statements = [
+            (
+                "UPDATE tasks SET state = ?, updated_at = ?, retry_count = ? WHERE task_id = ?",
+                [(task.state.value, task.updated_at.isoformat(), task.retry_count, task_id)]
+            ),
+            (INSERT_HISTORY_SQL, [self._history_row(task_id, old_state, new_state, message, data)])
+        ]
+        dependents = None
+        if TaskState.is_terminal(new_state):
+            dependents = self._dependents.get(task_id)
+            statements.extend(self._release_dependents(task_id, new_state))
+        
+        try:
+            await self._write(statements)
+        except Exception:
+            task.state, task.updated_at, task.retry_count = old_state, old_updated_at, old_retry_count
+            if old_unmet is not None:
+                self._unmet[task_id] = old_unmet
+            if was_ready:
+                self._ready[task_id] = None
+            if dependents is not None:
+                self._restore_dependents(task_id, dependents, new_state)
+            raise
         return task
     
     async def delete_task(self, task_id: str, force: bool = False) -> bool:
@@ -243,98 +399,84 @@ class LocalWorkflowStateManager:
         if task.state not in (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED) and not force:
             logger.warning(f"Cannot delete active task {task_id} without force flag")
             return False
-            
-        async with self._lock:
-            # Mark as inactive in database (soft delete)
-            await self._db.execute(
-                "UPDATE tasks SET is_active = 0 WHERE task_id = ?",
-                (task_id,)
-            )
-            
-            # Remove from cache
-            self._cache.pop(task_id, None)
-            
-            await self._db.commit()
-            
+        
+        # Mark as inactive in database (soft delete) and remove from cache
+        forgotten = self._forget_task(task_id)
+        try:
+            await self._write([("UPDATE tasks SET is_active = 0 WHERE task_id = ?", [(task_id,)])])
+        except Exception:
+            self._restore_task(task_id, forgotten)
+            raise
         return True
     
     async def get_task_dependencies(self, task_id: str) -> List[TaskDependency]:
         """Get all dependencies for a task."""
         dependencies = []
-        async with self._db.execute(
-            """
-            SELECT td.*, t.state as parent_state 
-            FROM task_dependencies td
-            JOIN tasks t ON td.parent_id = t.task_id
-            WHERE td.child_id = ?
-            """,
-            (task_id,)
-        ) as cursor:
-            async for row in cursor:
-                dependencies.append(TaskDependency(
-                    parent_id=row["parent_id"],
-                    child_id=row["child_id"],
-                    dependency_type=row["dependency_type"],
-                    parent_state=TaskState(row["parent_state"])
-                ))
+        async with self._reader() as db:
+            async with db.execute(
+                """
+                SELECT td.*, t.state as parent_state 
+                FROM task_dependencies td
+                JOIN tasks t ON td.parent_id = t.task_id
+                WHERE td.child_id = ?
+                """,
+                (task_id,)
+            ) as cursor:
+                async for row in cursor:
+                    dependencies.append(TaskDependency(
+                        parent_id=row["parent_id"],
+                        child_id=row["child_id"],
+                        dependency_type=row["dependency_type"],
+                        parent_state=TaskState(row["parent_state"])
+                    ))
         return dependencies
     
     async def get_dependent_tasks(self, task_id: str) -> List[TaskStateData]:
         """Get all tasks that depend on the given task."""
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT child_id FROM task_dependencies WHERE parent_id = ?",
+                (task_id,)
+            ) as cursor:
+                child_ids = [row["child_id"] async for row in cursor]
+        
         dependents = []
-        async with self._db.execute(
-            "SELECT child_id FROM task_dependencies WHERE parent_id = ?",
-            (task_id,)
-        ) as cursor:
-            async for row in cursor:
-                task = await self.get_task(row["child_id"])
-                if task:
-                    dependents.append(task)
+        for child_id in child_ids:
+            task = await self.get_task(child_id)
+            if task:
+                dependents.append(task)
         return dependents
     
     async def get_task_history(self, task_id: str) -> List[TaskHistoryEntry]:
         """Get the history of a task."""
         history = []
-        async with self._db.execute(
-            "SELECT * FROM task_history WHERE task_id = ? ORDER BY timestamp",
-            (task_id,)
-        ) as cursor:
-            async for row in cursor:
-                history.append(TaskHistoryEntry(
-                    task_id=row["task_id"],
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                    from_state=TaskState(row["from_state"]) if row["from_state"] else None,
-                    to_state=TaskState(row["to_state"]),
-                    message=row["message"],
-                    data=json.loads(row["data"]) if row["data"] else None
-                ))
+        async with self._reader() as db:
+            async with db.execute(
+                "SELECT * FROM task_history WHERE task_id = ? ORDER BY timestamp",
+                (task_id,)
+            ) as cursor:
+                async for row in cursor:
+                    history.append(TaskHistoryEntry(
+                        task_id=row["task_id"],
+                        timestamp=datetime.fromisoformat(row["timestamp"]),
+                        from_state=TaskState(row["from_state"]) if row["from_state"] else None,
+                        to_state=TaskState(row["to_state"]),
+                        message=row["message"],
+                        data=json.loads(row["data"]) if row["data"] else None
+                    ))
         return history
     
     async def find_ready_tasks(self, limit: int = 100) -> List[TaskStateData]:
-        """Find tasks that are ready to run (all dependencies met)."""
-        ready_tasks = []
-        async with self._lock:
-            # Get all pending tasks
-            async with self._db.execute(
-                "SELECT * FROM tasks WHERE state = ? AND is_active = 1",
-                (TaskState.PENDING.value,)
-            ) as cursor:
-                async for row in cursor:
-                    task = await self._row_to_task(row)
-                    if await self._are_dependencies_met(task.task_id):
-                        ready_tasks.append(task)
-                        if len(ready_tasks) >= limit:
-                            break
-        return ready_tasks
+        """Find tasks that are ready to run (all dependencies met), oldest first."""
+        return [self._cache[task_id] for task_id in islice(self._ready, limit)]
     
     async def cleanup_old_tasks(self, older_than_days: int = 30) -> int:
         """Clean up old completed/failed tasks."""
         cutoff = datetime.utcnow() - timedelta(days=older_than_days)
-        count = 0
         
-        async with self._lock:
-            # Find tasks to delete
-            async with self._db.execute(
+        # Find tasks to delete
+        async with self._reader() as db:
+            async with db.execute(
                 """
                 SELECT task_id FROM tasks 
                 WHERE updated_at < ? 
@@ -349,83 +491,256 @@ class LocalWorkflowStateManager:
                 )
             ) as cursor:
                 task_ids = [row["task_id"] async for row in cursor]
+        
+        # Soft delete them in one statement
+        forgotten = {task_id: self._forget_task(task_id) for task_id in task_ids}
+        if task_ids:
+            try:
+                await self._write([
+                    ("UPDATE tasks SET is_active = 0 WHERE task_id = ?", [(task_id,) for task_id in task_ids])
+                ])
+            except Exception:
+                for task_id, removed in forgotten.items():
+                    self._restore_task(task_id, removed)
+                raise
             
-            # Delete tasks
-            for task_id in task_ids:
-                await self.delete_task(task_id)
-                count += 1
-                
-            await self._db.commit()
-            
-        return count
+        return len(task_ids)
+    
+    async def flush(self) -> None:
+        """Wait until every mutation queued so far is committed."""
+        if self._write_queue is not None:
+            await self._write([])
     
     async def close(self) -> None:
-        """Close the database connection."""
+        """Flush pending writes and close the database connections."""
+        if self._writer:
+            self._write_queue.put_nowait(None)
+            await self._writer
+            self._writer = None
+        for reader in self._readers:
+            await reader.close()
+        self._readers.clear()
+        self._read_pool = None
         if self._db:
             await self._db.close()
             self._db = None
     
     # Helper methods
     
-    async def _add_dependencies(self, task_id: str, dependencies: List[Dict[str, str]]) -> None:
-        """Add dependencies for a task."""
-        for dep in dependencies:
-            await self._db.execute(
-                """
-                INSERT OR IGNORE INTO task_dependencies 
-                (parent_id, child_id, dependency_type)
-                VALUES (?, ?, ?)
-                """,
-                (
-                    dep["parent_id"],
-                    task_id,
-                    dep.get("type", "completion")  # completion, success, etc.
-                )
-            )
+    async def _write(self, statements: List[Statement]) -> None:
+        """Queue a mutation for the writer and wait until it is committed."""
+        if self._write_queue is None:
+            raise RuntimeError("LocalWorkflowStateManager is not initialized")
+        committed = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((statements, committed))
+        await committed
     
-    async def _are_dependencies_met(self, task_id: str) -> bool:
-        """Check if all dependencies for a task are met."""
-        deps = await self.get_task_dependencies(task_id)
-        if not deps:
-            return True
+    async def _writer_loop(self) -> None:
+        """Group queued mutations into one transaction per batch."""
+        stopping = False
+        while not stopping:
+            item = await self._write_queue.get()
+            if item is None:
+                break
             
-        for dep in deps:
-            parent = await self.get_task(dep.parent_id)
-            if not parent:
-                return False
-                
-            if dep.dependency_type == "completion":
-                if parent.state not in (TaskState.COMPLETED, TaskState.FAILED):
-                    return False
-            elif dep.dependency_type == "success":
-                if parent.state != TaskState.COMPLETED:
-                    return False
-                    
+            # Let concurrent callers join the batch
+            await asyncio.sleep(self.batch_interval)
+            batch = [item]
+            while len(batch) < self.max_batch_size and not self._write_queue.empty():
+                item = self._write_queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            await self._commit_or_fail(batch)
+        
+        # Drain anything queued behind the stop marker
+        while not self._write_queue.empty():
+            item = self._write_queue.get_nowait()
+            if item is not None:
+                await self._commit_or_fail([item])
+    
+    async def _commit_or_fail(self, batch: List[Tuple[List[Statement], asyncio.Future]]) -> None:
+        """Commit a batch; on an unexpected error fail its callers, not the writer."""
+        try:
+            await self._commit_batch(batch)
+        except Exception as e:
+            logger.error(f"Task state writer failed on a batch of {len(batch)} mutations: {e}")
+            for _, committed in batch:
+                if not committed.done():
+                    committed.set_exception(e)
+    
+    async def _commit_batch(self, batch: List[Tuple[List[Statement], asyncio.Future]]) -> None:
+        # Statements run in the order they were queued; only back-to-back
+        # runs of the same statement are merged into one executemany.
+        runs: List[Tuple[str, List[tuple]]] = []
+        for statements, _ in batch:
+            for sql, rows in statements:
+                if runs and runs[-1][0] == sql:
+                    runs[-1][1].extend(rows)
+                else:
+                    runs.append((sql, list(rows)))
+
+        try:
+            for sql, rows in runs:
+                await self._db.executemany(sql, rows)
+            await self._db.commit()
+        except Exception as e:
+            await self._db.rollback()
+            self.write_stats["failed_batches"] += 1
+            if len(batch) > 1:
+                # Retry one by one so a bad mutation only fails its own caller
+                for item in batch:
+                    await self._commit_batch([item])
+                return
+            _, committed = batch[0]
+            if not committed.done():
+                committed.set_exception(e)
+            return
+        
+        self.write_stats["batches"] += 1
+        self.write_stats["mutations"] += len(batch)
+        self.write_stats["largest_batch"] = max(self.write_stats["largest_batch"], len(batch))
+        for _, committed in batch:
+            if not committed.done():
+                committed.set_result(None)
+    
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection, or the writer's when there is no pool."""
+        if self._read_pool is None:
+            yield self._db
+            return
+        db = await self._read_pool.get()
+        try:
+            yield db
+        finally:
+            self._read_pool.put_nowait(db)
+    
+    def _forget_task(self, task_id: str) -> Tuple[Optional[TaskStateData], Optional[int], bool]:
+        """Drop a task from the in-memory indexes; returns what ``_restore_task`` needs."""
+        return (
+            self._cache.pop(task_id, None),
+            self._unmet.pop(task_id, None),
+            self._ready.pop(task_id, False) is None
+        )
+    
+    def _restore_task(
+        self, task_id: str, forgotten: Tuple[Optional[TaskStateData], Optional[int], bool]
+    ) -> None:
+        """Undo ``_forget_task`` after its mutation failed to commit."""
+        task, unmet, was_ready = forgotten
+        if task is not None:
+            self._cache[task_id] = task
+        if unmet is not None:
+            self._unmet[task_id] = unmet
+        if was_ready:
+            self._ready[task_id] = None
+    
+    def _unlink_dependents(self, parent_ids: Set[str], child_ids: Set[str]) -> None:
+        """Drop the dependency-index edges from ``parent_ids`` to ``child_ids``."""
+        for parent_id in parent_ids:
+            remaining = [edge for edge in self._dependents.get(parent_id, ()) if edge[0] not in child_ids]
+            if remaining:
+                self._dependents[parent_id] = remaining
+            else:
+                self._dependents.pop(parent_id, None)
+    
+    @staticmethod
+    def _dependency_edges(dependencies: List[Dict[str, str]]) -> Dict[str, str]:
+        """Map parent_id -> dependency type, keeping the first entry per parent."""
+        edges: Dict[str, str] = {}
+        for dep in dependencies:
+            edges.setdefault(dep["parent_id"], dep.get("type", "completion"))  # completion, success, etc.
+        return edges
+    
+    @staticmethod
+    def _is_dependency_met(dependency_type: str, parent_state: Optional[TaskState]) -> bool:
+        """Check if a parent in ``parent_state`` satisfies a dependency of this type."""
+        if dependency_type == "completion":
+            return parent_state in (TaskState.COMPLETED, TaskState.FAILED)
+        if dependency_type == "success":
+            return parent_state == TaskState.COMPLETED
         return True
     
-    async def _add_history_entry(
+    async def _load_parent_states(self, parent_ids: Set[str]) -> Dict[str, TaskState]:
+        """States of parents that are not cached, i.e. archived ones."""
+        missing = [parent_id for parent_id in parent_ids if parent_id not in self._cache]
+        parent_states: Dict[str, TaskState] = {}
+        if missing:
+            placeholders = ",".join("?" * len(missing))
+            async with self._reader() as db:
+                async with db.execute(
+                    f"SELECT task_id, state FROM tasks WHERE task_id IN ({placeholders})",
+                    missing
+                ) as cursor:
+                    async for row in cursor:
+                        parent_states[row["task_id"]] = TaskState(row["state"])
+        return parent_states
+    
+    def _resolve_dependencies(
         self,
+        edges: Dict[str, str],
+        archived_states: Dict[str, TaskState]
+    ) -> Tuple[int, List[Tuple[str, str]]]:
+        """Count dependencies whose parent has not yet reached a satisfying state.
+        
+        Also returns the (parent_id, dependency_type) edges whose parent has
+        not finished yet; only those can still release the task. Cached
+        parents are checked at call time, so the result is consistent with
+        the dependency index it is about to be added to.
+        """
+        unmet, waiting = 0, []
+        for parent_id, dependency_type in edges.items():
+            parent = self._cache.get(parent_id)
+            parent_state = parent.state if parent is not None else archived_states.get(parent_id)
+            if not self._is_dependency_met(dependency_type, parent_state):
+                unmet += 1
+            if parent_state is None or not TaskState.is_terminal(parent_state):
+                waiting.append((parent_id, dependency_type))
+        return unmet, waiting
+    
+    def _release_dependents(self, parent_id: str, parent_state: TaskState) -> List[Statement]:
+        """Decrement the unmet counts of a finished parent's pending children."""
+        released = []
+        for child_id, dependency_type in self._dependents.pop(parent_id, ()):
+            if child_id in self._unmet and self._is_dependency_met(dependency_type, parent_state):
+                self._unmet[child_id] -= 1
+                released.append((self._unmet[child_id], child_id))
+                if self._unmet[child_id] == 0:
+                    self._ready[child_id] = None
+        
+        if not released:
+            return []
+        return [("UPDATE tasks SET unmet_dependencies = ? WHERE task_id = ?", released)]
+    
+    def _restore_dependents(
+        self, parent_id: str, dependents: List[Tuple[str, str]], parent_state: TaskState
+    ) -> None:
+        """Undo ``_release_dependents`` after its mutation failed to commit."""
+        self._dependents[parent_id] = dependents
+        for child_id, dependency_type in dependents:
+            if child_id in self._unmet and self._is_dependency_met(dependency_type, parent_state):
+                self._unmet[child_id] += 1
+                self._ready.pop(child_id, None)
+    
+    @staticmethod
+    def _history_row(
         task_id: str,
         from_state: Optional[TaskState],
         to_state: TaskState,
         message: str,
         data: Optional[Dict[str, Any]] = None
-    ) -> None:
-        """Add an entry to the task history."""
-        await self._db.execute(
-            """
-            INSERT INTO task_history 
-            (task_id, timestamp, from_state, to_state, message, data)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                task_id,
-                datetime.utcnow().isoformat(),
-                from_state.value if from_state else None,
-                to_state.value,
-                message,
-                json.dumps(data) if data else None
-            )
+    ) -> tuple:
+        """Row for the task history table."""
+        return (
+            task_id,
+            datetime.utcnow().isoformat(),
+            from_state.value if from_state else None,
+            to_state.value,
+            message,
+            json.dumps(data) if data else None
         )
     
     def _is_valid_transition(self, from_state: TaskState, to_state: TaskState) -> bool:
@@ -1,7 +1,7 @@
 """Data models for local workflow state management."""
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Any, Union
+from typing import Dict, List, Optional, Set, Any, Tuple, Union
 import json
 import uuid
 
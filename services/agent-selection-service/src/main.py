@@ -5,8 +5,9 @@ Three-layer architecture: Capability Matching, Multi-Objective Optimization, Rei
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from enum import Enum
 from datetime import datetime, timezone
 import asyncio
@@ -15,18 +16,24 @@ import json
 import time
 import uuid
 import math
+import os
 import numpy as np
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from abc import ABC, abstractmethod
 import random
 from collections import defaultdict, deque
+from itertools import repeat
 import sqlite3
 import threading
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import pandas as pd
+from scipy import stats
+from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import min_weight_full_bipartite_matching
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -123,6 +130,10 @@ class Assignment:
     created_at: datetime
 
 # Layer 1: Capability Matching Engine
+def _task_type_history() -> defaultdict:
+    """Per-task-type quality history; module-level so the matrix pickles under spawn"""
+    return defaultdict(list)
+
 class CapabilityMatrix:
     """Multi-Agent Capability Matrix with dynamic assessment"""
     
@@ -167,7 +178,7 @@ class CapabilityMatrix:
             }
         }
         
-        self.performance_history = defaultdict(lambda: defaultdict(list))
+        self.performance_history = defaultdict(_task_type_history)
         self.environmental_factors = {}
     
     def get_base_capability(self, agent: Agent, task_type: TaskType) -> float:
@@ -243,6 +254,140 @@ class CapabilityMatrix:
         else:
             return 0.8  # High complexity
 
+class AgentFeatureMatrix:
+    """NumPy feature matrix of agents for vectorized assignment scoring
+
+    Each agent owns one row. Rows are written when an agent registers and
+    refreshed incrementally when its status, load or performance history
+    changes, so batch scoring never walks the Agent dataclasses.
+    """
+
+    TASK_TYPES = list(TaskType)
+    _ARRAYS = ('agent_ids', 'base_capability', 'performance_trend', 'fatigue_factor', 'current_load',
+               'cost_per_hour', 'safety_rating', 'energy_efficiency', 'available')
+
+    def __init__(self, capability_matrix: CapabilityMatrix, initial_capacity: int = 64):
+        self.capability_matrix = capability_matrix
+        self.type_index = {task_type: i for i, task_type in enumerate(self.TASK_TYPES)}
+        self.index: Dict[str, int] = {}
+        self.size = 0
+
+        capacity = max(initial_capacity, 1)
+        n_types = len(self.TASK_TYPES)
+        self.agent_ids = np.empty(capacity, dtype=object)
+        self.base_capability = np.zeros((capacity, n_types))
+        self.performance_trend = np.ones((capacity, n_types))
+        self.fatigue_factor = np.ones(capacity)
+        self.current_load = np.zeros(capacity)
+        self.cost_per_hour = np.zeros(capacity)
+        self.safety_rating = np.ones(capacity)
+        self.energy_efficiency = np.ones(capacity)
+        self.available = np.zeros(capacity, dtype=bool)
+
+    @classmethod
+    def from_agents(cls, agents: List[Agent], capability_matrix: CapabilityMatrix) -> 'AgentFeatureMatrix':
+        """Build a matrix for an ad-hoc agent list (simulations, batch optimizers)"""
+        features = cls(capability_matrix, initial_capacity=len(agents))
+        for agent in agents:
+            features.upsert(agent)
+        return features
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.index
+
+    def _grow(self):
+        """Double the row capacity of every feature array"""
+        capacity = len(self.agent_ids) * 2
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def upsert(self, agent: Agent) -> int:
+        """Write the full feature row for an agent, adding it if needed"""
+        row = self.index.get(agent.agent_id)
+        if row is None:
+            if self.size == len(self.agent_ids):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.index[agent.agent_id] = row
+            self.agent_ids[row] = agent.agent_id
+
+        self.base_capability[row] = [
+            self.capability_matrix.get_base_capability(agent, task_type)
+            for task_type in self.TASK_TYPES
+        ]
+        self.performance_trend[row] = 1.0
+        for task_type_value in self.capability_matrix.performance_history.get(agent.agent_id, {}):
+            self.update_trend(agent, TaskType(task_type_value))
+
+        self.cost_per_hour[row] = agent.cost_per_hour
+        self.safety_rating[row] = agent.safety_rating
+        self.energy_efficiency[row] = agent.energy_efficiency
+        self.update_state(agent)
+        return row
+
+    def update_state(self, agent: Agent):
+        """Refresh the fields that change with status, load and fatigue"""
+        row = self.index[agent.agent_id]
+        self.fatigue_factor[row] = self.capability_matrix.calculate_fatigue_factor(agent)
+        self.current_load[row] = agent.current_load
+        self.available[row] = agent.status == AgentStatus.AVAILABLE
+
+    def update_trend(self, agent: Agent, task_type: TaskType):
+        """Refresh the performance trend after new history is recorded"""
+        row = self.index[agent.agent_id]
+        self.performance_trend[row, self.type_index[task_type]] = (
+            self.capability_matrix.get_recent_performance_trend(agent, task_type)
+        )
+
+    def remove(self, agent_id: str):
+        """Remove an agent by moving the last row into its slot"""
+        row = self.index.pop(agent_id)
+        last = self.size - 1
+        if row != last:
+            for name in self._ARRAYS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            self.index[self.agent_ids[row]] = row
+        self.agent_ids[last] = None
+        self.size = last
+
+    def assignable_rows(self, max_load: float = 0.9) -> np.ndarray:
+        """Rows of available agents below the load ceiling"""
+        return np.flatnonzero(self.available[:self.size] & (self.current_load[:self.size] < max_load))
+
+    @staticmethod
+    def load_factor(current_load: np.ndarray) -> np.ndarray:
+        """Vectorized CapabilityMatrix.calculate_load_factor"""
+        return np.where(current_load >= 0.9, 0.5, np.where(current_load >= 0.7, 0.8, 1.0))
+
+    def capability(self, type_indices: np.ndarray, complexity_adjustment: np.ndarray,
+                   rows: np.ndarray, current_load: np.ndarray) -> np.ndarray:
+        """Vectorized CapabilityMatrix.assess_real_time_capability
+
+        Task arguments and agent rows broadcast against each other: (tasks, 1)
+        and (1, agents) shapes give a full matrix, aligned 1-D arrays give pairs.
+        """
+        base = self.base_capability[rows, type_indices]
+        trend = self.performance_trend[rows, type_indices]
+        agent_factor = self.fatigue_factor[rows] * self.load_factor(current_load)
+        capability = base * agent_factor * trend * complexity_adjustment
+        return np.clip(capability, 0.0, 1.0)
+
+@dataclass
+class ScoreMatrix:
+    """Composite scores for a batch of tasks (rows) against agent rows (columns)"""
+    tasks: List[Task]
+    agent_rows: np.ndarray
+    composite: np.ndarray
+    capability: np.ndarray
+
 # Layer 2: Multi-Objective Optimization Engine
 class OptimizationCriteria:
     """Multi-objective optimization with configurable weights"""
@@ -324,7 +469,140 @@ class OptimizationCriteria:
             composite_score += weight * score
         
         return composite_score
-    
+
+    def _task_arrays(self, tasks: List[Task], features: AgentFeatureMatrix) -> Dict[str, np.ndarray]:
+        """Per-task feature vectors for batch scoring"""
+        complexity = np.array([task.complexity for task in tasks], dtype=float)
+        return {
+            'type_index': np.array([features.type_index[task.task_type] for task in tasks], dtype=np.intp),
+            'complexity_adjustment': np.where(complexity <= 0.3, 1.0, np.where(complexity <= 0.7, 0.9, 0.8)),
+            'duration': np.array([task.estimated_duration for task in tasks], dtype=float),
+            'quality_requirements': np.array([task.quality_requirements for task in tasks], dtype=float),
+            'safety_requirements': np.array([task.safety_requirements for task in tasks], dtype=float)
+        }
+
+    def _objective_metrics(self, capability: np.ndarray, duration, quality_requirements, safety_requirements,
+                           current_load, cost_per_hour, safety_rating) -> Dict[str, np.ndarray]:
+        """Vectorized completion time, quality, cost and safety
+
+        Arguments broadcast against ``capability``: (tasks, 1) and (agents,)
+        shaped arrays for a full matrix, or aligned 1-D arrays for pairs.
+        """
+        completion_time = duration / np.maximum(capability, 0.1) * (1.0 + current_load * 0.5)
+        quality = np.clip(capability - np.maximum(quality_requirements - capability, 0.0) * 0.5, 0.0, 1.0)
+        return {
+            'completion_time': completion_time,
+            'quality': quality,
+            'cost': cost_per_hour * (completion_time / 60.0),
+            'safety': np.minimum(safety_rating, 1.0 - (safety_requirements - safety_rating) * 0.3)
+        }
+
+    def _score(self, task_arrays: Dict[str, np.ndarray], task_index: np.ndarray, agent_rows: np.ndarray,
+               features: AgentFeatureMatrix, added_load=0.0) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Composite score, capability and raw metrics for broadcastable task/agent indices
+
+        ``added_load`` is load the agents will carry on top of their current
+        load, e.g. from earlier tasks in the same batch.
+        """
+        current_load = features.current_load[agent_rows] + added_load
+        capability = features.capability(
+            task_arrays['type_index'][task_index],
+            task_arrays['complexity_adjustment'][task_index],
+            agent_rows,
+            current_load
+        )
+        metrics = self._objective_metrics(
+            capability,
+            task_arrays['duration'][task_index],
+            task_arrays['quality_requirements'][task_index],
+            task_arrays['safety_requirements'][task_index],
+            current_load,
+            features.cost_per_hour[agent_rows],
+            features.safety_rating[agent_rows]
+        )
+        scores = {
+            'speed': 1.0 / (1.0 + metrics['completion_time'] / 60.0),
+            'quality': metrics['quality'],
+            'cost': 1.0 / (1.0 + metrics['cost'] / 100.0),
+            'safety': metrics['safety'],
+            'energy_efficiency': features.energy_efficiency[agent_rows]
+        }
+
+        composite = np.zeros(capability.shape)
+        for objective, config in self.objectives.items():
+            score = scores[objective]
+            if not config['maximize']:
+                score = 1.0 - score
+            composite += config['weight'] * score
+
+        return composite, capability, metrics
+
+    def calculate_score_matrix(self, tasks: List[Task], features: AgentFeatureMatrix,
+                               agent_rows: Optional[np.ndarray] = None, added_load=0.0) -> ScoreMatrix:
+        """Score every task against every agent row in one vectorized pass
+
+        Produces the same values as calculate_composite_score applied to
+        each (agent, task) pair.
+        """
+        if agent_rows is None:
+            agent_rows = np.arange(len(features))
+        task_arrays = self._task_arrays(tasks, features)
+        composite, capability, _ = self._score(
+            task_arrays, np.arange(len(tasks))[:, None], agent_rows[None, :], features, added_load
+        )
+        return ScoreMatrix(tasks=tasks, agent_rows=agent_rows, composite=composite, capability=capability)
+
+    def score_pairs(self, tasks: List[Task], features: AgentFeatureMatrix, task_positions, agent_rows,
+                    added_load=0.0, task_arrays: Dict[str, np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Composite score and capability for aligned (task position, agent row) pairs"""
+        if task_arrays is None:
+            task_arrays = self._task_arrays(tasks, features)
+        composite, capability, _ = self._score(
+            task_arrays, np.asarray(task_positions, dtype=np.intp), np.asarray(agent_rows, dtype=np.intp),
+            features, added_load
+        )
+        return composite, capability
+
+    def build_assignments(self, tasks: List[Task], features: AgentFeatureMatrix, task_positions,
+                          agent_rows, added_load=0.0) -> List[Assignment]:
+        """Create Assignment records for chosen (task position, agent row) pairs"""
+        task_positions = np.asarray(task_positions, dtype=np.intp)
+        agent_rows = np.asarray(agent_rows, dtype=np.intp)
+        chosen_tasks = [tasks[i] for i in task_positions]
+        composite, _, metrics = self._score(
+            self._task_arrays(chosen_tasks, features), np.arange(len(chosen_tasks)), agent_rows,
+            features, added_load
+        )
+        created_at = datetime.now(timezone.utc)
+
+        return [
+            Assignment(
+                assignment_id=str(uuid.uuid4()),
+                task_id=task.task_id,
+                agent_id=features.agent_ids[agent_rows[i]],
+                confidence_score=float(composite[i]),
+                estimated_completion_time=int(metrics['completion_time'][i]),
+                quality_prediction=float(metrics['quality'][i]),
+                cost_estimate=float(metrics['cost'][i]),
+                safety_score=float(metrics['safety'][i]),
+                energy_efficiency=float(features.energy_efficiency[agent_rows[i]]),
+                created_at=created_at
+            )
+            for i, task in enumerate(chosen_tasks)
+        ]
+
+    def optimize_assignments_batch(self, tasks: List[Task], features: AgentFeatureMatrix,
+                                   agent_rows: Optional[np.ndarray] = None) -> List[Optional[Assignment]]:
+        """Best agent for each task independently, scored as one matrix"""
+        if agent_rows is None:
+            agent_rows = np.flatnonzero(features.available[:len(features)])
+        if not tasks or len(agent_rows) == 0:
+            return [None] * len(tasks)
+
+        scores = self.calculate_score_matrix(tasks, features, agent_rows)
+        best_columns = np.argmax(scores.composite, axis=1)
+        return self.build_assignments(tasks, features, np.arange(len(tasks)), agent_rows[best_columns])
+
     def optimize_assignment(self, task: Task, available_agents: List[Agent]) -> Optional[Assignment]:
         """Find optimal agent assignment for task"""
         if not available_agents:
@@ -745,152 +1023,519 @@ class PredictiveFailurePrevention:
             created_at=datetime.now(timezone.utc)
         )
 
-# Genetic Algorithm Optimizer for Complex Multi-Agent Scenarios
-class GeneticAlgorithmOptimizer:
-    """Advanced genetic algorithm for complex multi-agent task assignment optimization"""
-
-    def __init__(self, population_size=50, generations=100, mutation_rate=0.1, crossover_rate=0.8):
-        self.population_size = population_size
-        self.generations = generations
-        self.mutation_rate = mutation_rate
-        self.crossover_rate = crossover_rate
-        self.fitness_history = []
-
-    def create_individual(self, tasks: List[Task], agents: List[Agent]) -> Dict[str, str]:
-        """Create a random assignment individual (chromosome)"""
-        individual = {}
-        available_agents = [a.agent_id for a in agents if a.status == AgentStatus.AVAILABLE]
-
-        for task in tasks:
-            if available_agents:
-                individual[task.task_id] = random.choice(available_agents)
-
-        return individual
-
-    def calculate_fitness(self, individual: Dict[str, str], tasks: List[Task], agents: List[Agent],
-                         optimization_engine) -> float:
-        """Calculate fitness score for an assignment individual"""
-        total_fitness = 0.0
-        agent_workloads = defaultdict(float)
-
-        for task_id, agent_id in individual.items():
-            task = next((t for t in tasks if t.task_id == task_id), None)
-            agent = next((a for a in agents if a.agent_id == agent_id), None)
-
-            if task and agent:
-                # Calculate assignment quality using existing optimization engine
-                assignment_score = optimization_engine.calculate_assignment_score(agent, task)
-
-                # Apply workload balancing penalty
-                agent_workloads[agent_id] += task.estimated_duration
-                workload_penalty = min(agent_workloads[agent_id] / 480, 1.0)  # 8-hour workday
-
-                # Combine scores
-                fitness_contribution = assignment_score * (1.0 - workload_penalty * 0.3)
-                total_fitness += fitness_contribution
-
-        # Add diversity bonus for balanced workload distribution
-        workload_variance = np.var(list(agent_workloads.values())) if agent_workloads else 0
-        diversity_bonus = max(0, 1.0 - workload_variance / 10000)  # Normalize variance
-
-        return total_fitness + diversity_bonus
-
-    def crossover(self, parent1: Dict[str, str], parent2: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
-        """Single-point crossover between two parents"""
-        if random.random() > self.crossover_rate:
-            return parent1.copy(), parent2.copy()
+# Global Batch Assignment Solver
+@dataclass
+class BatchAssignmentResult:
+    assignments: List[Assignment]
+    unassigned_task_ids: List[str]
+    total_score: float
+    method: str
+    solve_time_seconds: float
+
+class BatchAssignmentSolver:
+    """Globally optimal assignment of a window of tasks to capacity-limited agents
+
+    Every agent offers one slot per additional task it can take before its
+    load reaches the assignment ceiling, and slot k is scored at the load
+    the agent carries after k earlier tasks in the batch. The solver
+    maximizes the number of assigned tasks, then their total composite score.
+
+    The default method runs the Hungarian algorithm over the slot-expanded
+    score matrix, exactly for windows of up to ``hungarian_window`` tasks
+    and window by window beyond that. The "min_cost_flow" method solves the
+    whole batch at once as a min-cost flow over a sparse network linking
+    each task to candidate agents; with unit task supply and integer agent
+    capacities that flow is a sparse min-weight bipartite matching over
+    agent slots, so memory grows with edges rather than tasks x slots.
+    """
+
+    def __init__(self, min_capability: float = 0.3, load_per_task: float = 0.3, max_load: float = 0.9,
+                 hungarian_window: int = 500, candidates_per_task: int = 16,
+                 chunk_size: int = 1024, refill_rounds: int = 3):
+        self.min_capability = min_capability
+        self.load_per_task = load_per_task
+        self.max_load = max_load
+        self.hungarian_window = hungarian_window
+        self.candidates_per_task = candidates_per_task
+        self.chunk_size = chunk_size
+        self.refill_rounds = refill_rounds
+
+    def capacity_slots(self, features: AgentFeatureMatrix, agent_rows: np.ndarray) -> np.ndarray:
+        """Number of further tasks each agent can take while its load stays below max_load"""
+        headroom = (self.max_load - features.current_load[agent_rows]) / self.load_per_task
+        slots = np.ceil(headroom - 1e-9).astype(np.intp)
+        slots[~features.available[agent_rows]] = 0
+        return np.maximum(slots, 0)
+
+    def solve(self, tasks: List[Task], features: AgentFeatureMatrix, optimization_engine: OptimizationCriteria,
+              agent_rows: Optional[np.ndarray] = None, method: str = "hungarian") -> BatchAssignmentResult:
+        """Assign a window of tasks with the "hungarian" or "min_cost_flow" method"""
+        start_time = time.perf_counter()
+        if method not in ("hungarian", "min_cost_flow"):
+            raise ValueError(f"Unknown batch assignment method: {method}")
+
+        if agent_rows is None:
+            agent_rows = np.arange(len(features))
+        slots = self.capacity_slots(features, agent_rows)
+        agent_rows, slots = agent_rows[slots > 0], slots[slots > 0]
+
+        task_positions = chosen_rows = levels = np.empty(0, dtype=np.intp)
+        if tasks and len(agent_rows):
+            task_arrays = optimization_engine._task_arrays(tasks, features)
+            solver = self._solve_dense if method == "hungarian" else self._solve_sparse
+            task_positions, chosen_rows, levels = solver(
+                tasks, task_arrays, features, optimization_engine, agent_rows, slots
+            )
+            levels = self._compact_levels(chosen_rows, levels)
 
-        tasks = list(parent1.keys())
-        if len(tasks) < 2:
-            return parent1.copy(), parent2.copy()
+        assignments = optimization_engine.build_assignments(
+            tasks, features, task_positions, chosen_rows, levels * self.load_per_task
+        )
+        assigned = set(task_positions.tolist())
+
+        return BatchAssignmentResult(
+            assignments=assignments,
+            unassigned_task_ids=[task.task_id for i, task in enumerate(tasks) if i not in assigned],
+            total_score=float(sum(a.confidence_score for a in assignments)),
+            method=method,
+            solve_time_seconds=time.perf_counter() - start_time
+        )
 
-        crossover_point = random.randint(1, len(tasks) - 1)
+    @staticmethod
+    def _compact_levels(chosen_rows: np.ndarray, levels: np.ndarray) -> np.ndarray:
+        """Renumber each agent's chosen slots 0..n-1 in slot order
+
+        Slot scores do not necessarily fall with load under every objective
+        configuration, so a solver may leave a lower slot empty.
+        """
+        order = np.lexsort((levels, chosen_rows))
+        sorted_rows = chosen_rows[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_rows[1:] != sorted_rows[:-1]])
+        counts = np.diff(np.r_[group_start, len(sorted_rows)])
+        compacted = np.empty(len(levels), dtype=np.intp)
+        compacted[order] = np.arange(len(sorted_rows)) - np.repeat(group_start, counts)
+        return compacted
+
+    def _solve_dense(self, tasks, task_arrays, features, optimization_engine, agent_rows, slots):
+        """Hungarian algorithm over the slot-expanded cost matrix, one task window at a time
+
+        Each window is solved exactly against the capacity left by earlier
+        windows. A row never needs more than its window-size best columns
+        for an optimal assignment, so the remaining columns are pruned.
+        """
+        window = self.hungarian_window
+        infeasible = float(window + 1)
+        used = np.zeros(len(agent_rows), dtype=np.intp)
+        chosen_tasks, chosen_rows, chosen_levels = [], [], []
+
+        for start in range(0, len(tasks), window):
+            task_index = np.arange(start, min(start + window, len(tasks)))
+            blocks, block_agents, block_levels = [], [], []
+            for level in range(int(slots.max())):
+                agents = np.flatnonzero(used + level < slots)
+                if len(agents) == 0:
+                    break
+                composite, capability, _ = optimization_engine._score(
+                    task_arrays, task_index[:, None], agent_rows[agents][None, :], features,
+                    ((used[agents] + level) * self.load_per_task)[None, :]
+                )
+                blocks.append(np.where(capability >= self.min_capability, -composite, infeasible))
+                block_agents.append(agents)
+                block_levels.append(used[agents] + level)
+            if not blocks:
+                break
+
+            cost = np.hstack(blocks)
+            column_agents = np.concatenate(block_agents)
+            column_levels = np.concatenate(block_levels)
+            if cost.shape[1] > len(task_index):
+                keep = np.unique(np.argpartition(cost, len(task_index) - 1, axis=1)[:, :len(task_index)])
+                cost, column_agents, column_levels = cost[:, keep], column_agents[keep], column_levels[keep]
+
+            rows, columns = linear_sum_assignment(cost)
+            feasible = cost[rows, columns] < infeasible
+            rows, columns = rows[feasible], columns[feasible]
+            chosen_tasks.append(task_index[rows])
+            chosen_rows.append(agent_rows[column_agents[columns]])
+            chosen_levels.append(column_levels[columns])
+            np.add.at(used, column_agents[columns], 1)
+
+        if not chosen_tasks:
+            return (np.empty(0, dtype=np.intp),) * 3
+        return np.concatenate(chosen_tasks), np.concatenate(chosen_rows), np.concatenate(chosen_levels)
+
+    def _candidates(self, task_arrays, task_positions, features, optimization_engine, agent_rows, used, slots):
+        """Candidate (task, agent) edges, scored in task chunks
+
+        Each task links to its best agents and each agent to its best tasks
+        (a few per free slot), so similar tasks that all prefer the same
+        agents still leave every agent with edges to fill its capacity.
+        """
+        k = min(self.candidates_per_task, len(agent_rows))
+        m = min(self.candidates_per_task * int(slots.max()), len(task_positions))
+        added_load = used * self.load_per_task
+        column_scores = np.full((m, len(agent_rows)), -np.inf)
+        column_tasks = np.full((m, len(agent_rows)), -1, dtype=np.intp)
+        candidate_tasks, candidate_rows = [], []
+
+        for start in range(0, len(task_positions), self.chunk_size):
+            chunk = task_positions[start:start + self.chunk_size]
+            composite, capability, _ = optimization_engine._score(
+                task_arrays, chunk[:, None], agent_rows[None, :], features, added_load[None, :]
+            )
+            composite = np.where(capability >= self.min_capability, composite, -np.inf)
+
+            top = np.argpartition(-composite, k - 1, axis=1)[:, :k]
+            keep = np.isfinite(np.take_along_axis(composite, top, axis=1))
+            candidate_tasks.append(np.broadcast_to(chunk[:, None], top.shape)[keep])
+            candidate_rows.append(top[keep])
+
+            merged_scores = np.vstack([column_scores, composite])
+            merged_tasks = np.vstack([column_tasks, np.broadcast_to(chunk[:, None], composite.shape)])
+            best = np.argpartition(-merged_scores, m - 1, axis=0)[:m]
+            column_scores = np.take_along_axis(merged_scores, best, axis=0)
+            column_tasks = np.take_along_axis(merged_tasks, best, axis=0)
+
+        keep = np.isfinite(column_scores)
+        candidate_tasks.append(column_tasks[keep])
+        candidate_rows.append(np.broadcast_to(np.arange(len(agent_rows)), keep.shape)[keep])
+
+        # A few random edges per task keep the network well connected when
+        # scores are dominated by a handful of agents or tasks
+        rng = np.random.default_rng(len(task_positions))
+        candidate_tasks.append(np.repeat(task_positions, k))
+        candidate_rows.append(rng.integers(0, len(agent_rows), size=len(task_positions) * k))
+
+        edges = np.unique(np.concatenate(candidate_tasks) * len(agent_rows) + np.concatenate(candidate_rows))
+        return edges // len(agent_rows), edges % len(agent_rows)
+
+    def _solve_sparse(self, tasks, task_arrays, features, optimization_engine, agent_rows, slots):
+        """Min-cost flow over a sparse candidate network, refilled for tasks left over"""
+        used = np.zeros(len(agent_rows), dtype=np.intp)
+        pending = np.arange(len(tasks))
+        chosen_tasks, chosen_rows, chosen_levels = [], [], []
+
+        for _ in range(self.refill_rounds):
+            open_agents = np.flatnonzero(used < slots)
+            if len(pending) == 0 or len(open_agents) == 0:
+                break
+
+            edge_tasks, edge_agents = self._candidates(
+                task_arrays, pending, features, optimization_engine,
+                agent_rows[open_agents], used[open_agents], slots[open_agents] - used[open_agents]
+            )
+            if len(edge_tasks) == 0:
+                break
+            edge_agents = open_agents[edge_agents]
+
+            # One column per free slot of each candidate agent
+            free = slots - used
+            slot_offset = np.r_[0, np.cumsum(free)]
+            repeats = free[edge_agents]
+            edge_tasks = np.repeat(edge_tasks, repeats)
+            edge_agents = np.repeat(edge_agents, repeats)
+            slot = np.arange(len(edge_agents)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            composite, capability = optimization_engine.score_pairs(
+                tasks, features, edge_tasks, agent_rows[edge_agents],
+                (used[edge_agents] + slot) * self.load_per_task, task_arrays
+            )
+            feasible = capability >= self.min_capability
+            edge_tasks, edge_agents, slot = edge_tasks[feasible], edge_agents[feasible], slot[feasible]
+
+            # Rows are pending tasks; each also gets a private "unassigned" column
+            # priced above any real edge so cardinality is maximized first
+            task_row = np.full(len(tasks), -1, dtype=np.intp)
+            task_row[pending] = np.arange(len(pending))
+            n_slots = int(slot_offset[-1])
+            weights = np.r_[2.0 - composite[feasible], np.full(len(pending), 2.0 * len(pending) + 2.0)]
+            graph = csr_matrix(
+                (weights, (np.r_[task_row[edge_tasks], np.arange(len(pending))],
+                           np.r_[slot_offset[edge_agents] + slot, n_slots + np.arange(len(pending))])),
+                shape=(len(pending), n_slots + len(pending))
+            )
+            matched_rows, matched_columns = min_weight_full_bipartite_matching(graph)
 
-        child1 = {}
-        child2 = {}
+            real = matched_columns < n_slots
+            matched_tasks = pending[matched_rows[real]]
+            matched_agents = np.searchsorted(slot_offset, matched_columns[real], side='right') - 1
+            chosen_tasks.append(matched_tasks)
+            chosen_rows.append(agent_rows[matched_agents])
+            chosen_levels.append(used[matched_agents] + matched_columns[real] - slot_offset[matched_agents])
+            np.add.at(used, matched_agents, 1)
+            pending = np.setdiff1d(pending, matched_tasks)
 
-        for i, task_id in enumerate(tasks):
-            if i < crossover_point:
-                child1[task_id] = parent1[task_id]
-                child2[task_id] = parent2[task_id]
-            else:
-                child1[task_id] = parent2[task_id]
-                child2[task_id] = parent1[task_id]
+        if not chosen_tasks:
+            return (np.empty(0, dtype=np.intp),) * 3
+        return np.concatenate(chosen_tasks), np.concatenate(chosen_rows), np.concatenate(chosen_levels)
 
-        return child1, child2
+# Genetic Algorithm Optimizer for Complex Multi-Agent Scenarios
+_island_scores: Optional[np.ndarray] = None
+_island_durations: Optional[np.ndarray] = None
 
-    def mutate(self, individual: Dict[str, str], agents: List[Agent]) -> Dict[str, str]:
-        """Mutate an individual by randomly reassigning some tasks"""
-        mutated = individual.copy()
-        available_agents = [a.agent_id for a in agents if a.status == AgentStatus.AVAILABLE]
+def _init_island_worker(scores: np.ndarray, durations: np.ndarray):
+    """Process-pool initializer: share the score matrix with island workers once"""
+    global _island_scores, _island_durations
+    _island_scores, _island_durations = scores, durations
 
-        for task_id in mutated:
-            if random.random() < self.mutation_rate and available_agents:
-                mutated[task_id] = random.choice(available_agents)
+def _evolve_island_worker(optimizer: 'GeneticAlgorithmOptimizer', population: np.ndarray,
+                          rng: np.random.Generator, generations: int):
+    return optimizer.evolve(population, _island_scores, _island_durations, rng, generations)
 
-        return mutated
+class GeneticAlgorithmOptimizer:
+    """Advanced genetic algorithm for complex multi-agent task assignment optimization
+
+    Chromosomes are integer arrays mapping task positions to agent columns
+    of a precomputed composite score matrix, and fitness is evaluated for
+    the whole population at once. Multiple islands evolve independently
+    (optionally in a process pool) and exchange their best individuals
+    every ``migration_interval`` generations. Runs are reproducible for a
+    given ``seed`` regardless of whether a process pool is used.
+    """
+
+    def __init__(self, population_size=50, generations=100, mutation_rate=0.1, crossover_rate=0.8,
+                 tournament_size=3, elite_size=2, patience=20, tolerance=1e-6, islands=1,
+                 migration_interval=10, migration_size=2, max_workers=None, seed=None):
+        self.population_size = population_size
+        self.generations = generations
+        self.mutation_rate = mutation_rate
+        self.crossover_rate = crossover_rate
+        self.tournament_size = tournament_size
+        self.elite_size = elite_size
+        self.patience = patience
+        self.tolerance = tolerance
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.max_workers = max_workers
+        self.seed = seed
+        self.fitness_history = []
+        self.last_run: Dict[str, Any] = {}
+
+    def build_score_matrix(self, tasks: List[Task], agents: List[Agent], optimization_engine,
+                           chunk_size: int = 1024) -> np.ndarray:
+        """Composite scores for every task against every agent, built in task chunks"""
+        features = AgentFeatureMatrix.from_agents(agents, optimization_engine.capability_matrix)
+        scores = np.empty((len(tasks), len(agents)))
+        for start in range(0, len(tasks), chunk_size):
+            chunk = tasks[start:start + chunk_size]
+            scores[start:start + len(chunk)] = optimization_engine.calculate_score_matrix(chunk, features).composite
+        return scores
+
+    def population_fitness(self, population: np.ndarray, scores: np.ndarray, durations: np.ndarray) -> np.ndarray:
+        """Fitness of every individual in one vectorized pass
+
+        Each gene contributes its assignment score, discounted by up to 30%
+        as the agent's cumulative workload (in task order) approaches an
+        8-hour day; a bonus rewards balanced total workloads.
+        """
+        pop_size, n_tasks = population.shape
+        n_agents = scores.shape[1]
+        assignment_scores = scores[np.arange(n_tasks), population]
+
+        # Cumulative workload of each gene's agent up to and including that task
+        groups = (np.arange(pop_size)[:, None] * n_agents + population).ravel()
+        order = np.argsort(groups, kind='stable')
+        sorted_groups = groups[order]
+        sorted_durations = np.broadcast_to(durations, population.shape).ravel()[order]
+        running = np.cumsum(sorted_durations)
+        group_start = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+        group_offset = np.repeat(running[group_start] - sorted_durations[group_start],
+                                 np.diff(np.r_[group_start, len(order)]))
+        cumulative = np.empty_like(running)
+        cumulative[order] = running - group_offset
+        workload_penalty = np.minimum(cumulative.reshape(population.shape) / 480.0, 1.0)
+
+        fitness = (assignment_scores * (1.0 - workload_penalty * 0.3)).sum(axis=1)
+
+        totals = np.bincount(groups, weights=np.broadcast_to(durations, population.shape).ravel(),
+                             minlength=pop_size * n_agents).reshape(pop_size, n_agents)
+        used = np.count_nonzero(
+            np.bincount(groups, minlength=pop_size * n_agents).reshape(pop_size, n_agents), axis=1
+        )
+        mean = totals.sum(axis=1) / used
+        variance = (totals ** 2).sum(axis=1) / used - mean ** 2
+        return fitness + np.maximum(0.0, 1.0 - variance / 10000)
+
+    def _select(self, fitness: np.ndarray, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Tournament selection: indices of ``count`` winners"""
+        contenders = rng.integers(0, len(fitness), size=(count, min(self.tournament_size, len(fitness))))
+        return contenders[np.arange(count), np.argmax(fitness[contenders], axis=1)]
+
+    def _offspring(self, population: np.ndarray, fitness: np.ndarray, rng: np.random.Generator,
+                   n_agents: int, count: int) -> np.ndarray:
+        """Single-point crossover and uniform mutation for a batch of children"""
+        n_pairs = (count + 1) // 2
+        parents1 = population[self._select(fitness, rng, n_pairs)]
+        parents2 = population[self._select(fitness, rng, n_pairs)]
+        n_tasks = population.shape[1]
+
+        if n_tasks >= 2:
+            points = rng.integers(1, n_tasks, size=n_pairs)
+            points[rng.random(n_pairs) > self.crossover_rate] = n_tasks  # no crossover
+            head = np.arange(n_tasks) < points[:, None]
+            children = np.concatenate([np.where(head, parents1, parents2), np.where(head, parents2, parents1)])
+        else:
+            children = np.concatenate([parents1, parents2])
+        children = children[:count]
+
+        mutate = rng.random(children.shape) < self.mutation_rate
+        children[mutate] = rng.integers(0, n_agents, size=int(mutate.sum()))
+        return children
+
+    def evolve(self, population: np.ndarray, scores: np.ndarray, durations: np.ndarray,
+               rng: np.random.Generator, generations: int, prior_history: Optional[List[float]] = None):
+        """Evolve one island for up to ``generations`` generations
+
+        Returns the final population, its fitness, the island's best fitness
+        per generation and the random generator (so runs can resume). When
+        ``prior_history`` is given the island stops early once it converges.
+        """
+        fitness = self.population_fitness(population, scores, durations)
+        history = []
+        elite_size = min(self.elite_size, len(population))
+
+        for _ in range(generations):
+            elite = population[np.argsort(fitness)[::-1][:elite_size]]
+            children = self._offspring(population, fitness, rng, scores.shape[1], len(population) - elite_size)
+            population = np.concatenate([elite, children])
+            fitness = self.population_fitness(population, scores, durations)
+            history.append(float(fitness.max()))
+            if prior_history is not None and self._converged(prior_history + history):
+                break
+
+        return population, fitness, history, rng
+
+    def _converged(self, history: List[float]) -> bool:
+        """No improvement above tolerance over the last ``patience`` generations"""
+        if not self.patience or len(history) <= self.patience:
+            return False
+        return history[-1] - history[-self.patience - 1] <= self.tolerance
 
     def optimize_assignments(self, tasks: List[Task], agents: List[Agent],
-                           optimization_engine) -> Dict[str, str]:
+                             optimization_engine) -> Dict[str, str]:
         """Run genetic algorithm optimization"""
-        if not tasks or not agents:
+        start_time = time.perf_counter()
+        available_agents = [a for a in agents if a.status == AgentStatus.AVAILABLE]
+        if not tasks or not available_agents:
             return {}
 
-        # Initialize population
-        population = []
-        for _ in range(self.population_size):
-            individual = self.create_individual(tasks, agents)
-            population.append(individual)
-
-        best_fitness = float('-inf')
-        best_individual = None
-
-        for generation in range(self.generations):
-            # Calculate fitness for all individuals
-            fitness_scores = []
-            for individual in population:
-                fitness = self.calculate_fitness(individual, tasks, agents, optimization_engine)
-                fitness_scores.append(fitness)
-
-                if fitness > best_fitness:
-                    best_fitness = fitness
-                    best_individual = individual.copy()
-
-            self.fitness_history.append(best_fitness)
-
-            # Selection (tournament selection)
-            new_population = []
-            for _ in range(self.population_size // 2):
-                # Tournament selection for parents
-                parent1 = self.tournament_selection(population, fitness_scores)
-                parent2 = self.tournament_selection(population, fitness_scores)
-
-                # Crossover
-                child1, child2 = self.crossover(parent1, parent2)
+        scores = self.build_score_matrix(tasks, available_agents, optimization_engine)
+        durations = np.array([task.estimated_duration for task in tasks], dtype=float)
+        rngs = [np.random.default_rng(seed) for seed in np.random.SeedSequence(self.seed).spawn(self.islands)]
+        populations = [
+            rng.integers(0, len(available_agents), size=(self.population_size, len(tasks))) for rng in rngs
+        ]
 
-                # Mutation
-                child1 = self.mutate(child1, agents)
-                child2 = self.mutate(child2, agents)
+        interval = self.migration_interval if self.islands > 1 else self.generations
+        use_pool = self.islands > 1 and self.max_workers and self.max_workers > 1
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.max_workers, self.islands),
+            initializer=_init_island_worker,
+            initargs=(scores, durations)
+        ) if use_pool else None
+
+        history: List[float] = []
+        generations_run = 0
+        best, best_fitness = None, float('-inf')
+        try:
+            while generations_run < self.generations:
+                epoch = min(interval, self.generations - generations_run)
+                if executor:
+                    results = list(executor.map(
+                        _evolve_island_worker, [self] * self.islands, populations, rngs, [epoch] * self.islands
+                    ))
+                elif self.islands == 1:
+                    results = [self.evolve(populations[0], scores, durations, rngs[0], epoch, history)]
+                else:
+                    results = [self.evolve(pop, scores, durations, rng, epoch) for pop, rng in zip(populations, rngs)]
+
+                populations = [result[0] for result in results]
+                fitnesses = [result[1] for result in results]
+                rngs = [result[3] for result in results]
+                epoch_history = np.max([result[2] for result in results], axis=0).tolist()
+                history.extend(epoch_history)
+                generations_run += len(epoch_history)
+
+                island = int(np.argmax([fitness.max() for fitness in fitnesses]))
+                if best is None or fitnesses[island].max() > best_fitness:
+                    best_fitness = float(fitnesses[island].max())
+                    best = populations[island][int(np.argmax(fitnesses[island]))].copy()
+
+                if self._converged(history) or len(epoch_history) < epoch:
+                    break
+                if self.islands > 1:
+                    populations = self._migrate(populations, fitnesses)
+        finally:
+            if executor:
+                executor.shutdown()
+
+        if best is None:
+            # Zero generations requested: best of the initial populations
+            fitnesses = [self.population_fitness(pop, scores, durations) for pop in populations]
+            island = int(np.argmax([fitness.max() for fitness in fitnesses]))
+            best_fitness = float(fitnesses[island].max())
+            best = populations[island][int(np.argmax(fitnesses[island]))]
+
+        self.fitness_history.extend(history)
+        self.last_run = {
+            'generations_run': generations_run,
+            'converged': generations_run < self.generations,
+            'best_fitness': best_fitness,
+            'islands': self.islands,
+            'runtime_seconds': time.perf_counter() - start_time
+        }
+        return {task.task_id: available_agents[agent].agent_id for task, agent in zip(tasks, best)}
+
+    def _migrate(self, populations: List[np.ndarray], fitnesses: List[np.ndarray]) -> List[np.ndarray]:
+        """Ring migration: each island's best individuals replace the next island's worst"""
+        count = min(self.migration_size, self.population_size)
+        migrants = [pop[np.argsort(fit)[::-1][:count]] for pop, fit in zip(populations, fitnesses)]
+        migrated = []
+        for i, (population, fitness) in enumerate(zip(populations, fitnesses)):
+            population = population.copy()
+            population[np.argsort(fitness)[:count]] = migrants[i - 1]
+            migrated.append(population)
+        return migrated
 
-                new_population.extend([child1, child2])
+# Simulation Engine for What-If Analysis
+_simulation_context: Optional[Tuple] = None
 
-            population = new_population
+def _init_simulation_worker(settings: Dict[str, Any], base_tasks: List[Task], base_agents: List[Agent],
+                            optimization_engine: OptimizationCriteria):
+    """Process-pool initializer: share the scenario inputs with replication workers once
 
-        return best_individual or {}
+    Only the engine's replication settings are shipped, not the engine
+    itself, so its simulation history never crosses the process boundary.
+    """
+    global _simulation_context
+    engine = SimulationEngine(load_per_task=settings['load_per_task'], min_capability=settings['min_capability'])
+    engine.scenario_templates = settings['scenario_templates']
+    _simulation_context = (engine, base_tasks, base_agents, optimization_engine)
 
-    def tournament_selection(self, population: List[Dict[str, str]],
-                           fitness_scores: List[float], tournament_size: int = 3) -> Dict[str, str]:
-        """Tournament selection for parent selection"""
-        tournament_indices = random.sample(range(len(population)),
-                                         min(tournament_size, len(population)))
-        best_index = max(tournament_indices, key=lambda i: fitness_scores[i])
-        return population[best_index].copy()
+def _simulation_replication_worker(scenario_type: str, custom_params: Optional[Dict],
+                                   seed: np.random.SeedSequence) -> Dict[str, Any]:
+    engine, base_tasks, base_agents, optimization_engine = _simulation_context
+    return engine.run_replication(base_tasks, base_agents, optimization_engine, scenario_type, custom_params, seed)
 
-# Simulation Engine for What-If Analysis
 class SimulationEngine:
-    """Advanced simulation engine for scenario planning and what-if analysis"""
-
-    def __init__(self):
+    """Advanced simulation engine for scenario planning and what-if analysis
+
+    Scenarios are evaluated as Monte-Carlo experiments. Each replication
+    draws agent outages, task durations and arrival order from its own
+    seeded generator and assigns the tasks greedily, the way the live
+    engine does. Replications run in batches, optionally over a process
+    pool, until the confidence intervals on cost, utilization and success
+    rate are within ``relative_precision`` of their means.
+    """
+
+    CONVERGENCE_METRICS = ('total_cost', 'mean_utilization', 'assignment_success_rate')
+    SUMMARY_METRICS = CONVERGENCE_METRICS + ('average_cost_per_task', 'successful_assignments',
+                                             'total_estimated_minutes')
+    SHIFT_MINUTES = 480
+
+    def __init__(self, confidence_level: float = 0.95, relative_precision: float = 0.05,
+                 min_runs: int = 10, batch_size: int = 10, max_workers: Optional[int] = None,
+                 load_per_task: float = 0.1, min_capability: float = 0.3, mp_context=None):
         self.simulation_history = []
         self.scenario_templates = {
             'high_load': {'task_multiplier': 3.0, 'agent_availability': 0.7},
@@ -898,26 +1543,45 @@ class SimulationEngine:
             'rush_orders': {'priority_shift': 'high', 'deadline_pressure': 0.5},
             'maintenance_window': {'agent_availability': 0.3, 'duration_multiplier': 1.5}
         }
+        self.confidence_level = confidence_level
+        self.relative_precision = relative_precision
+        self.min_runs = min_runs
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.load_per_task = load_per_task
+        self.min_capability = min_capability
+        # multiprocessing context for the replication pool; None uses the platform default
+        self.mp_context = mp_context
 
     def create_scenario(self, base_tasks: List[Task], base_agents: List[Agent],
-                       scenario_type: str = 'normal', custom_params: Dict = None) -> Tuple[List[Task], List[Agent]]:
-        """Create a simulation scenario with modified tasks and agents"""
-        scenario_params = self.scenario_templates.get(scenario_type, {})
+                       scenario_type: str = 'normal', custom_params: Dict = None,
+                       rng: Optional[np.random.Generator] = None) -> Tuple[List[Task], List[Agent]]:
+        """Create a simulation scenario with modified tasks and agents
+
+        Task durations are scaled by a mean-one gamma factor with coefficient
+        of variation ``duration_variability`` (default 0.1, 0 disables).
+        """
+        scenario_params = dict(self.scenario_templates.get(scenario_type, {}))
         if custom_params:
             scenario_params.update(custom_params)
+        if rng is None:
+            rng = np.random.default_rng()
+
+        duration_multiplier = scenario_params.get('duration_multiplier', 1.0)
+        variability = scenario_params.get('duration_variability', 0.1)
+        if variability > 0:
+            shape = 1.0 / variability ** 2
+            duration_factors = rng.gamma(shape, 1.0 / shape, size=len(base_tasks)) * duration_multiplier
+        else:
+            duration_factors = np.full(len(base_tasks), duration_multiplier)
 
         # Modify tasks based on scenario
         modified_tasks = []
-        for task in base_tasks:
-            new_task = Task(
+        for task, factor in zip(base_tasks, duration_factors):
+            new_task = replace(
+                task,
                 task_id=f"sim_{task.task_id}",
-                task_type=task.task_type,
-                priority=task.priority,
-                requirements=task.requirements,
-                estimated_duration=int(task.estimated_duration * scenario_params.get('duration_multiplier', 1.0)),
-                deadline=task.deadline,
-                complexity=task.complexity,
-                location=task.location
+                estimated_duration=max(1, int(task.estimated_duration * factor))
             )
 
             # Apply priority shifts
@@ -933,106 +1597,230 @@ class SimulationEngine:
             additional_tasks = []
             for i in range(int(task_multiplier) - 1):
                 for task in modified_tasks:
-                    additional_task = Task(
-                        task_id=f"{task.task_id}_copy_{i}",
-                        task_type=task.task_type,
-                        priority=task.priority,
-                        requirements=task.requirements,
-                        estimated_duration=task.estimated_duration,
-                        deadline=task.deadline,
-                        complexity=task.complexity,
-                        location=task.location
-                    )
-                    additional_tasks.append(additional_task)
+                    additional_tasks.append(replace(task, task_id=f"{task.task_id}_copy_{i}"))
             modified_tasks.extend(additional_tasks)
 
-        # Modify agents based on scenario
-        modified_agents = []
+        # Modify agents based on scenario; randomly take some offline based on availability factor
         agent_availability = scenario_params.get('agent_availability', 1.0)
+        offline = rng.random(len(base_agents)) > agent_availability
 
-        for agent in base_agents:
-            new_agent = Agent(
+        modified_agents = [
+            replace(
+                agent,
                 agent_id=f"sim_{agent.agent_id}",
                 name=f"Sim_{agent.name}",
-                agent_type=agent.agent_type,
                 capabilities=agent.capabilities.copy(),
-                status=agent.status,
-                location=agent.location,
-                cost_per_hour=agent.cost_per_hour,
-                current_load=agent.current_load,
-                fatigue_level=agent.fatigue_level,
-                energy_efficiency=agent.energy_efficiency
+                status=AgentStatus.MAINTENANCE if is_offline else agent.status
             )
+            for agent, is_offline in zip(base_agents, offline)
+        ]
 
-            # Randomly make some agents unavailable based on availability factor
-            if random.random() > agent_availability:
-                new_agent.status = AgentStatus.MAINTENANCE
+        return modified_tasks, modified_agents
 
-            modified_agents.append(new_agent)
+    def replication_settings(self) -> Dict[str, Any]:
+        """Settings a worker process needs to run replications of this engine"""
+        return {
+            'scenario_templates': self.scenario_templates,
+            'load_per_task': self.load_per_task,
+            'min_capability': self.min_capability
+        }
 
-        return modified_tasks, modified_agents
+    def run_replication(self, base_tasks: List[Task], base_agents: List[Agent],
+                        optimization_engine: OptimizationCriteria, scenario_type: str = 'normal',
+                        custom_params: Dict = None, seed=None, keep_assignments: bool = False) -> Dict[str, Any]:
+        """Run one randomized replication of a scenario
+
+        Tasks arrive in random order (unless ``shuffle_arrivals`` is false)
+        and each goes to the best-scoring capable agent below the load
+        ceiling; the agent then carries ``load_per_task`` more load.
+        """
+        rng = np.random.default_rng(seed)
+        sim_tasks, sim_agents = self.create_scenario(base_tasks, base_agents, scenario_type, custom_params, rng)
+        if (custom_params or {}).get('shuffle_arrivals', True):
+            sim_tasks = [sim_tasks[i] for i in rng.permutation(len(sim_tasks))]
+
+        # Rows follow sim_agents order, so a row indexes the agent list directly
+        features = AgentFeatureMatrix.from_agents(sim_agents, optimization_engine.capability_matrix)
+        online = features.available[:len(features)].copy()
+
+        task_positions, agent_rows, loads_at_assignment = [], [], []
+        for position, task in enumerate(sim_tasks):
+            open_rows = features.assignable_rows()
+            if len(open_rows) == 0:
+                break
+
+            scores = optimization_engine.calculate_score_matrix([task], features, open_rows)
+            capable = scores.capability[0] >= self.min_capability
+            if not capable.any():
+                continue
 
-    def run_simulation(self, base_tasks: List[Task], base_agents: List[Agent],
-                      ai_engine, scenario_type: str = 'normal',
-                      custom_params: Dict = None) -> Dict[str, Any]:
-        """Run a complete simulation scenario"""
-        start_time = time.time()
+            row = open_rows[np.argmax(np.where(capable, scores.composite[0], -np.inf))]
+            agent = sim_agents[row]
+            task_positions.append(position)
+            agent_rows.append(row)
+            loads_at_assignment.append(agent.current_load)
 
-        # Create scenario
-        sim_tasks, sim_agents = self.create_scenario(base_tasks, base_agents, scenario_type, custom_params)
+            agent.current_load += self.load_per_task  # Simulate workload increase
+            features.update_state(agent)
 
-        # Run assignments
+        agent_rows = np.array(agent_rows, dtype=np.intp)
         assignments = []
-        total_cost = 0.0
-        total_duration = 0
-        successful_assignments = 0
+        if len(agent_rows):
+            # Score every chosen pair at the load its agent carried when the task arrived
+            assignments = optimization_engine.build_assignments(
+                sim_tasks, features, task_positions, agent_rows,
+                added_load=np.array(loads_at_assignment) - features.current_load[agent_rows]
+            )
 
-        for task in sim_tasks:
-            try:
-                # Use AI engine to find optimal assignment
-                assignment = ai_engine.find_optimal_assignment(task, sim_agents)
-                if assignment:
-                    assignments.append(assignment)
-                    total_cost += assignment.cost_estimate
-                    total_duration += assignment.estimated_completion_time.timestamp() - time.time()
-                    successful_assignments += 1
-
-                    # Update agent workload
-                    assigned_agent = next((a for a in sim_agents if a.agent_id == assignment.agent_id), None)
-                    if assigned_agent:
-                        assigned_agent.current_load += 0.1  # Simulate workload increase
-            except Exception as e:
-                logger.warning(f"Simulation assignment failed for task {task.task_id}: {e}")
-
-        # Calculate metrics
-        assignment_success_rate = successful_assignments / len(sim_tasks) if sim_tasks else 0
-        average_cost = total_cost / successful_assignments if successful_assignments else 0
-        simulation_time = time.time() - start_time
-
-        # Agent utilization
-        agent_utilization = {}
-        for agent in sim_agents:
-            assigned_tasks = [a for a in assignments if a.agent_id == agent.agent_id]
-            utilization = len(assigned_tasks) / len(sim_tasks) if sim_tasks else 0
-            agent_utilization[agent.agent_id] = utilization
-
-        simulation_result = {
-            'scenario_type': scenario_type,
-            'scenario_params': custom_params or {},
+        costs = np.array([a.cost_estimate for a in assignments], dtype=float)
+        minutes = np.array([a.estimated_completion_time for a in assignments], dtype=float)
+        agent_minutes = np.bincount(agent_rows, weights=minutes, minlength=len(sim_agents))
+        utilization = np.minimum(agent_minutes[online] / self.SHIFT_MINUTES, 1.0)
+        successful_assignments = len(assignments)
+
+        result = {
             'total_tasks': len(sim_tasks),
             'total_agents': len(sim_agents),
+            'online_agents': int(online.sum()),
             'successful_assignments': successful_assignments,
-            'assignment_success_rate': assignment_success_rate,
-            'total_cost': total_cost,
-            'average_cost_per_task': average_cost,
+            'assignment_success_rate': successful_assignments / len(sim_tasks) if sim_tasks else 0.0,
+            'total_cost': float(costs.sum()),
+            'average_cost_per_task': float(costs.mean()) if successful_assignments else 0.0,
+            'total_estimated_minutes': float(minutes.sum()),
+            'mean_utilization': float(utilization.mean()) if len(utilization) else 0.0,
+            'agent_task_counts': np.bincount(agent_rows, minlength=len(sim_agents))
+        }
+        if keep_assignments:
+            result['assignments'] = [asdict(a) for a in assignments]
+        return result
+
+    def confidence_interval(self, values: np.ndarray) -> Dict[str, Optional[float]]:
+        """Mean and Student-t confidence interval of replication values"""
+        runs = len(values)
+        mean = float(values.mean())
+        if runs < 2:
+            return {'mean': mean, 'std': None, 'half_width': None, 'lower': None, 'upper': None}
+
+        std = float(values.std(ddof=1))
+        half_width = float(stats.t.ppf((1.0 + self.confidence_level) / 2.0, runs - 1) * std / math.sqrt(runs))
+        return {'mean': mean, 'std': std, 'half_width': half_width,
+                'lower': mean - half_width, 'upper': mean + half_width}
+
+    def summarize_replications(self, replications: List[Dict[str, Any]],
+                               relative_precision: float) -> Dict[str, Any]:
+        """Confidence intervals over completed replications and the stopping decision"""
+        intervals = {
+            name: self.confidence_interval(np.array([r[name] for r in replications], dtype=float))
+            for name in self.SUMMARY_METRICS
+        }
+        converged = len(replications) >= max(self.min_runs, 2) and all(
+            intervals[name]['half_width'] <= relative_precision * abs(intervals[name]['mean'])
+            for name in self.CONVERGENCE_METRICS
+        )
+        return {
+            'runs_completed': len(replications),
+            'converged': converged,
+            'confidence_level': self.confidence_level,
+            'confidence_intervals': intervals
+        }
+
+    def iter_simulation(self, base_tasks: List[Task], base_agents: List[Agent],
+                        optimization_engine: OptimizationCriteria, scenario_type: str = 'normal',
+                        custom_params: Dict = None, runs: int = 100, seed: Optional[int] = None,
+                        max_workers: Optional[int] = None,
+                        relative_precision: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Run up to ``runs`` replications, yielding a partial summary after each batch
+
+        The last summary has ``final`` set and carries the scenario-level
+        result, which is also recorded in the simulation history. Batches
+        are fixed-size and evaluated in seed order, so a seed gives the same
+        result with or without the process pool.
+        """
+        start_time = time.time()
+        if relative_precision is None:
+            relative_precision = self.relative_precision
+        if max_workers is None:
+            max_workers = self.max_workers or os.cpu_count() or 1
+        seeds = np.random.SeedSequence(seed).spawn(runs)
+
+        executor = None
+        if runs > 1 and max_workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=self.mp_context,
+                initializer=_init_simulation_worker,
+                initargs=(self.replication_settings(), base_tasks, base_agents, optimization_engine)
+            )
+
+        replications = []
+        try:
+            while len(replications) < runs:
+                batch_size = self.batch_size if replications else max(self.batch_size, self.min_runs)
+                batch = seeds[len(replications):len(replications) + batch_size]
+                if executor is not None:
+                    replications.extend(executor.map(
+                        _simulation_replication_worker, repeat(scenario_type), repeat(custom_params), batch
+                    ))
+                else:
+                    replications.extend(
+                        self.run_replication(base_tasks, base_agents, optimization_engine, scenario_type,
+                                             custom_params, batch_seed, keep_assignments=runs == 1)
+                        for batch_seed in batch
+                    )
+
+                summary = self.summarize_replications(replications, relative_precision)
+                summary['final'] = summary['converged'] or len(replications) >= runs
+                if not summary['final']:
+                    yield summary
+                    continue
+
+                summary.update(self._scenario_result(
+                    replications, scenario_type, custom_params, base_agents, time.time() - start_time
+                ))
+                self.simulation_history.append(summary)
+                yield summary
+                return
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _scenario_result(self, replications: List[Dict[str, Any]], scenario_type: str,
+                         custom_params: Optional[Dict], base_agents: List[Agent],
+                         simulation_time: float) -> Dict[str, Any]:
+        """Mean replication outcome in the single-run result layout"""
+        total_tasks = replications[0]['total_tasks']
+        task_share = np.mean([r['agent_task_counts'] for r in replications], axis=0) / max(total_tasks, 1)
+
+        result = {
+            'scenario_type': scenario_type,
+            'scenario_params': custom_params or {},
+            'total_tasks': total_tasks,
+            'total_agents': replications[0]['total_agents'],
+            'successful_assignments': float(np.mean([r['successful_assignments'] for r in replications])),
             'simulation_time_seconds': simulation_time,
-            'agent_utilization': agent_utilization,
-            'assignments': [asdict(a) for a in assignments],
+            'agent_utilization': {
+                f"sim_{agent.agent_id}": float(share) for agent, share in zip(base_agents, task_share)
+            },
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
+        for name in ('assignment_success_rate', 'total_cost', 'average_cost_per_task', 'mean_utilization'):
+            result[name] = float(np.mean([r[name] for r in replications]))
+        if 'assignments' in replications[0]:
+            result['assignments'] = replications[0]['assignments']
+        return result
 
-        self.simulation_history.append(simulation_result)
-        return simulation_result
+    def run_simulation(self, base_tasks: List[Task], base_agents: List[Agent],
+                      ai_engine, scenario_type: str = 'normal',
+                      custom_params: Dict = None, runs: int = 1, seed: Optional[int] = None,
+                      max_workers: Optional[int] = None,
+                      relative_precision: Optional[float] = None) -> Dict[str, Any]:
+        """Run a complete simulation scenario and return its final summary"""
+        summary = None
+        for summary in self.iter_simulation(base_tasks, base_agents, ai_engine.optimization_engine,
+                                            scenario_type, custom_params, runs, seed, max_workers,
+                                            relative_precision):
+            pass
+        return summary
 
 # Integration Service for Robot and IoT Systems
 class SystemIntegrationService:
@@ -1388,6 +2176,7 @@ class AIDecisionEngine:
         # Layer 2: Multi-Objective Optimization
         self.optimization_engine = OptimizationCriteria()
         self.optimization_engine.capability_matrix = self.capability_matrix
+        self.agent_features = AgentFeatureMatrix(self.capability_matrix)
 
         # Layer 3: Reinforcement Learning
         self.bandit_selector = AgentSelectionBandit()
@@ -1399,6 +2188,7 @@ class AIDecisionEngine:
 
         # Enterprise Features
         self.genetic_optimizer = GeneticAlgorithmOptimizer()
+        self.batch_solver = BatchAssignmentSolver()
         self.simulation_engine = SimulationEngine()
         self.integration_service = SystemIntegrationService()
         self.analytics_engine = AdvancedAnalyticsEngine()
@@ -1408,6 +2198,8 @@ class AIDecisionEngine:
         self.tasks: Dict[str, Task] = {}
         self.assignments: Dict[str, Assignment] = {}
         self.assignment_history: List[Assignment] = []
+        self.task_queue: deque = deque()
+        self.batch_lock = asyncio.Lock()  # one assignment window at a time
         self.active_websockets: List[WebSocket] = []
 
         # Performance tracking
@@ -1425,6 +2217,7 @@ class AIDecisionEngine:
         """Register a new agent with the system"""
         try:
             self.agents[agent.agent_id] = agent
+            self.agent_features.upsert(agent)
             logger.info(f"Registered agent: {agent.agent_id} ({agent.agent_type.value})")
             await self.broadcast_agent_update(agent)
             return True
@@ -1456,6 +2249,7 @@ class AIDecisionEngine:
             if assignment:
                 return f"Task assigned to agent {assignment.agent_id}"
             else:
+                self.task_queue.append(task.task_id)
                 return "Task queued - no suitable agent available"
 
         except Exception as e:
@@ -1464,26 +2258,30 @@ class AIDecisionEngine:
 
     async def assign_task(self, task: Task) -> Optional[Assignment]:
         """Assign task to optimal agent using multi-layer intelligence"""
-        available_agents = [
-            agent for agent in self.agents.values()
-            if agent.status == AgentStatus.AVAILABLE and agent.current_load < 0.9
-        ]
+        available_rows = self.agent_features.assignable_rows()
 
-        if not available_agents:
+        if len(available_rows) == 0:
             return None
 
+        # Layers 1 and 2: score the task against every available agent in one pass
+        scores = self.optimization_engine.calculate_score_matrix([task], self.agent_features, available_rows)
+
         # Layer 1: Filter agents by capability
-        capable_agents = []
-        for agent in available_agents:
-            capability = self.capability_matrix.assess_real_time_capability(agent, task)
-            if capability >= 0.3:  # Minimum capability threshold
-                capable_agents.append(agent)
+        capable = scores.capability[0] >= 0.3  # Minimum capability threshold
+        capable_columns = np.flatnonzero(capable)
 
-        if not capable_agents:
+        if len(capable_columns) == 0:
             return None
 
+        capable_agents = [
+            self.agents[self.agent_features.agent_ids[row]] for row in available_rows[capable_columns]
+        ]
+
         # Layer 2: Multi-objective optimization
-        optimization_assignment = self.optimization_engine.optimize_assignment(task, capable_agents)
+        best_column = int(np.argmax(np.where(capable, scores.composite[0], -np.inf)))
+        optimization_assignment = self.optimization_engine.build_assignments(
+            [task], self.agent_features, [0], [available_rows[best_column]]
+        )[0]
 
         # Layer 3: Reinforcement learning selection
         current_state = self.q_learning.get_state_representation(
@@ -1499,7 +2297,9 @@ class AIDecisionEngine:
         else:
             # Use bandit selection for exploration
             selected_agent = self.bandit_selector.select_agent_ucb(task, capable_agents)
-            selected_assignment = self.optimization_engine.optimize_assignment(task, [selected_agent])
+            selected_assignment = self.optimization_engine.build_assignments(
+                [task], self.agent_features, [0], [self.agent_features.index[selected_agent.agent_id]]
+            )[0]
 
         if not selected_assignment:
             return None
@@ -1517,6 +2317,7 @@ class AIDecisionEngine:
             assigned_agent = self.agents[final_assignment.agent_id]
             assigned_agent.status = AgentStatus.BUSY
             assigned_agent.current_load = min(assigned_agent.current_load + 0.3, 1.0)
+            self.agent_features.update_state(assigned_agent)
 
             # Store assignment
             self.assignments[final_assignment.assignment_id] = final_assignment
@@ -1533,6 +2334,53 @@ class AIDecisionEngine:
 
         return None
 
+    def queue_task(self, task: Task):
+        """Queue a task for the next batch assignment window"""
+        self.tasks[task.task_id] = task
+        self.task_queue.append(task.task_id)
+
+    async def assign_queued_tasks(self, window_size: int = 1000, method: str = "hungarian") -> BatchAssignmentResult:
+        """Solve the global assignment for a window of queued tasks
+
+        Tasks the solver cannot place go back to the front of the queue. The
+        solve runs off the event loop; windows are solved one at a time so
+        each sees the loads left by the previous one.
+        """
+        async with self.batch_lock:
+            return await self._assign_window(window_size, method)
+
+    async def _assign_window(self, window_size: int, method: str) -> BatchAssignmentResult:
+        window = []
+        while self.task_queue and len(window) < window_size:
+            task = self.tasks.get(self.task_queue.popleft())
+            if task is not None:
+                window.append(task)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            None,
+            lambda: self.batch_solver.solve(window, self.agent_features, self.optimization_engine, method=method)
+        )
+
+        for assignment in result.assignments:
+            agent = self.agents[assignment.agent_id]
+            agent.status = AgentStatus.BUSY
+            agent.current_load = min(agent.current_load + self.batch_solver.load_per_task, 1.0)
+            self.agent_features.update_state(agent)
+
+            self.assignments[assignment.assignment_id] = assignment
+            self.assignment_history.append(assignment)
+            self.performance_metrics['total_assignments'] += 1
+            await self.broadcast_assignment_update(assignment)
+
+        self.task_queue.extendleft(reversed(result.unassigned_task_ids))
+
+        logger.info(
+            f"Batch assigned {len(result.assignments)}/{len(window)} tasks "
+            f"({result.method}, {result.solve_time_seconds * 1000:.1f} ms)"
+        )
+        return result
+
     async def complete_assignment(self, assignment_id: str, success: bool, quality_score: float = 0.0, actual_duration: int = 0):
         """Mark assignment as complete and update learning systems"""
         if assignment_id not in self.assignments:
@@ -1549,6 +2397,8 @@ class AIDecisionEngine:
         # Update performance history
         task_type = task.task_type
         self.capability_matrix.performance_history[agent.agent_id][task_type.value].append(quality_score)
+        self.agent_features.update_state(agent)
+        self.agent_features.update_trend(agent, task_type)
 
         # Update bandit learning
         self.bandit_selector.update_performance(agent.agent_id, task_type, success)
@@ -1668,6 +2518,7 @@ class AIDecisionEngine:
             'active_agents': len([a for a in self.agents.values() if a.status == AgentStatus.AVAILABLE]),
             'busy_agents': len([a for a in self.agents.values() if a.status == AgentStatus.BUSY]),
             'pending_assignments': len(self.assignments),
+            'queued_tasks': len(self.task_queue),
             'q_table_size': len(self.q_learning.q_table),
             'bandit_exploration_rate': self.bandit_selector.exploration_factor
         }
@@ -1793,6 +2644,7 @@ async def update_agent_status(agent_id: str, status: AgentStatus):
 
     agent = ai_engine.agents[agent_id]
     agent.status = status
+    ai_engine.agent_features.update_state(agent)
 
     await ai_engine.broadcast_agent_update(agent)
 
@@ -1892,6 +2744,41 @@ async def get_assignment_history(limit: int = 100):
         "total_count": len(ai_engine.assignment_history)
     }
 
+@app.post("/api/v1/assignments/batch")
+async def assign_batch(tasks: Optional[List[TaskSubmission]] = None, window_size: int = 1000,
+                       method: str = "hungarian"):
+    """Queue tasks and solve the global assignment for a window of the queue"""
+    if method not in ("hungarian", "min_cost_flow"):
+        raise HTTPException(status_code=400, detail=f"Unknown batch assignment method: {method}")
+    if not 1 <= window_size <= MAX_BATCH_WINDOW:
+        raise HTTPException(status_code=400, detail=f"window_size must be between 1 and {MAX_BATCH_WINDOW}")
+
+    for task_data in tasks or []:
+        ai_engine.queue_task(Task(
+            task_id=task_data.task_id,
+            task_type=task_data.task_type,
+            priority=task_data.priority,
+            complexity=task_data.complexity,
+            estimated_duration=task_data.estimated_duration,
+            quality_requirements=task_data.quality_requirements,
+            safety_requirements=task_data.safety_requirements,
+            deadline=task_data.deadline,
+            location=task_data.location,
+            parameters=task_data.parameters or {}
+        ))
+
+    result = await ai_engine.assign_queued_tasks(window_size=window_size, method=method)
+
+    return {
+        "success": True,
+        "method": result.method,
+        "assignments": [asdict(assignment) for assignment in result.assignments],
+        "unassigned_task_ids": result.unassigned_task_ids,
+        "total_score": result.total_score,
+        "solve_time_seconds": result.solve_time_seconds,
+        "queued_tasks": len(ai_engine.task_queue)
+    }
+
 # Performance and Analytics Endpoints
 @app.get("/api/v1/performance/stats")
 async def get_performance_stats():
@@ -2016,33 +2903,46 @@ async def websocket_endpoint(websocket: WebSocket):
 
 # Enterprise Features API Endpoints
 
+# Server-side ceilings on the work and parallelism a request can ask for
+MAX_BATCH_WINDOW = 10000
+MAX_OPTIMIZER_ISLANDS = 16
+MAX_POPULATION_SIZE = 500
+MAX_GENERATIONS = 1000
+MAX_OPTIMIZER_WORKERS = os.cpu_count() or 1
+MAX_SIMULATION_RUNS = 1000
+MAX_SIMULATION_WORKERS = min(4, os.cpu_count() or 1)
+
+def _genetic_limits(population_size: int, max_generations: int):
+    """Validate the population size and generation budget against the server maximums"""
+    if not 2 <= population_size <= MAX_POPULATION_SIZE:
+        raise HTTPException(status_code=400, detail=f"population_size must be between 2 and {MAX_POPULATION_SIZE}")
+    if not 1 <= max_generations <= MAX_GENERATIONS:
+        raise HTTPException(status_code=400, detail=f"max_generations must be between 1 and {MAX_GENERATIONS}")
+
 @app.post("/api/v1/optimization/genetic")
-async def run_genetic_optimization(tasks: List[TaskSubmission], max_generations: int = 50):
+async def run_genetic_optimization(tasks: List[TaskSubmission], max_generations: int = 50,
+                                   population_size: int = 50, islands: int = 1,
+                                   max_workers: Optional[int] = None, seed: Optional[int] = None):
     """Run genetic algorithm optimization for complex multi-task scenarios"""
     try:
-        # Convert task submissions to Task objects
-        task_objects = []
-        for task_data in tasks:
-            # Create basic requirements based on task type and quality/safety requirements
-            requirements = [
-                TaskRequirement(
-                    requirement_type=task_data.task_type.value,
-                    minimum_proficiency=task_data.quality_requirements,
-                    weight=1.0
-                )
-            ]
+        _genetic_limits(population_size, max_generations)
 
-            task = Task(
+        # Convert task submissions to Task objects
+        task_objects = [
+            Task(
                 task_id=task_data.task_id,
                 task_type=task_data.task_type,
                 priority=task_data.priority,
-                requirements=requirements,
+                complexity=task_data.complexity,
                 estimated_duration=task_data.estimated_duration,
+                quality_requirements=task_data.quality_requirements,
+                safety_requirements=task_data.safety_requirements,
                 deadline=task_data.deadline,
-                complexity=task_data.complexity,
-                location=task_data.location
+                location=task_data.location,
+                parameters=task_data.parameters or {}
             )
-            task_objects.append(task)
+            for task_data in tasks
+        ]
 
         # Get available agents
         available_agents = [agent for agent in ai_engine.agents.values()
@@ -2051,45 +2951,93 @@ async def run_genetic_optimization(tasks: List[TaskSubmission], max_generations:
         if not available_agents:
             raise HTTPException(status_code=400, detail="No available agents for optimization")
 
-        # Configure genetic algorithm
-        ai_engine.genetic_optimizer.generations = max_generations
+        # Per-request optimizer: concurrent requests must not share run state
+        template = ai_engine.genetic_optimizer
+        optimizer = GeneticAlgorithmOptimizer(
+            population_size=population_size,
+            generations=max_generations,
+            mutation_rate=template.mutation_rate,
+            crossover_rate=template.crossover_rate,
+            tournament_size=template.tournament_size,
+            elite_size=template.elite_size,
+            patience=template.patience,
+            tolerance=template.tolerance,
+            islands=max(1, min(islands, MAX_OPTIMIZER_ISLANDS)),
+            migration_interval=template.migration_interval,
+            migration_size=template.migration_size,
+            max_workers=min(max_workers, MAX_OPTIMIZER_WORKERS) if max_workers else None,
+            seed=seed
+        )
 
-        # Run optimization
-        optimal_assignments = ai_engine.genetic_optimizer.optimize_assignments(
-            task_objects, available_agents, ai_engine.optimization_engine
+        # Run optimization off the event loop
+        loop = asyncio.get_running_loop()
+        optimal_assignments = await loop.run_in_executor(
+            None, optimizer.optimize_assignments, task_objects, available_agents, ai_engine.optimization_engine
         )
 
         return {
             "success": True,
             "optimization_method": "genetic_algorithm",
-            "generations_run": max_generations,
+            "generations_run": optimizer.last_run['generations_run'],
+            "converged": optimizer.last_run['converged'],
+            "best_fitness": optimizer.last_run['best_fitness'],
+            "runtime_seconds": optimizer.last_run['runtime_seconds'],
             "optimal_assignments": optimal_assignments,
-            "fitness_history": ai_engine.genetic_optimizer.fitness_history[-10:],  # Last 10 generations
+            "fitness_history": optimizer.fitness_history[-10:],  # Last 10 generations
             "total_tasks": len(task_objects),
             "total_agents": len(available_agents)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Genetic optimization failed: {str(e)}")
 
+def _simulation_limits(runs: int, max_workers: Optional[int]) -> int:
+    """Validate the replication count and clamp the worker count to the server maximum"""
+    if not 1 <= runs <= MAX_SIMULATION_RUNS:
+        raise HTTPException(status_code=400, detail=f"runs must be between 1 and {MAX_SIMULATION_RUNS}")
+    return min(max_workers or MAX_SIMULATION_WORKERS, MAX_SIMULATION_WORKERS)
+
+def _simulation_inputs(include_current_tasks: bool) -> Tuple[List[Task], List[Agent]]:
+    """Base tasks and agents for a what-if simulation"""
+    base_tasks = list(ai_engine.tasks.values()) if include_current_tasks else []
+    base_agents = list(ai_engine.agents.values())
+
+    if not base_agents:
+        raise HTTPException(status_code=400, detail="No agents available for simulation")
+    return base_tasks, base_agents
+
 @app.post("/api/v1/simulation/run")
 async def run_simulation(
     scenario_type: str = "normal",
     custom_params: Optional[Dict] = None,
-    include_current_tasks: bool = True
+    include_current_tasks: bool = True,
+    runs: int = 1,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    relative_precision: Optional[float] = None
 ):
-    """Run simulation for what-if analysis"""
-    try:
-        # Get base tasks and agents
-        base_tasks = list(ai_engine.tasks.values()) if include_current_tasks else []
-        base_agents = list(ai_engine.agents.values())
+    """Run simulation for what-if analysis
 
-        if not base_agents:
-            raise HTTPException(status_code=400, detail="No agents available for simulation")
+    With ``runs`` > 1 the scenario is replicated Monte-Carlo style and the
+    result carries confidence intervals; replication stops early once they
+    are within ``relative_precision`` of the means.
+    """
+    try:
+        max_workers = _simulation_limits(runs, max_workers)
 
-        # Run simulation
-        simulation_result = ai_engine.simulation_engine.run_simulation(
-            base_tasks, base_agents, ai_engine, scenario_type, custom_params
+        # Get base tasks and agents
+        base_tasks, base_agents = _simulation_inputs(include_current_tasks)
+
+        # Run simulation off the event loop
+        loop = asyncio.get_running_loop()
+        simulation_result = await loop.run_in_executor(
+            None,
+            lambda: ai_engine.simulation_engine.run_simulation(
+                base_tasks, base_agents, ai_engine, scenario_type, custom_params,
+                runs, seed, max_workers, relative_precision
+            )
         )
 
         return {
@@ -2098,9 +3046,39 @@ async def run_simulation(
             "available_scenarios": list(ai_engine.simulation_engine.scenario_templates.keys())
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation failed: {str(e)}")
 
+@app.post("/api/v1/simulation/stream")
+async def stream_simulation(
+    scenario_type: str = "normal",
+    custom_params: Optional[Dict] = None,
+    include_current_tasks: bool = True,
+    runs: int = 200,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    relative_precision: Optional[float] = None
+):
+    """Stream Monte-Carlo progress as newline-delimited JSON
+
+    One line per completed batch of replications with the current
+    confidence intervals; the last line has ``final`` set and the full
+    scenario result.
+    """
+    max_workers = _simulation_limits(runs, max_workers)
+    base_tasks, base_agents = _simulation_inputs(include_current_tasks)
+
+    summaries = ai_engine.simulation_engine.iter_simulation(
+        base_tasks, base_agents, ai_engine.optimization_engine, scenario_type, custom_params,
+        runs, seed, max_workers, relative_precision
+    )
+    return StreamingResponse(
+        (json.dumps(summary, default=str) + "\n" for summary in summaries),
+        media_type="application/x-ndjson"
+    )
+
 @app.get("/api/v1/simulation/history")
 async def get_simulation_history(limit: int = 10):
     """Get simulation history"""
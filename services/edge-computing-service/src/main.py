@@ -5,7 +5,7 @@ Provides autonomous operation during network outages with local AI processing
 from fastapi import FastAPI, HTTPException, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Hashable, Tuple, Union
 from enum import Enum
 import asyncio
 import time
@@ -15,7 +15,7 @@ import uuid
 import json
 import logging
 import threading
-from collections import deque, defaultdict
+from collections import deque, defaultdict, OrderedDict
 import sqlite3
 from contextlib import asynccontextmanager
 import psutil
@@ -88,6 +88,12 @@ class LocalAgent(BaseModel):
     status: str
     location: str
 
+def _copy_model(model: BaseModel, **update: Any) -> BaseModel:
+    """Shallow copy with some fields replaced; the others are shared with ``model``"""
+    if hasattr(model, "model_copy"):
+        return model.model_copy(update=update)
+    return model.copy(update=update)
+
 # Performance Targets
 RESPONSE_TARGETS = {
     TaskPriority.SAFETY_CRITICAL: 1,      # 1ms
@@ -96,40 +102,85 @@ RESPONSE_TARGETS = {
     TaskPriority.STANDARD: 500            # 500ms
 }
 
-# Local Cache with LRU eviction
+# Local Cache with LRU eviction and per-entry TTL
 class EdgeDecisionCache:
-    def __init__(self, maxsize: int = 10000):
-        self.cache = {}
-        self.access_order = deque()
+    """O(1) LRU cache: an OrderedDict of key -> (value, expires_at)"""
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: Optional[float] = 30.0, latency_window: int = 10000):
+        self.cache: OrderedDict = OrderedDict()
         self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
         self.lock = threading.Lock()
-        
-    def get(self, key: str) -> Optional[Any]:
+        self.stats = {'hits': 0, 'misses': 0, 'expirations': 0, 'evictions': 0}
+        # Recent get() latencies in nanoseconds
+        self.lookup_latencies_ns = deque(maxlen=latency_window)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        start_ns = time.perf_counter_ns()
         with self.lock:
-            if key in self.cache:
+            entry = self.cache.get(key)
+            if entry is None:
+                value = None
+                self.stats['misses'] += 1
+            elif entry[1] is not None and entry[1] <= time.monotonic():
+                del self.cache[key]
+                value = None
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+            else:
                 # Move to end (most recently used)
-                self.access_order.remove(key)
-                self.access_order.append(key)
-                return self.cache[key]
-            return None
-    
-    def put(self, key: str, value: Any):
+                self.cache.move_to_end(key)
+                value = entry[0]
+                self.stats['hits'] += 1
+            self.lookup_latencies_ns.append(time.perf_counter_ns() - start_ns)
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
         with self.lock:
             if key in self.cache:
                 # Update existing
-                self.access_order.remove(key)
+                self.cache.move_to_end(key)
             elif len(self.cache) >= self.maxsize:
                 # Evict LRU
-                oldest = self.access_order.popleft()
-                del self.cache[oldest]
-            
-            self.cache[key] = value
-            self.access_order.append(key)
-    
+                self.cache.popitem(last=False)
+                self.stats['evictions'] += 1
+            self.cache[key] = (value, expires_at)
+
     def clear(self):
         with self.lock:
             self.cache.clear()
-            self.access_order.clear()
+
+    def recent_keys(self, count: int = 10) -> List[str]:
+        """Most recently used keys, oldest first"""
+        with self.lock:
+            keys = []
+            for key in reversed(self.cache):
+                if len(keys) >= count:
+                    break
+                keys.append(str(key))
+        return keys[::-1]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = np.array(self.lookup_latencies_ns, dtype=np.float64)
+            stats = dict(self.stats)
+            size = len(self.cache)
+        lookups = stats['hits'] + stats['misses']
+        stats.update({
+            'cache_size': size,
+            'max_size': self.maxsize,
+            'utilization': size / self.maxsize * 100,
+            'ttl_seconds': self.ttl_seconds,
+            'hit_ratio': stats['hits'] / lookups if lookups else 0.0,
+            'lookup_latency_us': {
+                'p50': float(np.percentile(latencies, 50)) / 1000 if latencies.size else 0.0,
+                'p99': float(np.percentile(latencies, 99)) / 1000 if latencies.size else 0.0,
+                'samples': int(latencies.size)
+            }
+        })
+        return stats
 
 # Lightweight ML Models for Edge
 class LightweightDecisionModel:
@@ -166,6 +217,20 @@ class LightweightDecisionModel:
         output = 1 / (1 + np.exp(-z2))  # Sigmoid activation
         
         return float(output[0])
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        """Score an (n, 5) feature matrix with one matmul per layer"""
+        a1 = np.maximum(0, features @ self.model_weights['layer1'] + self.model_weights['bias1'])
+        z2 = a1 @ self.model_weights['layer2'] + self.model_weights['bias2']
+        return 1 / (1 + np.exp(-z2[:, 0]))
+
+    def fill_features(self, block: np.ndarray, task: EdgeTask, agent_load: np.ndarray, proficiency: np.ndarray):
+        """Write extract_features rows for one task and many agents into ``block``"""
+        block[:, 0] = agent_load
+        block[:, 1] = len(task.parameters) / 10.0
+        block[:, 2] = proficiency
+        block[:, 3] = 0.1
+        block[:, 4] = RESPONSE_TARGETS[task.priority] / 1000.0
     
     def extract_features(self, task: EdgeTask, agent: LocalAgent) -> np.ndarray:
         """Extract features for model input"""
@@ -189,6 +254,75 @@ class LightweightDecisionModel:
         
         return features
 
+class AgentFeatureMatrix:
+    """Per-agent model inputs in preallocated arrays, one row per agent
+
+    Load and per-task-type proficiency columns are updated in place when an
+    agent registers or its load changes, so scoring a task never rebuilds
+    features agent by agent.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.index: Dict[str, int] = {}
+        self.load = np.zeros(capacity)
+        self.capabilities: List[Dict[str, float]] = []
+        self.proficiency: Dict[str, np.ndarray] = {}  # task_type -> column
+        self._features = np.empty((capacity, 5))  # scratch buffer for model inputs
+
+    def _grow(self):
+        capacity = len(self.load) * 2
+        self.load = np.resize(self.load, capacity)
+        for task_type, column in self.proficiency.items():
+            self.proficiency[task_type] = np.resize(column, capacity)
+
+    def upsert(self, agent: LocalAgent) -> int:
+        row = self.index.get(agent.agent_id)
+        if row is None:
+            row = len(self.capabilities)
+            if row == len(self.load):
+                self._grow()
+            self.index[agent.agent_id] = row
+            self.capabilities.append(agent.capabilities)
+        else:
+            self.capabilities[row] = agent.capabilities
+        self.load[row] = agent.current_load
+        for task_type, column in self.proficiency.items():
+            column[row] = agent.capabilities.get(task_type, 0.5)
+        return row
+
+    def set_load(self, agent_id: str, load: float):
+        row = self.index.get(agent_id)
+        if row is not None:
+            self.load[row] = load
+
+    def proficiency_column(self, task_type: str) -> np.ndarray:
+        column = self.proficiency.get(task_type)
+        if column is None:
+            column = np.full(len(self.load), 0.5)
+            for row, capabilities in enumerate(self.capabilities):
+                column[row] = capabilities.get(task_type, 0.5)
+            self.proficiency[task_type] = column
+        return column
+
+    def rows_for(self, agents: List[LocalAgent]) -> np.ndarray:
+        """Row numbers of ``agents``; agents seen for the first time are added"""
+        index = self.index
+        return np.fromiter(
+            (index[a.agent_id] if a.agent_id in index else self.upsert(a) for a in agents),
+            dtype=np.intp, count=len(agents)
+        )
+
+    def features(self, model: 'LightweightDecisionModel', tasks: List[EdgeTask], rows: np.ndarray) -> np.ndarray:
+        """(len(tasks) * len(rows), 5) model inputs, task-major, in the reused buffer"""
+        size = len(tasks) * len(rows)
+        if len(self._features) < size:
+            self._features = np.empty((max(size, 2 * len(self._features)), 5))
+        blocks = self._features[:size].reshape(len(tasks), len(rows), 5)
+        load = self.load[rows]
+        for block, task in zip(blocks, tasks):
+            model.fill_features(block, task, load, self.proficiency_column(task.task_type)[rows])
+        return self._features[:size]
+
 # Rule-based Decision Engine
 class RuleBasedEngine:
     def __init__(self):
@@ -258,9 +392,18 @@ class RealTimeTaskRouter:
         self.lightweight_model = LightweightDecisionModel()
         self.rule_engine = RuleBasedEngine()
         self.local_agents: Dict[str, LocalAgent] = {}
+        self.agent_features = AgentFeatureMatrix()
         self.performance_stats = defaultdict(list)
         self.cloud_available = True
         self.local_db = self._init_local_db()
+        # Bumped whenever an agent's registration or load changes. Each epoch
+        # gets a random-looking token, and the XOR of the available agents'
+        # tokens is kept up to date so the full fleet's version costs O(1)
+        self.agent_epochs: Dict[str, int] = defaultdict(int)
+        self.agent_tokens: Dict[str, int] = {}
+        self.fleet_version = 0
+        self.available_count = 0
+        self._available_agents: Optional[List[LocalAgent]] = None
     
     def _init_local_db(self) -> sqlite3.Connection:
         """Initialize local SQLite database for offline operation"""
@@ -302,11 +445,8 @@ class RealTimeTaskRouter:
             cache_key = self._generate_cache_key(task, available_agents)
             cached_decision = self.decision_cache.get(cache_key)
 
-            if cached_decision and self._is_decision_valid(cached_decision):
-                processing_time = (time.perf_counter_ns() - start_time) / 1_000_000
-                cached_decision.processing_time_ms = processing_time
-                cached_decision.cached = True
-                return cached_decision
+            if cached_decision:
+                return self._from_cache(cached_decision, task, start_time)
 
             # Step 2: Make decision based on priority
             decision = await self._make_priority_decision(task, available_agents, start_time, target_time_ms)
@@ -358,20 +498,27 @@ class RealTimeTaskRouter:
     async def _quality_critical_decision(self, task: EdgeTask, agents: List[LocalAgent], start_time: int) -> EdgeDecision:
         """Balanced decision for quality-critical tasks"""
         # Use lightweight ML model for better quality
-        best_agent = None
-        best_score = -1.0
-
-        for agent in agents:
-            if agent.status == "available":
-                features = self.lightweight_model.extract_features(task, agent)
-                score = self.lightweight_model.predict(features)
-
-                if score > best_score:
-                    best_score = score
-                    best_agent = agent
-
-        if not best_agent:
-            best_agent = agents[0] if agents else None
+        candidates, scores = self._score_agents([task], agents)
+        return self._model_decision(task, agents, candidates, scores[0], start_time)
+
+    def _score_agents(self, tasks: List[EdgeTask], agents: List[LocalAgent]) -> Tuple[List[LocalAgent], np.ndarray]:
+        """Model scores of every available agent for every task: one batched inference"""
+        candidates = [a for a in agents if a.status == "available"]
+        if not candidates:
+            return candidates, np.empty((len(tasks), 0))
+        rows = self.agent_features.rows_for(candidates)
+        features = self.agent_features.features(self.lightweight_model, tasks, rows)
+        scores = self.lightweight_model.predict_batch(features)
+        return candidates, scores.reshape(len(tasks), len(candidates))
+
+    def _model_decision(self, task: EdgeTask, agents: List[LocalAgent], candidates: List[LocalAgent],
+                        scores: np.ndarray, start_time: int) -> EdgeDecision:
+        """Decision for the highest-scoring candidate (first one on ties)"""
+        if candidates:
+            best = int(np.argmax(scores))
+            best_agent, best_score = candidates[best], float(scores[best])
+        else:
+            best_agent, best_score = (agents[0] if agents else None), -1.0
 
         processing_time = (time.perf_counter_ns() - start_time) / 1_000_000
 
@@ -436,22 +583,101 @@ class RealTimeTaskRouter:
             timestamp=datetime.now(timezone.utc)
         )
 
-    def _generate_cache_key(self, task: EdgeTask, agents: List[LocalAgent]) -> str:
-        """Generate cache key for task and agent combination"""
-        agent_ids = sorted([a.agent_id for a in agents if a.status == "available"])
-        key_parts = [
-            task.task_type,
-            task.priority.value,
-            str(len(task.parameters)),
-            "|".join(agent_ids[:5])  # Limit to 5 agents for key stability
-        ]
-        return ":".join(key_parts)
+    @staticmethod
+    def _from_cache(decision: EdgeDecision, task: EdgeTask, start_time: int) -> EdgeDecision:
+        """Copy of a cached decision for ``task``; the cached entry itself stays untouched"""
+        return _copy_model(
+            decision,
+            task_id=task.task_id,
+            processing_time_ms=(time.perf_counter_ns() - start_time) / 1_000_000,
+            cached=True
+        )
 
-    def _is_decision_valid(self, decision: EdgeDecision) -> bool:
-        """Check if cached decision is still valid"""
-        # Decision is valid for 30 seconds
-        age = (datetime.now(timezone.utc) - decision.timestamp).total_seconds()
-        return age < 30
+    def _generate_cache_key(self, task: EdgeTask, agents: List[LocalAgent],
+                            agent_versions: Optional[Tuple] = None) -> Tuple:
+        """Generate cache key for task and agent combination
+
+        Every available agent contributes its epoch token, so a load or
+        registration change only invalidates decisions made over sets
+        containing that agent. Expiry is handled by the cache TTL.
+        """
+        if agent_versions is None:
+            agent_versions = self._agent_versions(agents)
+        return (task.task_type, task.priority.value, len(task.parameters), agent_versions)
+
+    def _agent_versions(self, agents: List[LocalAgent]) -> Tuple[int, int]:
+        """Count and XOR of epoch tokens of the available agents, in any order
+
+        O(1) for the list returned by ``available_agents``; other agent
+        lists are folded in one pass.
+        """
+        if agents is self._available_agents:
+            return self.available_count, self.fleet_version
+        tokens = self.agent_tokens
+        count = version = 0
+        for agent in agents:
+            if agent.status == "available":
+                count += 1
+                token = tokens.get(agent.agent_id)
+                version ^= token if token is not None else hash((agent.agent_id, 0))
+        return count, version
+
+    async def route_tasks_batch(self, tasks: List[EdgeTask], available_agents: List[LocalAgent]) -> List[EdgeDecision]:
+        """Route a batch of tasks against one snapshot of agent state
+
+        Cached decisions are reused and safety-critical tasks keep the rule
+        engine. As in ``route_task_realtime``, standard and efficiency-critical
+        tasks ask the cloud first while it is available, concurrently; every
+        other task is scored in a single batched inference. Tasks left
+        undecided by an error get the emergency fallback.
+        """
+        start_time = time.perf_counter_ns()
+        decisions: List[Optional[EdgeDecision]] = [None] * len(tasks)
+
+        try:
+            agent_versions = self._agent_versions(available_agents)
+            cache_keys = [self._generate_cache_key(task, available_agents, agent_versions) for task in tasks]
+            to_score = []
+            to_cloud = []
+
+            for position, task in enumerate(tasks):
+                cached_decision = self.decision_cache.get(cache_keys[position])
+                if cached_decision:
+                    decisions[position] = self._from_cache(cached_decision, task, start_time)
+                elif task.priority == TaskPriority.SAFETY_CRITICAL:
+                    decisions[position] = await self._safety_critical_decision(task, available_agents, start_time)
+                elif task.priority != TaskPriority.QUALITY_CRITICAL and self.cloud_available:
+                    to_cloud.append(position)
+                else:
+                    to_score.append(position)
+
+            if to_cloud:
+                cloud_decisions = await asyncio.gather(*[
+                    self._standard_decision(tasks[position], available_agents, start_time)
+                    for position in to_cloud
+                ])
+                for position, decision in zip(to_cloud, cloud_decisions):
+                    decisions[position] = decision
+
+            if to_score:
+                batch = [tasks[position] for position in to_score]
+                candidates, scores = self._score_agents(batch, available_agents)
+                for task, position, task_scores in zip(batch, to_score, scores):
+                    decisions[position] = self._model_decision(task, available_agents, candidates, task_scores, start_time)
+
+            for position, decision in enumerate(decisions):
+                if not decision.cached:
+                    self.decision_cache.put(cache_keys[position], decision)
+                    task = tasks[position]
+                    self._record_performance(task.priority, decision.processing_time_ms, RESPONSE_TARGETS[task.priority])
+        except Exception as e:
+            # Emergency fallback for whatever the error left undecided
+            processing_time = (time.perf_counter_ns() - start_time) / 1_000_000
+            return [
+                decision or self._emergency_fallback(task, available_agents, processing_time, str(e))
+                for task, decision in zip(tasks, decisions)
+            ]
+        return decisions
 
     def _record_performance(self, priority: TaskPriority, actual_time: float, target_time: float):
         """Record performance metrics"""
@@ -485,19 +711,51 @@ class RealTimeTaskRouter:
 
         return stats
 
+    def _bump_agent(self, agent_id: str, was_available: bool, available: bool):
+        """Start a new epoch for an agent and keep the fleet version in step"""
+        if was_available:
+            self.fleet_version ^= self.agent_tokens[agent_id]
+            self.available_count -= 1
+        self.agent_epochs[agent_id] += 1
+        token = self.agent_tokens[agent_id] = hash((agent_id, self.agent_epochs[agent_id]))
+        if available:
+            self.fleet_version ^= token
+            self.available_count += 1
+
     def register_agent(self, agent: LocalAgent):
         """Register local agent"""
+        previous = self.local_agents.get(agent.agent_id)
         self.local_agents[agent.agent_id] = agent
+        self._bump_agent(agent.agent_id, previous is not None and previous.status == "available",
+                         agent.status == "available")
+        self._available_agents = None
+        self.agent_features.upsert(agent)
 
     def update_agent_load(self, agent_id: str, load: float):
         """Update agent load"""
         if agent_id in self.local_agents:
-            self.local_agents[agent_id].current_load = load
+            agent = self.local_agents[agent_id]
+            if agent.current_load != load:
+                available = agent.status == "available"
+                self._bump_agent(agent_id, available, available)
+            agent.current_load = load
+            self.agent_features.set_load(agent_id, load)
 
     def get_local_agents(self) -> List[LocalAgent]:
         """Get all local agents"""
         return list(self.local_agents.values())
 
+    def available_agents(self) -> List[LocalAgent]:
+        """Registered agents with status "available"
+
+        The same list object is returned until an agent registers, which
+        lets cache keys over it use the running fleet version; callers must
+        not modify it. Status changes go through ``register_agent``.
+        """
+        if self._available_agents is None:
+            self._available_agents = [a for a in self.local_agents.values() if a.status == "available"]
+        return self._available_agents
+
 # Global task router
 task_router = RealTimeTaskRouter()
 
@@ -581,7 +839,7 @@ async def health_check():
 async def route_task(task: EdgeTask):
     """Route task to optimal agent with real-time constraints"""
     try:
-        available_agents = [a for a in task_router.get_local_agents() if a.status == "available"]
+        available_agents = task_router.available_agents()
 
         if not available_agents:
             raise HTTPException(status_code=503, detail="No agents available")
@@ -681,10 +939,8 @@ async def get_cache_stats():
     try:
         cache = task_router.decision_cache
         return {
-            "cache_size": len(cache.cache),
-            "max_size": cache.maxsize,
-            "utilization": len(cache.cache) / cache.maxsize * 100,
-            "access_pattern": list(cache.access_order)[-10:]  # Last 10 accessed keys
+            **cache.get_stats(),
+            "access_pattern": cache.recent_keys(10)  # Last 10 accessed keys
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -846,14 +1102,46 @@ async def optimize_edge_resources():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v2/edge/tasks/realtime-route")
-async def route_task_with_advanced_pipeline(task: EdgeTask):
-    """Route task using full advanced edge computing pipeline"""
+async def route_task_with_advanced_pipeline(task: Union[EdgeTask, List[EdgeTask]]):
+    """Route task using full advanced edge computing pipeline
+
+    A list of tasks is routed as one batch with the same per-priority paths
+    as a single task: standard and efficiency-critical tasks go to the cloud
+    while it is reachable, and the remaining non-safety tasks are scored
+    against the current agents in a single model inference.
+    """
     try:
-        available_agents = [a for a in task_router.get_local_agents() if a.status == "available"]
+        available_agents = task_router.available_agents()
 
         if not available_agents:
             raise HTTPException(status_code=503, detail="No agents available")
 
+        if isinstance(task, list):
+            start_time = time.perf_counter_ns()
+            decisions = await task_router.route_tasks_batch(task, available_agents)
+
+            # Update agent loads once the whole batch is assigned
+            for decision in decisions:
+                if decision.assigned_agent_id in task_router.local_agents:
+                    current_load = task_router.local_agents[decision.assigned_agent_id].current_load
+                    task_router.update_agent_load(decision.assigned_agent_id, min(current_load + 0.1, 1.0))
+
+            return {
+                "batch_size": len(decisions),
+                "decisions": [
+                    {
+                        "task_id": decision.task_id,
+                        "assigned_agent_id": decision.assigned_agent_id,
+                        "decision_source": decision.decision_type.value,
+                        "confidence": decision.confidence,
+                        "cached": decision.cached
+                    }
+                    for decision in decisions
+                ],
+                "processing_time_ms": (time.perf_counter_ns() - start_time) / 1_000_000,
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            }
+
         # Use advanced edge computing pipeline
         assigned_agent_id = await advanced_edge_service.process_realtime_task(task, available_agents)
 
@@ -921,7 +1209,7 @@ async def simulate_background_tasks():
                 timeout_ms=1000
             )
 
-            available_agents = [a for a in task_router.get_local_agents() if a.status == "available"]
+            available_agents = task_router.available_agents()
             if available_agents:
                 await task_router.route_task_realtime(task, available_agents)
 
@@ -6,18 +6,23 @@ Comprehensive monitoring with APM, performance analytics, and predictive insight
 
 import asyncio
 import logging
+import os
+import random
 import time
 import uuid
 import json
-import statistics
+import math
+import operator
+import re
 import threading
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable, Awaitable
 from dataclasses import dataclass, asdict, field
 from enum import Enum
 from collections import defaultdict, deque
 import numpy as np
 import psutil
+import aiohttp
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -110,58 +115,556 @@ class PerformanceMetrics:
     error_rate: float
     throughput: float
 
+# PerformanceMetrics fields also recorded as service.<name>.perf.<field> series
+PERFORMANCE_FIELDS = [
+    "cpu_usage", "memory_usage", "disk_usage",
+    "response_time_p50", "response_time_p95", "response_time_p99",
+    "error_rate", "throughput"
+]
+
+# Columnar metric storage
+# Rollup label -> (bucket width in seconds, buckets kept)
+ROLLUP_RESOLUTIONS = {
+    "1m": (60, 1440),    # 24 hours
+    "5m": (300, 2016),   # 7 days
+    "1h": (3600, 720)    # 30 days
+}
+RAW_QUERY_MAX_SECONDS = 3600  # longer windows read rollups
+MAX_ROLLUP_POINTS = 360       # finest rollup with at most this many buckets in the window
+
+class RingBuffer:
+    """Bounded float64 rows; appending to a full buffer overwrites the oldest row
+
+    Storage starts small and doubles up to ``capacity``, so sparse series
+    do not pay for a full buffer.
+    """
+
+    INITIAL_ROWS = 64
+
+    def __init__(self, capacity: int, width: int):
+        self.data = np.zeros((min(capacity, self.INITIAL_ROWS), width))
+        self.capacity = capacity
+        self.head = 0  # next slot to write
+        self.size = 0
+
+    def append(self, row) -> np.ndarray:
+        if self.size == len(self.data) < self.capacity:
+            # Not wrapped yet, so rows are already in order
+            grown = np.zeros((min(self.capacity, 2 * len(self.data)), self.data.shape[1]))
+            grown[:self.size] = self.data
+            self.data = grown
+        slot = self.data[self.head]
+        slot[:] = row
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        return slot
+
+    def last(self) -> Optional[np.ndarray]:
+        return self.data[self.head - 1] if self.size else None
+
+    def first(self) -> Optional[np.ndarray]:
+        if not self.size:
+            return None
+        return self.data[0] if self.size < self.capacity else self.data[self.head]
+
+    def since(self, start: float) -> np.ndarray:
+        """Rows whose first column is >= ``start``, oldest first (a view unless the range wraps)"""
+        if self.size < self.capacity:
+            segments = [self.data[:self.size]]
+        else:
+            segments = [self.data[self.head:], self.data[:self.head]]
+        parts = [
+            segment[np.searchsorted(segment[:, 0], start):]
+            for segment in segments
+        ]
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return self.data[:0]
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+class RollupSeries:
+    """Fixed-width buckets of (start, count, mean, m2, min, max, last), updated with Welford's method"""
+
+    START, COUNT, MEAN, M2, MIN, MAX, LAST = range(7)
+
+    def __init__(self, resolution_seconds: int, buckets: int):
+        self.resolution = resolution_seconds
+        self.buckets = RingBuffer(buckets, 7)
+
+    def add(self, timestamp: float, value: float):
+        bucket_start = timestamp - timestamp % self.resolution
+        current = self.buckets.last()
+        if current is None or bucket_start > current[self.START]:
+            self.buckets.append((bucket_start, 1, value, 0.0, value, value, value))
+        elif bucket_start == current[self.START]:
+            count = current[self.COUNT] + 1
+            delta = value - current[self.MEAN]
+            current[self.COUNT] = count
+            current[self.MEAN] += delta / count
+            current[self.M2] += delta * (value - current[self.MEAN])
+            if value < current[self.MIN]:
+                current[self.MIN] = value
+            if value > current[self.MAX]:
+                current[self.MAX] = value
+            current[self.LAST] = value
+        # Samples older than the newest bucket only reach the raw series
+
+    def since(self, start: float) -> np.ndarray:
+        return self.buckets.since(start - start % self.resolution)
+
+def _weighted_percentiles(values: np.ndarray, weights: np.ndarray, percentiles: List[float]) -> np.ndarray:
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    positions = np.searchsorted(cumulative, np.array(percentiles) / 100 * cumulative[-1])
+    return values[order][np.minimum(positions, len(values) - 1)]
+
+# Streaming anomaly detection
+DETECTOR_WINDOW = 60        # samples in the rolling mean/variance/slope window
+DETECTOR_MIN_SAMPLES = 20   # warm-up before anomalies are reported
+ANOMALY_Z_THRESHOLD = 3.0
+EWMA_ALPHA = 0.2
+
+class StreamingDetector:
+    """Online statistics for one series
+
+    Keeps Welford mean/variance and least-squares slope sums over a rolling
+    window of samples, plus an EWMA level, all updated in O(1) per sample.
+    A sample more than ``z_threshold`` standard deviations from the window
+    mean (measured before it joins the window) is reported as an anomaly.
+    """
+
+    def __init__(self, window: int = DETECTOR_WINDOW, alpha: float = EWMA_ALPHA,
+                 z_threshold: Optional[float] = ANOMALY_Z_THRESHOLD, min_samples: int = DETECTOR_MIN_SAMPLES):
+        self.window = window
+        self.alpha = alpha
+        self.z_threshold = z_threshold  # None disables anomaly reporting
+        self.min_samples = min_samples
+        self.samples: deque = deque()  # (timestamp - origin, value)
+        self.origin = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sum_t = 0.0
+        self.sum_tt = 0.0
+        self.sum_tv = 0.0
+        self.ewma: Optional[float] = None
+        self.total = 0
+        self.anomalies: deque = deque(maxlen=100)
+        self._until_rebase = window
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def std(self) -> float:
+        n = len(self.samples)
+        return math.sqrt(max(self.m2, 0.0) / (n - 1)) if n > 1 else 0.0
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope over the window, in value units per second"""
+        n = len(self.samples)
+        if n < 2:
+            return 0.0
+        sxx = self.sum_tt - self.sum_t * self.sum_t / n
+        return (self.sum_tv - self.sum_t * self.mean) / sxx if sxx > 0 else 0.0
+
+    def update(self, timestamp: float, value: float) -> Optional[Dict[str, Any]]:
+        """Add a sample; returns the anomaly record if it was one"""
+        anomaly = None
+        n = len(self.samples)
+        if self.z_threshold is not None and n >= self.min_samples:
+            std = self.std
+            if std > 0:
+                z_score = (value - self.mean) / std
+                if abs(z_score) > self.z_threshold:
+                    anomaly = {
+                        "timestamp": timestamp,
+                        "value": value,
+                        "expected": self.mean,
+                        "threshold": self.mean + math.copysign(self.z_threshold * std, z_score),
+                        "z_score": z_score,
+                        "deviation": value - self.mean
+                    }
+                    self.anomalies.append(anomaly)
+
+        if self.total == 0:
+            self.origin = timestamp
+        t = timestamp - self.origin
+        if n == self.window:
+            # Welford removal of the sample leaving the window
+            old_t, old_value = self.samples.popleft()
+            n -= 1
+            old_mean = self.mean
+            self.mean = (old_mean * (n + 1) - old_value) / n if n else 0.0
+            self.m2 -= (old_value - old_mean) * (old_value - self.mean)
+            self.sum_t -= old_t
+            self.sum_tt -= old_t * old_t
+            self.sum_tv -= old_t * old_value
+
+        self.samples.append((t, value))
+        n += 1
+        delta = value - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (value - self.mean)
+        self.sum_t += t
+        self.sum_tt += t * t
+        self.sum_tv += t * value
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+        self.total += 1
+
+        self._until_rebase -= 1
+        if self._until_rebase == 0:
+            self._rebase()
+        return anomaly
+
+    def _rebase(self):
+        """Recompute the sums from the window once per window of updates
+
+        Moves the time origin to the oldest sample to keep t*t small, and
+        clears rounding drift from the incremental removals.
+        """
+        self._until_rebase = self.window
+        shift = self.samples[0][0]
+        self.origin += shift
+        self.samples = deque((t - shift, value) for t, value in self.samples)
+        n = len(self.samples)
+        self.mean = sum(value for _, value in self.samples) / n
+        self.m2 = sum((value - self.mean) ** 2 for _, value in self.samples)
+        self.sum_t = sum(t for t, _ in self.samples)
+        self.sum_tt = sum(t * t for t, _ in self.samples)
+        self.sum_tv = sum(t * value for t, value in self.samples)
+
+    def anomalies_since(self, start: float) -> List[Dict[str, Any]]:
+        return [anomaly for anomaly in self.anomalies if anomaly["timestamp"] >= start]
+
+class MetricSeries:
+    """One metric: a raw (timestamp, value) ring buffer, 1m/5m/1h rollups and a streaming detector"""
+
+    def __init__(self, name: str, metric_type: MetricType, labels: Dict[str, str], capacity: int):
+        self.name = name
+        self.type = metric_type
+        self.labels = labels
+        self.unit = labels.get("unit", "")
+        self.raw = RingBuffer(capacity, 2)
+        self.rollups = {
+            label: RollupSeries(resolution, buckets)
+            for label, (resolution, buckets) in ROLLUP_RESOLUTIONS.items()
+        }
+        # Counters only ever grow, so deviation from the window mean means nothing
+        self.detector = StreamingDetector(
+            z_threshold=None if metric_type == MetricType.COUNTER else ANOMALY_Z_THRESHOLD
+        )
+
+    def __len__(self) -> int:
+        return self.raw.size
+
+    def append(self, timestamp: float, value: float) -> Optional[Dict[str, Any]]:
+        """Store a sample; returns the detector's anomaly record, if any"""
+        self.raw.append((timestamp, value))
+        for rollup in self.rollups.values():
+            rollup.add(timestamp, value)
+        return self.detector.update(timestamp, value)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        last = self.raw.last()
+        return float(last[0]) if last is not None else None
+
+    def _resolution_for(self, start: float, now: float) -> str:
+        window = now - start
+        oldest = self.raw.first()
+        raw_covers = self.raw.size < self.raw.capacity or oldest[0] <= start
+        if window <= RAW_QUERY_MAX_SECONDS and raw_covers:
+            return "raw"
+        for label, rollup in self.rollups.items():
+            if window / rollup.resolution <= MAX_ROLLUP_POINTS:
+                return label
+        return list(self.rollups)[-1]
+
+    def summary(self, start: float, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Window statistics since ``start``; None when the window is empty"""
+        resolution = self._resolution_for(start, now if now is not None else time.time())
+        if resolution == "raw":
+            rows = self.raw.since(start)
+            if not len(rows):
+                return None
+            values = rows[:, 1]
+            count = len(values)
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stats = {
+                "data_points": count,
+                "min_value": float(values.min()),
+                "max_value": float(values.max()),
+                "avg_value": float(values.mean()),
+                "std_dev": float(values.std(ddof=1)) if count > 1 else 0.0
+            }
+        else:
+            # Chan et al. combination of per-bucket means and M2
+            buckets = self.rollups[resolution].since(start)
+            if not len(buckets):
+                return None
+            counts, means = buckets[:, RollupSeries.COUNT], buckets[:, RollupSeries.MEAN]
+            count = int(counts.sum())
+            mean = float((counts * means).sum() / count)
+            m2 = buckets[:, RollupSeries.M2].sum() + (counts * (means - mean) ** 2).sum()
+            # Percentiles of bucket means weighted by their sample counts
+            p50, p95, p99 = _weighted_percentiles(means, counts, [50, 95, 99])
+            stats = {
+                "data_points": count,
+                "min_value": float(buckets[:, RollupSeries.MIN].min()),
+                "max_value": float(buckets[:, RollupSeries.MAX].max()),
+                "avg_value": mean,
+                "std_dev": float(np.sqrt(m2 / (count - 1))) if count > 1 else 0.0
+            }
+
+        last = self.raw.last()
+        stats.update({
+            "current_value": float(last[1]),
+            "median_value": float(p50),
+            "p95_value": float(p95),
+            "p99_value": float(p99),
+            "resolution": resolution,
+            "last_updated": datetime.fromtimestamp(last[0], timezone.utc).isoformat()
+        })
+        return stats
+
+class MetricStore(dict):
+    """Metric name -> MetricSeries"""
+
+    def __init__(self, capacity: int = 4096):
+        super().__init__()
+        self.capacity = capacity
+
+    def add(self, name: str, metric_type: MetricType, value: float, labels: Dict[str, str],
+            timestamp: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        series = self.get(name)
+        if series is None:
+            series = self[name] = MetricSeries(name, metric_type, labels, self.capacity)
+        return series.append(timestamp if timestamp is not None else time.time(), value)
+
+# Service discovery and scraping
+SERVICES_CONFIG_PATH = os.getenv(
+    "MONITORING_SERVICES_CONFIG",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "config", "services.json")
+)
+
+@dataclass
+class ScrapeTarget:
+    """A service health endpoint polled by the scrape scheduler"""
+    name: str
+    url: str
+    interval: float = 30.0  # seconds
+    timeout: float = 5.0    # seconds
+
+def load_scrape_targets(config_path: str = SERVICES_CONFIG_PATH, interval: float = 30.0,
+                        timeout: float = 5.0, exclude: Tuple[str, ...] = ("monitoring-analytics",)) -> List[ScrapeTarget]:
+    """Build scrape targets from the platform services config
+
+    Each entry under ``services`` needs a ``port``; ``health_endpoint``,
+    ``scrape_interval`` and ``scrape_timeout`` are optional per service.
+    """
+    try:
+        with open(config_path) as f:
+            services = json.load(f).get("services", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"No scrape targets loaded from {config_path}: {e}")
+        return []
+    
+    host = os.getenv("MONITORING_TARGET_HOST", "localhost")
+    targets = []
+    for name, spec in services.items():
+        if name in exclude or "port" not in spec:
+            continue
+        targets.append(ScrapeTarget(
+            name=name,
+            url=f"http://{host}:{spec['port']}{spec.get('health_endpoint', '/health')}",
+            interval=float(spec.get("scrape_interval", interval)),
+            timeout=float(spec.get("scrape_timeout", timeout))
+        ))
+    return targets
+
+class ScrapeScheduler:
+    """Concurrent health checks over one pooled HTTP session
+
+    Every target is polled by its own task on a jittered interval and
+    bounded by its own timeout, so a slow or unreachable service only
+    delays its own results.
+    """
+    
+    def __init__(self, targets: List[ScrapeTarget],
+                 handler: Callable[[ScrapeTarget, ServiceHealth], Awaitable[None]],
+                 jitter: float = 0.1, max_connections: int = 32):
+        self.targets: Dict[str, ScrapeTarget] = {target.name: target for target in targets}
+        self.handler = handler
+        self.jitter = jitter
+        self.max_connections = max_connections
+        self.stats = {"scrapes": 0, "failures": 0, "timeouts": 0, "sessions_opened": 0}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections,
+                                               keepalive_timeout=60)
+            )
+            self.stats["sessions_opened"] += 1
+        return self._session
+    
+    async def check(self, target: ScrapeTarget) -> ServiceHealth:
+        """Probe one target's health endpoint"""
+        self.stats["scrapes"] += 1
+        start_time = time.perf_counter()
+        try:
+            timeout = aiohttp.ClientTimeout(total=target.timeout)
+            async with self._get_session().get(target.url, timeout=timeout) as response:
+                await response.read()
+                response_time = (time.perf_counter() - start_time) * 1000
+                healthy = response.status == 200
+                
+                return ServiceHealth(
+                    service_name=target.name,
+                    status=ServiceStatus.HEALTHY if healthy else ServiceStatus.DEGRADED,
+                    response_time_ms=response_time,
+                    error_rate=0.0 if healthy else 10.0,
+                    throughput=10.0,  # Simulated
+                    last_check=datetime.now(timezone.utc),
+                    uptime_percentage=99.5,  # Simulated
+                    dependencies=[]
+                )
+        
+        except Exception as e:
+            self.stats["failures"] += 1
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["timeouts"] += 1
+                logger.warning(f"Health check for {target.name} timed out after {target.timeout}s")
+            else:
+                logger.error(f"Health check failed for {target.name}: {e}")
+            return ServiceHealth(
+                service_name=target.name,
+                status=ServiceStatus.UNHEALTHY,
+                response_time_ms=0.0,
+                error_rate=100.0,
+                throughput=0.0,
+                last_check=datetime.now(timezone.utc),
+                uptime_percentage=0.0,
+                dependencies=[]
+            )
+    
+    async def scrape(self, target: ScrapeTarget):
+        health = await self.check(target)
+        try:
+            await self.handler(target, health)
+        except Exception as e:
+            logger.error(f"Error recording metrics for service {target.name}: {e}")
+    
+    async def scrape_all(self):
+        """Scrape every target once, concurrently"""
+        await asyncio.gather(*(self.scrape(target) for target in self.targets.values()))
+    
+    async def _run_target(self, target: ScrapeTarget):
+        loop = asyncio.get_running_loop()
+        # Spread the first scrapes so targets sharing an interval do not fire together
+        next_run = loop.time() + random.uniform(0, target.interval * self.jitter)
+        while True:
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+            next_run += target.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            await self.scrape(target)
+    
+    def start(self):
+        """Start one polling task per target (needs a running event loop)"""
+        for name, target in self.targets.items():
+            task = self._tasks.get(name)
+            if task is None or task.done():
+                self._tasks[name] = asyncio.create_task(self._run_target(target))
+    
+    async def close(self):
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
 # Application Performance Monitoring (APM)
 class APMCollector:
     """Collect and analyze application performance metrics"""
     
-    def __init__(self):
-        self.metrics: Dict[str, List[Metric]] = defaultdict(list)
+    def __init__(self, metric_capacity: int = 4096, targets: Optional[List[ScrapeTarget]] = None):
+        self.metrics = MetricStore(capacity=metric_capacity)
         self.service_health: Dict[str, ServiceHealth] = {}
         self.performance_history: Dict[str, List[PerformanceMetrics]] = defaultdict(list)
         self.collection_interval = 30  # seconds
         self.retention_hours = 24
-        self.services = [
-            "workflow-state-service",
-            "ai-task-delegation",
-            "robot-abstraction-protocol",
-            "edge-computing",
-            "security-compliance"
-        ]
+        if targets is None:
+            targets = load_scrape_targets(interval=self.collection_interval)
+        self.scraper = ScrapeScheduler(targets, self._record_service_health)
+        self.services = list(self.scraper.targets)
+        # Called as listener(metric_name, value, timestamp) for every sample
+        self.sample_listeners: List[Callable[[str, float, float], None]] = []
+        # Called as listener(metric_name, anomaly) when a detector flags a sample
+        self.anomaly_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
         
-        # Start background collection
-        asyncio.create_task(self._start_collection_loop())
+        # Prime psutil so later cpu_percent(interval=None) calls measure since the previous sample
+        psutil.cpu_percent(interval=None)
+        self._collection_task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start background collection (needs a running event loop)"""
+        if self._collection_task is None or self._collection_task.done():
+            self._collection_task = asyncio.create_task(self._start_collection_loop())
+        self.scraper.start()
+    
+    async def close(self):
+        if self._collection_task is not None:
+            self._collection_task.cancel()
+            await asyncio.gather(self._collection_task, return_exceptions=True)
+            self._collection_task = None
+        await self.scraper.close()
     
     async def _start_collection_loop(self):
-        """Start the metrics collection loop"""
+        """Start the system metrics loop; services are scraped by the scheduler"""
         while True:
             try:
                 await self._collect_system_metrics()
-                await self._collect_service_metrics()
                 await self._cleanup_old_metrics()
                 await asyncio.sleep(self.collection_interval)
             except Exception as e:
                 logger.error(f"Error in metrics collection: {e}")
                 await asyncio.sleep(self.collection_interval)
     
+    def _sample_system(self) -> Dict[str, Any]:
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory": psutil.virtual_memory(),
+            "disk": psutil.disk_usage('/'),
+            "network": psutil.net_io_counters()
+        }
+    
     async def _collect_system_metrics(self):
         """Collect system-level metrics"""
         try:
+            # psutil reads /proc synchronously; keep it off the event loop
+            sample = await asyncio.to_thread(self._sample_system)
+            
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self._add_metric("system.cpu.usage", MetricType.GAUGE, cpu_percent, {"unit": "percent"})
+            self._add_metric("system.cpu.usage", MetricType.GAUGE, sample["cpu_percent"], {"unit": "percent"})
             
             # Memory metrics
-            memory = psutil.virtual_memory()
+            memory = sample["memory"]
             self._add_metric("system.memory.usage", MetricType.GAUGE, memory.percent, {"unit": "percent"})
             self._add_metric("system.memory.available", MetricType.GAUGE, memory.available / (1024**3), {"unit": "GB"})
             
             # Disk metrics
-            disk = psutil.disk_usage('/')
+            disk = sample["disk"]
             disk_percent = (disk.used / disk.total) * 100
             self._add_metric("system.disk.usage", MetricType.GAUGE, disk_percent, {"unit": "percent"})
             
             # Network metrics
-            network = psutil.net_io_counters()
+            network = sample["network"]
             self._add_metric("system.network.bytes_sent", MetricType.COUNTER, network.bytes_sent, {"unit": "bytes"})
             self._add_metric("system.network.bytes_recv", MetricType.COUNTER, network.bytes_recv, {"unit": "bytes"})
             
@@ -169,86 +672,41 @@ class APMCollector:
             logger.error(f"Error collecting system metrics: {e}")
     
     async def _collect_service_metrics(self):
-        """Collect service-specific metrics"""
-        for service in self.services:
-            try:
-                health = await self._check_service_health(service)
-                self.service_health[service] = health
-                
-                # Convert health to metrics
-                self._add_metric(f"service.{service}.response_time", MetricType.GAUGE, 
-                               health.response_time_ms, {"service": service, "unit": "ms"})
-                self._add_metric(f"service.{service}.error_rate", MetricType.GAUGE, 
-                               health.error_rate, {"service": service, "unit": "percent"})
-                self._add_metric(f"service.{service}.throughput", MetricType.GAUGE, 
-                               health.throughput, {"service": service, "unit": "rps"})
-                
-                # Collect performance metrics
-                perf_metrics = await self._collect_service_performance(service)
-                if perf_metrics:
-                    self.performance_history[service].append(perf_metrics)
-                    
-                    # Keep only recent history
-                    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
-                    self.performance_history[service] = [
-                        m for m in self.performance_history[service] 
-                        if m.timestamp >= cutoff_time
-                    ]
-                
-            except Exception as e:
-                logger.error(f"Error collecting metrics for service {service}: {e}")
+        """Scrape every service once, concurrently"""
+        await self.scraper.scrape_all()
     
-    async def _check_service_health(self, service: str) -> ServiceHealth:
-        """Check health of a specific service"""
-        service_ports = {
-            "workflow-state-service": 8003,
-            "robot-abstraction-protocol": 8004,
-            "ai-task-delegation": 8005,
-            "edge-computing": 8006,
-            "security-compliance": 8007,
-            "monitoring-analytics": 8008
-        }
+    async def _record_service_health(self, target: ScrapeTarget, health: ServiceHealth):
+        """Store a scrape result as service metrics"""
+        service = target.name
+        self.service_health[service] = health
         
-        port = service_ports.get(service, 8000)
+        # Convert health to metrics
+        self._add_metric(f"service.{service}.response_time", MetricType.GAUGE, 
+                       health.response_time_ms, {"service": service, "unit": "ms"})
+        self._add_metric(f"service.{service}.error_rate", MetricType.GAUGE, 
+                       health.error_rate, {"service": service, "unit": "percent"})
+        self._add_metric(f"service.{service}.throughput", MetricType.GAUGE, 
+                       health.throughput, {"service": service, "unit": "rps"})
         
-        try:
-            import aiohttp
-            start_time = time.perf_counter()
+        # Collect performance metrics
+        perf_metrics = await self._collect_service_performance(service)
+        if perf_metrics:
+            self.performance_history[service].append(perf_metrics)
+            timestamp = perf_metrics.timestamp.timestamp()
+            for field_name in PERFORMANCE_FIELDS:
+                self._add_metric(f"service.{service}.perf.{field_name}", MetricType.GAUGE,
+                                 getattr(perf_metrics, field_name), {"service": service}, timestamp)
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5)) as session:
-                async with session.get(f"http://localhost:{port}/health") as response:
-                    response_time = (time.perf_counter() - start_time) * 1000
-                    
-                    if response.status == 200:
-                        status = ServiceStatus.HEALTHY
-                        error_rate = 0.0
-                    else:
-                        status = ServiceStatus.DEGRADED
-                        error_rate = 10.0
-                    
-                    return ServiceHealth(
-                        service_name=service,
-                        status=status,
-                        response_time_ms=response_time,
-                        error_rate=error_rate,
-                        throughput=10.0,  # Simulated
-                        last_check=datetime.now(timezone.utc),
-                        uptime_percentage=99.5,  # Simulated
-                        dependencies=[]
-                    )
-                    
-        except Exception as e:
-            logger.error(f"Health check failed for {service}: {e}")
-            return ServiceHealth(
-                service_name=service,
-                status=ServiceStatus.UNHEALTHY,
-                response_time_ms=0.0,
-                error_rate=100.0,
-                throughput=0.0,
-                last_check=datetime.now(timezone.utc),
-                uptime_percentage=0.0,
-                dependencies=[]
-            )
+            # Keep only recent history
+            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+            self.performance_history[service] = [
+                m for m in self.performance_history[service] 
+                if m.timestamp >= cutoff_time
+            ]
+    
+    async def _check_service_health(self, service: str) -> ServiceHealth:
+        """Check health of a specific service"""
+        return await self.scraper.check(self.scraper.targets[service])
     
     async def _collect_service_performance(self, service: str) -> Optional[PerformanceMetrics]:
         """Collect detailed performance metrics for a service"""
@@ -277,61 +735,51 @@ class APMCollector:
             logger.error(f"Error collecting performance metrics for {service}: {e}")
             return None
     
-    def _add_metric(self, name: str, metric_type: MetricType, value: float, labels: Dict[str, str]):
-        """Add a metric to the collection"""
-        metric = Metric(
-            name=name,
-            type=metric_type,
-            value=value,
-            timestamp=datetime.now(timezone.utc),
-            labels=labels,
-            unit=labels.get("unit", "")
-        )
-        
-        self.metrics[name].append(metric)
-        
-        # Keep only recent metrics
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
-        self.metrics[name] = [m for m in self.metrics[name] if m.timestamp >= cutoff_time]
+    def _add_metric(self, name: str, metric_type: MetricType, value: float, labels: Dict[str, str],
+                    timestamp: Optional[float] = None):
+        """Add a metric to the collection (O(1): ring buffer, rollup and detector updates)"""
+        if timestamp is None:
+            timestamp = time.time()
+        anomaly = self.metrics.add(name, metric_type, value, labels, timestamp)
+        for listener in self.sample_listeners:
+            try:
+                listener(name, value, timestamp)
+            except Exception as e:
+                logger.error(f"Sample listener failed for {name}: {e}")
+        if anomaly is not None:
+            for listener in self.anomaly_listeners:
+                try:
+                    listener(name, anomaly)
+                except Exception as e:
+                    logger.error(f"Anomaly listener failed for {name}: {e}")
     
     async def _cleanup_old_metrics(self):
-        """Clean up old metrics to prevent memory issues"""
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+        """Drop series that stopped reporting; ring buffers bound everything else"""
+        cutoff_time = time.time() - self.retention_hours * 3600
         
         for metric_name in list(self.metrics.keys()):
-            self.metrics[metric_name] = [
-                m for m in self.metrics[metric_name] 
-                if m.timestamp >= cutoff_time
-            ]
-            
-            # Remove empty metric lists
-            if not self.metrics[metric_name]:
+            if self.metrics[metric_name].last_timestamp < cutoff_time:
                 del self.metrics[metric_name]
     
-    def get_metric_summary(self, metric_name: str, time_range_hours: int = 1) -> Dict[str, Any]:
-        """Get summary statistics for a metric"""
+    def get_metric_summary(self, metric_name: str, time_range_hours: float = 1) -> Dict[str, Any]:
+        """Get summary statistics for a metric
+
+        Windows up to an hour are computed from raw samples; longer windows
+        read the 1m/5m/1h rollups, so percentiles there are approximate.
+        """
         if metric_name not in self.metrics:
             return {"error": "Metric not found"}
         
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
-        recent_metrics = [m for m in self.metrics[metric_name] if m.timestamp >= cutoff_time]
+        now = time.time()
+        stats = self.metrics[metric_name].summary(now - time_range_hours * 3600, now)
         
-        if not recent_metrics:
+        if stats is None:
             return {"error": "No recent data"}
         
-        values = [m.value for m in recent_metrics]
-        
         return {
             "metric_name": metric_name,
             "time_range_hours": time_range_hours,
-            "data_points": len(values),
-            "current_value": values[-1] if values else 0,
-            "min_value": min(values),
-            "max_value": max(values),
-            "avg_value": statistics.mean(values),
-            "median_value": statistics.median(values),
-            "std_dev": statistics.stdev(values) if len(values) > 1 else 0,
-            "last_updated": recent_metrics[-1].timestamp.isoformat() if recent_metrics else None
+            **stats
         }
     
     def get_service_overview(self) -> Dict[str, Any]:
@@ -356,18 +804,93 @@ class APMCollector:
         
         return overview
 
+# Alert rule index
+OPERATORS = {">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le}
+
+class CompiledRule:
+    """An alert rule prepared for per-sample evaluation
+
+    ``metric_pattern`` wildcards match one dot-separated segment, so
+    ``service.*.error_rate`` matches ``service.billing.error_rate`` but not
+    ``service.billing.perf.error_rate``.
+    """
+
+    def __init__(self, rule: Dict[str, Any]):
+        self.rule = rule
+        self.name = rule["name"]
+        self.metric = rule.get("metric")
+        pattern = rule.get("metric_pattern")
+        self.pattern = re.compile("[^.]+".join(map(re.escape, pattern.split("*")))) if pattern else None
+        self.compare = OPERATORS[rule["operator"]]
+        self.threshold = float(rule["threshold"])
+        self.for_seconds = float(rule.get("duration_minutes", 0)) * 60
+
+    def matches(self, metric_name: str) -> bool:
+        if self.metric is not None:
+            return metric_name == self.metric
+        return self.pattern is not None and self.pattern.fullmatch(metric_name) is not None
+
+class RuleIndex:
+    """Alert rules dispatched by metric name
+
+    Exact-metric rules are found with one dict lookup; pattern rules are
+    matched the first time a metric name is seen and the result cached.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self._exact: Dict[str, List[CompiledRule]] = defaultdict(list)
+        self._patterns: List[CompiledRule] = []
+        for rule in self.rules:
+            if rule.metric is not None:
+                self._exact[rule.metric].append(rule)
+            elif rule.pattern is not None:
+                self._patterns.append(rule)
+        self._resolved: Dict[str, Tuple[CompiledRule, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def rules_for(self, metric_name: str) -> Tuple[CompiledRule, ...]:
+        rules = self._resolved.get(metric_name)
+        if rules is None:
+            rules = tuple(self._exact.get(metric_name, ())) + tuple(
+                rule for rule in self._patterns if rule.matches(metric_name)
+            )
+            self._resolved[metric_name] = rules
+        return rules
+
 # Alert Manager
 class AlertManager:
-    """Manage alerts and notifications"""
+    """Manage alerts and notifications
+
+    Rules are evaluated as samples arrive: the collector calls on_sample for
+    every sample and only the rules indexed under that metric are checked.
+    A rule fires once its condition has held for ``duration_minutes``, counted
+    afresh after the previous alert is resolved; one alert stays open per
+    (rule, metric) and alerts are grouped per rule
+    (or per rule and service with ``"group_by": "service"``) so only the
+    first alert of a group sends a notification.
+    """
     
-    def __init__(self, apm_collector: APMCollector):
+    def __init__(self, apm_collector: APMCollector, latency_window: int = 10000):
         self.apm_collector = apm_collector
         self.alerts: List[Alert] = []
-        self.alert_rules = self._define_alert_rules()
         self.notification_channels = []
-        
-        # Start alert evaluation loop
-        asyncio.create_task(self._start_alert_evaluation())
+        self.set_rules(self._define_alert_rules())
+        self._active: Dict[Tuple[str, str], Alert] = {}
+        self._groups: Dict[Tuple[str, ...], List[Alert]] = {}
+        self._notification_tasks: set = set()
+        self.evaluation_stats = {"samples": 0, "rule_checks": 0, "alerts_fired": 0}
+        self.evaluation_latencies_ns: deque = deque(maxlen=latency_window)
+        apm_collector.sample_listeners.append(self.on_sample)
+        apm_collector.anomaly_listeners.append(self.on_anomaly)
+    
+    def set_rules(self, rules: List[Dict[str, Any]]):
+        """Replace the alert rules and rebuild the dispatch index"""
+        self.alert_rules = rules
+        self.rule_index = RuleIndex(rules)
+        self._pending: Dict[Tuple[str, str], float] = {}  # (rule, metric) -> condition true since
     
     def _define_alert_rules(self) -> List[Dict[str, Any]]:
         """Define alert rules"""
@@ -406,89 +929,43 @@ class AlertManager:
             }
         ]
     
-    async def _start_alert_evaluation(self):
-        """Start the alert evaluation loop"""
-        while True:
-            try:
-                await self._evaluate_alerts()
-                await asyncio.sleep(60)  # Check every minute
-            except Exception as e:
-                logger.error(f"Error in alert evaluation: {e}")
-                await asyncio.sleep(60)
-    
-    async def _evaluate_alerts(self):
-        """Evaluate all alert rules"""
-        for rule in self.alert_rules:
-            try:
-                await self._evaluate_rule(rule)
-            except Exception as e:
-                logger.error(f"Error evaluating rule {rule['name']}: {e}")
-    
-    async def _evaluate_rule(self, rule: Dict[str, Any]):
-        """Evaluate a specific alert rule"""
-        metric_name = rule.get("metric")
-        metric_pattern = rule.get("metric_pattern")
-        
-        metrics_to_check = []
-        
-        if metric_name:
-            metrics_to_check = [metric_name]
-        elif metric_pattern:
-            # Simple pattern matching (in production, use proper regex)
-            pattern = metric_pattern.replace("*", "")
-            metrics_to_check = [
-                name for name in self.apm_collector.metrics.keys()
-                if pattern in name
-            ]
-        
-        for metric_name in metrics_to_check:
-            await self._check_metric_threshold(metric_name, rule)
-    
-    async def _check_metric_threshold(self, metric_name: str, rule: Dict[str, Any]):
-        """Check if metric exceeds threshold"""
-        summary = self.apm_collector.get_metric_summary(metric_name, 0.1)  # Last 6 minutes
-        
-        if "error" in summary:
-            return
+    def on_sample(self, metric_name: str, value: float, timestamp: float):
+        """Check the rules that reference ``metric_name`` against a new sample"""
+        start_ns = time.perf_counter_ns()
+        rules = self.rule_index.rules_for(metric_name)
+        for rule in rules:
+            key = (rule.name, metric_name)
+            if rule.compare(value, rule.threshold):
+                active = self._active.get(key)
+                if active is not None and active.resolved_at is None:
+                    continue  # the for duration starts over once the alert is resolved
+                since = self._pending.setdefault(key, timestamp)
+                if timestamp - since >= rule.for_seconds:
+                    del self._pending[key]
+                    self._open_alert(metric_name, rule.rule, value)
+            elif key in self._pending:
+                del self._pending[key]
         
-        current_value = summary["current_value"]
-        threshold = rule["threshold"]
-        operator = rule["operator"]
-        
-        threshold_exceeded = False
-        if operator == ">":
-            threshold_exceeded = current_value > threshold
-        elif operator == "<":
-            threshold_exceeded = current_value < threshold
-        elif operator == ">=":
-            threshold_exceeded = current_value >= threshold
-        elif operator == "<=":
-            threshold_exceeded = current_value <= threshold
-        
-        if threshold_exceeded:
-            await self._trigger_alert(metric_name, rule, current_value)
+        stats = self.evaluation_stats
+        stats["samples"] += 1
+        stats["rule_checks"] += len(rules)
+        self.evaluation_latencies_ns.append(time.perf_counter_ns() - start_ns)
     
-    async def _trigger_alert(self, metric_name: str, rule: Dict[str, Any], current_value: float):
-        """Trigger an alert"""
-        # Check if alert already exists
-        existing_alert = None
-        for alert in self.alerts:
-            if (alert.metric == metric_name and 
-                alert.name == rule["name"] and 
-                alert.resolved_at is None):
-                existing_alert = alert
-                break
+    def _open_alert(self, metric_name: str, rule: Dict[str, Any], current_value: float,
+                    message: Optional[str] = None) -> Optional[Alert]:
+        """Record a new alert; None if the same rule is already active for the metric"""
+        key = (rule["name"], metric_name)
+        existing = self._active.get(key)
+        if existing is not None and existing.resolved_at is None:
+            return None  # Alert already active
         
-        if existing_alert:
-            return  # Alert already active
-        
-        # Create new alert
+        service = metric_name.split(".")[1] if "." in metric_name else "system"
         alert = Alert(
             id=str(uuid.uuid4()),
             name=rule["name"],
             severity=AlertSeverity(rule["severity"]),
-            message=f"{rule['name']}: {metric_name} is {current_value:.2f}, threshold is {rule['threshold']}",
-            service=metric_name.split(".")[1] if "." in metric_name else "system",
+            message=message or f"{rule['name']}: {metric_name} is {current_value:.2f}, threshold is {rule['threshold']}",
+            service=service,
             metric=metric_name,
             threshold=rule["threshold"],
             current_value=current_value,
@@ -496,10 +973,42 @@ class AlertManager:
         )
         
         self.alerts.append(alert)
-        logger.warning(f"Alert triggered: {alert.message}")
+        self._active[key] = alert
+        self.evaluation_stats["alerts_fired"] += 1
+        
+        group_key = (rule["name"], service) if rule.get("group_by") == "service" else (rule["name"],)
+        group = [member for member in self._groups.get(group_key, []) if member.resolved_at is None]
+        group.append(alert)
+        self._groups[group_key] = group
         
-        # Send notifications
-        await self._send_notifications(alert)
+        if len(group) == 1:
+            logger.warning(f"Alert triggered: {alert.message}")
+            self._notify(alert)
+        else:
+            logger.info(f"Alert grouped with {len(group) - 1} active '{rule['name']}' alerts: {alert.message}")
+        return alert
+    
+    def _notify(self, alert: Alert):
+        try:
+            task = asyncio.get_running_loop().create_task(self._send_notifications(alert))
+        except RuntimeError:
+            return  # recorded outside the event loop; the alert is still listed
+        self._notification_tasks.add(task)
+        task.add_done_callback(self._notification_tasks.discard)
+    
+    def on_anomaly(self, metric_name: str, anomaly: Dict[str, Any]):
+        """Raise an alert for a sample flagged by a streaming detector"""
+        rule = {
+            "name": "Metric Anomaly",
+            "severity": AlertSeverity.HIGH if abs(anomaly["z_score"]) >= 2 * ANOMALY_Z_THRESHOLD
+                        else AlertSeverity.MEDIUM,
+            "threshold": anomaly["threshold"],
+            "group_by": "service"
+        }
+        message = (f"Metric Anomaly: {metric_name} is {anomaly['value']:.2f}, "
+                   f"{abs(anomaly['z_score']):.1f} standard deviations from its rolling mean "
+                   f"{anomaly['expected']:.2f}")
+        self._open_alert(metric_name, rule, anomaly["value"], message)
     
     async def _send_notifications(self, alert: Alert):
         """Send alert notifications"""
@@ -510,6 +1019,33 @@ class AlertManager:
         """Get all active alerts"""
         return [alert for alert in self.alerts if alert.resolved_at is None]
     
+    def get_alert_groups(self) -> List[Dict[str, Any]]:
+        """Active alerts grouped as they were notified"""
+        groups = []
+        for group_key, members in self._groups.items():
+            active = [alert for alert in members if alert.resolved_at is None]
+            if active:
+                groups.append({
+                    "rule": group_key[0],
+                    "service": group_key[1] if len(group_key) > 1 else None,
+                    "severity": max((alert.severity for alert in active), key=list(AlertSeverity).index).value,
+                    "count": len(active),
+                    "metrics": [alert.metric for alert in active],
+                    "first_triggered": active[0].triggered_at.isoformat()
+                })
+        return groups
+    
+    def get_evaluation_stats(self) -> Dict[str, Any]:
+        """Rule evaluation counters and per-sample latency percentiles"""
+        latencies = np.fromiter(self.evaluation_latencies_ns, dtype=np.float64)
+        p50, p99 = np.percentile(latencies, [50, 99]) / 1000 if len(latencies) else (0.0, 0.0)
+        return {
+            **self.evaluation_stats,
+            "rules": len(self.rule_index),
+            "pending": len(self._pending),
+            "latency_us": {"p50": float(p50), "p99": float(p99), "samples": len(latencies)}
+        }
+    
     def get_alert_summary(self) -> Dict[str, Any]:
         """Get alert summary"""
         active_alerts = self.get_active_alerts()
@@ -522,6 +1058,8 @@ class AlertManager:
             "total_active_alerts": len(active_alerts),
             "severity_breakdown": severity_counts,
             "recent_alerts": [asdict(alert) for alert in self.alerts[-10:]],  # Last 10 alerts
+            "alert_groups": self.get_alert_groups(),
+            "evaluation": self.get_evaluation_stats(),
             "alert_rate_last_hour": len([
                 alert for alert in self.alerts
                 if (datetime.now(timezone.utc) - alert.triggered_at).total_seconds() < 3600
@@ -540,130 +1078,81 @@ class AnalyticsEngine:
 
     async def analyze_performance_trends(self, service: str, metric: str,
                                        time_range_hours: int = 24) -> Dict[str, Any]:
-        """Analyze performance trends for a service metric"""
-        try:
-            # Get historical data
-            if service not in self.apm_collector.performance_history:
-                return {"error": "No performance data available"}
+        """Analyze performance trends for a service metric
 
-            history = self.apm_collector.performance_history[service]
-            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
-            recent_history = [h for h in history if h.timestamp >= cutoff_time]
+        Window statistics come from the metric store; trend, anomalies and
+        predictions read the series' streaming detector instead of
+        re-deriving them from the full history.
+        """
+        try:
+            series = self.apm_collector.metrics.get(f"service.{service}.perf.{metric}")
+            if series is None:
+                if service not in self.apm_collector.performance_history:
+                    return {"error": "No performance data available"}
+                return {"error": f"Metric {metric} not found"}
 
-            if len(recent_history) < 2:
+            start = time.time() - time_range_hours * 3600
+            stats = series.summary(start)
+            if stats is None or stats["data_points"] < 2:
                 return {"error": "Insufficient data for trend analysis"}
 
-            # Extract metric values
-            values = []
-            timestamps = []
-
-            for record in recent_history:
-                if hasattr(record, metric):
-                    values.append(getattr(record, metric))
-                    timestamps.append(record.timestamp.timestamp())
-
-            if not values:
-                return {"error": f"Metric {metric} not found"}
-
-            # Calculate trend
-            trend_slope = self._calculate_trend_slope(timestamps, values)
+            detector = series.detector
+            trend_slope = detector.slope
             trend_direction = "increasing" if trend_slope > 0.1 else "decreasing" if trend_slope < -0.1 else "stable"
 
-            # Calculate statistics
-            avg_value = statistics.mean(values)
-            std_dev = statistics.stdev(values) if len(values) > 1 else 0
-
-            # Detect anomalies
-            anomalies = self._detect_anomalies(values, avg_value, std_dev)
+            avg_value = stats["avg_value"]
+            std_dev = stats["std_dev"]
+            anomalies = detector.anomalies_since(start)
 
             return {
                 "service": service,
                 "metric": metric,
                 "time_range_hours": time_range_hours,
-                "data_points": len(values),
+                "data_points": stats["data_points"],
                 "trend": {
                     "direction": trend_direction,
                     "slope": trend_slope,
-                    "confidence": min(len(values) / 100, 1.0)  # More data = higher confidence
+                    "window_samples": detector.count,
+                    "confidence": min(stats["data_points"] / 100, 1.0)  # More data = higher confidence
                 },
                 "statistics": {
-                    "current_value": values[-1],
+                    "current_value": stats["current_value"],
                     "average": avg_value,
-                    "min": min(values),
-                    "max": max(values),
+                    "min": stats["min_value"],
+                    "max": stats["max_value"],
                     "std_deviation": std_dev,
                     "coefficient_of_variation": std_dev / avg_value if avg_value > 0 else 0
                 },
                 "anomalies": {
                     "count": len(anomalies),
-                    "anomaly_rate": len(anomalies) / len(values),
+                    "anomaly_rate": len(anomalies) / stats["data_points"],
                     "recent_anomalies": anomalies[-5:]  # Last 5 anomalies
                 },
-                "predictions": await self._predict_future_values(service, metric, values, timestamps)
+                "predictions": await self._predict_future_values(service, metric, detector)
             }
 
         except Exception as e:
             logger.error(f"Error in trend analysis: {e}")
             return {"error": str(e)}
 
-    def _calculate_trend_slope(self, timestamps: List[float], values: List[float]) -> float:
-        """Calculate trend slope using linear regression"""
-        n = len(timestamps)
-        if n < 2:
-            return 0.0
-
-        # Simple linear regression
-        sum_x = sum(timestamps)
-        sum_y = sum(values)
-        sum_xy = sum(x * y for x, y in zip(timestamps, values))
-        sum_x2 = sum(x * x for x in timestamps)
-
-        denominator = n * sum_x2 - sum_x * sum_x
-        if denominator == 0:
-            return 0.0
-
-        slope = (n * sum_xy - sum_x * sum_y) / denominator
-        return slope
-
-    def _detect_anomalies(self, values: List[float], mean: float, std_dev: float) -> List[Dict[str, Any]]:
-        """Detect anomalies using statistical methods"""
-        anomalies = []
-        threshold = 2.0  # 2 standard deviations
-
-        for i, value in enumerate(values):
-            z_score = abs(value - mean) / std_dev if std_dev > 0 else 0
-
-            if z_score > threshold:
-                anomalies.append({
-                    "index": i,
-                    "value": value,
-                    "z_score": z_score,
-                    "deviation": value - mean
-                })
-
-        return anomalies
-
     async def _predict_future_values(self, service: str, metric: str,
-                                   values: List[float], timestamps: List[float]) -> Dict[str, Any]:
-        """Predict future values using simple forecasting"""
+                                   detector: StreamingDetector) -> Dict[str, Any]:
+        """Predict future values from the detector's EWMA level and rolling slope"""
         try:
-            if len(values) < 5:
+            if detector.count < 5:
                 return {"error": "Insufficient data for prediction"}
 
-            # Simple moving average prediction
-            window_size = min(5, len(values))
-            recent_values = values[-window_size:]
-            predicted_value = statistics.mean(recent_values)
+            predicted_value = detector.ewma
 
             # Calculate prediction confidence based on recent stability
-            recent_std = statistics.stdev(recent_values) if len(recent_values) > 1 else 0
+            recent_std = detector.std
             confidence = max(0.1, 1.0 - (recent_std / predicted_value)) if predicted_value > 0 else 0.1
 
             # Predict next few time points
+            trend_slope = detector.slope
             predictions = []
             for i in range(1, 6):  # Next 5 time points
                 # Simple trend continuation
-                trend_slope = self._calculate_trend_slope(timestamps[-window_size:], recent_values)
                 predicted = predicted_value + (trend_slope * i * 3600)  # Assuming hourly intervals
 
                 predictions.append({
@@ -673,7 +1162,7 @@ class AnalyticsEngine:
                 })
 
             return {
-                "method": "moving_average_with_trend",
+                "method": "ewma_with_rolling_trend",
                 "base_prediction": predicted_value,
                 "overall_confidence": confidence,
                 "predictions": predictions
@@ -843,7 +1332,8 @@ async def health_check():
             "total_metrics": len(apm_collector.metrics),
             "monitored_services": len(apm_collector.services),
             "active_alerts": len(alert_manager.get_active_alerts()),
-            "collection_interval": apm_collector.collection_interval
+            "collection_interval": apm_collector.collection_interval,
+            "scrape": apm_collector.scraper.stats
         }
     }
 
@@ -852,6 +1342,15 @@ apm_collector = APMCollector()
 alert_manager = AlertManager(apm_collector)
 analytics_engine = AnalyticsEngine(apm_collector)
 
+@app.on_event("startup")
+async def startup_event():
+    """Start metric collection; alert rules are evaluated as samples arrive"""
+    apm_collector.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await apm_collector.close()
+
 @app.get("/api/v1/metrics")
 async def get_all_metrics():
     """Get all available metrics"""
@@ -878,16 +1377,15 @@ async def get_metric_details(metric_name: str, time_range_hours: int = 1):
         if "error" in summary:
             raise HTTPException(status_code=404, detail=summary["error"])
 
-        # Get raw data points
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
+        # Get raw data points still held in the ring buffer
+        series = apm_collector.metrics[metric_name]
         raw_data = [
             {
-                "timestamp": m.timestamp.isoformat(),
-                "value": m.value,
-                "labels": m.labels
+                "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                "value": value,
+                "labels": series.labels
             }
-            for m in apm_collector.metrics.get(metric_name, [])
-            if m.timestamp >= cutoff_time
+            for timestamp, value in series.raw.since(time.time() - time_range_hours * 3600).tolist()
         ]
 
         return {
@@ -13,12 +13,17 @@ sys.path.insert(0, str(project_root))
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
 import uuid
 import asyncio
 import json
+import queue
 import sqlite3
 import logging
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 import random
 
@@ -74,16 +79,94 @@ class TaskAlert(BaseModel):
     created_at: str
 
 # Database management
+UPSERT_MONITOR_SQL = '''
+    INSERT OR REPLACE INTO task_monitors 
+    (delegation_id, task_id, agent_id, task_type, priority, estimated_completion, 
+     start_time, status, current_progress, last_update)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_PROGRESS_SQL = '''
+    INSERT INTO progress_history 
+    (delegation_id, timestamp, progress_percentage, quality_metrics, performance_indicators)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+UPDATE_MONITOR_PROGRESS_SQL = '''
+    UPDATE task_monitors 
+    SET current_progress = ?, last_update = ?
+    WHERE delegation_id = ?
+'''
+
+STOP_MONITOR_SQL = '''
+    UPDATE task_monitors
+    SET status = 'stopped', stopped_at = ?
+    WHERE delegation_id = ?
+'''
+
+INSERT_ANOMALY_SQL = '''
+    INSERT INTO anomalies
+    (delegation_id, anomaly_type, severity, description, detected_at, metrics, suggested_actions)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_ALERT_SQL = '''
+    INSERT INTO alerts
+    (alert_id, delegation_id, alert_type, message, severity, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Writer queue item kinds
+_PROGRESS, _APPEND, _EXECUTE, _FLUSH, _STOP = range(5)
+
 class MonitoringDatabase:
-    def __init__(self):
-        self.db_path = "data/monitoring_service.db"
+    """SQLite store with a dedicated writer thread
+
+    Handlers only enqueue writes. The writer owns one long-lived WAL
+    connection and commits whatever arrived within ``commit_interval``
+    seconds (or ``max_batch_size`` items) as one transaction:
+    progress_history, anomaly and alert rows go in with one executemany per
+    statement, and task_monitors progress updates are coalesced to the
+    latest value per delegation. task_monitors inserts and stops keep their
+    order relative to those updates. Reads see data once its batch has
+    committed; ``flush`` waits for that. A batch whose transaction fails is
+    rolled back and written again row by row, dropping only the rows that
+    fail on their own.
+    """
+    
+    def __init__(self, db_path: str = "data/monitoring_service.db",
+                 commit_interval: float = 0.05, max_batch_size: int = 5000):
+        # Resolved once: the writer thread and readers must agree even if the cwd changes
+        self.db_path = os.path.abspath(db_path)
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.write_stats = {"batches": 0, "rows": 0, "largest_batch": 0, "failed_batches": 0, "dropped_rows": 0}
+        self._queue: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None  # owned by the writer thread
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL: fsync at checkpoints, not every commit
+        return conn
+    
+    @contextmanager
+    def reader(self):
+        """Short-lived read connection; WAL lets it run alongside the writer"""
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
     def _init_database(self):
         """Initialize monitoring database"""
         try:
-            os.makedirs("data", exist_ok=True)
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
             conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
             cursor = conn.cursor()
             
             # Task monitoring table
@@ -146,15 +229,180 @@ class MonitoringDatabase:
                 )
             ''')
             
+            # Per-task history lookups and time-range scans
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_progress_delegation_time "
+                           "ON progress_history (delegation_id, timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_progress_time ON progress_history (timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_anomalies_delegation_time "
+                           "ON anomalies (delegation_id, detected_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_delegation ON alerts (delegation_id)")
+            
             conn.commit()
             conn.close()
             logger.info("Monitoring database initialized successfully")
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
+    
+    # Write queue
+    def _enqueue(self, item: tuple):
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._writer_loop, name="monitoring-db-writer",
+                                                    daemon=True)
+                    self._writer.start()
+        self._queue.put(item)
+    
+    def record_progress(self, delegation_id: str, timestamp: str, progress_percentage: float,
+                        quality_metrics: Dict[str, float], performance_indicators: Dict[str, float]):
+        """Queue a progress_history row and the task_monitors progress update"""
+        self._enqueue((_PROGRESS, (delegation_id, timestamp, progress_percentage,
+                                   json.dumps(quality_metrics), json.dumps(performance_indicators))))
+    
+    def append(self, sql: str, rows: Sequence[tuple]):
+        """Queue inserts into an append-only table (anomalies, alerts); order-free"""
+        self._enqueue((_APPEND, (sql, list(rows))))
+    
+    def execute(self, sql: str, rows: Sequence[tuple]):
+        """Queue task_monitors writes that must apply in order with progress updates"""
+        self._enqueue((_EXECUTE, (sql, list(rows))))
+    
+    def flush(self, timeout: Optional[float] = 30.0) -> bool:
+        """Block until everything queued so far is committed; False on timeout or a dead writer"""
+        writer = self._writer
+        if writer is None:
+            return True
+        if not writer.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+    
+    def close(self):
+        """Commit what is queued and stop the writer"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put((_STOP, None))
+            writer.join()
+    
+    def _writer_loop(self):
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.commit_interval
+                while len(batch) < self.max_batch_size and batch[-1][0] not in (_FLUSH, _STOP):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                try:
+                    stopping = self._commit_batch(batch)
+                except Exception as e:
+                    # Keep the writer alive and never leave a flush waiting
+                    logger.error(f"Monitoring writer failed on a batch of {len(batch)} items: {e}")
+                    for kind, payload in batch:
+                        if kind == _FLUSH:
+                            payload.set()
+                    stopping = any(kind == _STOP for kind, _ in batch)
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _commit_batch(self, batch: List[tuple]) -> bool:
+        progress_rows: List[tuple] = []
+        appends: Dict[str, List[tuple]] = defaultdict(list)
+        ordered: List[Tuple[str, List[tuple]]] = []
+        latest: Dict[str, tuple] = {}  # delegation_id -> (progress, last_update, delegation_id)
+        waiters: List[threading.Event] = []
+        stopping = False
+        
+        def add_ordered(sql: str, rows: List[tuple]):
+            if ordered and ordered[-1][0] == sql:
+                ordered[-1][1].extend(rows)
+            else:
+                ordered.append((sql, list(rows)))
+        
+        for kind, payload in batch:
+            if kind == _PROGRESS:
+                progress_rows.append(payload)
+                latest[payload[0]] = (payload[2], payload[1], payload[0])
+            elif kind == _APPEND:
+                appends[payload[0]].extend(payload[1])
+            elif kind == _EXECUTE:
+                # Earlier progress updates must land before this statement
+                if latest:
+                    add_ordered(UPDATE_MONITOR_PROGRESS_SQL, list(latest.values()))
+                    latest.clear()
+                add_ordered(*payload)
+            elif kind == _FLUSH:
+                waiters.append(payload)
+            else:
+                stopping = True
+        if latest:
+            add_ordered(UPDATE_MONITOR_PROGRESS_SQL, list(latest.values()))
+        
+        statements = ([(INSERT_PROGRESS_SQL, progress_rows)] if progress_rows else []) + \
+            list(appends.items()) + ordered
+        try:
+            if statements:
+                self._write_statements(statements, len(batch))
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        return stopping
+    
+    def _write_statements(self, statements: List[Tuple[str, List[tuple]]], items: int):
+        if self._conn is None:
+            self._conn = self._connect()
+        conn = self._conn
+        rows_written = sum(len(rows) for _, rows in statements)
+        try:
+            with conn:
+                for sql, rows in statements:
+                    conn.executemany(sql, rows)
+        except sqlite3.Error as e:
+            # The transaction rolled back; retry each row so one bad row only costs itself
+            self.write_stats["failed_batches"] += 1
+            logger.warning(f"Monitoring batch of {items} items failed ({e}); retrying row by row")
+            dropped = 0
+            try:
+                with conn:
+                    for sql, rows in statements:
+                        failed, last_error = 0, None
+                        for row in rows:
+                            try:
+                                conn.execute(sql, row)
+                            except sqlite3.Error as row_error:
+                                failed, last_error = failed + 1, row_error
+                        if failed:
+                            dropped += failed
+                            logger.error(f"Dropped {failed} of {len(rows)} monitoring rows: {last_error}")
+            except sqlite3.Error:
+                # The connection itself is unusable; reconnect for the next batch
+                self._conn = None
+                conn.close()
+                raise
+            self.write_stats["dropped_rows"] += dropped
+            rows_written -= dropped
+        
+        self.write_stats["batches"] += 1
+        self.write_stats["rows"] += rows_written
+        self.write_stats["largest_batch"] = max(self.write_stats["largest_batch"], rows_written)
 
 # Global database instance
 monitoring_db = MonitoringDatabase()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Commit queued writes before exiting"""
+    await asyncio.to_thread(monitoring_db.close)
+
 # In-memory storage for active monitoring
 active_monitors = {}  # delegation_id -> monitor_data
 task_progress_history = {}  # delegation_id -> [progress_data]
@@ -186,7 +434,8 @@ async def health_check():
         "service": "monitoring-service",
         "version": "2.0.0",
         "active_monitors": len(active_monitors),
-        "database_status": "connected"
+        "database_status": "connected",
+        "database_writes": monitoring_db.write_stats
     }
 
 # Notification storage
@@ -262,20 +511,11 @@ async def start_monitoring(request: TaskMonitoringRequest, background_tasks: Bac
         detected_anomalies[request.delegation_id] = []
         
         # Store in database
-        conn = sqlite3.connect(monitoring_db.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO task_monitors 
-            (delegation_id, task_id, agent_id, task_type, priority, estimated_completion, 
-             start_time, status, current_progress, last_update)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (request.delegation_id, request.task_id, request.agent_id, request.task_type,
-              request.priority, request.estimated_completion, current_time.isoformat(),
-              "monitoring", 0.0, current_time.isoformat()))
-        
-        conn.commit()
-        conn.close()
+        monitoring_db.execute(UPSERT_MONITOR_SQL, [
+            (request.delegation_id, request.task_id, request.agent_id, request.task_type,
+             request.priority, request.estimated_completion, current_time.isoformat(),
+             "monitoring", 0.0, current_time.isoformat())
+        ])
         
         # Start background monitoring task
         background_tasks.add_task(monitor_task_execution, request.delegation_id)
@@ -315,26 +555,9 @@ async def update_task_progress(progress: TaskProgress):
         active_monitors[progress.delegation_id]["last_update"] = progress.timestamp
         active_monitors[progress.delegation_id]["current_progress"] = progress.progress_percentage
         
-        # Store in database
-        conn = sqlite3.connect(monitoring_db.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO progress_history 
-            (delegation_id, timestamp, progress_percentage, quality_metrics, performance_indicators)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (progress.delegation_id, progress.timestamp, progress.progress_percentage,
-              json.dumps(progress.quality_metrics), json.dumps(progress.performance_indicators)))
-        
-        # Update monitor status
-        cursor.execute('''
-            UPDATE task_monitors 
-            SET current_progress = ?, last_update = ?
-            WHERE delegation_id = ?
-        ''', (progress.progress_percentage, progress.timestamp, progress.delegation_id))
-        
-        conn.commit()
-        conn.close()
+        # Store in database (progress row and monitor status, committed by the writer thread)
+        monitoring_db.record_progress(progress.delegation_id, progress.timestamp, progress.progress_percentage,
+                                      progress.quality_metrics, progress.performance_indicators)
         
         # Check for anomalies
         anomalies = await detect_anomalies(progress.delegation_id, progress_data)
@@ -514,17 +737,7 @@ async def stop_monitoring(delegation_id: str):
         final_data["stopped_at"] = datetime.now(timezone.utc).isoformat()
 
         # Update database
-        conn = sqlite3.connect(monitoring_db.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE task_monitors
-            SET status = 'stopped', stopped_at = ?
-            WHERE delegation_id = ?
-        ''', (final_data["stopped_at"], delegation_id))
-
-        conn.commit()
-        conn.close()
+        monitoring_db.execute(STOP_MONITOR_SQL, [(final_data["stopped_at"], delegation_id)])
 
         # Clean up memory
         task_progress_history.pop(delegation_id, None)
@@ -549,8 +762,41 @@ async def get_monitoring_statistics():
     """Get comprehensive monitoring statistics"""
 
     try:
-        # Get database statistics
-        conn = sqlite3.connect(monitoring_db.db_path)
+        # Get database statistics off the event loop
+        stats = await asyncio.to_thread(query_database_statistics)
+        total_monitored = stats["total_monitored"]
+
+        return {
+            "monitoring_overview": {
+                "total_tasks_monitored": total_monitored,
+                "completed_tasks": stats["completed_tasks"],
+                "currently_active": len(active_monitors),
+                "average_completion_minutes": round(stats["avg_completion_minutes"], 1)
+            },
+            "task_distribution": {
+                "by_type": stats["task_type_stats"],
+                "by_priority": stats["priority_stats"]
+            },
+            "anomaly_statistics": {
+                "total_anomalies": stats["total_anomalies"],
+                "by_severity": stats["anomaly_severity_stats"]
+            },
+            "system_health": {
+                "active_monitors": len(active_monitors),
+                "active_alerts": len(active_alerts),
+                "database_records": total_monitored
+            },
+            "version": "2.0"
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting statistics: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def query_database_statistics() -> Dict:
+    """Aggregate counts for the statistics endpoint (blocking; run in a thread)"""
+
+    with monitoring_db.reader() as conn:
         cursor = conn.cursor()
 
         # Total tasks monitored
@@ -595,34 +841,15 @@ async def get_monitoring_statistics():
         ''')
         anomaly_severity_stats = dict(cursor.fetchall())
 
-        conn.close()
-
-        return {
-            "monitoring_overview": {
-                "total_tasks_monitored": total_monitored,
-                "completed_tasks": completed_tasks,
-                "currently_active": len(active_monitors),
-                "average_completion_minutes": round(avg_completion_minutes, 1)
-            },
-            "task_distribution": {
-                "by_type": task_type_stats,
-                "by_priority": priority_stats
-            },
-            "anomaly_statistics": {
-                "total_anomalies": total_anomalies,
-                "by_severity": anomaly_severity_stats
-            },
-            "system_health": {
-                "active_monitors": len(active_monitors),
-                "active_alerts": len(active_alerts),
-                "database_records": total_monitored
-            },
-            "version": "2.0"
-        }
-
-    except Exception as e:
-        logger.error(f"Error getting statistics: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "total_monitored": total_monitored,
+        "completed_tasks": completed_tasks,
+        "avg_completion_minutes": avg_completion_minutes,
+        "task_type_stats": task_type_stats,
+        "priority_stats": priority_stats,
+        "total_anomalies": total_anomalies,
+        "anomaly_severity_stats": anomaly_severity_stats
+    }
 
 # Background monitoring and anomaly detection functions
 async def monitor_task_execution(delegation_id: str):
@@ -735,27 +962,12 @@ async def simulate_task_progress(delegation_id: str):
     active_monitors[delegation_id]["last_update"] = current_time.isoformat()
 
     # Store in database
-    try:
-        conn = sqlite3.connect(monitoring_db.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO progress_history
-            (delegation_id, timestamp, progress_percentage, quality_metrics, performance_indicators)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (delegation_id, current_time.isoformat(), current_progress,
-              json.dumps(quality_metrics), json.dumps(performance_indicators)))
+    monitoring_db.record_progress(delegation_id, current_time.isoformat(), current_progress,
+                                  quality_metrics, performance_indicators)
 
-        cursor.execute('''
-            UPDATE task_monitors
-            SET current_progress = ?, last_update = ?
-            WHERE delegation_id = ?
-        ''', (current_progress, current_time.isoformat(), delegation_id))
-
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        logger.error(f"Error storing progress data: {e}")
+def anomaly_row(delegation_id: str, anomaly: Dict) -> tuple:
+    return (delegation_id, anomaly["anomaly_type"], anomaly["severity"], anomaly["description"],
+            anomaly["detected_at"], json.dumps(anomaly["metrics"]), json.dumps(anomaly["suggested_actions"]))
 
 async def detect_anomalies(delegation_id: str, progress_data: Dict) -> List[Dict]:
     """Detect anomalies in task execution"""
@@ -825,23 +1037,7 @@ async def detect_anomalies(delegation_id: str, progress_data: Dict) -> List[Dict
 
     # Store anomalies in database
     if anomalies:
-        try:
-            conn = sqlite3.connect(monitoring_db.db_path)
-            cursor = conn.cursor()
-
-            for anomaly in anomalies:
-                cursor.execute('''
-                    INSERT INTO anomalies
-                    (delegation_id, anomaly_type, severity, description, detected_at, metrics, suggested_actions)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (delegation_id, anomaly["anomaly_type"], anomaly["severity"],
-                      anomaly["description"], anomaly["detected_at"],
-                      json.dumps(anomaly["metrics"]), json.dumps(anomaly["suggested_actions"])))
-
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.error(f"Error storing anomalies: {e}")
+        monitoring_db.append(INSERT_ANOMALY_SQL, [anomaly_row(delegation_id, anomaly) for anomaly in anomalies])
 
     return anomalies
 
@@ -872,22 +1068,7 @@ async def check_task_timeout(delegation_id: str):
         detected_anomalies[delegation_id].append(anomaly)
 
         # Store in database
-        try:
-            conn = sqlite3.connect(monitoring_db.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                INSERT INTO anomalies
-                (delegation_id, anomaly_type, severity, description, detected_at, metrics, suggested_actions)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (delegation_id, anomaly["anomaly_type"], anomaly["severity"],
-                  anomaly["description"], anomaly["detected_at"],
-                  json.dumps(anomaly["metrics"]), json.dumps(anomaly["suggested_actions"])))
-
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            logger.error(f"Error storing timeout anomaly: {e}")
+        monitoring_db.append(INSERT_ANOMALY_SQL, [anomaly_row(delegation_id, anomaly)])
 
 async def create_alert(delegation_id: str, anomaly: Dict):
     """Create an alert for critical anomalies"""
@@ -905,23 +1086,11 @@ async def create_alert(delegation_id: str, anomaly: Dict):
     active_alerts[alert_id] = alert
 
     # Store in database
-    try:
-        conn = sqlite3.connect(monitoring_db.db_path)
-        cursor = conn.cursor()
+    monitoring_db.append(INSERT_ALERT_SQL, [
+        (alert_id, delegation_id, alert["alert_type"], alert["message"], alert["severity"], alert["created_at"])
+    ])
 
-        cursor.execute('''
-            INSERT INTO alerts
-            (alert_id, delegation_id, alert_type, message, severity, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (alert_id, delegation_id, alert["alert_type"], alert["message"],
-              alert["severity"], alert["created_at"]))
-
-        conn.commit()
-        conn.close()
-
-        logger.warning(f"Critical alert created for {delegation_id}: {alert['message']}")
-    except Exception as e:
-        logger.error(f"Error storing alert: {e}")
+    logger.warning(f"Critical alert created for {delegation_id}: {alert['message']}")
 
 def calculate_completion_estimate(delegation_id: str) -> str:
     """Calculate estimated completion time based on current progress"""
@@ -3,19 +3,26 @@ Enhanced Hierarchical Workflow State Management with Event Sourcing
 Supports complex multi-agent workflows with distributed consistency, conflict resolution, and disaster recovery
 Enterprise-grade workflow orchestration with sub-10ms state transitions
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Awaitable, Callable, Set, Tuple, Union
 from enum import Enum
 import asyncio
+import heapq
 import json
+import os
+import struct
+import sys
 import threading
 import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right, insort
 from datetime import datetime, timezone
 import uuid
 import logging
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 import networkx as nx
 import redis
 import sqlite3
@@ -25,6 +32,11 @@ import pickle
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 app = FastAPI(
     title="Workflow State Management Service",
     description="Hierarchical state machine with event sourcing for complex workflows",
@@ -207,41 +219,514 @@ class WorkflowConflict(BaseModel):
     resolution_strategy: Optional[str] = None
 
 # Event Store
-class WorkflowEventStore:
+EVENT_LOG_DIR = os.getenv("WORKFLOW_EVENT_LOG_DIR", os.path.join("data", "workflow_events"))
+
+def _json_default(value: Any) -> Any:
+    """Convert values the JSON encoder cannot handle natively"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    def _dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_json_default)
+
+    _loads = orjson.loads
+else:
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+    _loads = json.loads
+
+def _model_dump(model: BaseModel) -> Dict[str, Any]:
+    return model.model_dump() if hasattr(model, "model_dump") else model.dict()
+
+def _copy_model(model: BaseModel, **update: Any) -> BaseModel:
+    """Shallow copy with some fields replaced; the others are shared with ``model``"""
+    if hasattr(model, "model_copy"):
+        return model.model_copy(update=update)
+    return model.copy(update=update)
+
+class _StreamIndex:
+    """Offset index of one workflow's records in the segmented log"""
+
+    __slots__ = ('sequences', 'locations', 'sizes', 'snapshot_location', 'snapshot_size',
+                 'pending_events', 'pending_bytes')
+
     def __init__(self):
-        self.event_streams: Dict[str, List[WorkflowEvent]] = defaultdict(list)
+        self.sequences = array('Q')  # ascending sequence numbers
+        self.locations = array('Q')  # segment number << 40 | byte offset
+        self.sizes = array('I')  # record length in bytes
+        self.snapshot_location = -1
+        self.snapshot_size = 0
+        self.pending_events = 0  # events after the latest snapshot
+        self.pending_bytes = 0
+
+class WorkflowEventStore:
+    """Durable event store backed by an append-only segmented log
+
+    Events and snapshots are framed, checksummed records appended to
+    segment files (``<number>.log``) under ``data_dir``. Every workflow keeps
+    an in-memory offset index of its events ordered by sequence number, so
+    reads binary-search to the first wanted event and touch only the
+    records they return.
+
+    Appends go to a buffer that is written and fsynced as a group commit.
+    ``append_event`` returns once a commit covering its record is durable:
+    the first waiting appender fsyncs everything buffered so far, and
+    appends that arrive meanwhile share the next fsync. Snapshots and
+    ``durable=False`` appends are committed by a background thread every
+    ``group_commit_interval`` seconds, or inline once ``group_commit_bytes``
+    are pending; ``flush()`` forces a commit.
+    Sealed segments get a ``.idx`` sidecar holding their offset index, so
+    opening a store only scans the active segment, truncating a torn tail
+    left by a crash.
+
+    The log is opened, and the commit thread started, by ``open()``; the
+    constructor calls it unless ``open_log`` is false.
+    """
+
+    RECORD_EVENT = 1
+    RECORD_SNAPSHOT = 2
+    _HEADER = struct.Struct(">BIIQH")  # kind, payload length, crc32, sequence, workflow id length
+    _INDEX_MAGIC = b"WFIDX1" + (b"L" if sys.byteorder == "little" else b"B")
+    _INDEX_ENTRY = struct.Struct(">HIqI")  # workflow id length, events, snapshot location, snapshot size
+    _OFFSET_BITS = 40
+    _OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+
+    def __init__(self, data_dir: Optional[str] = None, segment_max_bytes: int = 64 * 1024 * 1024,
+                 group_commit_interval: float = 0.005, group_commit_bytes: int = 1024 * 1024,
+                 fsync: bool = True, open_log: bool = True):
+        self.data_dir = data_dir or EVENT_LOG_DIR
+        self.segment_max_bytes = segment_max_bytes
+        self.group_commit_interval = group_commit_interval
+        self.group_commit_bytes = group_commit_bytes
+        self.fsync = fsync
+
         self.snapshots: Dict[str, WorkflowStateSnapshot] = {}
         self.sequence_numbers: Dict[str, int] = defaultdict(int)
-        self.event_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
-    
-    def append_event(self, workflow_id: str, event: WorkflowEvent) -> None:
-        """Append event to workflow stream"""
-        with self.event_locks[workflow_id]:
+        self.stream_indexes: Dict[str, _StreamIndex] = {}
+        self.stats = {'events_appended': 0, 'snapshots_saved': 0, 'group_commits': 0, 'fsyncs': 0,
+                      'bytes_written': 0, 'recovered_records': 0, 'truncated_bytes': 0}
+
+        self._lock = threading.RLock()
+        self._synced = threading.Condition(threading.Lock())  # durable appenders wait here for their fsync
+        self._syncing = False
+        self._buffer = bytearray()
+        self._segment_number = 0
+        self._segment_size = 0  # bytes in the active segment, including the buffer
+        self._written_size = 0  # bytes of the active segment handed to the OS
+        self._segment_records: List[Tuple[str, int, int, int]] = []  # (workflow, kind, sequence, size) in order
+        self._read_fds: Dict[int, int] = {}
+        self._write_fd: Optional[int] = None
+        self._unsynced = False
+        self._appended_bytes = 0  # bytes framed since open, across segments
+        self._durable_bytes = 0  # prefix of those bytes known to be committed
+
+        self._closed = threading.Event()
+        self._committer: Optional[threading.Thread] = None
+        if open_log:
+            self.open()
+
+    def open(self) -> None:
+        """Recover the log under ``data_dir`` and start the group commit thread"""
+        with self._lock:
+            if self._committer is not None:
+                return
+            os.makedirs(self.data_dir, exist_ok=True)
+            self._recover()
+            self._committer = threading.Thread(target=self._group_commit_loop, name="event-log-commit", daemon=True)
+            self._committer.start()
+
+    # Write path
+
+    def append_event(self, workflow_id: str, event: WorkflowEvent, durable: bool = True) -> None:
+        """Append event to workflow stream
+
+        Waits until the record is committed unless ``durable`` is false, in
+        which case the background thread commits it within
+        ``group_commit_interval`` seconds.
+        """
+        with self._lock:
             # Assign sequence number
             self.sequence_numbers[workflow_id] += 1
             event.sequence_number = self.sequence_numbers[workflow_id]
             event.timestamp = datetime.now(timezone.utc)
-            
-            # Add to stream
-            self.event_streams[workflow_id].append(event)
-            
-            logging.info(f"Event appended: {event.event_type} for workflow {workflow_id}")
-    
-    def get_events(self, workflow_id: str, from_sequence: int = 0) -> List[WorkflowEvent]:
-        """Get events for workflow from sequence number"""
-        events = self.event_streams.get(workflow_id, [])
-        return [e for e in events if e.sequence_number > from_sequence]
-    
+
+            # Add to log
+            self._append_record(self.RECORD_EVENT, workflow_id, event.sequence_number, _dumps(_model_dump(event)))
+            self.stats['events_appended'] += 1
+            position = self._appended_bytes
+
+        if durable:
+            self._wait_durable(position)
+
+        logging.debug(f"Event appended: {event.event_type} for workflow {workflow_id}")
+
     def save_snapshot(self, snapshot: WorkflowStateSnapshot) -> None:
         """Save state snapshot"""
-        snapshot.snapshot_sequence = self.sequence_numbers[snapshot.workflow_id]
-        self.snapshots[snapshot.workflow_id] = snapshot
-        
-        logging.info(f"Snapshot saved for workflow {snapshot.workflow_id}")
-    
+        with self._lock:
+            snapshot.snapshot_sequence = self.sequence_numbers[snapshot.workflow_id]
+            self.snapshots[snapshot.workflow_id] = snapshot
+            self._append_record(self.RECORD_SNAPSHOT, snapshot.workflow_id, snapshot.snapshot_sequence,
+                                _dumps(_model_dump(snapshot)))
+            self.stats['snapshots_saved'] += 1
+
+        logging.debug(f"Snapshot saved for workflow {snapshot.workflow_id}")
+
+    def _append_record(self, kind: int, workflow_id: str, sequence: int, payload: bytes):
+        """Frame a record into the commit buffer and index it (caller holds the lock)"""
+        if self._write_fd is None:
+            raise RuntimeError("Event store is not open")
+
+        workflow_key = workflow_id.encode()
+        header = self._HEADER.pack(kind, len(payload), zlib.crc32(payload, zlib.crc32(workflow_key)),
+                                   sequence, len(workflow_key))
+        size = len(header) + len(workflow_key) + len(payload)
+        if self._segment_size and self._segment_size + size > self.segment_max_bytes:
+            self._roll_segment()
+
+        location = (self._segment_number << self._OFFSET_BITS) | self._segment_size
+        self._buffer += header
+        self._buffer += workflow_key
+        self._buffer += payload
+        self._segment_size += size
+        self._appended_bytes += size
+        self._segment_records.append((workflow_id, kind, sequence, size))
+        self._index_record(workflow_id, kind, sequence, location, size)
+
+        if len(self._buffer) >= self.group_commit_bytes:
+            self._commit(self.fsync)
+
+    def _index_record(self, workflow_id: str, kind: int, sequence: int, location: int, size: int):
+        index = self.stream_indexes.get(workflow_id)
+        if index is None:
+            index = self.stream_indexes[workflow_id] = _StreamIndex()
+        if kind == self.RECORD_EVENT:
+            index.sequences.append(sequence)
+            index.locations.append(location)
+            index.sizes.append(size)
+            index.pending_events += 1
+            index.pending_bytes += size
+        else:
+            index.snapshot_location = location
+            index.snapshot_size = size
+            index.pending_events = index.pending_bytes = 0
+
+    def _write_buffer(self):
+        """Hand buffered records to the OS (caller holds the lock)"""
+        if not self._buffer:
+            return
+        view = memoryview(self._buffer)
+        while view:
+            written = os.write(self._write_fd, view)
+            view = view[written:]
+        view.release()
+        self._written_size += len(self._buffer)
+        self.stats['bytes_written'] += len(self._buffer)
+        self._buffer.clear()
+        self._unsynced = True
+
+    def _commit(self, fsync: bool):
+        """Group commit: write the buffer and optionally fsync it (caller holds the lock)"""
+        if self._buffer:
+            self._write_buffer()
+            self.stats['group_commits'] += 1
+        if fsync and self._unsynced:
+            os.fsync(self._write_fd)
+            self._unsynced = False
+            self.stats['fsyncs'] += 1
+        # Rolling fsyncs the sealed segment, so a synced active segment means everything is synced
+        if not self._unsynced or not self.fsync:
+            self._durable_bytes = self._appended_bytes
+
+    def _wait_durable(self, position: int):
+        """Block until the first ``position`` appended bytes are committed
+
+        One waiter at a time fsyncs a duplicate of the segment descriptor
+        outside the store lock; appends made meanwhile are covered by the
+        next waiter's fsync, and waiters it already covers just return.
+        """
+        with self._synced:
+            while self._durable_bytes < position:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._synced.wait()
+            else:
+                return  # covered by another appender's fsync
+
+        try:
+            with self._lock:
+                if self._write_fd is None:
+                    return  # close() committed everything
+                self._commit(fsync=False)
+                target = self._appended_bytes
+                fd = os.dup(self._write_fd) if self.fsync else None
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            with self._lock:
+                if fd is not None:
+                    self.stats['fsyncs'] += 1
+                    if self._appended_bytes == target:
+                        self._unsynced = False
+                self._durable_bytes = max(self._durable_bytes, target)
+        finally:
+            with self._synced:
+                self._syncing = False
+                self._synced.notify_all()
+
+    def _group_commit_loop(self):
+        while not self._closed.wait(self.group_commit_interval):
+            try:
+                with self._lock:
+                    if self._write_fd is not None:
+                        self._commit(self.fsync)
+            except OSError as e:
+                logging.error(f"Event log group commit failed: {e}")
+
+    def flush(self, fsync: bool = True) -> None:
+        """Commit every buffered record, fsyncing unless disabled"""
+        with self._lock:
+            self._commit(fsync)
+
+    def close(self) -> None:
+        """Flush, stop the commit thread and release file descriptors"""
+        self._closed.set()
+        committer = self._committer
+        if committer is not None and committer.is_alive() and committer is not threading.current_thread():
+            committer.join()
+        with self._lock:
+            if self._write_fd is None:
+                return
+            self._commit(self.fsync)
+            os.close(self._write_fd)
+            self._write_fd = None
+            for fd in self._read_fds.values():
+                os.close(fd)
+            self._read_fds.clear()
+
+    # Segments
+
+    def _segment_path(self, number: int, suffix: str = ".log") -> str:
+        return os.path.join(self.data_dir, f"{number:010d}{suffix}")
+
+    def _open_segment(self, number: int):
+        self._segment_number = number
+        self._write_fd = os.open(self._segment_path(number), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._segment_size = self._written_size = os.fstat(self._write_fd).st_size
+
+    def _roll_segment(self):
+        """Seal the active segment with its offset index and start the next one"""
+        self._commit(fsync=True)
+        os.close(self._write_fd)
+        self._write_sealed_index(self._segment_number, self._segment_records)
+        self._segment_records = []
+        self._open_segment(self._segment_number + 1)
+
+    def _write_sealed_index(self, number: int, records: List[Tuple[str, int, int, int]]):
+        """Write the ``.idx`` sidecar of a sealed segment"""
+        groups: Dict[str, List] = {}
+        offset = 0
+        base = number << self._OFFSET_BITS
+        for workflow_id, kind, sequence, size in records:
+            group = groups.get(workflow_id)
+            if group is None:
+                group = groups[workflow_id] = [array('Q'), array('Q'), array('I'), -1, 0]
+            if kind == self.RECORD_EVENT:
+                group[0].append(sequence)
+                group[1].append(base | offset)
+                group[2].append(size)
+            else:
+                group[3], group[4] = base | offset, size
+            offset += size
+
+        chunks = [self._INDEX_MAGIC]
+        for workflow_id, (sequences, locations, sizes, snapshot_location, snapshot_size) in groups.items():
+            workflow_key = workflow_id.encode()
+            chunks.append(self._INDEX_ENTRY.pack(len(workflow_key), len(sequences), snapshot_location, snapshot_size))
+            chunks.extend((workflow_key, sequences.tobytes(), locations.tobytes(), sizes.tobytes()))
+
+        temporary_path = self._segment_path(number, ".idx.tmp")
+        with open(temporary_path, "wb") as index_file:
+            index_file.write(b"".join(chunks))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(temporary_path, self._segment_path(number, ".idx"))
+
+    def _load_sealed_index(self, number: int) -> bool:
+        """Merge a sealed segment's sidecar index; False when it is missing or unreadable"""
+        try:
+            with open(self._segment_path(number, ".idx"), "rb") as index_file:
+                data = index_file.read()
+        except FileNotFoundError:
+            return False
+        if not data.startswith(self._INDEX_MAGIC):
+            return False
+
+        position = len(self._INDEX_MAGIC)
+        while position < len(data):
+            key_length, count, snapshot_location, snapshot_size = self._INDEX_ENTRY.unpack_from(data, position)
+            position += self._INDEX_ENTRY.size
+            workflow_id = data[position:position + key_length].decode()
+            position += key_length
+
+            index = self.stream_indexes.get(workflow_id)
+            if index is None:
+                index = self.stream_indexes[workflow_id] = _StreamIndex()
+            for values, width in ((index.sequences, 8), (index.locations, 8), (index.sizes, 4)):
+                values.frombytes(data[position:position + count * width])
+                position += count * width
+            if snapshot_location >= 0:
+                index.snapshot_location, index.snapshot_size = snapshot_location, snapshot_size
+            self.stats['recovered_records'] += count + (snapshot_location >= 0)
+        return True
+
+    def _scan_segment(self, number: int, truncate: bool) -> List[Tuple[str, int, int, int]]:
+        """Index a segment by walking its record headers
+
+        A torn or corrupt record at the end of the active segment is
+        truncated away; in a sealed segment it stops the scan.
+        """
+        path = self._segment_path(number)
+        with open(path, "rb") as segment_file:
+            data = segment_file.read()
+
+        records = []
+        offset = 0
+        base = number << self._OFFSET_BITS
+        header_size = self._HEADER.size
+        while offset + header_size <= len(data):
+            kind, payload_length, crc, sequence, key_length = self._HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            end = start + key_length + payload_length
+            if kind not in (self.RECORD_EVENT, self.RECORD_SNAPSHOT) or end > len(data):
+                break
+            key = data[start:start + key_length]
+            if zlib.crc32(data[start + key_length:end], zlib.crc32(key)) != crc:
+                break
+
+            workflow_id = key.decode()
+            records.append((workflow_id, kind, sequence, end - offset))
+            self._index_record(workflow_id, kind, sequence, base | offset, end - offset)
+            offset = end
+
+        if offset < len(data):
+            logging.warning(f"Event log segment {path}: discarding {len(data) - offset} bytes after offset {offset}")
+            self.stats['truncated_bytes'] += len(data) - offset
+            if truncate:
+                os.truncate(path, offset)
+        self.stats['recovered_records'] += len(records)
+        return records
+
+    def _recover(self):
+        """Rebuild offset indexes, sequence numbers and the active segment from disk"""
+        numbers = sorted(
+            int(name[:-4]) for name in os.listdir(self.data_dir)
+            if name.endswith(".log") and name[:-4].isdigit()
+        )
+        for number in numbers[:-1]:
+            if not self._load_sealed_index(number):
+                self._write_sealed_index(number, self._scan_segment(number, truncate=False))
+
+        active = numbers[-1] if numbers else 0
+        if numbers:
+            self._segment_records = self._scan_segment(active, truncate=True)
+        self._open_segment(active)
+
+        for workflow_id, index in self.stream_indexes.items():
+            if index.sequences:
+                self.sequence_numbers[workflow_id] = index.sequences[-1]
+            start = bisect_right(index.locations, index.snapshot_location)
+            index.pending_events, index.pending_bytes = len(index.locations) - start, sum(index.sizes[start:])
+        if self.stats['recovered_records']:
+            logging.info(f"Event log recovered {self.stats['recovered_records']} records "
+                         f"for {len(self.stream_indexes)} workflows from {len(numbers)} segments")
+
+    # Read path
+
+    def _read_records(self, locations: array, sizes: array) -> List[Tuple[int, bytes]]:
+        """Read framed records, returning (kind, payload) pairs"""
+        with self._lock:
+            # Records still in the commit buffer must reach the OS before pread can see them
+            if self._buffer and locations and (
+                locations[-1] >> self._OFFSET_BITS == self._segment_number
+                and (locations[-1] & self._OFFSET_MASK) + sizes[-1] > self._written_size
+            ):
+                self._write_buffer()
+
+        records = []
+        header_size = self._HEADER.size
+        for location, size in zip(locations, sizes):
+            number = location >> self._OFFSET_BITS
+            fd = self._read_fds.get(number)
+            if fd is None:
+                with self._lock:
+                    fd = self._read_fds.get(number)
+                    if fd is None:
+                        fd = self._read_fds[number] = os.open(self._segment_path(number), os.O_RDONLY)
+            data = os.pread(fd, size, location & self._OFFSET_MASK)
+            kind, payload_length, crc, _, key_length = self._HEADER.unpack_from(data)
+            payload = data[header_size + key_length:]
+            if len(payload) != payload_length or zlib.crc32(payload, zlib.crc32(
+                    data[header_size:header_size + key_length])) != crc:
+                raise IOError(f"Corrupt event log record at segment {number} offset {location & self._OFFSET_MASK}")
+            records.append((kind, payload))
+        return records
+
+    def get_events(self, workflow_id: str, from_sequence: int = 0,
+                   limit: Optional[int] = None) -> List[WorkflowEvent]:
+        """Get events for workflow from sequence number"""
+        index = self.stream_indexes.get(workflow_id)
+        if index is None:
+            return []
+
+        with self._lock:
+            start = bisect_right(index.sequences, from_sequence)
+            end = start + limit if limit is not None else len(index.sequences)
+            locations, sizes = index.locations[start:end], index.sizes[start:end]
+        return [WorkflowEvent(**_loads(payload)) for _, payload in self._read_records(locations, sizes)]
+
+    def pending_since_snapshot(self, workflow_id: str) -> Tuple[int, int]:
+        """Events and bytes appended since the latest snapshot: the replay cost of a rebuild"""
+        index = self.stream_indexes.get(workflow_id)
+        if index is None:
+            return 0, 0
+        return index.pending_events, index.pending_bytes
+
     def get_latest_snapshot(self, workflow_id: str) -> Optional[WorkflowStateSnapshot]:
         """Get latest snapshot"""
-        return self.snapshots.get(workflow_id)
+        snapshot = self.snapshots.get(workflow_id)
+        if snapshot is not None:
+            return snapshot
+
+        index = self.stream_indexes.get(workflow_id)
+        if index is None or index.snapshot_location < 0:
+            return None
+        (_, payload), = self._read_records(array('Q', [index.snapshot_location]), array('I', [index.snapshot_size]))
+        snapshot = self.snapshots[workflow_id] = WorkflowStateSnapshot(**_loads(payload))
+        return snapshot
+
+    def workflow_ids(self) -> List[str]:
+        """Workflows with records in the log"""
+        with self._lock:
+            return list(self.stream_indexes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Log size and commit counters"""
+        with self._lock:
+            return {
+                **self.stats,
+                'workflows': len(self.stream_indexes),
+                'active_segment': self._segment_number,
+                'active_segment_bytes': self._segment_size,
+                'buffered_bytes': len(self._buffer)
+            }
 
 # State Machine
 class HierarchicalStateMachine:
@@ -511,16 +996,134 @@ class MultiAgentWorkflowCoordinator:
         pass
 
 # Workflow Engine
+@dataclass
+class SnapshotPolicy:
+    """When the engine snapshots a workflow
+
+    A snapshot is taken as soon as any threshold is reached since the
+    previous one, so rebuilding a workflow never replays more than
+    ``every_events`` events.
+    """
+    every_events: int = 100
+    interval_seconds: Optional[float] = 60.0
+    max_replay_bytes: Optional[int] = 256 * 1024
+
+    def should_snapshot(self, events_since: int, bytes_since: int, seconds_since: float) -> bool:
+        if events_since <= 0:
+            return False
+        return (
+            events_since >= self.every_events
+            or (self.interval_seconds is not None and seconds_since >= self.interval_seconds)
+            or (self.max_replay_bytes is not None and bytes_since >= self.max_replay_bytes)
+        )
+
+class StepDAG:
+    """Dependency graph of a workflow's steps
+
+    Steps are kept in topological order (Kahn's algorithm) together with
+    successor lists and in-degrees, so a scheduler can release a step as
+    soon as its last dependency completes. ``priority`` is each step's
+    longest estimated path to the end of the workflow (its own duration
+    included), used to start critical-path steps first.
+    """
+
+    def __init__(self, steps: List[WorkflowStep], default_duration: float = 1.0,
+                 max_parallel: Optional[int] = None):
+        self.steps: Dict[str, WorkflowStep] = {step.step_id: step for step in steps}
+        if len(self.steps) != len(steps):
+            raise ValueError("Workflow step ids must be unique")
+        self.max_parallel = max_parallel
+
+        self.dependencies: Dict[str, Tuple[str, ...]] = {}
+        self.successors: Dict[str, List[str]] = {step_id: [] for step_id in self.steps}
+        for step in steps:
+            dependencies = tuple(dict.fromkeys(step.dependencies))
+            unknown = [dep for dep in dependencies if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {step.step_id} depends on unknown steps {unknown}")
+            self.dependencies[step.step_id] = dependencies
+            for dep in dependencies:
+                self.successors[dep].append(step.step_id)
+        self.in_degree = {step_id: len(deps) for step_id, deps in self.dependencies.items()}
+
+        remaining = dict(self.in_degree)
+        ready = deque(step_id for step_id, degree in remaining.items() if degree == 0)
+        order = []
+        while ready:
+            step_id = ready.popleft()
+            order.append(step_id)
+            for successor in self.successors[step_id]:
+                remaining[successor] -= 1
+                if remaining[successor] == 0:
+                    ready.append(successor)
+        if len(order) != len(self.steps):
+            cyclic = sorted(step_id for step_id, degree in remaining.items() if degree > 0)
+            raise ValueError(f"Workflow steps contain a dependency cycle through {cyclic}")
+        self.topological_order = order
+
+        self.durations = {
+            step_id: float(step.parameters.get("estimated_duration", default_duration))
+            for step_id, step in self.steps.items()
+        }
+        self.priority: Dict[str, float] = {}
+        for step_id in reversed(order):
+            self.priority[step_id] = self.durations[step_id] + max(
+                (self.priority[successor] for successor in self.successors[step_id]), default=0.0
+            )
+
+    def critical_path(self, completed: Optional[Set[str]] = None) -> Tuple[float, List[str]]:
+        """Longest estimated chain of steps not yet completed, and its duration"""
+        completed = completed or set()
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for step_id in self.topological_order:
+            if step_id in completed:
+                continue
+            start, via = 0.0, None
+            for dep in self.dependencies[step_id]:
+                if dep in finish and finish[dep] > start:
+                    start, via = finish[dep], dep
+            finish[step_id] = start + self.durations[step_id]
+            previous[step_id] = via
+
+        if not finish:
+            return 0.0, []
+        step_id = max(finish, key=finish.get)
+        duration, path = finish[step_id], []
+        while step_id is not None:
+            path.append(step_id)
+            step_id = previous[step_id]
+        return duration, path[::-1]
+
 class WorkflowEngine:
-    def __init__(self):
-        self.event_store = WorkflowEventStore()
+    def __init__(self, event_store: Optional[WorkflowEventStore] = None,
+                 snapshot_policy: Optional[SnapshotPolicy] = None,
+                 max_parallel_steps: int = 8, max_concurrent_steps: int = 256,
+                 default_step_duration: float = 1.0,
+                 step_executor: Optional[Callable[[str, WorkflowStep], Awaitable[Optional[Dict[str, Any]]]]] = None):
+        self.event_store = event_store or WorkflowEventStore()
+        self.snapshot_policy = snapshot_policy or SnapshotPolicy()
+        self.max_parallel_steps = max_parallel_steps  # per workflow, unless global_parameters["max_parallel_steps"]
+        self.max_concurrent_steps = max_concurrent_steps  # across all workflows
+        self.default_step_duration = default_step_duration
+        self.step_executor = step_executor or self._simulate_step
         self.state_machine = HierarchicalStateMachine()
         self.active_workflows: Dict[str, WorkflowStateSnapshot] = {}
         self.workflow_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self.last_snapshot_at: Dict[str, float] = {}
+        self.replay_stats = {'snapshots_taken': 0, 'rebuilds': 0, 'events_replayed': 0, 'max_events_replayed': 0,
+                             'bytes_replayed': 0}
+        self.state_listeners: List[Callable[[WorkflowStateSnapshot], None]] = []
+        self.step_dags: Dict[str, StepDAG] = {}
+        self.schedulers: Dict[str, asyncio.Task] = {}
+        self.scheduler_stats = {'steps_started': 0, 'running_steps': 0, 'peak_running_steps': 0}
+        self._step_slots: Optional[asyncio.Semaphore] = None
+        self._step_slots_loop: Optional[asyncio.AbstractEventLoop] = None
         
     def create_workflow(self, definition: WorkflowDefinition) -> WorkflowStateSnapshot:
         """Create new workflow instance"""
         workflow_id = definition.workflow_id
+        step_dag = self._build_step_dag(definition)  # rejects cycles and unknown dependencies
         
         # Create initial state
         initial_state = WorkflowStateSnapshot(
@@ -549,8 +1152,9 @@ class WorkflowEngine:
         
         # Store event and snapshot
         self.event_store.append_event(workflow_id, event)
-        self.event_store.save_snapshot(initial_state)
-        self.active_workflows[workflow_id] = initial_state
+        self._save_snapshot(initial_state)
+        self.step_dags[workflow_id] = step_dag
+        self._publish_state(initial_state)
         
         return initial_state
     
@@ -571,7 +1175,7 @@ class WorkflowEngine:
             )
             
             # Start executing steps
-            asyncio.create_task(self._execute_workflow_steps(workflow_id))
+            self._schedule_steps(workflow_id)
             
             return new_state
 
@@ -606,7 +1210,7 @@ class WorkflowEngine:
             )
 
             # Resume executing steps
-            asyncio.create_task(self._execute_workflow_steps(workflow_id))
+            self._schedule_steps(workflow_id)
 
             return new_state
 
@@ -615,29 +1219,14 @@ class WorkflowEngine:
         with self.workflow_locks[workflow_id]:
             current_state = self.get_workflow_state(workflow_id)
 
-            # Update step status
-            current_state.step_states[step_id] = "completed"
-            current_state.updated_at = datetime.now(timezone.utc)
-
-            # Create step completed event
-            event = WorkflowEvent(
-                event_id=str(uuid.uuid4()),
-                workflow_id=workflow_id,
-                event_type=EventType.STEP_COMPLETED,
-                event_data={
-                    "step_id": step_id,
-                    "result": result,
-                    "completed_at": datetime.now(timezone.utc).isoformat()
-                },
-                sequence_number=0,
-                timestamp=datetime.now(timezone.utc)
-            )
-
-            self.event_store.append_event(workflow_id, event)
-            self.event_store.save_snapshot(current_state)
+            new_state = self._record_event(workflow_id, current_state, EventType.STEP_COMPLETED, {
+                "step_id": step_id,
+                "result": result,
+                "completed_at": datetime.now(timezone.utc).isoformat()
+            })
 
             # Check if workflow is complete
-            if all(status in ["completed", "skipped"] for status in current_state.step_states.values()):
+            if all(status in ["completed", "skipped"] for status in new_state.step_states.values()):
                 self._transition_state(
                     workflow_id,
                     WorkflowState.COMPLETED,
@@ -650,25 +1239,11 @@ class WorkflowEngine:
         with self.workflow_locks[workflow_id]:
             current_state = self.get_workflow_state(workflow_id)
 
-            # Update step status
-            current_state.step_states[step_id] = "failed"
-            current_state.updated_at = datetime.now(timezone.utc)
-
-            # Create step failed event
-            event = WorkflowEvent(
-                event_id=str(uuid.uuid4()),
-                workflow_id=workflow_id,
-                event_type=EventType.STEP_FAILED,
-                event_data={
-                    "step_id": step_id,
-                    "error": error,
-                    "failed_at": datetime.now(timezone.utc).isoformat()
-                },
-                sequence_number=0,
-                timestamp=datetime.now(timezone.utc)
-            )
-
-            self.event_store.append_event(workflow_id, event)
+            self._record_event(workflow_id, current_state, EventType.STEP_FAILED, {
+                "step_id": step_id,
+                "error": error,
+                "failed_at": datetime.now(timezone.utc).isoformat()
+            })
 
             # Fail the entire workflow
             self._transition_state(
@@ -683,26 +1258,26 @@ class WorkflowEngine:
         with self.workflow_locks[workflow_id]:
             current_state = self.get_workflow_state(workflow_id)
 
-            # Update agent assignment
-            current_state.assigned_agents[step_id] = agent_id
-            current_state.updated_at = datetime.now(timezone.utc)
+            self._record_event(workflow_id, current_state, EventType.AGENT_ASSIGNED, {
+                "step_id": step_id,
+                "agent_id": agent_id,
+                "assigned_at": datetime.now(timezone.utc).isoformat()
+            })
 
-            # Create agent assigned event
-            event = WorkflowEvent(
-                event_id=str(uuid.uuid4()),
-                workflow_id=workflow_id,
-                event_type=EventType.AGENT_ASSIGNED,
-                event_data={
-                    "step_id": step_id,
-                    "agent_id": agent_id,
-                    "assigned_at": datetime.now(timezone.utc).isoformat()
-                },
-                sequence_number=0,
-                timestamp=datetime.now(timezone.utc)
-            )
+    def recover_workflows(self) -> int:
+        """Rebuild in-memory state for every workflow in the event log
 
-            self.event_store.append_event(workflow_id, event)
-            self.event_store.save_snapshot(current_state)
+        Each workflow is restored from its latest snapshot plus the events
+        appended after it.
+        """
+        recovered = 0
+        for workflow_id in self.event_store.workflow_ids():
+            try:
+                self._rebuild_workflow_state(workflow_id)
+                recovered += 1
+            except ValueError as e:
+                logging.error(f"Failed to recover workflow {workflow_id}: {e}")
+        return recovered
 
     def get_workflow_state(self, workflow_id: str) -> WorkflowStateSnapshot:
         """Get current workflow state"""
@@ -713,14 +1288,20 @@ class WorkflowEngine:
         return self._rebuild_workflow_state(workflow_id)
 
     def _rebuild_workflow_state(self, workflow_id: str) -> WorkflowStateSnapshot:
-        """Rebuild workflow state from events"""
+        """Rebuild workflow state from the latest snapshot and the events after it
+
+        The snapshot policy keeps that tail to at most ``every_events``
+        events. They are applied in place to a private copy of the
+        snapshot, so the rebuild allocates nothing per event.
+        """
         # Get latest snapshot
         snapshot = self.event_store.get_latest_snapshot(workflow_id)
+        _, replay_bytes = self.event_store.pending_since_snapshot(workflow_id)
 
         if snapshot:
             # Get events since snapshot
             events = self.event_store.get_events(workflow_id, snapshot.snapshot_sequence)
-            current_state = snapshot
+            base_state = snapshot
         else:
             # Rebuild from beginning
             events = self.event_store.get_events(workflow_id, 0)
@@ -731,63 +1312,117 @@ class WorkflowEngine:
             first_event = events[0]
             if first_event.event_type == EventType.WORKFLOW_CREATED:
                 initial_data = first_event.event_data["initial_state"]
-                current_state = WorkflowStateSnapshot(**initial_data)
+                base_state = WorkflowStateSnapshot(**initial_data)
                 events = events[1:]  # Skip first event
             else:
                 raise ValueError("Invalid event stream - missing workflow_created event")
 
-        # Apply events to rebuild state
+        # Apply events to a working copy; the cached snapshot stays untouched
+        current_state = _copy_model(
+            base_state,
+            step_states=dict(base_state.step_states),
+            assigned_agents=dict(base_state.assigned_agents),
+            global_context=dict(base_state.global_context)
+        )
         for event in events:
-            current_state = self._apply_event_to_state(current_state, event)
-
-        # Cache and return
-        self.active_workflows[workflow_id] = current_state
+            self._apply_event_to_state(current_state, event, in_place=True)
+
+        self.replay_stats['rebuilds'] += 1
+        self.replay_stats['events_replayed'] += len(events)
+        self.replay_stats['max_events_replayed'] = max(self.replay_stats['max_events_replayed'], len(events))
+        self.replay_stats['bytes_replayed'] += replay_bytes
+
+        # Cache and return; re-snapshot streams written without a policy so the next rebuild is bounded
+        self._publish_state(current_state)
+        self.last_snapshot_at[workflow_id] = time.monotonic()
+        if len(events) >= self.snapshot_policy.every_events:
+            self._save_snapshot(current_state)
         return current_state
 
-    def _apply_event_to_state(self, state: WorkflowStateSnapshot, event: WorkflowEvent) -> WorkflowStateSnapshot:
-        """Apply event to state"""
-        new_state = state.copy()
-        new_state.updated_at = event.timestamp
+    _STATE_EVENTS = {
+        EventType.WORKFLOW_STARTED: (WorkflowState.ACTIVE, WorkflowSubState.INITIALIZING),
+        EventType.WORKFLOW_PAUSED: (WorkflowState.PAUSED, None),
+        EventType.WORKFLOW_RESUMED: (WorkflowState.ACTIVE, WorkflowSubState.EXECUTING),
+        EventType.WORKFLOW_COMPLETED: (WorkflowState.COMPLETED, None),
+        EventType.WORKFLOW_FAILED: (WorkflowState.FAILED, None)
+    }
+    _STEP_EVENTS = {
+        EventType.STEP_STARTED: "running",
+        EventType.STEP_COMPLETED: "completed",
+        EventType.STEP_FAILED: "failed"
+    }
 
-        if event.event_type == EventType.WORKFLOW_STARTED:
-            new_state.current_state = WorkflowState.ACTIVE
-            new_state.current_substate = WorkflowSubState.INITIALIZING
+    def _apply_event_to_state(self, state: WorkflowStateSnapshot, event: WorkflowEvent,
+                              in_place: bool = False) -> WorkflowStateSnapshot:
+        """Apply event to state
 
-        elif event.event_type == EventType.WORKFLOW_PAUSED:
-            new_state.current_state = WorkflowState.PAUSED
-            new_state.current_substate = None
+        By default ``state`` is left untouched and the result shares every
+        field the event does not change with it (copy-on-write): a step
+        event copies only ``step_states``, an assignment only
+        ``assigned_agents``. ``in_place`` mutates ``state`` instead, for
+        rebuilds that own their working copy.
+        """
+        updates: Dict[str, Any] = {'updated_at': event.timestamp}
+        step_update = agent_update = None
 
-        elif event.event_type == EventType.WORKFLOW_RESUMED:
-            new_state.current_state = WorkflowState.ACTIVE
-            new_state.current_substate = WorkflowSubState.EXECUTING
+        if event.event_type in self._STATE_EVENTS:
+            updates['current_state'], updates['current_substate'] = self._STATE_EVENTS[event.event_type]
 
-        elif event.event_type == EventType.WORKFLOW_COMPLETED:
-            new_state.current_state = WorkflowState.COMPLETED
-            new_state.current_substate = None
+        elif event.event_type in self._STEP_EVENTS:
+            step_update = (event.event_data["step_id"], self._STEP_EVENTS[event.event_type])
 
-        elif event.event_type == EventType.WORKFLOW_FAILED:
-            new_state.current_state = WorkflowState.FAILED
-            new_state.current_substate = None
+        elif event.event_type == EventType.AGENT_ASSIGNED:
+            agent_update = (event.event_data["step_id"], event.event_data["agent_id"])
+
+        if in_place:
+            for field, value in updates.items():
+                setattr(state, field, value)
+            if step_update:
+                state.step_states[step_update[0]] = step_update[1]
+            if agent_update:
+                state.assigned_agents[agent_update[0]] = agent_update[1]
+            return state
 
-        elif event.event_type == EventType.STEP_STARTED:
-            step_id = event.event_data["step_id"]
-            new_state.step_states[step_id] = "running"
+        if step_update:
+            updates['step_states'] = {**state.step_states, step_update[0]: step_update[1]}
+        if agent_update:
+            updates['assigned_agents'] = {**state.assigned_agents, agent_update[0]: agent_update[1]}
+        return _copy_model(state, **updates)
 
-        elif event.event_type == EventType.STEP_COMPLETED:
-            step_id = event.event_data["step_id"]
-            new_state.step_states[step_id] = "completed"
+    def _record_event(self, workflow_id: str, current_state: WorkflowStateSnapshot, event_type: EventType,
+                      event_data: Dict[str, Any]) -> WorkflowStateSnapshot:
+        """Append an event, apply it to the current state and snapshot if the policy says so"""
+        event = WorkflowEvent(
+            event_id=str(uuid.uuid4()),
+            workflow_id=workflow_id,
+            event_type=event_type,
+            event_data=event_data,
+            sequence_number=0,
+            timestamp=datetime.now(timezone.utc)
+        )
 
-        elif event.event_type == EventType.STEP_FAILED:
-            step_id = event.event_data["step_id"]
-            new_state.step_states[step_id] = "failed"
+        self.event_store.append_event(workflow_id, event)
+        new_state = self._apply_event_to_state(current_state, event)
+        self._publish_state(new_state)
 
-        elif event.event_type == EventType.AGENT_ASSIGNED:
-            step_id = event.event_data["step_id"]
-            agent_id = event.event_data["agent_id"]
-            new_state.assigned_agents[step_id] = agent_id
+        events_since, bytes_since = self.event_store.pending_since_snapshot(workflow_id)
+        seconds_since = time.monotonic() - self.last_snapshot_at.get(workflow_id, 0.0)
+        if self.snapshot_policy.should_snapshot(events_since, bytes_since, seconds_since):
+            self._save_snapshot(new_state)
 
         return new_state
 
+    def _publish_state(self, state: WorkflowStateSnapshot):
+        """Make ``state`` the current state and notify listeners such as the state cache"""
+        self.active_workflows[state.workflow_id] = state
+        for listener in self.state_listeners:
+            listener(state)
+
+    def _save_snapshot(self, state: WorkflowStateSnapshot):
+        self.event_store.save_snapshot(state)
+        self.last_snapshot_at[state.workflow_id] = time.monotonic()
+        self.replay_stats['snapshots_taken'] += 1
+
     def _transition_state(self, workflow_id: str, new_state: WorkflowState, event_type: EventType, event_data: Dict[str, Any]) -> WorkflowStateSnapshot:
         """Transition workflow to new state"""
         current_state = self.get_workflow_state(workflow_id)
@@ -796,64 +1431,153 @@ class WorkflowEngine:
         if not self.state_machine.is_valid_transition(current_state.current_state, new_state, event_type):
             raise ValueError(f"Invalid transition from {current_state.current_state} to {new_state} with event {event_type}")
 
-        # Create state transition event
-        event = WorkflowEvent(
-            event_id=str(uuid.uuid4()),
-            workflow_id=workflow_id,
-            event_type=event_type,
-            event_data=event_data,
-            sequence_number=0,
-            timestamp=datetime.now(timezone.utc)
+        # Store the transition event and apply it
+        return self._record_event(workflow_id, current_state, event_type, event_data)
+
+    def _build_step_dag(self, definition: WorkflowDefinition) -> StepDAG:
+        return StepDAG(
+            definition.steps,
+            default_duration=self.default_step_duration,
+            max_parallel=definition.global_parameters.get("max_parallel_steps")
         )
 
-        # Apply event to get new state
-        new_state_snapshot = self._apply_event_to_state(current_state, event)
+    def get_step_dag(self, workflow_id: str) -> StepDAG:
+        """Step graph of a workflow, rebuilt from its creation event after a restart"""
+        step_dag = self.step_dags.get(workflow_id)
+        if step_dag is None:
+            events = self.event_store.get_events(workflow_id, 0, limit=1)
+            if not events or events[0].event_type != EventType.WORKFLOW_CREATED:
+                raise ValueError(f"Workflow {workflow_id} not found")
+            definition = WorkflowDefinition(**events[0].event_data["definition"])
+            step_dag = self.step_dags[workflow_id] = self._build_step_dag(definition)
+        return step_dag
 
-        # Store event and snapshot
-        self.event_store.append_event(workflow_id, event)
-        self.event_store.save_snapshot(new_state_snapshot)
-        self.active_workflows[workflow_id] = new_state_snapshot
+    def estimate_critical_path(self, workflow_id: str) -> Dict[str, Any]:
+        """Critical path of the whole workflow and of the steps still to run"""
+        step_dag = self.get_step_dag(workflow_id)
+        current_state = self.get_workflow_state(workflow_id)
+        completed = {step_id for step_id, status in current_state.step_states.items()
+                     if status in ("completed", "skipped")}
 
-        return new_state_snapshot
+        makespan, path = step_dag.critical_path()
+        remaining, remaining_path = step_dag.critical_path(completed)
+        total_work = sum(step_dag.durations.values())
+        return {
+            "workflow_id": workflow_id,
+            "step_count": len(step_dag.steps),
+            "critical_path": path,
+            "estimated_makespan": makespan,
+            "remaining_critical_path": remaining_path,
+            "estimated_remaining": remaining,
+            "total_work": total_work,
+            "average_parallelism": total_work / makespan if makespan else 0.0
+        }
+
+    def _schedule_steps(self, workflow_id: str):
+        """Start the workflow's step scheduler unless one is still running"""
+        scheduler = self.schedulers.get(workflow_id)
+        if scheduler is None or scheduler.done():
+            self.schedulers[workflow_id] = asyncio.create_task(self._execute_workflow_steps(workflow_id))
+
+    def _global_step_slots(self) -> asyncio.Semaphore:
+        # Semaphores bind to the loop that first waits on them
+        loop = asyncio.get_running_loop()
+        if self._step_slots_loop is not loop:
+            self._step_slots = asyncio.Semaphore(self.max_concurrent_steps)
+            self._step_slots_loop = loop
+        return self._step_slots
+
+    async def _simulate_step(self, workflow_id: str, step: WorkflowStep) -> Dict[str, Any]:
+        # Simulate step execution (in real implementation, this would delegate to agents)
+        await asyncio.sleep(self.get_step_dag(workflow_id).durations[step.step_id])
+        return {"status": "auto_completed"}
+
+    async def _run_step(self, workflow_id: str, step: WorkflowStep) -> Optional[bool]:
+        """Start, execute and complete one step
+
+        Returns None if the workflow stopped being active before the step
+        got an execution slot, so the scheduler can put it back.
+        """
+        async with self._global_step_slots():
+            with self.workflow_locks[workflow_id]:
+                current_state = self.get_workflow_state(workflow_id)
+                if current_state.current_state != WorkflowState.ACTIVE:
+                    return None
+                self._record_event(workflow_id, current_state, EventType.STEP_STARTED, {
+                    "step_id": step.step_id,
+                    "started_at": datetime.now(timezone.utc).isoformat()
+                })
+
+            self.scheduler_stats['steps_started'] += 1
+            self.scheduler_stats['running_steps'] += 1
+            self.scheduler_stats['peak_running_steps'] = max(
+                self.scheduler_stats['peak_running_steps'], self.scheduler_stats['running_steps']
+            )
+            try:
+                result = await self.step_executor(workflow_id, step)
+            except Exception as e:
+                self.fail_step(workflow_id, step.step_id, str(e))
+                return False
+            finally:
+                self.scheduler_stats['running_steps'] -= 1
+
+        self.complete_step(workflow_id, step.step_id, result or {})
+        return True
 
     async def _execute_workflow_steps(self, workflow_id: str):
-        """Execute workflow steps (simplified implementation)"""
+        """Run the workflow's steps in dependency order, independent steps concurrently
+
+        Every step waiting to run keeps a count of unfinished dependencies
+        and becomes ready when it drops to zero. Ready steps are started
+        longest-remaining-path first, up to the per-workflow limit, and
+        each step also takes one of the engine-wide execution slots. A
+        failed step fails the workflow; pausing stops new steps from
+        starting while the running ones finish.
+        """
         try:
+            step_dag = self.get_step_dag(workflow_id)
+            limit = step_dag.max_parallel or self.max_parallel_steps
             current_state = self.get_workflow_state(workflow_id)
+            finished = {step_id for step_id, status in current_state.step_states.items()
+                        if status in ("completed", "skipped")}
+
+            # Steps left "running" by an interrupted scheduler are run again
+            unmet: Dict[str, int] = {}
+            ready: List[Tuple[float, int, str]] = []
+            for position, step_id in enumerate(step_dag.topological_order):
+                if step_id in finished or current_state.step_states.get(step_id, "pending") not in ("pending", "running"):
+                    continue
+                unmet[step_id] = sum(1 for dep in step_dag.dependencies[step_id] if dep not in finished)
+                if unmet[step_id] == 0:
+                    ready.append((-step_dag.priority[step_id], position, step_id))
+            heapq.heapify(ready)
+            positions = {step_id: position for position, step_id in enumerate(step_dag.topological_order)}
+
+            running: Dict[asyncio.Task, str] = {}
+            while True:
+                while ready and len(running) < limit and \
+                        self.get_workflow_state(workflow_id).current_state == WorkflowState.ACTIVE:
+                    _, _, step_id = heapq.heappop(ready)
+                    running[asyncio.create_task(self._run_step(workflow_id, step_dag.steps[step_id]))] = step_id
+                if not running:
+                    break
 
-            # Find ready steps (no dependencies or dependencies completed)
-            ready_steps = []
-            for step_id, status in current_state.step_states.items():
-                if status == "pending":
-                    # Check if all dependencies are completed
-                    # This would need the workflow definition to check dependencies
-                    ready_steps.append(step_id)
-
-            # Start ready steps
-            for step_id in ready_steps[:1]:  # Start one step at a time for simplicity
-                current_state.step_states[step_id] = "running"
-
-                # Create step started event
-                event = WorkflowEvent(
-                    event_id=str(uuid.uuid4()),
-                    workflow_id=workflow_id,
-                    event_type=EventType.STEP_STARTED,
-                    event_data={
-                        "step_id": step_id,
-                        "started_at": datetime.now(timezone.utc).isoformat()
-                    },
-                    sequence_number=0,
-                    timestamp=datetime.now(timezone.utc)
-                )
-
-                self.event_store.append_event(workflow_id, event)
-                self.event_store.save_snapshot(current_state)
-
-                # Simulate step execution (in real implementation, this would delegate to agents)
-                await asyncio.sleep(1)
-
-                # Auto-complete step for demo (in real implementation, agents would complete steps)
-                self.complete_step(workflow_id, step_id, {"status": "auto_completed"})
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = running.pop(task)
+                    try:
+                        outcome = task.result()
+                    except Exception as e:
+                        logging.error(f"Error executing step {step_id} of workflow {workflow_id}: {e}")
+                        continue
+                    if outcome is None:
+                        heapq.heappush(ready, (-step_dag.priority[step_id], positions[step_id], step_id))
+                    elif outcome:
+                        for successor in step_dag.successors[step_id]:
+                            if successor in unmet:
+                                unmet[successor] -= 1
+                                if unmet[successor] == 0:
+                                    heapq.heappush(ready, (-step_dag.priority[successor], positions[successor], successor))
 
         except Exception as e:
             logging.error(f"Error executing workflow steps: {e}")
@@ -1122,36 +1846,49 @@ class WorkflowRecoveryManager:
 
 # Performance Optimization - State Caching and Indexing
 class WorkflowStateCache:
-    """Multi-tier caching for workflow state with performance optimization"""
+    """Multi-tier caching for workflow state with performance optimization
 
-    def __init__(self):
-        self.memory_cache = {}  # Hot workflows (LRU simulation)
-        self.memory_cache_order = deque()  # For LRU ordering
-        self.max_memory_cache_size = 1000
+    The memory tier is an O(1) LRU (OrderedDict). Secondary indexes are
+    kept per workflow, so an update moves the workflow out of its previous
+    status bucket and off agents it no longer uses. The temporal index
+    holds one (updated_at, workflow_id) entry per workflow in sorted order,
+    maintained with bisect, and answers time-range queries.
+    """
+
+    def __init__(self, max_memory_cache_size: int = 1000, max_temporal_entries: int = 10000):
+        self.memory_cache: OrderedDict = OrderedDict()  # Hot workflows, least recently used first
+        self.max_memory_cache_size = max_memory_cache_size
+        self.max_temporal_entries = max_temporal_entries
 
         # Redis cache simulation (would be actual Redis in production)
         self.redis_cache = {}  # Warm workflows
 
         # Database indices for fast queries
         self.database_indices = {
-            'workflow_status': defaultdict(list),  # status -> [workflow_ids]
-            'agent_assignments': defaultdict(list),  # agent_id -> [workflow_ids]
-            'temporal_queries': []  # [(timestamp, workflow_id)]
+            'workflow_status': defaultdict(set),  # status -> {workflow_ids}
+            'agent_assignments': defaultdict(set),  # agent_id -> {workflow_ids}
+            'temporal_queries': []  # sorted [(updated_at, workflow_id)]
         }
+        self.indexed_status: Dict[str, str] = {}  # workflow_id -> status bucket it is in
+        self.indexed_agents: Dict[str, Set[str]] = {}  # workflow_id -> agents it is indexed under
+        self.indexed_updated_at: Dict[str, datetime] = {}  # workflow_id -> temporal index key
+
+        self.stats = {'memory_hits': 0, 'redis_hits': 0, 'database_hits': 0, 'misses': 0, 'evictions': 0}
 
     def get_workflow_state(self, workflow_id: str) -> Optional[WorkflowStateSnapshot]:
         """Retrieve workflow state with multi-tier caching"""
 
         # Check memory cache first
-        if workflow_id in self.memory_cache:
-            # Move to end for LRU
-            self.memory_cache_order.remove(workflow_id)
-            self.memory_cache_order.append(workflow_id)
-            return self.memory_cache[workflow_id]
+        state = self.memory_cache.get(workflow_id)
+        if state is not None:
+            self.memory_cache.move_to_end(workflow_id)
+            self.stats['memory_hits'] += 1
+            return state
 
         # Check Redis cache
-        if workflow_id in self.redis_cache:
-            state = self.redis_cache[workflow_id]
+        state = self.redis_cache.get(workflow_id)
+        if state is not None:
+            self.stats['redis_hits'] += 1
             # Promote to memory cache
             self.put_memory_cache(workflow_id, state)
             return state
@@ -1160,24 +1897,30 @@ class WorkflowStateCache:
         state = self.load_state_from_database(workflow_id)
 
         if state:
+            self.stats['database_hits'] += 1
             # Cache at appropriate levels
             self.redis_cache[workflow_id] = state
             self.put_memory_cache(workflow_id, state)
+        else:
+            self.stats['misses'] += 1
 
         return state
 
     def put_memory_cache(self, workflow_id: str, state: WorkflowStateSnapshot):
         """Put state in memory cache with LRU eviction"""
-        if workflow_id in self.memory_cache:
-            self.memory_cache_order.remove(workflow_id)
-
         self.memory_cache[workflow_id] = state
-        self.memory_cache_order.append(workflow_id)
+        self.memory_cache.move_to_end(workflow_id)
 
         # Evict if over capacity
         while len(self.memory_cache) > self.max_memory_cache_size:
-            oldest = self.memory_cache_order.popleft()
-            del self.memory_cache[oldest]
+            self.memory_cache.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def update_workflow_state(self, state: WorkflowStateSnapshot):
+        """Write-through for state changes published by the workflow engine"""
+        self.redis_cache[state.workflow_id] = state
+        self.put_memory_cache(state.workflow_id, state)
+        self.update_indices(state.workflow_id, state)
 
     def load_state_from_database(self, workflow_id: str) -> Optional[WorkflowStateSnapshot]:
         """Load state from database (simulated)"""
@@ -1186,41 +1929,84 @@ class WorkflowStateCache:
 
     def update_indices(self, workflow_id: str, state: WorkflowStateSnapshot):
         """Update database indices for fast queries"""
-        # Update status index
+        # Move between status buckets
         status = state.current_state.value
-        if workflow_id not in self.database_indices['workflow_status'][status]:
-            self.database_indices['workflow_status'][status].append(workflow_id)
-
-        # Update agent assignment index
-        for step_id, agent_id in state.assigned_agents.items():
-            if agent_id and workflow_id not in self.database_indices['agent_assignments'][agent_id]:
-                self.database_indices['agent_assignments'][agent_id].append(workflow_id)
-
-        # Update temporal index
-        self.database_indices['temporal_queries'].append((state.updated_at, workflow_id))
-
-        # Keep temporal index sorted and limited
-        self.database_indices['temporal_queries'].sort(key=lambda x: x[0])
-        if len(self.database_indices['temporal_queries']) > 10000:
-            self.database_indices['temporal_queries'] = self.database_indices['temporal_queries'][-10000:]
-
-    def query_workflows_by_status(self, status: WorkflowState) -> List[str]:
-        """Fast query workflows by status using index"""
-        return self.database_indices['workflow_status'][status.value].copy()
+        previous_status = self.indexed_status.get(workflow_id)
+        if previous_status != status:
+            status_index = self.database_indices['workflow_status']
+            if previous_status is not None:
+                status_index[previous_status].discard(workflow_id)
+            status_index[status].add(workflow_id)
+            self.indexed_status[workflow_id] = status
+
+        # Sync agent assignment index with the agents the workflow uses now
+        agents = {agent_id for agent_id in state.assigned_agents.values() if agent_id}
+        previous_agents = self.indexed_agents.get(workflow_id, set())
+        if agents != previous_agents:
+            agent_index = self.database_indices['agent_assignments']
+            for agent_id in previous_agents - agents:
+                agent_index[agent_id].discard(workflow_id)
+                if not agent_index[agent_id]:
+                    del agent_index[agent_id]
+            for agent_id in agents - previous_agents:
+                agent_index[agent_id].add(workflow_id)
+            self.indexed_agents[workflow_id] = agents
+
+        # Re-key the workflow's temporal index entry
+        temporal_index = self.database_indices['temporal_queries']
+        previous_updated_at = self.indexed_updated_at.get(workflow_id)
+        if previous_updated_at is not None:
+            position = bisect_left(temporal_index, (previous_updated_at, workflow_id))
+            if position < len(temporal_index) and temporal_index[position] == (previous_updated_at, workflow_id):
+                del temporal_index[position]
+        insort(temporal_index, (state.updated_at, workflow_id))
+        self.indexed_updated_at[workflow_id] = state.updated_at
+
+        # Keep the temporal index limited to the most recently updated workflows
+        if len(temporal_index) > self.max_temporal_entries:
+            for _, expired_id in temporal_index[:len(temporal_index) - self.max_temporal_entries]:
+                del self.indexed_updated_at[expired_id]
+            del temporal_index[:len(temporal_index) - self.max_temporal_entries]
+
+    def query_workflows_by_status(self, status: WorkflowState, limit: Optional[int] = None) -> List[str]:
+        """Fast query workflows by status using index
+
+        With ``limit``, returns the most recently updated workflows first.
+        """
+        workflow_ids = self.database_indices['workflow_status'].get(status.value, ())
+        if limit is None:
+            return list(workflow_ids)
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        return heapq.nlargest(limit, workflow_ids, key=lambda wf_id: self.indexed_updated_at.get(wf_id, epoch))
 
     def query_workflows_by_agent(self, agent_id: str) -> List[str]:
         """Fast query workflows by assigned agent using index"""
-        return self.database_indices['agent_assignments'][agent_id].copy()
+        return list(self.database_indices['agent_assignments'].get(agent_id, ()))
+
+    def query_workflows_by_time(self, start: Optional[datetime] = None,
+                                end: Optional[datetime] = None) -> List[str]:
+        """Workflows last updated in [start, end], oldest first"""
+        temporal_index = self.database_indices['temporal_queries']
+        low = bisect_left(temporal_index, (start,)) if start is not None else 0
+        high = bisect_right(temporal_index, (end, "\U0010ffff")) if end is not None else len(temporal_index)
+        return [workflow_id for _, workflow_id in temporal_index[low:high]]
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics"""
+        lookups = (self.stats['memory_hits'] + self.stats['redis_hits']
+                   + self.stats['database_hits'] + self.stats['misses'])
         return {
             "memory_cache_size": len(self.memory_cache),
             "memory_cache_capacity": self.max_memory_cache_size,
             "redis_cache_size": len(self.redis_cache),
             "status_index_size": sum(len(workflows) for workflows in self.database_indices['workflow_status'].values()),
             "agent_index_size": sum(len(workflows) for workflows in self.database_indices['agent_assignments'].values()),
-            "temporal_index_size": len(self.database_indices['temporal_queries'])
+            "temporal_index_size": len(self.database_indices['temporal_queries']),
+            **self.stats,
+            "lookups": lookups,
+            "memory_hit_ratio": self.stats['memory_hits'] / lookups if lookups else 0.0,
+            "redis_hit_ratio": self.stats['redis_hits'] / lookups if lookups else 0.0,
+            "overall_hit_ratio": (lookups - self.stats['misses']) / lookups if lookups else 0.0
         }
 
 # Distributed State Consistency Manager
@@ -1331,14 +2117,27 @@ class DistributedStateConsistency:
         # Implementation for concurrent modification resolution
         return False
 
-# Global instances with advanced components
-workflow_engine = WorkflowEngine()
+# Global instances with advanced components; the event log is opened at startup
+workflow_engine = WorkflowEngine(WorkflowEventStore(open_log=False))
 dependency_manager = WorkflowDependencyManager()
 multi_agent_coordinator = MultiAgentWorkflowCoordinator()
 conflict_resolver = WorkflowConflictResolver()
 recovery_manager = WorkflowRecoveryManager()
 state_cache = WorkflowStateCache()
 consistency_manager = DistributedStateConsistency()
+workflow_engine.state_listeners.append(state_cache.update_workflow_state)
+
+@app.on_event("startup")
+async def recover_workflow_state():
+    """Open the event log and restore the workflows persisted in it"""
+    workflow_engine.event_store.open()
+    recovered = workflow_engine.recover_workflows()
+    logging.info(f"Recovered {recovered} workflows from the event log")
+
+@app.on_event("shutdown")
+async def close_event_store():
+    """Flush pending event log commits and stop the commit thread"""
+    workflow_engine.event_store.close()
 
 # API Models for Requests/Responses
 class WorkflowCreateRequest(BaseModel):
@@ -1422,15 +2221,16 @@ async def list_workflows(status: Optional[WorkflowState] = None, limit: int = 10
     """List workflows with optional filtering"""
     try:
         if status:
-            workflow_ids = state_cache.query_workflows_by_status(status)
+            # Served from the status index, most recently updated first
+            workflow_ids = state_cache.query_workflows_by_status(status, limit=limit)
             workflows = []
-            for wf_id in workflow_ids[:limit]:
-                state = state_cache.get_workflow_state(wf_id)
+            for wf_id in workflow_ids:
+                state = state_cache.get_workflow_state(wf_id) or workflow_engine.active_workflows.get(wf_id)
                 if state:
-                    workflows.append(asdict(state))
+                    workflows.append(_model_dump(state))
         else:
             workflows = [
-                asdict(wf) for wf in list(workflow_engine.active_workflows.values())[:limit]
+                _model_dump(wf) for wf in list(workflow_engine.active_workflows.values())[:limit]
             ]
 
         return {
@@ -1462,7 +2262,7 @@ async def get_workflow(workflow_id: str):
         coordination_state = multi_agent_coordinator.active_coordinations.get(workflow_id)
 
         return {
-            "workflow": asdict(workflow_state),
+            "workflow": _model_dump(workflow_state),
             "dependencies": [asdict(dep) for dep in dependencies],
             "coordination": asdict(coordination_state) if coordination_state else None,
             "cache_hit": workflow_state is not None
@@ -1492,10 +2292,11 @@ async def update_workflow(workflow_id: str, request: WorkflowUpdateRequest):
         # Update agent assignments if provided
         if request.agent_assignments:
             for step_id, agent_id in request.agent_assignments.items():
-                workflow.assigned_agents[step_id] = agent_id
+                workflow_engine.assign_agent_to_step(workflow_id, step_id, agent_id)
+            workflow = workflow_engine.get_workflow_state(workflow_id)
 
         # Update cache
-        state_cache.update_indices(workflow_id, workflow)
+        state_cache.update_workflow_state(workflow_engine.active_workflows.get(workflow_id, workflow))
 
         return {
             "success": True,
@@ -1564,6 +2365,16 @@ async def get_workflow_dependencies(workflow_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/workflows/{workflow_id}/critical-path")
+async def get_workflow_critical_path(workflow_id: str):
+    """Estimate makespan from the critical path of the workflow's step graph"""
+    try:
+        return workflow_engine.estimate_critical_path(workflow_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/v1/workflows/{workflow_id}/coordination")
 async def setup_multi_agent_coordination(workflow_id: str, request: CoordinationRequest):
     """Setup multi-agent coordination for workflow"""
@@ -1701,9 +2512,9 @@ async def get_agent_workflows(agent_id: str):
 
         workflows = []
         for wf_id in workflow_ids:
-            state = state_cache.get_workflow_state(wf_id)
+            state = state_cache.get_workflow_state(wf_id) or workflow_engine.active_workflows.get(wf_id)
             if state:
-                workflows.append(asdict(state))
+                workflows.append(_model_dump(state))
 
         return {
             "agent_id": agent_id,
@@ -9,6 +9,9 @@ import asyncio
 import logging
 import sys
 import os
+import socketserver
+import threading
+import time
 from unittest.mock import Mock, patch
 
 # Add the services directory to Python path
@@ -42,6 +45,213 @@ def mock_redis():
         mock.return_value = mock_client
         yield mock_client
 
+class RedisStandIn:
+    """Minimal in-process Redis (RESP2) server for cache tests and benchmarks.
+    
+    Serves connections from its own threads, so a blocking client cannot
+    deadlock the event loop that is driving it, and sleeps ``latency``
+    seconds per network read to emulate a real round trip. Pipelined
+    commands that arrive in one read therefore pay the latency once.
+    """
+    
+    def __init__(self, latency=0.001):
+        self.latency = latency
+        self.data = {}
+        self.lock = threading.RLock()
+        self.commands_processed = 0
+        self.round_trips = 0
+        self._connection = threading.local()
+        standin = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                buffer = b""
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    replies = []
+                    while True:
+                        parsed = standin._parse(buffer)
+                        if parsed is None:
+                            break
+                        args, buffer = parsed
+                        replies.append(standin._execute(args))
+                    if replies:
+                        standin.round_trips += 1
+                        if standin.latency:
+                            time.sleep(standin.latency)
+                        self.request.sendall(b"".join(replies))
+        
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"redis://{host}:{port}/0"
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    @staticmethod
+    def _parse(buffer):
+        """Parse one RESP array command; return (args, rest) or None."""
+        if not buffer.startswith(b"*"):
+            return None
+        end = buffer.find(b"\r\n")
+        if end < 0:
+            return None
+        count, pos, args = int(buffer[1:end]), end + 2, []
+        for _ in range(count):
+            end = buffer.find(b"\r\n", pos)
+            if end < 0:
+                return None
+            length = int(buffer[pos + 1:end])
+            start = end + 2
+            if len(buffer) < start + length + 2:
+                return None
+            args.append(buffer[start:start + length])
+            pos = start + length + 2
+        return args, buffer[pos:]
+    
+    def _bulk(self, value):
+        if value is None:
+            # RESP3 clients expect the dedicated null type
+            return b"_\r\n" if getattr(self._connection, "proto", 2) == 3 else b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] < time.time():
+            del self.data[key]
+            entry = None
+        return entry
+    
+    def _execute(self, args):
+        command = args[0].upper()
+        self.commands_processed += 1
+        queued = getattr(self._connection, "queue", None)
+        if command == b"MULTI":
+            self._connection.queue = []
+            return b"+OK\r\n"
+        if command == b"DISCARD":
+            self._connection.queue = None
+            return b"+OK\r\n"
+        if command == b"EXEC":
+            self._connection.queue = None
+            with self.lock:
+                replies = [self._execute(queued_args) for queued_args in queued or []]
+            return b"*%d\r\n%s" % (len(replies), b"".join(replies))
+        if queued is not None:
+            queued.append(args)
+            return b"+QUEUED\r\n"
+        with self.lock:
+            if command == b"PING":
+                return b"+PONG\r\n"
+            if command == b"HELLO":
+                # Plain RESP2 replies are also valid RESP3, so echo the
+                # requested protocol version back to the client
+                proto = int(args[1]) if len(args) > 1 else 2
+                self._connection.proto = proto
+                return (b"%3\r\n" + self._bulk(b"server") + self._bulk(b"redis")
+                        + self._bulk(b"version") + self._bulk(b"7.2.0")
+                        + self._bulk(b"proto") + b":%d\r\n" % proto)
+            if command == b"GET":
+                entry = self._live(args[1])
+                return self._bulk(entry[0] if entry else None)
+            if command == b"MGET":
+                replies = [self._bulk(e[0] if e else None) for e in map(self._live, args[1:])]
+                return b"*%d\r\n%s" % (len(replies), b"".join(replies))
+            if command == b"SET":
+                expiry = None
+                options = [a.upper() for a in args[3:]]
+                if b"EX" in options:
+                    expiry = time.time() + int(args[3 + options.index(b"EX") + 1])
+                if b"PX" in options:
+                    expiry = time.time() + int(args[3 + options.index(b"PX") + 1]) / 1000
+                self.data[args[1]] = [args[2], expiry]
+                return b"+OK\r\n"
+            if command == b"SETEX":
+                self.data[args[1]] = [args[3], time.time() + int(args[2])]
+                return b"+OK\r\n"
+            if command == b"MSET":
+                for i in range(1, len(args), 2):
+                    self.data[args[i]] = [args[i + 1], None]
+                return b"+OK\r\n"
+            if command in (b"DEL", b"UNLINK"):
+                removed = sum(1 for k in args[1:] if self.data.pop(k, None) is not None)
+                return b":%d\r\n" % removed
+            if command == b"EXISTS":
+                return b":%d\r\n" % sum(1 for k in args[1:] if self._live(k))
+            if command == b"EXPIRE":
+                entry = self._live(args[1])
+                expiry = time.time() + int(args[2])
+                option = args[3].upper() if len(args) > 3 else None
+                applies = entry is not None and (
+                    option is None
+                    or (option == b"NX" and entry[1] is None)
+                    or (option == b"GT" and entry[1] is not None and expiry > entry[1])
+                )
+                if applies:
+                    entry[1] = expiry
+                return b":%d\r\n" % (1 if applies else 0)
+            if command == b"PERSIST":
+                entry = self._live(args[1])
+                if entry is None or entry[1] is None:
+                    return b":0\r\n"
+                entry[1] = None
+                return b":1\r\n"
+            if command == b"TTL":
+                entry = self._live(args[1])
+                if entry is None:
+                    return b":-2\r\n"
+                if entry[1] is None:
+                    return b":-1\r\n"
+                return b":%d\r\n" % int(entry[1] - time.time())
+            if command == b"PTTL":
+                entry = self._live(args[1])
+                if entry is None:
+                    return b":-2\r\n"
+                if entry[1] is None:
+                    return b":-1\r\n"
+                return b":%d\r\n" % int((entry[1] - time.time()) * 1000)
+            if command == b"SADD":
+                entry = self._live(args[1]) or self.data.setdefault(args[1], [set(), None])
+                before = len(entry[0])
+                entry[0].update(args[2:])
+                return b":%d\r\n" % (len(entry[0]) - before)
+            if command == b"SREM":
+                entry = self._live(args[1])
+                if entry is None:
+                    return b":0\r\n"
+                before = len(entry[0])
+                entry[0].difference_update(args[2:])
+                return b":%d\r\n" % (before - len(entry[0]))
+            if command == b"SMEMBERS":
+                entry = self._live(args[1])
+                members = [self._bulk(m) for m in (entry[0] if entry else ())]
+                return b"*%d\r\n%s" % (len(members), b"".join(members))
+            if command == b"SCARD":
+                entry = self._live(args[1])
+                return b":%d\r\n" % (len(entry[0]) if entry else 0)
+            # CLIENT SETINFO, SELECT and other housekeeping commands
+            return b"+OK\r\n"
+
+@pytest.fixture
+def redis_standin():
+    """Local Redis stand-in server with emulated network latency"""
+    server = RedisStandIn().start()
+    yield server
+    server.stop()
+
 @pytest.fixture
 def mock_database():
     """Mock database session for testing"""
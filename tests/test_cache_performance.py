@@ -0,0 +1,671 @@
+#!/usr/bin/env python3
+"""
+Cache Layer Performance Tests
+Functional checks and benchmarks for ai_automation_platform.core.caching
+"""
+
+import pytest
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_automation_platform.core.caching import (
+    AsyncRedisBackend,
+    BoundedMemoryBackend,
+    CacheManager,
+    InMemoryBackend,
+    RedisBackend,
+    TieredBackend,
+    cached,
+)
+from ai_automation_platform.core.serialization import CacheCodec, SchemaVersionMismatch
+from pydantic import BaseModel
+
+class AgentPayload(BaseModel):
+    """Mirror of the agent-selection service Agent record"""
+    agent_id: str
+    name: str
+    agent_type: str
+    status: str
+    capabilities: Dict[str, float]
+    current_load: float
+    location: str
+    last_performance: Dict[str, float]
+    fatigue_level: float
+    energy_efficiency: float
+    cost_per_hour: float
+    safety_rating: float
+
+class AssignmentPayload(BaseModel):
+    """Mirror of the agent-selection service Assignment record"""
+    assignment_id: str
+    task_id: str
+    agent_id: str
+    confidence_score: float
+    estimated_completion_time: int
+    quality_prediction: float
+    cost_estimate: float
+    safety_score: float
+    energy_efficiency: float
+    created_at: datetime
+
+def _agent_payloads(count, seed=7):
+    rng = random.Random(seed)
+    task_types = ["assembly", "inspection", "welding", "packaging", "data_analysis",
+                  "quality_control", "material_handling", "maintenance"]
+    return [
+        AgentPayload(
+            agent_id=f"agent_{i:05d}",
+            name=f"Agent {i}",
+            agent_type=rng.choice(["robot", "human", "ai_system", "hybrid"]),
+            status="available",
+            capabilities={t: round(rng.random(), 3) for t in task_types},
+            current_load=rng.random(),
+            location=f"facility_{i % 4}",
+            last_performance={t: round(rng.random(), 3) for t in task_types[:4]},
+            fatigue_level=rng.random(),
+            energy_efficiency=rng.random(),
+            cost_per_hour=rng.uniform(10, 120),
+            safety_rating=rng.random(),
+        )
+        for i in range(count)
+    ]
+
+def _assignment_payloads(count, seed=11):
+    rng = random.Random(seed)
+    return [
+        AssignmentPayload(
+            assignment_id=f"assign_{i:06d}",
+            task_id=f"task_{i:06d}",
+            agent_id=f"agent_{rng.randrange(500):05d}",
+            confidence_score=rng.random(),
+            estimated_completion_time=rng.randrange(5, 240),
+            quality_prediction=rng.random(),
+            cost_estimate=rng.uniform(5, 500),
+            safety_score=rng.random(),
+            energy_efficiency=rng.random(),
+            created_at=datetime.now(timezone.utc),
+        )
+        for i in range(count)
+    ]
+
+async def _concurrent_gets(manager, keys, concurrency):
+    """Issue one cache read per simulated request, `concurrency` at a time
+
+    Returns the results, the throughput and the longest the event loop
+    went without running a heartbeat task meanwhile.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    longest_stall = 0.0
+    done = False
+
+    async def handle_request(key):
+        async with semaphore:
+            return await manager.get(key)
+
+    async def heartbeat():
+        nonlocal longest_stall
+        while not done:
+            tick = time.perf_counter()
+            await asyncio.sleep(0)
+            longest_stall = max(longest_stall, time.perf_counter() - tick)
+
+    beat = asyncio.ensure_future(heartbeat())
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*[handle_request(key) for key in keys])
+    elapsed = time.perf_counter() - start_time
+    done = True
+    await beat
+    return results, len(keys) / elapsed, longest_stall
+
+class TestAsyncRedisBackend:
+    """AsyncRedisBackend behaviour against the local Redis stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_basic_operations(self, redis_standin):
+        """get/set/exists/ttl/delete round-trip through the async client"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            await manager.set("agent:1", {"id": "agent-1", "load": 0.4}, expire=60)
+
+            assert await manager.get("agent:1") == {"id": "agent-1", "load": 0.4}
+            assert await manager.backend.exists("agent:1")
+            assert 0 < await manager.backend.ttl("agent:1") <= 60
+
+            await manager.delete("agent:1")
+            assert await manager.get("agent:1", default="missing") == "missing"
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_mget_mset_single_round_trip(self, redis_standin):
+        """mset and mget each cost one round trip regardless of key count"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            values = {f"task:{i}": {"priority": i} for i in range(100)}
+            await manager.set("warmup", 1)
+
+            round_trips = redis_standin.round_trips
+            await manager.mset(values, expire=60)
+            results = await manager.mget(list(values) + ["task:missing"], default={})
+
+            assert redis_standin.round_trips - round_trips == 2
+            assert results[:100] == list(values.values())
+            assert results[100] == {}
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_batches_mixed_operations(self, redis_standin):
+        """Pipelined operations are executed in order in one round trip"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            await manager.set("warmup", 1)
+            round_trips = redis_standin.round_trips
+
+            async with manager.pipeline() as pipe:
+                pipe.set("a", [1, 2, 3], expire=30)
+                pipe.get("a")
+                pipe.delete("a")
+                pipe.get("a")
+
+            assert redis_standin.round_trips - round_trips == 1
+            assert pipe.results == [None, [1, 2, 3], None, None]
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_in_memory_backend_batch_fallbacks(self):
+        """Backends without native batching fall back to per-key operations"""
+        manager = CacheManager(InMemoryBackend())
+
+        await manager.mset({"x": 1, "y": 2})
+        assert await manager.mget(["x", "y", "z"]) == [1, 2, None]
+
+        results = await manager.pipeline().set("z", 3).get("z").execute()
+        assert results == [None, 3]
+
+class TestBoundedMemoryBackend:
+    """Capacity limits, eviction policies and expiry of the bounded tier"""
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_by_entry_count(self):
+        """The least recently used key is evicted first"""
+        backend = BoundedMemoryBackend(max_entries=3, eviction="lru", sweep_interval=None)
+        for key in ("a", "b", "c"):
+            await backend.set(key, b"1")
+        await backend.get("a")
+        await backend.set("d", b"1")
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == b"1"
+        assert backend.stats()["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lfu_eviction_keeps_frequent_keys(self):
+        """The least frequently used key is evicted first"""
+        backend = BoundedMemoryBackend(max_entries=3, eviction="lfu", sweep_interval=None)
+        for key in ("a", "b", "c"):
+            await backend.set(key, b"1")
+        for _ in range(3):
+            await backend.get("a")
+            await backend.get("c")
+        await backend.set("d", b"1")
+
+        assert await backend.exists("a") and await backend.exists("c")
+        assert not await backend.exists("b")
+
+    @pytest.mark.asyncio
+    async def test_tinylfu_rejects_one_off_scan(self):
+        """A scan of cold keys does not flush the hot working set"""
+        backend = BoundedMemoryBackend(max_entries=10, eviction="tinylfu", sweep_interval=None)
+        hot_keys = [f"hot:{i}" for i in range(10)]
+        for key in hot_keys:
+            await backend.set(key, b"1")
+            for _ in range(5):
+                await backend.get(key)
+
+        for i in range(100):
+            await backend.set(f"scan:{i}", b"1")
+
+        assert all([await backend.exists(key) for key in hot_keys])
+        assert backend.stats()["rejections"] == 100
+
+    @pytest.mark.asyncio
+    async def test_byte_size_accounting(self):
+        """Total key and value bytes never exceed max_bytes"""
+        backend = BoundedMemoryBackend(max_entries=1000, max_bytes=1000, sweep_interval=None)
+        for i in range(50):
+            await backend.set(f"k{i:03d}", b"x" * 96)
+
+        stats = backend.stats()
+        assert stats["bytes"] <= 1000
+        assert stats["entries"] == 10
+        assert stats["bytes"] == 10 * (4 + 96)
+
+        await backend.set("too-big", b"x" * 2000)
+        assert await backend.get("too-big") is None
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper_removes_unread_expired_keys(self):
+        """Expired entries are reclaimed without being read"""
+        backend = BoundedMemoryBackend(sweep_interval=0.05)
+        try:
+            await backend.set("short", b"x" * 100, expire=0)
+            await backend.set("long", b"x", expire=60)
+            await asyncio.sleep(0.15)
+
+            stats = backend.stats()
+            assert stats["entries"] == 1
+            assert stats["expirations"] == 1
+        finally:
+            await backend.close()
+
+    @pytest.mark.asyncio
+    async def test_expiry_heap_stays_bounded_under_overwrites(self):
+        """Stale heap records from overwritten keys are compacted away"""
+        backend = BoundedMemoryBackend(sweep_interval=None)
+        for i in range(20_000):
+            await backend.set(f"hot:{i % 10}", b"1", expire=60)
+
+        assert len(backend._expiry_heap) <= BoundedMemoryBackend.HEAP_COMPACTION_MIN
+        await backend.set("short", b"1", expire=0)
+        assert backend.sweep_expired() == 1
+        assert backend.stats()["entries"] == 10
+
+    @pytest.mark.asyncio
+    async def test_tiered_read_through(self, redis_standin):
+        """L1 misses are filled from Redis and then served locally"""
+        l2 = AsyncRedisBackend(redis_standin.url)
+        manager = CacheManager(TieredBackend(BoundedMemoryBackend(sweep_interval=None), l2))
+        try:
+            await CacheManager(l2).set("agent:7", {"status": "idle"})
+
+            assert await manager.get("agent:7") == {"status": "idle"}
+            commands = redis_standin.commands_processed
+            assert await manager.get("agent:7") == {"status": "idle"}
+            assert redis_standin.commands_processed == commands
+            assert manager.stats()["l1"]["hits"] == 1
+
+            await manager.delete("agent:7")
+            assert await l2.get("agent:7") is None
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_tiered_fill_never_outlives_l2(self, redis_standin):
+        """L1 fills are capped by the remaining L2 TTL on every read path"""
+        l2 = AsyncRedisBackend(redis_standin.url)
+        l1 = BoundedMemoryBackend(sweep_interval=None)
+        tiered = TieredBackend(l1, l2, l1_ttl=60)
+        try:
+            await l2.set("short", b"1", expire=5)
+            await l2.set("forever", b"2")
+            await l2._get_redis().set("expiring", b"3", px=500)
+
+            assert await tiered.get("short") == b"1"
+            assert 0 < await l1.ttl("short") <= 5
+            assert await tiered.mget(["forever", "expiring"]) == [b"2", b"3"]
+            assert 5 < await l1.ttl("forever") <= 60
+            assert await l1.get("expiring") is None
+
+            l1.clear()
+            assert await tiered.execute_pipeline([("get", ("short",)), ("get", ("expiring",))]) == [b"1", b"3"]
+            assert 0 < await l1.ttl("short") <= 5
+            assert await l1.get("expiring") is None
+        finally:
+            await tiered.close()
+
+class TestTagInvalidation:
+    """Set-based tag indexes and batched tag invalidation"""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tag_group_in_memory(self):
+        """Every key under any tag in the group is invalidated"""
+        manager = CacheManager(BoundedMemoryBackend(sweep_interval=None))
+        await manager.set("agent:1", 1, tags=["agents", "site:a"])
+        await manager.set("agent:2", 2, tags=["agents"])
+        await manager.set("task:1", 3, tags=["tasks", "site:a"])
+        await manager.set("task:2", 4, tags=["tasks"])
+
+        invalidated = await manager.invalidate_tags(["agents", "site:a"])
+
+        assert invalidated == 3
+        assert await manager.mget(["agent:1", "agent:2", "task:1", "task:2"]) == [None, None, None, 4]
+        assert await manager.tag_members("tasks") == {"task:2"}
+
+    @pytest.mark.asyncio
+    async def test_clear_drops_in_memory_tags(self):
+        """Clearing the plain in-memory backend also forgets its tags"""
+        manager = CacheManager(InMemoryBackend())
+        await manager.set("agent:1", 1, tags=["agents"])
+
+        await manager.clear()
+
+        assert await manager.get("agent:1") is None
+        assert await manager.tag_members("agents") == set()
+
+    @pytest.mark.asyncio
+    async def test_evicted_keys_leave_memory_tag_index(self):
+        """Evicted and deleted keys are dropped from their tags"""
+        manager = CacheManager(BoundedMemoryBackend(max_entries=2, sweep_interval=None))
+        for i in range(5):
+            await manager.set(f"k{i}", i, tags=["all"])
+        await manager.delete("k4")
+
+        assert await manager.tag_members("all") == {"k3"}
+
+    @pytest.mark.asyncio
+    async def test_redis_tag_group_invalidation_round_trips(self, redis_standin):
+        """Invalidating a tag group costs a fixed number of round trips"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            await manager.mset({f"agent:{i}": i for i in range(1000)}, expire=60, tags=["agents"])
+            await manager.mset({f"task:{i}": i for i in range(1000)}, expire=60, tags=["tasks"])
+            await manager.set("other", 1)
+
+            round_trips = redis_standin.round_trips
+            invalidated = await manager.invalidate_tags(["agents", "tasks", "missing"])
+
+            assert invalidated == 2000
+            assert redis_standin.round_trips - round_trips == 2
+            assert await manager.mget(["agent:0", "task:999", "other"]) == [None, None, 1]
+            assert await manager.tag_members("agents") == set()
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_tag_set_outlives_its_members(self, redis_standin):
+        """A tag set keeps the longest TTL of the keys added to it"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            await manager.set("long", 1, expire=600, tags=["t"])
+            await manager.set("short", 2, expire=5, tags=["t"])
+
+            assert await manager.backend.ttl("cache_tag:t") > 500
+
+            # A key without expiry keeps the set alive past any later TTL
+            await manager.set("pinned", 3, tags=["p"])
+            await manager.set("brief", 4, expire=5, tags=["p"])
+            assert await manager.backend.ttl("cache_tag:p") > 600
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tag_writers_lose_nothing(self, redis_standin):
+        """Concurrent sets on one tag all land in the index"""
+        manager = CacheManager(AsyncRedisBackend(redis_standin.url))
+        try:
+            await asyncio.gather(*[
+                manager.set(f"agent:{i}", i, expire=60, tags=["agents"]) for i in range(300)
+            ])
+
+            assert len(await manager.tag_members("agents")) == 300
+        finally:
+            await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_tagging_cost_is_linear(self):
+        """Tagging cost per key stays flat from 10k to 200k tagged entries"""
+        async def tag_keys(count):
+            manager = CacheManager(BoundedMemoryBackend(max_entries=count, max_bytes=1 << 30, sweep_interval=None))
+            start_time = time.perf_counter()
+            for i in range(count):
+                await manager.set(f"entry:{i}", i, tags=["bulk"])
+            per_key_us = (time.perf_counter() - start_time) / count * 1e6
+            start_time = time.perf_counter()
+            assert await manager.invalidate_tags(["bulk"]) == count
+            return per_key_us, (time.perf_counter() - start_time) * 1000
+
+        small_us, _ = await tag_keys(10_000)
+        large_us, invalidate_ms = await tag_keys(200_000)
+
+        print("\n🏷️  Tag Index Scaling:")
+        print(f"   10k tagged keys:   {small_us:6.2f} µs/set")
+        print(f"   200k tagged keys:  {large_us:6.2f} µs/set")
+        print(f"   Invalidate 200k:   {invalidate_ms:6.1f} ms")
+
+        assert large_us < small_us * 3
+
+class TestCacheSerialization:
+    """Pluggable codecs, compression and schema-versioned envelopes"""
+
+    @pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack", "pickle"])
+    def test_model_round_trip(self, serializer):
+        """Pydantic payloads survive every codec"""
+        codec = CacheCodec(serializer=serializer, compress_threshold=256)
+        agents = _agent_payloads(20)
+
+        restored = codec.decode(codec.encode(agents), AgentPayload)
+
+        assert restored == agents
+
+    def test_compression_above_threshold(self):
+        """Only payloads above the threshold are compressed"""
+        codec = CacheCodec(serializer="orjson", compress_threshold=1024)
+        small, large = codec.encode({"id": 1}), codec.encode([a.model_dump() for a in _agent_payloads(200)])
+
+        assert small[3] & CacheCodec.FLAG_COMPRESSED == 0
+        assert large[3] & CacheCodec.FLAG_COMPRESSED
+
+    def test_schema_version_mismatch_is_a_miss(self):
+        """Entries written under another schema version are not returned"""
+        old, new = CacheCodec(schema_version=1), CacheCodec(schema_version=2)
+
+        with pytest.raises(SchemaVersionMismatch):
+            new.decode(old.encode({"id": 1}))
+
+    @pytest.mark.asyncio
+    async def test_reads_legacy_json_and_other_codecs(self):
+        """Headerless JSON and entries from another codec stay readable"""
+        backend = InMemoryBackend()
+        writer = CacheManager(backend, CacheCodec(serializer="msgpack"))
+        reader = CacheManager(backend, CacheCodec(serializer="orjson"))
+
+        await backend.set("legacy", json.dumps({"v": 1}).encode())
+        await writer.set("binary", {"v": 2})
+        await CacheManager(backend, CacheCodec(schema_version=9)).set("future", {"v": 3})
+
+        assert await reader.mget(["legacy", "binary", "future"]) == [{"v": 1}, {"v": 2}, None]
+
+    def test_pickle_envelopes_are_rejected(self):
+        """A codec never unpickles unless pickle was opted into"""
+        envelope = CacheCodec(serializer="pickle").encode({"v": 1})
+
+        with pytest.raises(ValueError):
+            CacheCodec(serializer="orjson").decode(envelope)
+        assert CacheCodec(serializer="orjson", allowed_codecs=["pickle"]).decode(envelope) == {"v": 1}
+        with pytest.raises(ValueError):
+            CacheCodec(serializer="pickle", allowed_codecs=[]).decode(CacheCodec(serializer="json").encode({}))
+
+    def test_serializer_benchmark(self):
+        """Bytes and µs per encode+decode on Agent/Assignment payloads"""
+        payloads = {
+            "agents x500": (_agent_payloads(500), AgentPayload),
+            "assignments x2000": (_assignment_payloads(2000), AssignmentPayload),
+        }
+        codecs = {
+            "json": CacheCodec(serializer="json", compress_threshold=None),
+            "orjson": CacheCodec(serializer="orjson", compress_threshold=None),
+            "msgpack": CacheCodec(serializer="msgpack", compress_threshold=None),
+            "pickle5": CacheCodec(serializer="pickle", compress_threshold=None),
+            "orjson+zlib": CacheCodec(serializer="orjson", compress_threshold=4096),
+        }
+
+        results = {}
+        print("\n🧬 Cache Serializer Benchmark:")
+        for payload_name, (payload, model) in payloads.items():
+            for codec_name, codec in codecs.items():
+                # Best of several rounds: model validation dominates and GC pauses are noise
+                timings = []
+                for _ in range(7):
+                    start_time = time.perf_counter()
+                    encoded = codec.encode(payload)
+                    decoded = codec.decode(encoded, model)
+                    timings.append(time.perf_counter() - start_time)
+                elapsed_us = min(timings) * 1e6
+                assert decoded == payload
+                results[(payload_name, codec_name)] = (len(encoded), elapsed_us)
+                print(f"   {payload_name:18s} {codec_name:12s} {len(encoded):9d} bytes "
+                      f"{elapsed_us:10.0f} µs/op")
+
+        for payload_name in payloads:
+            json_bytes, json_us = results[(payload_name, "json")]
+            orjson_bytes, orjson_us = results[(payload_name, "orjson")]
+            assert orjson_us < json_us
+            assert results[(payload_name, "msgpack")][0] < json_bytes
+            assert results[(payload_name, "orjson+zlib")][0] < orjson_bytes / 2
+
+class PredictionService:
+    """Service with a slow cached computation, like an ML prediction"""
+
+    def __init__(self, delay=0.05, **cache_options):
+        self.cache = CacheManager(BoundedMemoryBackend(sweep_interval=None))
+        self.delay = delay
+        self.calls = 0
+
+        @cached(key="prediction:{task_id}", **cache_options)
+        async def predict(service, task_id):
+            service.calls += 1
+            await asyncio.sleep(service.delay)
+            if task_id == "bad":
+                raise ValueError("model failure")
+            return {"task_id": task_id, "version": service.calls}
+
+        self.predict = predict
+
+class TestCachedDecorator:
+    """Request coalescing, stale-while-revalidate and early expiration"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        """A hot key expiring under load triggers a single computation"""
+        service = PredictionService(ttl=60)
+
+        results = await asyncio.gather(*[service.predict(service, "t1") for _ in range(50)])
+
+        assert service.calls == 1
+        assert all(result == {"task_id": "t1", "version": 1} for result in results)
+        metrics = service.predict.cache_metrics.as_dict()
+        assert metrics["misses"] == 50
+        assert metrics["coalesced"] == 49
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_coalesced_caller(self):
+        """A failed computation is raised to all waiting callers and not cached"""
+        service = PredictionService(ttl=60)
+
+        results = await asyncio.gather(
+            *[service.predict(service, "bad") for _ in range(5)], return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert service.calls == 1
+        assert await service.cache.get("prediction:bad") is None
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self):
+        """Expired values are served immediately while one refresh runs"""
+        service = PredictionService(ttl=0.2, stale_ttl=60)
+        assert (await service.predict(service, "t1"))["version"] == 1
+        await asyncio.sleep(0.21)
+
+        start_time = time.perf_counter()
+        stale = await asyncio.gather(*[service.predict(service, "t1") for _ in range(20)])
+        stale_latency = time.perf_counter() - start_time
+        await asyncio.sleep(service.delay * 2)
+
+        assert all(result["version"] == 1 for result in stale)
+        assert stale_latency < service.delay
+        assert (await service.predict(service, "t1"))["version"] == 2
+        assert service.calls == 2
+        metrics = service.predict.cache_metrics.as_dict()
+        assert metrics["stale_hits"] == 20
+        assert metrics["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_probabilistic_early_expiration(self):
+        """Values close to expiry are recomputed before they expire"""
+        service = PredictionService(delay=0.02, ttl=0.5, early_expiration_beta=1e6)
+        await service.predict(service, "t1")
+
+        await service.predict(service, "t1")
+
+        assert service.calls == 2
+        assert service.predict.cache_metrics.early_refreshes == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_none_results_are_recomputed(self):
+        """With cache_none=False a miss still calls the function"""
+        calls = 0
+
+        class Lookup:
+            cache = CacheManager(InMemoryBackend())
+
+            @cached(key="lookup:{name}", cache_none=False)
+            async def find(self, name):
+                nonlocal calls
+                calls += 1
+                return None
+
+        lookup = Lookup()
+        await lookup.find("x")
+        await lookup.find("x")
+
+        assert calls == 2
+
+class TestCacheBackendThroughput:
+    """Concurrent-request throughput of the sync and async Redis backends"""
+
+    @pytest.mark.asyncio
+    async def test_async_backend_concurrent_throughput(self, redis_standin):
+        """The async backend overlaps round trips that the sync backend serializes"""
+        redis_standin.latency = 0.002
+        keys = [f"request:{i % 50}" for i in range(400)]
+        concurrency = 50
+
+        sync_manager = CacheManager(RedisBackend(redis_standin.url))
+        async_manager = CacheManager(AsyncRedisBackend(redis_standin.url, max_connections=concurrency))
+        try:
+            await async_manager.mset({key: {"cached": key} for key in set(keys)})
+
+            sync_results, sync_throughput, sync_stall = await _concurrent_gets(sync_manager, keys, concurrency)
+            await _concurrent_gets(async_manager, keys, concurrency)  # open the pool's connections
+            async_results, async_throughput, async_stall = await _concurrent_gets(async_manager, keys, concurrency)
+
+            # Batched reads of the same keys for comparison
+            start_time = time.perf_counter()
+            for i in range(0, len(keys), concurrency):
+                await async_manager.mget(keys[i:i + concurrency])
+            mget_throughput = len(keys) / (time.perf_counter() - start_time)
+        finally:
+            await sync_manager.close()
+            await async_manager.close()
+
+        print(f"\n🗄️  Cache Backend Throughput ({len(keys)} requests, "
+              f"{redis_standin.latency * 1000:.0f}ms RTT, concurrency {concurrency}):")
+        print(f"   Sync RedisBackend:       {sync_throughput:8.0f} req/sec")
+        print(f"   AsyncRedisBackend:       {async_throughput:8.0f} req/sec")
+        print(f"   AsyncRedisBackend mget:  {mget_throughput:8.0f} keys/sec")
+        print(f"   Speedup: {async_throughput / sync_throughput:.1f}x")
+        print(f"   Longest loop stall: sync {sync_stall * 1000:.1f} ms, async {async_stall * 1000:.1f} ms")
+
+        assert async_results == sync_results
+        # Sync gets hold the loop through a whole wave of sequential round
+        # trips; async gets overlap them and hand the loop back in between
+        wave = concurrency * redis_standin.latency
+        assert sync_stall >= wave
+        assert async_stall < wave / 4
+        # Wall-clock ratios are noisy on shared runners: only check the direction
+        assert async_throughput > sync_throughput * 1.5
+        assert mget_throughput > sync_throughput * 1.5
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
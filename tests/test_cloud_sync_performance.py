@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Cloud Sync Performance Tests
+Delta frames, resumable transfers and conflict handling for CloudSynchronizer
+"""
+
+import pytest
+import asyncio
+import random
+import sqlite3
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_automation_platform.cloud.sync import CloudSynchronizer, EntityStore, LocalEdgeNode
+from ai_automation_platform.cloud.sync.protocol import decode_frame, default_frame_codec, full_state_payload, lane_of
+from ai_automation_platform.core.serialization import CacheCodec
+from ai_automation_platform.cloud.sync.synchronizer import ConflictResolutionStrategy, SyncDirection
+
+def make_agent(index, revision=0):
+    return {
+        "agent_id": f"agent_{index}",
+        "status": "active",
+        "capabilities": ["navigation", "manipulation", "inspection"],
+        "location": {"x": index % 100, "y": index // 100, "zone": f"zone_{index % 7}"},
+        "revision": revision
+    }
+
+def make_pair(workers=4, frame_size=500, **edge_options):
+    synchronizer = CloudSynchronizer(workers_per_node=workers, frame_size=frame_size)
+    edge = LocalEdgeNode("edge-1", **edge_options)
+    synchronizer.register_edge_node("edge-1", edge)
+    return synchronizer, edge
+
+class TestDeltaSync:
+    """Change tracking, frames and resumption"""
+
+    @pytest.mark.asyncio
+    async def test_only_changes_since_last_ack_are_shipped(self):
+        synchronizer, edge = make_pair()
+        for i in range(1000):
+            synchronizer.store.put("agent", f"agent_{i}", make_agent(i))
+
+        result = await synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE)
+        assert result["status"] == "completed"
+        assert result["metadata"]["sync_stats"]["changes_sent"] == 1000
+        assert edge.store.get("agent", "agent_999") == make_agent(999)
+
+        for i in range(10):
+            synchronizer.store.put("agent", f"agent_{i}", make_agent(i, revision=1))
+        synchronizer.store.delete("agent", "agent_500")
+        result = await synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE)
+        assert result["metadata"]["sync_stats"]["changes_sent"] == 11
+        assert edge.store.get("agent", "agent_3")["revision"] == 1
+        assert edge.store.get("agent", "agent_500") is None
+        await synchronizer.close()
+
+    @pytest.mark.asyncio
+    async def test_edge_changes_are_pulled_without_echo(self):
+        synchronizer, edge = make_pair()
+        synchronizer.store.put("agent", "agent_0", make_agent(0))
+        for i in range(1, 50):
+            edge.store.put("telemetry", f"reading_{i}", {"value": i})
+
+        result = await synchronizer.sync_edge_node("edge-1")
+        stats = result["metadata"]["sync_stats"]
+        assert (stats["changes_sent"], stats["changes_received"]) == (1, 49)
+        assert synchronizer.store.get("telemetry", "reading_7") == {"value": 7}
+
+        # Neither side sends back what it just received
+        result = await synchronizer.sync_edge_node("edge-1")
+        stats = result["metadata"]["sync_stats"]
+        assert (stats["changes_sent"], stats["changes_received"]) == (0, 0)
+        await synchronizer.close()
+
+    @pytest.mark.asyncio
+    async def test_interrupted_transfer_resumes_from_last_ack(self):
+        synchronizer, edge = make_pair(workers=1, frame_size=50)
+        for i in range(1000):
+            synchronizer.store.put("agent", f"agent_{i}", make_agent(i))
+
+        request_id = await synchronizer.queue_sync("edge-1", SyncDirection.CLOUD_TO_EDGE, max_retries=0)
+        await synchronizer.close()
+        request = synchronizer._requests[request_id]
+
+        edge.fail_after_frames = 5
+        with pytest.raises(ConnectionError):
+            await synchronizer._sync_cloud_to_edge(request)
+        assert len(edge.store.records) == 250
+
+        edge.fail_after_frames = None
+        await synchronizer._sync_cloud_to_edge(request)
+        stats = request.metadata["sync_stats"]
+        assert stats["changes_sent"] == 1000 and stats["frames_sent"] == 20
+        assert len(edge.store.records) == 1000
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lanes_preserve_per_entity_order(self):
+        synchronizer, edge = make_pair(workers=4, frame_size=7)
+        rng = random.Random(7)
+        original_receive = edge.receive_frame
+        applied = {}
+
+        async def jittered_receive(peer_id, frame):
+            await asyncio.sleep(rng.random() * 0.002)
+            return await original_receive(peer_id, frame)
+        edge.receive_frame = jittered_receive
+
+        original_apply = edge.store.apply
+        def checked_apply(change, strategy):
+            # Each entity's revisions must arrive in the order they were written
+            assert change.value["revision"] > applied.get(change.entity_id, -1)
+            applied[change.entity_id] = change.value["revision"]
+            return original_apply(change, strategy)
+        edge.store.apply = checked_apply
+
+        for revision in range(5):
+            for i in range(40):
+                synchronizer.store.put("agent", f"agent_{i}", make_agent(i, revision))
+            await synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE)
+
+        assert {lane_of(("agent", f"agent_{i}"), 4) for i in range(40)} == {0, 1, 2, 3}
+        assert all(edge.store.get("agent", f"agent_{i}")["revision"] == 4 for i in range(40))
+        assert edge.store.records.keys() == synchronizer.store.records.keys()
+        await synchronizer.close()
+
+    def test_frames_in_another_codec_are_rejected(self):
+        class Exploit:
+            def __reduce__(self):
+                return (exec, ("raise SystemExit('unpickled')",))
+
+        frame = CacheCodec(serializer="pickle").encode(Exploit())
+        assert frame[:3] == bytes([0xCA, 0x01, 0x04])
+        with pytest.raises(ValueError):
+            decode_frame(default_frame_codec(), frame)
+        with pytest.raises(ValueError):
+            decode_frame(CacheCodec(serializer="json"), CacheCodec(serializer="msgpack").encode({"changes": []}))
+
+class TestConflictResolution:
+    """Concurrent edits on both sides of a sync"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strategy, expected", [
+        (ConflictResolutionStrategy.CLOUD_WINS, {"speed": 1}),
+        (ConflictResolutionStrategy.EDGE_WINS, {"mode": "manual"}),
+        (ConflictResolutionStrategy.NEWER_WINS, {"mode": "manual"}),
+        (ConflictResolutionStrategy.MERGE, {"speed": 1, "mode": "manual"}),
+    ])
+    async def test_strategies_converge(self, strategy, expected):
+        synchronizer, edge = make_pair()
+        synchronizer.store.put("config", "robot", {}, updated_at=1.0)
+        await synchronizer.sync_edge_node("edge-1")
+
+        synchronizer.store.put("config", "robot", {"speed": 1}, updated_at=2.0)
+        edge.store.put("config", "robot", {"mode": "manual"}, updated_at=3.0)
+        request_id = await synchronizer.queue_sync("edge-1", conflict_resolution=strategy)
+        await synchronizer._completions[request_id].wait()
+
+        assert synchronizer.store.get("config", "robot") == expected
+        assert edge.store.get("config", "robot") == expected
+        assert synchronizer.store.records[("config", "robot")].version == \
+            edge.store.records[("config", "robot")].version
+        await synchronizer.close()
+
+    @pytest.mark.asyncio
+    async def test_manual_conflicts_are_reported(self):
+        synchronizer, edge = make_pair()
+        synchronizer.store.put("config", "robot", {"speed": 1})
+        await synchronizer.sync_edge_node("edge-1")
+        synchronizer.store.put("config", "robot", {"speed": 2})
+        edge.store.put("config", "robot", {"speed": 3})
+
+        request_id = await synchronizer.queue_sync("edge-1", direction=SyncDirection.EDGE_TO_CLOUD,
+                                                   conflict_resolution=ConflictResolutionStrategy.MANUAL)
+        await synchronizer._completions[request_id].wait()
+        status = await synchronizer.get_sync_status(request_id)
+        assert status["status"] == "conflict"
+        assert status["metadata"]["sync_stats"]["conflicts"] == 1
+        assert synchronizer.store.get("config", "robot") == {"speed": 2}
+        local, remote = synchronizer.store.conflicts[0]
+        assert remote.value == {"speed": 3}
+        await synchronizer.close()
+
+    def test_stale_and_duplicate_changes_are_ignored(self):
+        cloud, edge = EntityStore("cloud"), EntityStore("edge-1")
+        first = cloud.put("agent", "a", {"revision": 1})
+        second = cloud.put("agent", "a", {"revision": 2})
+
+        assert edge.apply(second)
+        assert not edge.apply(second)
+        assert not edge.apply(first)
+        assert edge.get("agent", "a") == {"revision": 2}
+
+class TestRetryScheduling:
+    """Delay-queue retries, persisted requests and queue metrics"""
+
+    @pytest.mark.asyncio
+    async def test_backoff_does_not_stall_the_node(self):
+        synchronizer, edge = make_pair()
+        synchronizer.retry_base_delay = 0.3
+        edge.store.put("telemetry", "reading", {"value": 1})
+        original_fetch = edge.fetch_frame
+        failures = [1]
+
+        async def flaky_fetch(*args):
+            if failures[0]:
+                failures[0] -= 1
+                raise ConnectionError("link reset")
+            return await original_fetch(*args)
+        edge.fetch_frame = flaky_fetch
+
+        start_time = time.perf_counter()
+        flaky_id = await synchronizer.queue_sync("edge-1", SyncDirection.EDGE_TO_CLOUD)
+        healthy = await asyncio.gather(*(
+            synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE) for _ in range(20)
+        ))
+        healthy_seconds = time.perf_counter() - start_time
+        assert all(result["status"] == "completed" for result in healthy)
+
+        metrics = synchronizer.get_queue_metrics()["edge-1"]
+        assert metrics["scheduled_retries"] == 1 and metrics["queue_depth"] == 0
+        assert (await synchronizer.get_sync_status(flaky_id))["status"] == "pending"
+
+        await synchronizer._completions[flaky_id].wait()
+        status = await synchronizer.get_sync_status(flaky_id)
+        assert status["status"] == "completed" and status["retry_count"] == 1
+        assert healthy_seconds < synchronizer.retry_base_delay
+        assert time.perf_counter() - start_time >= synchronizer.retry_base_delay
+        assert synchronizer.get_queue_metrics()["edge-1"]["scheduled_retries"] == 0
+        await synchronizer.close()
+
+    @pytest.mark.asyncio
+    async def test_pending_requests_survive_restart(self, tmp_path):
+        db_url = f"sqlite:///{tmp_path / 'sync.db'}"
+        synchronizer = CloudSynchronizer(db_url=db_url, retry_base_delay=0.2)
+        await synchronizer.initialize()
+
+        # No transport registered yet: the first attempt fails and waits on a retry
+        retry_id = await synchronizer.queue_sync("edge-1")
+        while (await synchronizer.get_sync_status(retry_id))["retry_count"] == 0:
+            await asyncio.sleep(0.01)
+        await synchronizer.close()
+
+        # Queued but never picked up before shutdown
+        synchronizer = CloudSynchronizer(db_url=db_url)
+        await synchronizer.initialize()
+        synchronizer._active_syncs["edge-1"] = asyncio.get_running_loop().create_future()
+        queued_id = await synchronizer.queue_sync("edge-1", SyncDirection.CLOUD_TO_EDGE)
+        cancelled_id = await synchronizer.queue_sync("edge-1", SyncDirection.CLOUD_TO_EDGE)
+        assert await synchronizer.cancel_sync(cancelled_id)
+        await asyncio.sleep(0.05)
+        metrics = synchronizer.get_queue_metrics()["edge-1"]
+        assert metrics["queue_depth"] == 1 and metrics["oldest_queued_age_seconds"] >= 0.05
+        synchronizer._active_syncs.clear()
+        await synchronizer.close()
+
+        synchronizer = CloudSynchronizer(db_url=db_url)
+        edge = LocalEdgeNode("edge-1")
+        synchronizer.register_edge_node("edge-1", edge)
+        synchronizer.store.put("agent", "agent_0", make_agent(0))
+        await synchronizer.initialize()
+        assert set(synchronizer._requests) == {retry_id, queued_id}
+
+        for request_id in (retry_id, queued_id):
+            await asyncio.wait_for(synchronizer._completions[request_id].wait(), timeout=5)
+            assert (await synchronizer.get_sync_status(request_id))["status"] == "completed"
+        assert edge.store.get("agent", "agent_0") == make_agent(0)
+        await synchronizer.close()
+
+    @pytest.mark.asyncio
+    async def test_finished_requests_are_evicted(self, tmp_path):
+        db_path = tmp_path / "sync.db"
+
+        def stored_ids():
+            with sqlite3.connect(db_path) as conn:
+                return {row[0] for row in conn.execute("SELECT request_id FROM sync_requests")}
+
+        synchronizer = CloudSynchronizer(db_url=f"sqlite:///{db_path}", max_finished_requests=3,
+                                         finished_retention=0.2)
+        synchronizer.register_edge_node("edge-1", LocalEdgeNode("edge-1"))
+        await synchronizer.initialize()
+
+        # Past the count limit the oldest finished requests go first
+        finished = [(await synchronizer.sync_edge_node("edge-1"))["request_id"] for _ in range(5)]
+        assert set(synchronizer._requests) == set(synchronizer._completions) == set(finished[2:])
+        assert await synchronizer.get_sync_status(finished[0]) is None
+        assert stored_ids() == set(finished[2:])
+
+        # Past the age limit every finished request goes at the next sweep
+        await asyncio.sleep(0.25)
+        synchronizer._active_syncs["edge-2"] = asyncio.get_running_loop().create_future()  # never processed
+        pending_id = await synchronizer.queue_sync("edge-2")
+        cancelled_id = await synchronizer.queue_sync("edge-2")
+        assert await synchronizer.cancel_sync(cancelled_id)
+        assert set(synchronizer._requests) == {pending_id, cancelled_id}
+        assert stored_ids() == {pending_id, cancelled_id}
+        del synchronizer._active_syncs["edge-2"]
+        await synchronizer.close()
+
+        # A restart keeps pending requests only
+        synchronizer = CloudSynchronizer(db_url=f"sqlite:///{db_path}")
+        synchronizer._active_syncs["edge-2"] = asyncio.get_running_loop().create_future()
+        await synchronizer.initialize()
+        assert stored_ids() == set(synchronizer._requests) == {pending_id}
+        synchronizer._active_syncs.clear()
+        await synchronizer.close()
+
+class TestSyncBenchmark:
+    """Bytes on the wire and sync latency: delta frames versus full-state transfer"""
+
+    @pytest.mark.asyncio
+    async def test_delta_sync_benchmark(self):
+        entities = int(os.environ.get("CLOUD_SYNC_BENCH_ENTITIES", 20_000))
+        rounds, churn = 3, max(1, entities // 100)
+        link = {"bandwidth": 20_000_000, "round_trip": 0.002}  # 20 MB/s, 2 ms per frame
+
+        synchronizer, edge = make_pair(**link)
+        baseline = LocalEdgeNode("edge-full", **link)
+        for i in range(entities):
+            synchronizer.store.put("agent", f"agent_{i}", make_agent(i))
+
+        initial_full = len(full_state_payload(synchronizer.store))
+        start_time = time.perf_counter()
+        result = await synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE)
+        initial_delta_seconds = time.perf_counter() - start_time
+        initial_delta = result["metadata"]["sync_stats"]["bytes_sent"]
+
+        rng = random.Random(42)
+        delta_bytes = full_bytes = 0
+        delta_seconds = full_seconds = 0.0
+        for revision in range(1, rounds + 1):
+            for i in rng.sample(range(entities), churn):
+                synchronizer.store.put("agent", f"agent_{i}", make_agent(i, revision))
+
+            start_time = time.perf_counter()
+            result = await synchronizer.sync_edge_node("edge-1", SyncDirection.CLOUD_TO_EDGE)
+            delta_seconds += time.perf_counter() - start_time
+            delta_bytes += result["metadata"]["sync_stats"]["bytes_sent"]
+            assert result["metadata"]["sync_stats"]["changes_sent"] == churn
+
+            start_time = time.perf_counter()
+            payload = full_state_payload(synchronizer.store)
+            await baseline.receive_full_state(payload)
+            full_seconds += time.perf_counter() - start_time
+            full_bytes += len(payload)
+
+        for key, record in synchronizer.store.records.items():
+            assert edge.store.records[key].value == record.value
+        await synchronizer.close()
+
+        print(f"\n🔄 Cloud Sync @{entities} entities, {rounds} rounds of {churn} changes:")
+        print(f"   initial sync: full {initial_full / 1e6:6.2f} MB, compressed frames "
+              f"{initial_delta / 1e6:6.2f} MB in {initial_delta_seconds:.2f}s")
+        print(f"   full-state : {full_bytes / 1e3:10,.1f} KB  {full_seconds * 1000 / rounds:8.1f} ms/sync")
+        print(f"   delta      : {delta_bytes / 1e3:10,.1f} KB  {delta_seconds * 1000 / rounds:8.1f} ms/sync")
+        print(f"   reduction: {full_bytes / delta_bytes:,.0f}x bytes, {full_seconds / delta_seconds:,.1f}x latency")
+
+        assert initial_delta * 3 < initial_full
+        assert delta_bytes * 20 < full_bytes
+        assert delta_seconds * 5 < full_seconds
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Edge Computing Performance Tests
+Decision cache latency and invalidation for the edge computing service
+"""
+
+import pytest
+import importlib.util
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+SERVICE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'edge-computing-service', 'src', 'main.py'
+)
+
+def _load_service():
+    # The router opens edge_data.db in the working directory on import
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="edge_service_"))
+    try:
+        spec = importlib.util.spec_from_file_location("edge_computing_service", SERVICE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        os.chdir(cwd)
+
+svc = _load_service()
+
+class LegacyEdgeDecisionCache:
+    """Previous cache: deque.remove on every hit"""
+
+    def __init__(self, maxsize=10000):
+        self.cache = {}
+        self.access_order = deque()
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.cache:
+                self.access_order.remove(key)
+                self.access_order.append(key)
+                return self.cache[key]
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.cache:
+                self.access_order.remove(key)
+            elif len(self.cache) >= self.maxsize:
+                oldest = self.access_order.popleft()
+                del self.cache[oldest]
+            self.cache[key] = value
+            self.access_order.append(key)
+
+def make_agent(agent_id, load=0.2, status="available"):
+    return svc.LocalAgent(
+        agent_id=agent_id,
+        agent_type="robot",
+        capabilities={"inspection": 0.9, "assembly": 0.85},
+        current_load=load,
+        status=status,
+        location="edge_zone_1"
+    )
+
+def make_task(task_id="task", priority=None, task_type="inspection"):
+    return svc.EdgeTask(
+        task_id=task_id,
+        priority=priority or svc.TaskPriority.QUALITY_CRITICAL,
+        task_type=task_type,
+        parameters={"station": 3},
+        timeout_ms=10
+    )
+
+def make_router(agent_count=8):
+    # RealTimeTaskRouter is redefined further down the module; the API uses the first definition
+    router = type(svc.task_router)()
+    for index in range(agent_count):
+        router.register_agent(make_agent(f"agent_{index}", load=0.1 * (index % 5)))
+    return router
+
+def legacy_quality_choice(model, task, agents):
+    """Previous _quality_critical_decision loop: features and inference agent by agent"""
+    best_agent, best_score = None, -1.0
+    for agent in agents:
+        if agent.status == "available":
+            score = model.predict(model.extract_features(task, agent))
+            if score > best_score:
+                best_score, best_agent = score, agent
+    return best_agent, best_score
+
+def make_fleet(router, count, seed=5):
+    rng = random.Random(seed)
+    task_types = ["inspection", "assembly", "packaging", "welding", "sorting"]
+    for index in range(count):
+        router.register_agent(svc.LocalAgent(
+            agent_id=f"fleet_{index}",
+            agent_type="robot",
+            capabilities={t: round(rng.random(), 3) for t in rng.sample(task_types, 3)},
+            current_load=round(rng.random(), 2),
+            status="available" if rng.random() > 0.1 else "busy",
+            location="edge_zone_1"
+        ))
+    return task_types
+
+class TestEdgeDecisionCache:
+    """O(1) LRU with TTL, epoch invalidation and latency counters"""
+
+    def test_lru_eviction_and_ttl(self):
+        cache = svc.EdgeDecisionCache(maxsize=3, ttl_seconds=0.05)
+        for key in "abc":
+            cache.put(key, key.upper())
+        assert cache.get("a") == "A"
+        cache.put("d", "D")  # evicts b, the least recently used
+        assert cache.get("b") is None and cache.get("c") == "C"
+
+        cache.put("forever", 1, ttl_seconds=60)  # evicts a
+        time.sleep(0.06)
+        assert cache.get("c") is None and cache.get("forever") == 1
+        stats = cache.get_stats()
+        assert stats["evictions"] == 2 and stats["expirations"] == 1
+        assert stats["hits"] == 3 and stats["misses"] == 2
+        assert stats["lookup_latency_us"]["samples"] == 5
+
+    @pytest.mark.asyncio
+    async def test_agent_changes_invalidate_affected_decisions(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        router = make_router(agent_count=8)
+        agents = router.get_local_agents()
+        task = make_task()
+
+        first = await router.route_task_realtime(task, agents)
+        assert not first.cached
+        assert (await router.route_task_realtime(task, agents)).cached
+
+        # Every agent is part of the key, not just the first five
+        router.update_agent_load("agent_7", 0.9)
+        assert not (await router.route_task_realtime(task, agents)).cached
+        assert (await router.route_task_realtime(task, agents)).cached
+
+        # Decisions over agent sets without the changed agent stay cached
+        subset = agents[:3]
+        await router.route_task_realtime(task, subset)
+        router.update_agent_load("agent_6", 0.5)
+        assert (await router.route_task_realtime(task, subset)).cached
+        router.register_agent(make_agent("agent_1", load=0.0))
+        assert not (await router.route_task_realtime(task, subset)).cached
+
+        # Writing the same load is not a state change
+        router.update_agent_load("agent_0", router.local_agents["agent_0"].current_load)
+        assert (await router.route_task_realtime(task, subset)).cached
+
+        # The running fleet version matches a fold over the same agents in any order
+        fleet = router.available_agents()
+        assert router._agent_versions(fleet) == router._agent_versions(list(reversed(fleet)))
+        await router.route_task_realtime(task, fleet)
+        assert (await router.route_task_realtime(task, list(fleet))).cached
+        router.update_agent_load("agent_5", 0.7)
+        assert router.available_agents() is fleet
+        assert not (await router.route_task_realtime(task, fleet)).cached
+        router.register_agent(make_agent("agent_8", load=0.0))
+        assert len(router.available_agents()) == len(fleet) + 1
+
+    @pytest.mark.asyncio
+    async def test_stats_endpoint_reports_latency_percentiles(self):
+        svc.task_router.decision_cache.clear()
+        agents = [a for a in svc.task_router.get_local_agents() if a.status == "available"]
+        for index in range(20):
+            await svc.task_router.route_task_realtime(make_task(f"t{index}"), agents)
+
+        stats = await svc.get_cache_stats()
+        assert stats["hits"] >= 19
+        assert 0 < stats["lookup_latency_us"]["p50"] <= stats["lookup_latency_us"]["p99"]
+        assert len(stats["access_pattern"]) == 1
+
+    def test_lookup_latency_benchmark(self):
+        """Hot-key lookups at full capacity: deque.remove versus OrderedDict.move_to_end"""
+        capacity = int(os.environ.get("EDGE_CACHE_BENCH_SIZE", 10_000))
+        lookups = 20_000
+        legacy = LegacyEdgeDecisionCache(maxsize=capacity)
+        cache = svc.EdgeDecisionCache(maxsize=capacity)
+        for index in range(capacity):
+            legacy.put(f"key_{index}", index)
+            cache.put(f"key_{index}", index)
+
+        # Recently inserted keys sit at the far end of the deque
+        hot_keys = [f"key_{capacity - 1 - (i % 100)}" for i in range(lookups)]
+        results = {}
+        for label, target in (("legacy", legacy), ("indexed", cache)):
+            start_time = time.perf_counter()
+            for key in hot_keys:
+                target.get(key)
+            results[label] = (time.perf_counter() - start_time) / lookups * 1e6
+
+        latency = cache.get_stats()["lookup_latency_us"]
+        print(f"\n⚡ Edge Decision Cache @{capacity} entries, {lookups} hot-key lookups:")
+        print(f"   legacy  get: {results['legacy']:8.2f} µs/lookup")
+        print(f"   indexed get: {results['indexed']:8.2f} µs/lookup "
+              f"(p50 {latency['p50']:.2f} µs, p99 {latency['p99']:.2f} µs)")
+        print(f"   speedup: {results['legacy'] / results['indexed']:,.0f}x")
+
+        assert results["indexed"] * 5 < results["legacy"]
+
+class TestBatchedInference:
+    """Agent feature matrix and batched model scoring"""
+
+    @pytest.mark.asyncio
+    async def test_batched_scores_match_per_agent_loop(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        router = type(svc.task_router)()
+        router.cloud_available = False
+        task_types = make_fleet(router, 300)
+        agents = router.get_local_agents()
+        model = router.lightweight_model
+
+        tasks = [
+            svc.EdgeTask(task_id=f"t{i}", priority=priority, task_type=task_type,
+                         parameters={str(k): k for k in range(i % 4)}, timeout_ms=10)
+            for i, (task_type, priority) in enumerate(
+                (t, p) for t in task_types + ["unknown"]
+                for p in (svc.TaskPriority.QUALITY_CRITICAL, svc.TaskPriority.STANDARD)
+            )
+        ]
+        for task in tasks:
+            expected_agent, expected_score = legacy_quality_choice(model, task, agents)
+            decision = await router._quality_critical_decision(task, agents, time.perf_counter_ns())
+            assert decision.assigned_agent_id == expected_agent.agent_id
+            assert decision.confidence == pytest.approx(expected_score, abs=1e-12)
+
+        # The matrix follows load changes and registrations past its initial capacity
+        router.update_agent_load(expected_agent.agent_id, 1.0)
+        router.register_agent(make_agent("late_arrival", load=0.0))
+        agents = router.get_local_agents()
+        batch = await router.route_tasks_batch(tasks, agents)
+        for task, decision in zip(tasks, batch):
+            assert decision.assigned_agent_id == legacy_quality_choice(model, task, agents)[0].agent_id
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_report_their_own_task(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        router = make_router(agent_count=4)
+        agents = router.get_local_agents()
+
+        first = await router.route_tasks_batch([make_task("a")], agents)
+        hits = await router.route_tasks_batch([make_task("b"), make_task("c")], agents)
+        assert [d.task_id for d in hits] == ["b", "c"] and all(d.cached for d in hits)
+        assert hits[0] is not hits[1] and not first[0].cached
+        assert (await router.route_task_realtime(make_task("d"), agents)).task_id == "d"
+
+        def broken(*args):
+            raise RuntimeError("model unavailable")
+        monkeypatch.setattr(router, "_score_agents", broken)
+        router.decision_cache.clear()
+        fallback = await router.route_tasks_batch([make_task("e"), make_task("f", task_type="welding")], agents)
+        assert [d.task_id for d in fallback] == ["e", "f"]
+        assert all("model unavailable" in d.reasoning for d in fallback)
+
+    def test_batch_endpoint(self):
+        from fastapi.testclient import TestClient
+        client = TestClient(svc.app)
+        tasks = [
+            {"task_id": f"batch_{i}", "priority": priority, "task_type": "data_processing",
+             "parameters": {"i": i}, "timeout_ms": 10}
+            for i, priority in enumerate(["quality_critical", "safety_critical", "efficiency_critical"])
+        ]
+        response = client.post("/api/v2/edge/tasks/realtime-route", json=tasks)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["batch_size"] == 3
+        assert [d["task_id"] for d in body["decisions"]] == ["batch_0", "batch_1", "batch_2"]
+        assert [d["decision_source"] for d in body["decisions"]] == \
+            ["lightweight_model", "rule_based", "cloud_fallback"]
+
+    @pytest.mark.asyncio
+    async def test_batch_routes_standard_tasks_like_single_tasks(self, monkeypatch, tmp_path):
+        """Standard tasks take the cloud path while it is up and batched scoring after"""
+        monkeypatch.chdir(tmp_path)
+        router = make_router(agent_count=4)
+        agents = router.get_local_agents()
+        tasks = [make_task(f"s{i}", priority=svc.TaskPriority.STANDARD, task_type=task_type)
+                 for i, task_type in enumerate(["inspection", "assembly"])]
+        tasks.append(make_task("q"))
+
+        batch = await router.route_tasks_batch(tasks, agents)
+        single = await type(svc.task_router)()._standard_decision(tasks[0], agents, time.perf_counter_ns())
+        assert [d.decision_type for d in batch] == [svc.EdgeDecisionType.CLOUD_FALLBACK] * 2 + \
+            [svc.EdgeDecisionType.LIGHTWEIGHT_MODEL]
+        assert batch[0].assigned_agent_id == single.assigned_agent_id
+
+        async def unreachable(*args):
+            raise ConnectionError("cloud down")
+        monkeypatch.setattr(router, "_request_cloud_decision", unreachable)
+        router.decision_cache.clear()
+        batch = await router.route_tasks_batch(tasks, agents)
+        assert not router.cloud_available
+        assert all(d.decision_type == svc.EdgeDecisionType.LIGHTWEIGHT_MODEL for d in batch)
+
+        router.decision_cache.clear()
+        scored = []
+        score_agents = router._score_agents
+        monkeypatch.setattr(router, "_score_agents",
+                            lambda batch_tasks, a: scored.append(len(batch_tasks)) or score_agents(batch_tasks, a))
+        await router.route_tasks_batch(tasks, agents)
+        assert scored == [3]
+
+    @pytest.mark.asyncio
+    async def test_inference_latency_benchmark(self, monkeypatch, tmp_path):
+        """Quality-critical routing over a large fleet: per-agent loop versus batched inference"""
+        monkeypatch.chdir(tmp_path)
+        agent_count = int(os.environ.get("EDGE_INFERENCE_BENCH_AGENTS", 500))
+        router = type(svc.task_router)()
+        task_types = make_fleet(router, agent_count)
+        agents = router.get_local_agents()
+        tasks = [make_task(f"t{i}", task_type=task_types[i % len(task_types)]) for i in range(64)]
+        rounds = 5
+
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            for task in tasks:
+                legacy_quality_choice(router.lightweight_model, task, agents)
+        legacy_ms = (time.perf_counter() - start_time) * 1000 / (rounds * len(tasks))
+
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            for task in tasks:
+                await router._quality_critical_decision(task, agents, time.perf_counter_ns())
+        single_ms = (time.perf_counter() - start_time) * 1000 / (rounds * len(tasks))
+
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            router.decision_cache.clear()
+            await router.route_tasks_batch(tasks, agents)
+        batch_ms = (time.perf_counter() - start_time) * 1000 / (rounds * len(tasks))
+
+        print(f"\n🧠 Lightweight Model Routing @{agent_count} agents:")
+        print(f"   per-agent loop     : {legacy_ms:8.3f} ms/task")
+        print(f"   batched, one task  : {single_ms:8.3f} ms/task")
+        print(f"   batched, {len(tasks)} tasks  : {batch_ms:8.3f} ms/task")
+        print(f"   speedup: {legacy_ms / single_ms:,.0f}x single, {legacy_ms / batch_ms:,.0f}x batch")
+
+        assert single_ms * 5 < legacy_ms
+        assert batch_ms < single_ms
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
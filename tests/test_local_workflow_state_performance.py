@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Edge Workflow State Performance Tests
+Dependency tracking and ready-task discovery for LocalWorkflowStateManager
+"""
+
+import pytest
+import asyncio
+import aiosqlite
+import sqlite3
+import time
+from datetime import datetime
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_automation_platform.edge.local_workflow_state import LocalWorkflowStateManager, TaskState
+
+LEGACY_SCHEMA = """
+CREATE TABLE tasks (
+    task_id TEXT PRIMARY KEY, state TEXT NOT NULL, task_type TEXT NOT NULL, priority INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL, updated_at TIMESTAMP NOT NULL, metadata TEXT NOT NULL, error TEXT,
+    retry_count INTEGER DEFAULT 0, max_retries INTEGER DEFAULT 3, is_active INTEGER DEFAULT 1
+);
+CREATE TABLE task_dependencies (
+    parent_id TEXT NOT NULL, child_id TEXT NOT NULL, dependency_type TEXT NOT NULL,
+    PRIMARY KEY (parent_id, child_id)
+);
+CREATE TABLE task_history (
+    task_id TEXT NOT NULL, timestamp TIMESTAMP NOT NULL, from_state TEXT, to_state TEXT NOT NULL,
+    message TEXT NOT NULL, data TEXT, PRIMARY KEY (task_id, timestamp)
+);
+CREATE INDEX idx_task_state ON tasks(state);
+"""
+
+def build_legacy_database(db_path, chains, depth, completed_heads=0):
+    """Write chains of tasks (head first) in the pre-counter schema"""
+    now = datetime.utcnow().isoformat()
+    tasks, dependencies = [], []
+    for chain in range(chains):
+        for level in range(depth):
+            task_id = f"c{chain}_t{level}"
+            state = "completed" if level == 0 and chain < completed_heads else "pending"
+            tasks.append((task_id, state, "compute", 2, now, now, "{}"))
+            if level:
+                dependencies.append((f"c{chain}_t{level - 1}", task_id, "completion"))
+
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(LEGACY_SCHEMA)
+        conn.executemany(
+            "INSERT INTO tasks (task_id, state, task_type, priority, created_at, updated_at, metadata) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", tasks
+        )
+        conn.executemany("INSERT INTO task_dependencies VALUES (?, ?, ?)", dependencies)
+
+async def legacy_find_ready_tasks(manager, limit=100):
+    """Previous find_ready_tasks: scan pending rows, query each task's parents one by one"""
+    ready = []
+    async with manager._db.execute(
+        # Pin the pre-counter plan; the new (state, unmet_dependencies) index would list ready rows first
+        "SELECT * FROM tasks INDEXED BY idx_task_state WHERE state = ? AND is_active = 1", (TaskState.PENDING.value,)
+    ) as cursor:
+        async for row in cursor:
+            met = True
+            async with manager._db.execute(
+                "SELECT td.parent_id, td.dependency_type FROM task_dependencies td "
+                "JOIN tasks t ON td.parent_id = t.task_id WHERE td.child_id = ?", (row["task_id"],)
+            ) as deps:
+                for dep in await deps.fetchall():
+                    parent = await manager.get_task(dep["parent_id"])
+                    if not parent or not manager._is_dependency_met(dep["dependency_type"], parent.state):
+                        met = False
+                        break
+            if met:
+                ready.append(await manager._row_to_task(row))
+                if len(ready) >= limit:
+                    break
+    return ready
+
+async def legacy_create_task(db, lock, task_id):
+    """Previous create_task write path: one transaction and commit per task under a shared lock"""
+    now = datetime.utcnow().isoformat()
+    async with lock:
+        await db.execute(
+            "INSERT INTO tasks (task_id, state, task_type, priority, created_at, updated_at, metadata, "
+            "max_retries, is_active) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, "pending", "sensor", 2, now, now, "{}", 3, 1)
+        )
+        await db.execute(
+            "INSERT INTO task_history (task_id, timestamp, from_state, to_state, message, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)", (task_id, now, None, "pending", "Task created", None)
+        )
+        await db.commit()
+
+def count_rows(db_path, table="tasks"):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+async def finish(manager, task_id, state=TaskState.COMPLETED):
+    await manager.update_task_state(task_id, TaskState.RUNNING, "started")
+    await manager.update_task_state(task_id, state, "finished")
+
+class TestReadyQueue:
+    """Unmet-dependency counters and the ready queue"""
+
+    @pytest.mark.asyncio
+    async def test_completion_and_success_dependencies(self, tmp_path):
+        async with LocalWorkflowStateManager(str(tmp_path / "state.db")) as manager:
+            await manager.create_task({"task_id": "parent"})
+            await manager.create_task({"task_id": "after_any", "dependencies": [{"parent_id": "parent"}]})
+            await manager.create_task({"task_id": "after_success",
+                                       "dependencies": [{"parent_id": "parent", "type": "success"}]})
+            await manager.create_task({"task_id": "join", "dependencies": [
+                {"parent_id": "parent"}, {"parent_id": "after_any"}
+            ]})
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["parent"]
+
+            await finish(manager, "parent", TaskState.FAILED)
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["after_any"]
+            assert manager._unmet == {"after_any": 0, "after_success": 1, "join": 1}
+
+            await finish(manager, "after_any")
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["join"]
+
+    @pytest.mark.asyncio
+    async def test_counters_survive_restart(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            # Children may be created before their parents
+            await manager.create_task({"task_id": "child", "dependencies": [{"parent_id": "parent"}]})
+            await manager.create_task({"task_id": "parent"})
+            await manager.create_task({"task_id": "grandchild", "dependencies": [{"parent_id": "child"}]})
+            await finish(manager, "parent")
+
+        async with LocalWorkflowStateManager(db_path) as manager:
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["child"]
+            await finish(manager, "child")
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["grandchild"]
+
+    @pytest.mark.asyncio
+    async def test_existing_database_is_backfilled(self, tmp_path):
+        db_path = str(tmp_path / "legacy.db")
+        build_legacy_database(db_path, chains=3, depth=3, completed_heads=2)
+
+        async with LocalWorkflowStateManager(db_path) as manager:
+            ready = {task.task_id for task in await manager.find_ready_tasks()}
+            assert ready == {"c0_t1", "c1_t1", "c2_t0"}
+            assert ready == {task.task_id for task in await legacy_find_ready_tasks(manager)}
+
+    @pytest.mark.asyncio
+    async def test_ready_task_benchmark(self, tmp_path):
+        """find_ready_tasks on deep chains: per-task dependency queries versus the ready queue"""
+        task_count = int(os.environ.get("EDGE_READY_BENCH_TASKS", 100_000))
+        depth = 100
+        chains = task_count // depth
+        db_path = str(tmp_path / "bench.db")
+        build_legacy_database(db_path, chains, depth)
+
+        manager = LocalWorkflowStateManager(db_path)
+        start_time = time.perf_counter()
+        await manager.initialize()
+        startup_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        legacy_ready = await legacy_find_ready_tasks(manager, limit=100)
+        legacy_ms = (time.perf_counter() - start_time) * 1000
+
+        start_time = time.perf_counter()
+        for _ in range(100):
+            ready = await manager.find_ready_tasks(limit=100)
+        indexed_ms = (time.perf_counter() - start_time) * 10
+
+        assert {task.task_id for task in ready} == {task.task_id for task in legacy_ready}
+
+        # Walk chains forward: every completion releases exactly one child
+        rounds = 3
+        for _ in range(rounds):
+            for task in await manager.find_ready_tasks(limit=100):
+                await finish(manager, task.task_id)
+        ready = await manager.find_ready_tasks(limit=chains)
+        assert len(ready) == chains
+        if chains >= rounds * 100:
+            assert sum(task.task_id.endswith("_t1") for task in ready) == rounds * 100
+        await manager.close()
+
+        print(f"\n🧮 Edge Ready Tasks @{chains * depth} tasks in {chains} chains of {depth}:")
+        print(f"   startup (cache load + counter backfill): {startup_seconds:.2f}s")
+        print(f"   legacy  find_ready_tasks(100): {legacy_ms:9.2f} ms")
+        print(f"   indexed find_ready_tasks(100): {indexed_ms:9.3f} ms")
+        print(f"   speedup: {legacy_ms / indexed_ms:,.0f}x")
+
+        assert indexed_ms * 100 < legacy_ms
+
+class TestWriteBatching:
+    """Write-behind group commit, bulk creation and the read pool"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_creates_share_transactions(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            tasks = await asyncio.gather(*(
+                manager.create_task({"task_id": f"sensor_{i}", "task_type": "sensor"}) for i in range(200)
+            ))
+            # Every caller returned after its commit
+            assert count_rows(db_path) == 200
+            assert count_rows(db_path, "task_history") == 200
+            assert manager.write_stats["mutations"] == 200
+            assert manager.write_stats["batches"] <= 5
+            assert len(await manager.find_ready_tasks(limit=500)) == len(tasks)
+
+    @pytest.mark.asyncio
+    async def test_failed_mutation_only_fails_its_caller(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            await manager.create_task({"task_id": "archived"})
+            await manager.update_task_state("archived", TaskState.CANCELLED, "not needed")
+            await manager.delete_task("archived")
+
+            # The archived row still owns its primary key
+            results = await asyncio.gather(
+                manager.create_task({"task_id": "first"}),
+                manager.create_task({"task_id": "archived"}),
+                manager.create_task({"task_id": "second"}),
+                return_exceptions=True
+            )
+            assert isinstance(results[1], sqlite3.IntegrityError)
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["first", "second"]
+            assert manager.write_stats["failed_batches"] == 2  # the shared batch, then the bad mutation alone
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute("SELECT task_id FROM tasks WHERE is_active = 1 ORDER BY task_id").fetchall()
+        assert rows == [("first",), ("second",)]
+
+    @pytest.mark.asyncio
+    async def test_failed_state_update_is_undone(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            await manager.create_task({"task_id": "parent"})
+            await manager.create_task({"task_id": "child", "dependencies": [{"parent_id": "parent"}]})
+            await manager.update_task_state("parent", TaskState.RUNNING, "started")
+            await manager._db.execute(
+                "CREATE TRIGGER reject_completion BEFORE UPDATE OF state ON tasks "
+                "WHEN NEW.state = 'completed' BEGIN SELECT RAISE(ABORT, 'disk says no'); END"
+            )
+
+            with pytest.raises(sqlite3.IntegrityError):
+                await manager.update_task_state("parent", TaskState.COMPLETED, "finished")
+            parent = await manager.get_task("parent")
+            assert parent.state == TaskState.RUNNING
+            assert await manager.find_ready_tasks() == []
+
+            await manager._db.execute("DROP TRIGGER reject_completion")
+            await manager.update_task_state("parent", TaskState.COMPLETED, "finished")
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["child"]
+
+    @pytest.mark.asyncio
+    async def test_failed_deletes_are_undone(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            await manager.create_tasks_bulk([{"task_id": "ready"}, {"task_id": "old"}])
+            await manager.update_task_state("old", TaskState.CANCELLED, "not needed")
+            await manager._db.execute("UPDATE tasks SET updated_at = '2000-01-01T00:00:00' WHERE task_id = 'old'")
+            await manager._db.commit()
+            await manager._db.execute(
+                "CREATE TRIGGER reject_archive BEFORE UPDATE OF is_active ON tasks "
+                "BEGIN SELECT RAISE(ABORT, 'disk says no'); END"
+            )
+
+            with pytest.raises(sqlite3.IntegrityError):
+                await manager.delete_task("ready", force=True)
+            with pytest.raises(sqlite3.IntegrityError):
+                await manager.cleanup_old_tasks(older_than_days=1)
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["ready"]
+            assert "ready" in manager._cache and "old" in manager._cache
+
+            await manager._db.execute("DROP TRIGGER reject_archive")
+            assert await manager.cleanup_old_tasks(older_than_days=1) == 1
+            assert await manager.delete_task("ready", force=True)
+            assert await manager.find_ready_tasks() == [] and not manager._cache
+
+    @pytest.mark.asyncio
+    async def test_writer_survives_unexpected_errors(self, tmp_path, monkeypatch):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            commit_batch = manager._commit_batch
+
+            async def broken(batch):
+                monkeypatch.setattr(manager, "_commit_batch", commit_batch)
+                raise RuntimeError("connection lost")
+            monkeypatch.setattr(manager, "_commit_batch", broken)
+
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(manager.create_task({"task_id": "lost"}), timeout=1.0)
+            assert not manager._writer.done()
+            await asyncio.wait_for(manager.create_task({"task_id": "kept"}), timeout=1.0)
+        assert count_rows(db_path) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_create_leaves_no_dependency_edges(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            await manager.create_tasks_bulk([{"task_id": "a"}, {"task_id": "b"}])
+            await manager._db.execute(
+                "CREATE TRIGGER reject_c BEFORE INSERT ON tasks "
+                "WHEN NEW.task_id = 'c' BEGIN SELECT RAISE(ABORT, 'disk says no'); END"
+            )
+            child = {"task_id": "c", "dependencies": [{"parent_id": "a"}, {"parent_id": "b"}]}
+
+            with pytest.raises(sqlite3.IntegrityError):
+                await manager.create_task(child)
+            assert "a" not in manager._dependents and "b" not in manager._dependents
+
+            # Re-created, the child waits on both parents exactly once
+            await manager._db.execute("DROP TRIGGER reject_c")
+            await manager.create_task(child)
+            await finish(manager, "a")
+            assert manager._unmet["c"] == 1
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["b"]
+            await finish(manager, "b")
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["c"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_with_dependencies(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        chain = [
+            {"task_id": f"step_{i}", "dependencies": [{"parent_id": f"step_{i - 1}"}] if i else []}
+            for i in range(50)
+        ]
+        # Forward reference: a child listed before its parent
+        chain.insert(0, {"task_id": "report", "dependencies": [{"parent_id": "step_49"}]})
+
+        async with LocalWorkflowStateManager(db_path) as manager:
+            created = await manager.create_tasks_bulk(chain)
+            assert len(created) == 51 and manager.write_stats["batches"] == 1
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["step_0"]
+            with pytest.raises(ValueError):
+                await manager.create_tasks_bulk([{"task_id": "step_3"}])
+
+        async with LocalWorkflowStateManager(db_path) as manager:
+            for i in range(50):
+                await finish(manager, f"step_{i}")
+            assert [task.task_id for task in await manager.find_ready_tasks()] == ["report"]
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_wait_behind_writers(self, tmp_path):
+        db_path = str(tmp_path / "state.db")
+        async with LocalWorkflowStateManager(db_path) as manager:
+            await manager.create_task({"task_id": "archived"})
+            await manager.update_task_state("archived", TaskState.CANCELLED, "done")
+            await manager.delete_task("archived")
+
+            # Another process holds the write lock
+            blocker = sqlite3.connect(db_path, isolation_level=None)
+            blocker.execute("BEGIN IMMEDIATE")
+            blocker.execute("UPDATE tasks SET error = 'busy' WHERE task_id = 'archived'")
+
+            pending_write = asyncio.ensure_future(manager.create_task({"task_id": "queued"}))
+            archived = await asyncio.wait_for(manager.get_task("archived"), timeout=1.0)
+            assert archived.state == TaskState.CANCELLED
+            await asyncio.sleep(0.05)
+            assert not pending_write.done()
+
+            blocker.execute("COMMIT")
+            blocker.close()
+            assert (await pending_write).task_id == "queued"
+
+    @pytest.mark.asyncio
+    async def test_write_throughput_benchmark(self, tmp_path):
+        """Bursty task creation: commit per task versus group commit versus executemany"""
+        burst = int(os.environ.get("EDGE_WRITE_BENCH_TASKS", 2000))
+        results = {}
+
+        legacy_path = str(tmp_path / "legacy.db")
+        async with LocalWorkflowStateManager(legacy_path):
+            pass  # create the schema
+        async with aiosqlite.connect(legacy_path) as db:
+            await db.execute("PRAGMA journal_mode=WAL")
+            lock = asyncio.Lock()
+            start_time = time.perf_counter()
+            await asyncio.gather(*(legacy_create_task(db, lock, f"sensor_{i}") for i in range(burst)))
+            results["commit per task"] = time.perf_counter() - start_time
+
+        async with LocalWorkflowStateManager(str(tmp_path / "batched.db")) as manager:
+            start_time = time.perf_counter()
+            await asyncio.gather(*(
+                manager.create_task({"task_id": f"sensor_{i}", "task_type": "sensor"}) for i in range(burst)
+            ))
+            results["group commit"] = time.perf_counter() - start_time
+            batches = manager.write_stats["batches"]
+
+        async with LocalWorkflowStateManager(str(tmp_path / "bulk.db")) as manager:
+            start_time = time.perf_counter()
+            await manager.create_tasks_bulk([{"task_id": f"sensor_{i}", "task_type": "sensor"} for i in range(burst)])
+            results["create_tasks_bulk"] = time.perf_counter() - start_time
+            bulk_batches = manager.write_stats["batches"]
+
+        for path in ("legacy.db", "batched.db", "bulk.db"):
+            assert count_rows(str(tmp_path / path)) == burst
+            assert count_rows(str(tmp_path / path), "task_history") == burst
+
+        print(f"\n📝 Edge Task Writes @{burst} concurrent creates:")
+        for label, seconds in results.items():
+            print(f"   {label:<18} {burst / seconds:10,.0f} tasks/s")
+        print(f"   group commit used {batches} transactions")
+
+        # Wall-clock ratios are noisy on shared runners: assert on the
+        # transaction counts that produce the speedup instead
+        assert batches * 20 < burst
+        assert bulk_batches == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+Monitoring Analytics Performance Tests
+Ring-buffer metric storage, rollups, the scrape scheduler, streaming anomaly
+detection and indexed alert rules for the monitoring-analytics service
+"""
+
+import pytest
+import asyncio
+import importlib.util
+import json
+import statistics
+import time
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+from aiohttp import ClientSession, ClientTimeout, web
+from aiohttp.test_utils import TestServer
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+SERVICE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'monitoring-analytics', 'src', 'main.py'
+)
+
+def _load_service():
+    spec = importlib.util.spec_from_file_location("monitoring_analytics_service", SERVICE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+svc = _load_service()
+
+class LegacyMetricList:
+    """Previous storage: a Metric list rebuilt with a retention filter on every append"""
+
+    def __init__(self, retention_hours=24):
+        self.metrics = {}
+        self.retention_hours = retention_hours
+
+    def add(self, name, value, timestamp):
+        metric = svc.Metric(name=name, type=svc.MetricType.GAUGE, value=value, timestamp=timestamp)
+        self.metrics.setdefault(name, []).append(metric)
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+        self.metrics[name] = [m for m in self.metrics[name] if m.timestamp >= cutoff_time]
+
+    def summary(self, name, time_range_hours):
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_range_hours)
+        values = [m.value for m in self.metrics[name] if m.timestamp >= cutoff_time]
+        return {
+            "data_points": len(values),
+            "avg_value": statistics.mean(values),
+            "median_value": statistics.median(values),
+            "std_dev": statistics.stdev(values)
+        }
+
+def synthetic_series(count, interval, seed=11):
+    """``count`` samples ending now, ``interval`` seconds apart"""
+    rng = np.random.default_rng(seed)
+    end = time.time()
+    timestamps = end - interval * np.arange(count)[::-1]
+    values = 50 + 10 * np.sin(np.arange(count) / 50) + rng.normal(0, 3, count)
+    return timestamps, values
+
+async def legacy_collect_service_metrics(urls, timeout=5):
+    """Previous _collect_service_metrics: one service at a time, a new session per check"""
+    statuses = {}
+    for name, url in urls.items():
+        try:
+            async with ClientSession(timeout=ClientTimeout(total=timeout)) as session:
+                async with session.get(url) as response:
+                    statuses[name] = response.status
+        except Exception:
+            statuses[name] = None
+    return statuses
+
+async def start_health_server(latency=0.0, slow_latency=2.0):
+    """Local server: /health/<n> answers after ``latency``, /slow after ``slow_latency``"""
+    async def health(request):
+        await asyncio.sleep(latency)
+        return web.json_response({"status": "healthy"})
+
+    async def slow(request):
+        await asyncio.sleep(slow_latency)
+        return web.json_response({"status": "healthy"})
+
+    app = web.Application()
+    app.router.add_get("/health/{n}", health)
+    app.router.add_get("/slow", slow)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+def legacy_trend_statistics(values, timestamps):
+    """Previous analyze_performance_trends core: full-history mean, stdev, slope and anomaly scan"""
+    mean = statistics.mean(values)
+    std_dev = statistics.stdev(values)
+    n = len(timestamps)
+    sum_x, sum_y = sum(timestamps), sum(values)
+    sum_xy = sum(x * y for x, y in zip(timestamps, values))
+    sum_x2 = sum(x * x for x in timestamps)
+    slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+    anomalies = [v for v in values if std_dev > 0 and abs(v - mean) / std_dev > 2.0]
+    return mean, std_dev, slope, anomalies
+
+def legacy_evaluate_rules(collector, rules):
+    """Previous _evaluate_alerts pass: every rule re-reads its metric windows on a timer"""
+    fired = 0
+    for rule in rules:
+        metric_names = [rule["metric"]] if rule.get("metric") else [
+            name for name in collector.metrics.keys() if rule["metric_pattern"].replace("*", "") in name
+        ]
+        for metric_name in metric_names:
+            summary = collector.get_metric_summary(metric_name, 0.1)
+            if "error" not in summary and summary["current_value"] > rule["threshold"]:
+                fired += 1
+    return fired
+
+def threshold_rule(name, threshold, minutes=0, **target):
+    return {"name": name, "threshold": threshold, "operator": ">",
+            "severity": svc.AlertSeverity.HIGH, "duration_minutes": minutes, **target}
+
+class TestMetricStore:
+    """Ring buffers, window statistics and rollups"""
+
+    def test_ring_buffer_wraps_and_keeps_order(self):
+        ring = svc.RingBuffer(capacity=4, width=2)
+        for i in range(6):
+            ring.append((float(i), i * 10.0))
+        assert ring.size == 4
+        assert ring.since(0).tolist() == [[2, 20], [3, 30], [4, 40], [5, 50]]
+        assert ring.since(3.5).tolist() == [[4, 40], [5, 50]]
+        assert ring.since(9).shape == (0, 2)
+        assert ring.first()[0] == 2 and ring.last()[0] == 5
+
+    def test_raw_window_statistics_match_statistics_module(self):
+        collector = svc.APMCollector(metric_capacity=1000)
+        timestamps, values = synthetic_series(1500, interval=2)
+        for timestamp, value in zip(timestamps, values):
+            collector._add_metric("service.api.response_time", svc.MetricType.GAUGE, value, {"unit": "ms"}, timestamp)
+
+        summary = collector.get_metric_summary("service.api.response_time", 0.25)
+        window = values[timestamps >= time.time() - 900]
+        assert summary["resolution"] == "raw"
+        assert summary["data_points"] == len(window)
+        assert summary["avg_value"] == pytest.approx(statistics.mean(window))
+        assert summary["median_value"] == pytest.approx(statistics.median(window))
+        assert summary["std_dev"] == pytest.approx(statistics.stdev(window))
+        assert summary["p99_value"] == pytest.approx(np.percentile(window, 99))
+        assert summary["current_value"] == values[-1]
+        assert len(collector.metrics["service.api.response_time"]) == 1000
+
+    def test_long_windows_read_rollups(self):
+        collector = svc.APMCollector(metric_capacity=256)
+        timestamps, values = synthetic_series(8640, interval=10)  # 24h at 10s
+        for timestamp, value in zip(timestamps, values):
+            collector._add_metric("system.cpu.usage", svc.MetricType.GAUGE, value, {}, timestamp)
+
+        for hours, resolution in ((6, "1m"), (24, "5m")):
+            summary = collector.get_metric_summary("system.cpu.usage", hours)
+            # Rollup buckets are aligned, so the first one may start before the window
+            start = time.time() - hours * 3600
+            window = values[timestamps >= start - start % svc.ROLLUP_RESOLUTIONS[resolution][0]]
+            assert summary["resolution"] == resolution
+            assert summary["data_points"] == len(window)
+            assert summary["avg_value"] == pytest.approx(window.mean())
+            assert summary["std_dev"] == pytest.approx(window.std(ddof=1))
+            assert (summary["min_value"], summary["max_value"]) == (window.min(), window.max())
+            assert summary["median_value"] == pytest.approx(np.median(window), abs=1.5)
+
+        # 256 raw samples cover ~42 minutes; an hour falls back to rollups
+        assert collector.get_metric_summary("system.cpu.usage", 1)["resolution"] == "1m"
+        assert collector.get_metric_summary("system.cpu.usage", 0.5)["resolution"] == "raw"
+
+    @pytest.mark.asyncio
+    async def test_metric_endpoint_and_stale_series_cleanup(self):
+        collector = svc.apm_collector
+        collector._add_metric("system.disk.usage", svc.MetricType.GAUGE, 42.0, {"unit": "percent"})
+        collector._add_metric("stale.metric", svc.MetricType.GAUGE, 1.0, {}, time.time() - 25 * 3600)
+
+        details = await svc.get_metric_details("system.disk.usage", 1)
+        assert details["summary"]["current_value"] == 42.0
+        assert details["raw_data"][-1]["value"] == 42.0
+        assert details["raw_data"][-1]["labels"] == {"unit": "percent"}
+
+        await collector._cleanup_old_metrics()
+        assert "stale.metric" not in collector.metrics
+        assert "system.disk.usage" in collector.metrics
+
+    def test_ingest_and_query_benchmark(self):
+        """24h of samples: list rebuild per append versus ring buffer + rollups"""
+        count = int(os.environ.get("APM_BENCH_SAMPLES", 5000))
+        interval = 24 * 3600 / count
+        timestamps, values = synthetic_series(count, interval)
+        datetimes = [datetime.fromtimestamp(t, timezone.utc) for t in timestamps]
+
+        legacy = LegacyMetricList()
+        start_time = time.perf_counter()
+        for timestamp, value in zip(datetimes, values):
+            legacy.add("system.cpu.usage", value, timestamp)
+        legacy_ingest = time.perf_counter() - start_time
+
+        collector = svc.APMCollector()
+        start_time = time.perf_counter()
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            collector._add_metric("system.cpu.usage", svc.MetricType.GAUGE, value, {}, timestamp)
+        ring_ingest = time.perf_counter() - start_time
+
+        queries = 50
+        start_time = time.perf_counter()
+        for _ in range(queries):
+            legacy.summary("system.cpu.usage", 24)
+        legacy_query_ms = (time.perf_counter() - start_time) * 1000 / queries
+
+        start_time = time.perf_counter()
+        for _ in range(queries):
+            summary = collector.get_metric_summary("system.cpu.usage", 24)
+        ring_query_ms = (time.perf_counter() - start_time) * 1000 / queries
+        assert summary["resolution"] == "5m"
+
+        print(f"\n📈 APM Metric Store @{count} samples over 24h:")
+        print(f"   legacy ingest: {count / legacy_ingest:12,.0f} samples/s")
+        print(f"   ring   ingest: {count / ring_ingest:12,.0f} samples/s")
+        print(f"   legacy 24h summary: {legacy_query_ms:8.3f} ms")
+        print(f"   rollup 24h summary: {ring_query_ms:8.3f} ms")
+
+        assert ring_ingest * 5 < legacy_ingest
+        assert ring_query_ms * 5 < legacy_query_ms
+
+class TestScrapeScheduler:
+    """Config-driven targets, concurrent scrapes over one session, non-blocking system sampling"""
+
+    def test_targets_come_from_services_config(self, tmp_path, monkeypatch):
+        config = {"services": {
+            "billing": {"port": 9101},
+            "inventory": {"port": 9102, "health_endpoint": "/ready", "scrape_interval": 5, "scrape_timeout": 0.5},
+            "monitoring-analytics": {"port": 8008},
+            "frontend-without-port": {"path": "web"}
+        }}
+        path = tmp_path / "services.json"
+        path.write_text(json.dumps(config))
+        monkeypatch.setenv("MONITORING_TARGET_HOST", "10.0.0.7")
+
+        targets = {t.name: t for t in svc.load_scrape_targets(str(path), interval=30, timeout=5)}
+        assert set(targets) == {"billing", "inventory"}
+        assert targets["billing"].url == "http://10.0.0.7:9101/health"
+        assert (targets["billing"].interval, targets["billing"].timeout) == (30, 5)
+        assert targets["inventory"].url == "http://10.0.0.7:9102/ready"
+        assert (targets["inventory"].interval, targets["inventory"].timeout) == (5, 0.5)
+        assert svc.load_scrape_targets(str(tmp_path / "missing.json")) == []
+
+        # The shipped config keeps the previously hard-coded services
+        assert set(svc.apm_collector.services) == {
+            "workflow-state-service", "robot-abstraction-protocol", "ai-task-delegation",
+            "edge-computing", "security-compliance"
+        }
+
+    @pytest.mark.asyncio
+    async def test_slow_service_does_not_delay_the_others(self):
+        server = await start_health_server(latency=0.01, slow_latency=2.0)
+        targets = [svc.ScrapeTarget(f"svc_{i}", str(server.make_url(f"/health/{i}")), timeout=1.0) for i in range(5)]
+        targets.append(svc.ScrapeTarget("stuck", str(server.make_url("/slow")), timeout=0.2))
+        collector = svc.APMCollector(targets=targets)
+        try:
+            start_time = time.perf_counter()
+            await collector._collect_service_metrics()
+            elapsed = time.perf_counter() - start_time
+            await collector._collect_service_metrics()
+
+            assert elapsed < 0.5
+            assert collector.service_health["stuck"].status == svc.ServiceStatus.UNHEALTHY
+            assert all(collector.service_health[f"svc_{i}"].status == svc.ServiceStatus.HEALTHY for i in range(5))
+            assert collector.get_metric_summary("service.svc_0.response_time", 1)["data_points"] == 2
+            assert collector.scraper.stats["timeouts"] == 2
+            assert collector.scraper.stats["sessions_opened"] == 1
+        finally:
+            await collector.close()
+            await server.close()
+
+    @pytest.mark.asyncio
+    async def test_scheduled_targets_keep_their_own_cadence(self):
+        server = await start_health_server(latency=0.0, slow_latency=5.0)
+        fast = svc.ScrapeTarget("fast", str(server.make_url("/health/0")), interval=0.05, timeout=1.0)
+        stuck = svc.ScrapeTarget("stuck", str(server.make_url("/slow")), interval=0.05, timeout=5.0)
+        collector = svc.APMCollector(targets=[fast, stuck])
+        collector.collection_interval = 60
+        try:
+            collector.start()
+            await asyncio.sleep(0.5)
+            assert len(collector.metrics["service.fast.response_time"]) >= 5
+            assert "stuck" not in collector.service_health
+            assert "system.cpu.usage" in collector.metrics
+        finally:
+            await collector.close()
+            await server.close()
+        assert collector.scraper._session.closed
+
+    @pytest.mark.asyncio
+    async def test_system_sampling_does_not_block_the_loop(self):
+        collector = svc.APMCollector(targets=[])
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        start_time = time.perf_counter()
+        await collector._collect_system_metrics()
+        elapsed = time.perf_counter() - start_time
+        task.cancel()
+
+        # cpu_percent(interval=1) used to hold the loop for a full second
+        assert elapsed < 0.5
+        assert 0.0 <= collector.get_metric_summary("system.cpu.usage", 1)["current_value"] <= 100.0
+        assert "system.network.bytes_recv" in collector.metrics
+
+    @pytest.mark.asyncio
+    async def test_scrape_cycle_benchmark(self):
+        """Scrape cycle over many services: sequential new-session checks versus the scheduler"""
+        count = int(os.environ.get("APM_BENCH_SCRAPE_TARGETS", 20))
+        server = await start_health_server(latency=0.02)
+        urls = {f"svc_{i}": str(server.make_url(f"/health/{i}")) for i in range(count)}
+        collector = svc.APMCollector(targets=[svc.ScrapeTarget(name, url) for name, url in urls.items()])
+        try:
+            await collector._collect_service_metrics()  # warm the connection pool
+
+            start_time = time.perf_counter()
+            statuses = await legacy_collect_service_metrics(urls)
+            legacy_ms = (time.perf_counter() - start_time) * 1000
+
+            start_time = time.perf_counter()
+            await collector._collect_service_metrics()
+            scheduler_ms = (time.perf_counter() - start_time) * 1000
+        finally:
+            await collector.close()
+            await server.close()
+
+        print(f"\n🩺 Service Scrape Cycle @{count} services, 20 ms health endpoints:")
+        print(f"   legacy sequential: {legacy_ms:8.1f} ms")
+        print(f"   scheduler        : {scheduler_ms:8.1f} ms")
+        print(f"   speedup: {legacy_ms / scheduler_ms:,.1f}x")
+
+        assert set(statuses.values()) == {200}
+        assert all(h.status == svc.ServiceStatus.HEALTHY for h in collector.service_health.values())
+        assert scheduler_ms * 4 < legacy_ms
+
+class TestStreamingDetection:
+    """Rolling Welford/EWMA/slope state, pushed anomaly alerts and incremental trend analysis"""
+
+    def test_rolling_state_matches_batch_statistics(self):
+        detector = svc.StreamingDetector(window=50)
+        timestamps, values = synthetic_series(1037, interval=30)  # epoch timestamps, many rebases
+        values = values + 0.004 * (timestamps - timestamps[0])
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            detector.update(timestamp, value)
+
+        window_t, window_v = timestamps[-50:], values[-50:]
+        assert detector.count == 50
+        assert detector.mean == pytest.approx(window_v.mean(), rel=1e-9)
+        assert detector.std == pytest.approx(window_v.std(ddof=1), rel=1e-9)
+        assert detector.slope == pytest.approx(np.polyfit(window_t - window_t[0], window_v, 1)[0], rel=1e-6)
+
+        ewma = values[0]
+        for value in values[1:]:
+            ewma += svc.EWMA_ALPHA * (value - ewma)
+        assert detector.ewma == pytest.approx(ewma)
+
+    @pytest.mark.asyncio
+    async def test_anomalies_are_pushed_to_alert_manager(self):
+        collector = svc.APMCollector(targets=[])
+        alerts = svc.AlertManager(collector)
+        notified = []
+
+        async def notify(alert):
+            notified.append(alert.metric)
+        alerts._send_notifications = notify
+
+        rng = np.random.default_rng(3)
+        now = time.time()
+        for i in range(100):
+            collector._add_metric("service.billing.response_time", svc.MetricType.GAUGE,
+                                  100 + rng.normal(0, 5), {"unit": "ms"}, now + i)
+            collector._add_metric("system.network.bytes_sent", svc.MetricType.COUNTER,
+                                  1000.0 * i * i, {"unit": "bytes"}, now + i)
+        assert alerts.get_active_alerts() == []
+
+        collector._add_metric("service.billing.response_time", svc.MetricType.GAUGE, 400.0, {}, now + 100)
+        collector._add_metric("service.billing.response_time", svc.MetricType.GAUGE, 450.0, {}, now + 101)
+        await asyncio.sleep(0)
+
+        active = alerts.get_active_alerts()
+        assert [(a.name, a.metric, a.service) for a in active] == \
+            [("Metric Anomaly", "service.billing.response_time", "billing")]
+        assert active[0].severity == svc.AlertSeverity.HIGH
+        assert active[0].current_value == 400.0
+        assert 100 < active[0].threshold < 130
+        assert notified == ["service.billing.response_time"]
+
+    @pytest.mark.asyncio
+    async def test_trend_analysis_reads_detector_state(self):
+        collector = svc.APMCollector(targets=[])
+        engine = svc.AnalyticsEngine(collector)
+        assert (await engine.analyze_performance_trends("billing", "cpu_usage"))["error"] == \
+            "No performance data available"
+
+        timestamps, values = synthetic_series(200, interval=30)
+        values = 40 + 0.01 * (timestamps - timestamps[0]) + (values - 50) * 0.1
+        values[150] += 40
+        for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+            collector._add_metric("service.billing.perf.cpu_usage", svc.MetricType.GAUGE, value,
+                                  {"service": "billing"}, timestamp)
+
+        analysis = await engine.analyze_performance_trends("billing", "cpu_usage", 24)
+        detector = collector.metrics["service.billing.perf.cpu_usage"].detector
+        assert analysis["data_points"] == 200
+        assert analysis["statistics"]["average"] == pytest.approx(values.mean())
+        window = svc.DETECTOR_WINDOW
+        assert analysis["trend"]["slope"] == \
+            pytest.approx(np.polyfit(timestamps[-window:] - timestamps[-window], values[-window:], 1)[0])
+        assert analysis["trend"]["direction"] == "stable"
+        assert analysis["trend"]["window_samples"] == svc.DETECTOR_WINDOW
+        assert analysis["anomalies"]["count"] == 1
+        assert analysis["anomalies"]["recent_anomalies"][0]["value"] == values[150]
+        assert analysis["predictions"]["base_prediction"] == detector.ewma
+        assert analysis["predictions"]["predictions"][0]["predicted_value"] == \
+            pytest.approx(detector.ewma + detector.slope * 3600)
+        assert (await engine.analyze_performance_trends("billing", "queue_depth"))["error"] == \
+            "No performance data available"
+
+    @pytest.mark.asyncio
+    async def test_performance_metrics_feed_detectors(self):
+        collector = svc.APMCollector(targets=[])
+        target = svc.ScrapeTarget("billing", "http://localhost:1/health")
+        health = await collector.scraper.check(target)
+        await collector._record_service_health(target, health)
+        for field_name in svc.PERFORMANCE_FIELDS:
+            assert collector.metrics[f"service.billing.perf.{field_name}"].detector.total == 1
+        await collector.close()
+
+    def test_detector_cpu_benchmark(self):
+        """CPU per sample across many series, and trend queries versus full-history recompute"""
+        series_count = int(os.environ.get("APM_BENCH_SERIES", 10_000))
+        samples_per_series = 20
+        collector = svc.APMCollector(metric_capacity=64, targets=[])
+        names = [f"service.svc_{i % 50}.perf.metric_{i}" for i in range(series_count)]
+        rng = np.random.default_rng(9)
+        values = rng.normal(50, 5, (samples_per_series, series_count)).tolist()
+        now = time.time()
+
+        detectors = [svc.StreamingDetector() for _ in range(series_count)]
+        start_time = time.process_time()
+        for step, row in enumerate(values):
+            timestamp = now + step
+            for detector, value in zip(detectors, row):
+                detector.update(timestamp, value)
+        detector_us = (time.process_time() - start_time) * 1e6 / (series_count * samples_per_series)
+
+        start_time = time.process_time()
+        for step, row in enumerate(values):
+            timestamp = now + step
+            for name, value in zip(names, row):
+                collector._add_metric(name, svc.MetricType.GAUGE, value, {}, timestamp)
+        ingest_us = (time.process_time() - start_time) * 1e6 / (series_count * samples_per_series)
+
+        # A day of 30s samples for one service metric, queried as a dashboard would
+        timestamps, history = synthetic_series(2880, interval=30)
+        timestamps, history = timestamps.tolist(), history.tolist()
+        for timestamp, value in zip(timestamps, history):
+            collector._add_metric("service.billing.perf.cpu_usage", svc.MetricType.GAUGE, value, {}, timestamp)
+        engine = svc.AnalyticsEngine(collector)
+
+        queries = 20
+        start_time = time.perf_counter()
+        for _ in range(queries):
+            legacy_trend_statistics(history, timestamps)
+        legacy_ms = (time.perf_counter() - start_time) * 1000 / queries
+
+        start_time = time.perf_counter()
+        for _ in range(queries):
+            analysis = asyncio.run(engine.analyze_performance_trends("billing", "cpu_usage", 24))
+        streaming_ms = (time.perf_counter() - start_time) * 1000 / queries
+        assert analysis["data_points"] == 2880
+
+        print(f"\n🔍 Streaming Detection @{series_count} series:")
+        print(f"   detector update : {detector_us:8.2f} µs CPU/sample")
+        print(f"   full _add_metric: {ingest_us:8.2f} µs CPU/sample")
+        print(f"   legacy trend query (2880 points): {legacy_ms:8.3f} ms")
+        print(f"   streaming trend query           : {streaming_ms:8.3f} ms")
+
+        assert detector_us < 50
+        assert streaming_ms * 3 < legacy_ms
+
+class TestRuleIndex:
+    """Per-metric rule dispatch, for-duration hysteresis, dedup and grouping"""
+
+    def test_index_dispatches_exact_and_pattern_rules(self):
+        index = svc.RuleIndex([
+            threshold_rule("cpu", 80, metric="system.cpu.usage"),
+            threshold_rule("errors", 5, metric_pattern="service.*.error_rate"),
+            threshold_rule("any-latency", 100, metric_pattern="*.*.response_time"),
+        ])
+        assert [r.name for r in index.rules_for("system.cpu.usage")] == ["cpu"]
+        assert [r.name for r in index.rules_for("service.billing.error_rate")] == ["errors"]
+        assert [r.name for r in index.rules_for("service.billing.response_time")] == ["any-latency"]
+        # A wildcard spans one dot-separated segment
+        assert index.rules_for("service.billing.perf.error_rate") == ()
+        assert index.rules_for("system.memory.usage") == ()
+        assert index.rules_for("service.billing.error_rate") is index.rules_for("service.billing.error_rate")
+
+    def test_for_duration_hysteresis_and_dedup(self):
+        collector = svc.APMCollector(targets=[])
+        alerts = svc.AlertManager(collector)
+        alerts.set_rules([threshold_rule("Hot", 80, minutes=1, metric="system.cpu.usage")])
+        now = time.time()
+
+        def sample(offset, value):
+            collector._add_metric("system.cpu.usage", svc.MetricType.GAUGE, value, {}, now + offset)
+
+        sample(0, 90)
+        sample(30, 95)
+        sample(45, 70)  # dips below: the pending timer restarts
+        sample(60, 90)
+        sample(90, 91)
+        assert alerts.get_active_alerts() == []
+        sample(120, 92)
+        sample(150, 93)
+
+        active = alerts.get_active_alerts()
+        assert [(a.name, a.current_value) for a in active] == [("Hot", 92)]
+        assert alerts.get_evaluation_stats()["alerts_fired"] == 1
+
+        assert alerts._pending == {}
+
+        # Once resolved, a breach that is still ongoing fires again after
+        # holding for the full duration
+        active[0].resolved_at = datetime.now(timezone.utc)
+        sample(180, 94)
+        sample(210, 95)
+        assert alerts.get_active_alerts() == [] and len(alerts.alerts) == 1
+        sample(240, 96)
+        assert len(alerts.get_active_alerts()) == 1 and len(alerts.alerts) == 2
+
+    @pytest.mark.asyncio
+    async def test_firing_alerts_are_grouped(self):
+        collector = svc.APMCollector(targets=[])
+        alerts = svc.AlertManager(collector)
+        notified = []
+
+        async def notify(alert):
+            notified.append(alert.metric)
+        alerts._send_notifications = notify
+        alerts.set_rules([
+            threshold_rule("Error Rate", 5, metric_pattern="service.*.error_rate"),
+            {**threshold_rule("Slow", 1000, metric_pattern="service.*.response_time"), "group_by": "service"},
+        ])
+
+        for service in ("billing", "inventory", "shipping"):
+            collector._add_metric(f"service.{service}.error_rate", svc.MetricType.GAUGE, 50.0, {})
+            collector._add_metric(f"service.{service}.response_time", svc.MetricType.GAUGE, 2000.0, {})
+        await asyncio.sleep(0)
+
+        groups = {(g["rule"], g["service"]): g for g in alerts.get_alert_groups()}
+        assert groups[("Error Rate", None)]["count"] == 3
+        assert groups[("Error Rate", None)]["metrics"] == [
+            "service.billing.error_rate", "service.inventory.error_rate", "service.shipping.error_rate"
+        ]
+        assert {key for key in groups if key[0] == "Slow"} == \
+            {("Slow", "billing"), ("Slow", "inventory"), ("Slow", "shipping")}
+        assert notified.count("service.billing.error_rate") == 1
+        assert len(notified) == 4  # one per group
+
+    @pytest.mark.asyncio
+    async def test_alerts_endpoint_reports_groups_and_latency(self):
+        svc.apm_collector._add_metric("service.billing.error_rate", svc.MetricType.GAUGE, 40.0, {})
+        response = await svc.get_alerts()
+        evaluation = response["alert_summary"]["evaluation"]
+        assert evaluation["rules"] == 4 and evaluation["samples"] >= 1
+        assert evaluation["latency_us"]["p99"] >= evaluation["latency_us"]["p50"] > 0
+        assert evaluation["pending"] >= 1  # the error-rate rule holds for a minute before firing
+
+    def test_rule_evaluation_benchmark(self):
+        """5k rules: timer pass over every rule versus per-sample dispatch at 50k samples"""
+        rule_count = int(os.environ.get("APM_BENCH_RULES", 5000))
+        sample_count = int(os.environ.get("APM_BENCH_RULE_SAMPLES", 50_000))
+        metric_count = 2 * rule_count
+        collector = svc.APMCollector(metric_capacity=64, targets=[])
+        alerts = svc.AlertManager(collector)
+        rules = [threshold_rule(f"rule_{i}", 95, minutes=1, metric=f"service.svc_{i % 100}.metric_{i}")
+                 for i in range(rule_count - 50)]
+        rules += [threshold_rule(f"pattern_{i}", 99, metric_pattern=f"service.svc_{i}.*") for i in range(50)]
+        alerts.set_rules(rules)
+
+        names = [f"service.svc_{i % 100}.metric_{i}" for i in range(metric_count)]
+        rng = np.random.default_rng(4)
+        values = rng.normal(50, 20, sample_count).tolist()
+        now = time.time()
+        for name in names:
+            collector._add_metric(name, svc.MetricType.GAUGE, 50.0, {}, now)
+
+        start_time = time.perf_counter()
+        legacy_evaluate_rules(collector, rules)
+        legacy_pass = time.perf_counter() - start_time
+
+        alerts.evaluation_latencies_ns.clear()
+        start_time = time.perf_counter()
+        for i, value in enumerate(values):
+            alerts.on_sample(names[i % metric_count], value, now + i / 1000)
+        dispatch = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for i, value in enumerate(values):
+            collector._add_metric(names[i % metric_count], svc.MetricType.GAUGE, value, {}, now + i / 1000)
+        ingest = time.perf_counter() - start_time
+
+        latency = alerts.get_evaluation_stats()["latency_us"]
+        print(f"\n🚨 Alert Rules @{rule_count} rules, {sample_count} samples over {metric_count} series:")
+        print(f"   legacy timer pass    : {legacy_pass * 1000:8.1f} ms per pass")
+        print(f"   indexed dispatch     : {sample_count / dispatch:12,.0f} samples/s "
+              f"(p50 {latency['p50']:.2f} µs, p99 {latency['p99']:.2f} µs)")
+        print(f"   full ingest + rules  : {sample_count / ingest:12,.0f} samples/s")
+
+        assert alerts.get_evaluation_stats()["alerts_fired"] > 0
+        assert sample_count / dispatch > 50_000
+        # A whole second of samples costs less than one legacy pass
+        assert dispatch < legacy_pass
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
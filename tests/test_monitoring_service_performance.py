@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Monitoring Service Performance Tests
+Batched SQLite writer for progress ingestion in the task monitoring service
+"""
+
+import pytest
+import importlib.util
+import json
+import sqlite3
+import tempfile
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+SERVICE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'monitoring-service', 'src', 'main.py'
+)
+
+def _load_service():
+    # The service creates data/monitoring_service.db in the working directory on import
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="monitoring_service_"))
+    try:
+        spec = importlib.util.spec_from_file_location("monitoring_service", SERVICE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        spec.loader.exec_module(module)
+        return module
+    finally:
+        os.chdir(cwd)
+
+svc = _load_service()
+
+def legacy_store_progress(db_path, delegation_id, timestamp, progress, quality, performance):
+    """Previous update_task_progress write path: connect, insert, update, commit, close per request"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(svc.INSERT_PROGRESS_SQL, (delegation_id, timestamp, progress,
+                                             json.dumps(quality), json.dumps(performance)))
+    cursor.execute(svc.UPDATE_MONITOR_PROGRESS_SQL, (progress, timestamp, delegation_id))
+    conn.commit()
+    conn.close()
+
+def monitor_row(delegation_id, started="2026-01-01T00:00:00+00:00"):
+    return (delegation_id, f"task_{delegation_id}", "agent_1", "iot_monitoring", "high",
+            "2026-01-01T01:00:00+00:00", started, "monitoring", 0.0, started)
+
+def fetch(db_path, sql, params=()):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(sql, params).fetchall()
+
+class TestBatchedWriter:
+    """Writer thread batching, ordering, indexes and throughput"""
+
+    def test_batches_coalesce_updates_and_keep_order(self, tmp_path):
+        db = svc.MonitoringDatabase(str(tmp_path / "monitoring.db"), commit_interval=0.2)
+        db.execute(svc.UPSERT_MONITOR_SQL, [monitor_row(f"d{i}") for i in range(3)])
+        for step in range(1, 101):
+            for i in range(3):
+                db.record_progress(f"d{i}", f"t{step:03d}", step / 100, {"precision": 0.9}, {"cpu_usage": 0.3})
+        db.append(svc.INSERT_ALERT_SQL, [("a1", "d0", "high_error_rate", "boom", "critical", "t100")])
+        db.execute(svc.STOP_MONITOR_SQL, [("t101", "d1")])
+        # Restarting d2 after its progress updates must leave it at zero
+        db.execute(svc.UPSERT_MONITOR_SQL, [monitor_row("d2", started="t102")])
+        assert db.flush(timeout=5)
+
+        path = db.db_path
+        assert fetch(path, "SELECT COUNT(*) FROM progress_history")[0][0] == 300
+        assert fetch(path, "SELECT delegation_id, current_progress, status, last_update FROM task_monitors "
+                           "ORDER BY delegation_id") == [
+            ("d0", 1.0, "monitoring", "t100"),
+            ("d1", 1.0, "stopped", "t100"),
+            ("d2", 0.0, "monitoring", "t102"),
+        ]
+        assert fetch(path, "SELECT alert_id FROM alerts") == [("a1",)]
+        assert db.write_stats["batches"] == 1 and db.write_stats["failed_batches"] == 0
+        db.close()
+
+    def test_wal_mode_and_indexes(self, tmp_path):
+        db = svc.MonitoringDatabase(str(tmp_path / "monitoring.db"))
+        with db.reader() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM progress_history WHERE delegation_id = ? ORDER BY timestamp",
+                ("d0",)
+            ))
+            assert "idx_progress_delegation_time" in plan
+            plan = " ".join(row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM progress_history WHERE timestamp >= ?", ("t",)
+            ))
+            assert "idx_progress_time" in plan
+
+    def test_failed_batch_releases_flush(self, tmp_path):
+        db = svc.MonitoringDatabase(str(tmp_path / "monitoring.db"))
+        db.append("INSERT INTO missing_table VALUES (?)", [(1,)])
+        assert db.flush(timeout=5)
+        assert db.write_stats["failed_batches"] == 1
+        assert db.write_stats["dropped_rows"] == 1
+        db.record_progress("d0", "t1", 0.5, {}, {})
+        assert db.flush(timeout=5)
+        assert fetch(db.db_path, "SELECT COUNT(*) FROM progress_history")[0][0] == 1
+        db.close()
+
+    def test_bad_row_only_drops_itself(self, tmp_path):
+        db = svc.MonitoringDatabase(str(tmp_path / "monitoring.db"), commit_interval=0.2)
+        db.execute(svc.UPSERT_MONITOR_SQL, [monitor_row("d0")])
+        for step in range(1, 51):
+            db.record_progress("d0", f"t{step:03d}", step / 100, {}, {})
+        # The second alert reuses the first one's primary key
+        db.append(svc.INSERT_ALERT_SQL, [("a1", "d0", "high_error_rate", "boom", "critical", "t050"),
+                                         ("a1", "d0", "high_error_rate", "again", "critical", "t050"),
+                                         ("a2", "d0", "stalled", "slow", "warning", "t050")])
+        assert db.flush(timeout=5)
+
+        path = db.db_path
+        assert fetch(path, "SELECT COUNT(*) FROM progress_history")[0][0] == 50
+        assert fetch(path, "SELECT alert_id, message FROM alerts ORDER BY alert_id") == [("a1", "boom"), ("a2", "slow")]
+        assert fetch(path, "SELECT current_progress FROM task_monitors") == [(0.5,)]
+        assert db.write_stats["failed_batches"] == 1 and db.write_stats["dropped_rows"] == 1
+        assert db.write_stats["rows"] == 1 + 50 + 2 + 1
+        db.close()
+
+    def test_writer_survives_errors(self, tmp_path):
+        db = svc.MonitoringDatabase(str(tmp_path / "monitoring.db"))
+        write_statements = db._write_statements
+
+        def broken(statements, items):
+            db._write_statements = write_statements
+            raise RuntimeError("disk on fire")
+
+        db._write_statements = broken
+        db.record_progress("d0", "t1", 0.1, {}, {})
+        assert db.flush(timeout=5)
+        assert db._writer.is_alive()
+        db.record_progress("d0", "t2", 0.2, {}, {})
+        assert db.flush(timeout=5)
+        assert fetch(db.db_path, "SELECT timestamp FROM progress_history") == [("t2",)]
+        db.close()
+
+        # A writer that is gone can never answer a flush
+        dead = svc.threading.Thread(target=lambda: None)
+        dead.start()
+        dead.join()
+        db._writer = dead
+        start_time = time.perf_counter()
+        assert not db.flush()
+        assert time.perf_counter() - start_time < 1
+
+    @pytest.mark.asyncio
+    async def test_progress_endpoint_goes_through_writer(self):
+        delegation_id = "endpoint_task"
+        await svc.start_monitoring(svc.TaskMonitoringRequest(
+            delegation_id=delegation_id, task_id="task_1", agent_id="agent_1",
+            estimated_completion="2099-01-01T00:00:00+00:00", task_type="iot_monitoring"
+        ), svc.BackgroundTasks())
+        for step, quality in enumerate([0.9, 0.9, 0.4]):
+            response = await svc.update_task_progress(svc.TaskProgress(
+                delegation_id=delegation_id, progress_percentage=0.1 * (step + 1),
+                quality_metrics={"precision": quality}, performance_indicators={"error_rate": 0.01},
+                timestamp=f"2026-01-01T00:00:0{step}+00:00"
+            ))
+        assert response["anomalies_detected"] >= 1
+        await svc.stop_monitoring(delegation_id)
+        assert svc.monitoring_db.flush(timeout=5)
+
+        stats = await svc.get_monitoring_statistics()
+        assert stats["monitoring_overview"]["completed_tasks"] >= 1
+        assert stats["anomaly_statistics"]["by_severity"].get("critical", 0) >= 1
+        rows = fetch(svc.monitoring_db.db_path,
+                     "SELECT COUNT(*), MAX(progress_percentage) FROM progress_history WHERE delegation_id = ?",
+                     (delegation_id,))
+        assert rows[0][0] == 3 and rows[0][1] == pytest.approx(0.3)
+        assert fetch(svc.monitoring_db.db_path, "SELECT alert_type FROM alerts WHERE delegation_id = ?",
+                     (delegation_id,)) == [("quality_degradation",)]
+
+    def test_ingestion_throughput_benchmark(self, tmp_path):
+        """Progress updates: connection + commit per request versus the batched writer"""
+        updates = int(os.environ.get("MONITORING_BENCH_UPDATES", 2000))
+        agents = 200
+        quality, performance = {"precision": 0.9, "speed": 0.8}, {"cpu_usage": 0.4, "error_rate": 0.01}
+
+        legacy = svc.MonitoringDatabase(str(tmp_path / "legacy.db"))
+        with sqlite3.connect(legacy.db_path) as conn:
+            conn.executemany(svc.UPSERT_MONITOR_SQL, [monitor_row(f"agent_{i}") for i in range(agents)])
+        start_time = time.perf_counter()
+        for n in range(updates):
+            legacy_store_progress(legacy.db_path, f"agent_{n % agents}", f"t{n:06d}", n / updates,
+                                  quality, performance)
+        legacy_rate = updates / (time.perf_counter() - start_time)
+
+        batched = svc.MonitoringDatabase(str(tmp_path / "batched.db"))
+        batched.execute(svc.UPSERT_MONITOR_SQL, [monitor_row(f"agent_{i}") for i in range(agents)])
+        batched.flush()
+        start_time = time.perf_counter()
+        for n in range(updates):
+            batched.record_progress(f"agent_{n % agents}", f"t{n:06d}", n / updates, quality, performance)
+        enqueue_us = (time.perf_counter() - start_time) * 1e6 / updates
+        batched.flush()
+        batched_rate = updates / (time.perf_counter() - start_time)
+        stats = batched.write_stats
+        batched.close()
+
+        print(f"\n💾 Progress Ingestion @{updates} updates from {agents} agents:")
+        print(f"   legacy per-request commit: {legacy_rate:10,.0f} updates/s")
+        print(f"   batched writer           : {batched_rate:10,.0f} updates/s "
+              f"({enqueue_us:.1f} µs on the handler, {stats['batches']} commits, largest {stats['largest_batch']} rows)")
+        print(f"   speedup: {batched_rate / legacy_rate:,.1f}x")
+
+        assert fetch(batched.db_path, "SELECT COUNT(*) FROM progress_history")[0][0] == updates
+        assert fetch(batched.db_path, "SELECT MAX(current_progress) FROM task_monitors")[0][0] == \
+            pytest.approx((updates - 1) / updates)
+        assert batched_rate > 5 * legacy_rate
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Core Utilities Microbenchmarks
+Compares the O(1) LRUCache/ExpiringDict with the previous list- and scan-based versions
+"""
+
+import pytest
+import asyncio
+import threading
+import time
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_automation_platform.core.utils import (
+    AsyncLRUCache,
+    ExpiringDict,
+    LRUCache,
+    ThreadSafeLRUCache,
+)
+
+class ListLRUCache:
+    """Previous LRUCache: recency kept in a list, O(n) per access"""
+
+    def __init__(self, max_size=1000):
+        self.cache = {}
+        self.max_size = max_size
+        self.order = []
+
+    def get(self, key):
+        if key in self.cache:
+            self.order.remove(key)
+            self.order.append(key)
+            return self.cache[key]
+        return None
+
+    def set(self, key, value):
+        if key in self.cache:
+            self.order.remove(key)
+        elif len(self.cache) >= self.max_size:
+            oldest = self.order.pop(0)
+            del self.cache[oldest]
+        self.cache[key] = value
+        self.order.append(key)
+
+class ScanExpiringDict:
+    """Previous ExpiringDict: cleanup scans every entry"""
+
+    def __init__(self, default_ttl=60.0):
+        self.store = {}
+        self.default_ttl = default_ttl
+
+    def set(self, key, value, ttl=None):
+        self.store[key] = (value, time.time() + (ttl if ttl is not None else self.default_ttl))
+
+    def cleanup(self):
+        now = time.time()
+        expired_keys = [k for k, (_, expiry) in self.store.items() if now > expiry]
+        for key in expired_keys:
+            del self.store[key]
+
+def _lru_workload(cache, size, operations):
+    """Fill the cache, then mix mid-recency hits and inserts that force evictions"""
+    start_time = time.perf_counter()
+    for i in range(size):
+        cache.set(i, i)
+    for i in range(operations):
+        assert cache.get(i + size // 2) is not None
+        cache.set(size + i, i)
+    return (time.perf_counter() - start_time) / (size + 2 * operations) * 1e6
+
+class TestLRUCache:
+    """Correctness and performance of the O(1) LRUCache"""
+
+    def test_eviction_order_matches_previous_implementation(self):
+        """The new cache evicts exactly the keys the list-based cache did"""
+        new, old = LRUCache(max_size=50), ListLRUCache(max_size=50)
+        for i in range(500):
+            for cache in (new, old):
+                cache.set(i % 70, i)
+                cache.get((i * 7) % 70)
+
+        assert list(new.cache.keys()) == old.order
+        assert dict(new.cache) == old.cache
+
+    def test_lru_microbenchmark(self):
+        """O(1) LRUCache versus the list-based implementation"""
+        size, operations = 5000, 5000
+        old_us = _lru_workload(ListLRUCache(max_size=size), size, operations)
+        new_us = _lru_workload(LRUCache(max_size=size), size, operations)
+        new_large_us = _lru_workload(LRUCache(max_size=100_000), 100_000, 100_000)
+
+        print("\n📦 LRUCache Microbenchmark:")
+        print(f"   List-based @5k entries:  {old_us:8.3f} µs/op")
+        print(f"   O(1) @5k entries:        {new_us:8.3f} µs/op")
+        print(f"   O(1) @100k entries:      {new_large_us:8.3f} µs/op")
+
+        assert new_us * 5 < old_us
+        # Per-operation cost must not grow with the number of entries
+        assert new_large_us < new_us * 5
+
+    def test_thread_safe_variant(self):
+        """Concurrent writers never push the cache over capacity"""
+        cache = ThreadSafeLRUCache(max_size=100)
+
+        def writer(offset):
+            for i in range(2000):
+                cache.set(offset + i, i)
+                cache.get(offset + i // 2)
+
+        threads = [threading.Thread(target=writer, args=(n * 10000,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) == 100
+
+    @pytest.mark.asyncio
+    async def test_async_variant_single_flight(self):
+        """Concurrent misses for one key run the factory once"""
+        cache = AsyncLRUCache(max_size=10)
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*[cache.get_or_set("key", load) for _ in range(20)])
+
+        assert results == ["value"] * 20
+        assert calls == 1
+
+class TestExpiringDict:
+    """Correctness and performance of the heap-based ExpiringDict"""
+
+    def test_expired_entries_are_removed(self):
+        """cleanup removes only expired keys, including overwritten ones"""
+        store = ExpiringDict(default_ttl=60)
+        store.set("short", 1, ttl=0.01)
+        store.set("rewritten", 1, ttl=0.01)
+        store.set("rewritten", 2, ttl=60)
+        store["long"] = 3
+        time.sleep(0.02)
+
+        store.cleanup()
+
+        assert "short" not in store.store
+        assert store.get("rewritten") == 2
+        assert store["long"] == 3
+
+    def test_heap_stays_bounded_under_overwrites(self):
+        """Repeatedly overwriting live keys does not grow the expiry heap"""
+        store = ExpiringDict(default_ttl=60)
+        for i in range(100_000):
+            store[i % 100] = i
+
+        assert len(store) == 100
+        assert len(store._heap) <= 2 * len(store) + 64
+
+    def test_cleanup_microbenchmark(self):
+        """Periodic cleanup cost tracks expired entries, not total entries"""
+        entries, rounds = 100_000, 50
+        old, new = ScanExpiringDict(), ExpiringDict()
+        for i in range(entries):
+            old.set(i, i, ttl=3600)
+            new.set(i, i, ttl=3600)
+
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            old.cleanup()
+        old_ms = (time.perf_counter() - start_time) / rounds * 1000
+
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            new.cleanup()
+        new_ms = (time.perf_counter() - start_time) / rounds * 1000
+
+        print(f"\n⏳ ExpiringDict cleanup @{entries // 1000}k live entries:")
+        print(f"   Full scan:   {old_ms:8.3f} ms/cleanup")
+        print(f"   Heap-based:  {new_ms:8.3f} ms/cleanup")
+
+        assert new_ms * 100 < old_ms
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])
@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Workflow State Performance Tests
+Event log durability and throughput benchmarks for the workflow state service
+"""
+
+import pytest
+import asyncio
+import importlib.util
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+SERVICE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'services', 'workflow-state-service', 'src', 'main.py'
+)
+
+def _load_service():
+    # The startup hook opens the module-level engine's event log; keep it out of the source tree
+    os.environ.setdefault("WORKFLOW_EVENT_LOG_DIR", tempfile.mkdtemp(prefix="workflow_events_"))
+    spec = importlib.util.spec_from_file_location("workflow_state_service", SERVICE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+svc = _load_service()
+
+def make_definition(workflow_id, step_count=5):
+    return svc.WorkflowDefinition(
+        workflow_id=workflow_id,
+        name=f"Workflow {workflow_id}",
+        description="benchmark workflow",
+        steps=[
+            svc.WorkflowStep(step_id=f"step_{i}", step_name=f"Step {i}", step_type=svc.StepType.SEQUENTIAL)
+            for i in range(step_count)
+        ]
+    )
+
+def make_dag_definition(workflow_id, dependencies, duration=0.01, max_parallel_steps=None):
+    return svc.WorkflowDefinition(
+        workflow_id=workflow_id,
+        name=f"Workflow {workflow_id}",
+        description="step graph",
+        steps=[
+            svc.WorkflowStep(step_id=step_id, step_name=step_id, step_type=svc.StepType.PARALLEL,
+                             dependencies=deps, parameters={"estimated_duration": duration})
+            for step_id, deps in dependencies.items()
+        ],
+        global_parameters={"max_parallel_steps": max_parallel_steps} if max_parallel_steps else {}
+    )
+
+def run_workflows(engine, *workflow_ids):
+    """Start workflows on a fresh loop and wait for their schedulers; returns wall time"""
+    async def run():
+        start_time = time.perf_counter()
+        for workflow_id in workflow_ids:
+            engine.start_workflow(workflow_id)
+        await asyncio.gather(*(engine.schedulers[workflow_id] for workflow_id in workflow_ids))
+        return time.perf_counter() - start_time
+    return asyncio.run(run())
+
+def make_event(workflow_id, step_id="step_0"):
+    return svc.WorkflowEvent(
+        event_id=str(uuid.uuid4()),
+        workflow_id=workflow_id,
+        event_type=svc.EventType.AGENT_ASSIGNED,
+        event_data={"step_id": step_id, "agent_id": "agent_1"},
+        sequence_number=0,
+        timestamp=datetime.now(timezone.utc)
+    )
+
+def make_state(workflow_id, status=None, agents=None, updated_at=None):
+    return svc.WorkflowStateSnapshot(
+        workflow_id=workflow_id,
+        current_state=status or svc.WorkflowState.PENDING,
+        step_states={},
+        assigned_agents=agents or {},
+        global_context={},
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=updated_at or datetime.now(timezone.utc),
+        snapshot_sequence=0
+    )
+
+class LegacyEventStore:
+    """Previous WorkflowEventStore: in-memory lists with linear range scans"""
+
+    def __init__(self):
+        self.event_streams = defaultdict(list)
+        self.sequence_numbers = defaultdict(int)
+
+    def append_event(self, workflow_id, event):
+        self.sequence_numbers[workflow_id] += 1
+        event.sequence_number = self.sequence_numbers[workflow_id]
+        self.event_streams[workflow_id].append(event)
+
+    def get_events(self, workflow_id, from_sequence=0):
+        events = self.event_streams.get(workflow_id, [])
+        return [e for e in events if e.sequence_number > from_sequence]
+
+class LegacyWorkflowStateCache:
+    """Previous WorkflowStateCache: deque LRU, list indexes and a full temporal re-sort per update"""
+
+    def __init__(self):
+        self.memory_cache = {}
+        self.memory_cache_order = deque()
+        self.max_memory_cache_size = 1000
+        self.redis_cache = {}
+        self.database_indices = {
+            'workflow_status': defaultdict(list),
+            'agent_assignments': defaultdict(list),
+            'temporal_queries': []
+        }
+
+    def get_workflow_state(self, workflow_id):
+        if workflow_id in self.memory_cache:
+            self.memory_cache_order.remove(workflow_id)
+            self.memory_cache_order.append(workflow_id)
+            return self.memory_cache[workflow_id]
+        if workflow_id in self.redis_cache:
+            state = self.redis_cache[workflow_id]
+            self.put_memory_cache(workflow_id, state)
+            return state
+        return None
+
+    def put_memory_cache(self, workflow_id, state):
+        if workflow_id in self.memory_cache:
+            self.memory_cache_order.remove(workflow_id)
+        self.memory_cache[workflow_id] = state
+        self.memory_cache_order.append(workflow_id)
+        while len(self.memory_cache) > self.max_memory_cache_size:
+            oldest = self.memory_cache_order.popleft()
+            del self.memory_cache[oldest]
+
+    def update_indices(self, workflow_id, state):
+        status = state.current_state.value
+        if workflow_id not in self.database_indices['workflow_status'][status]:
+            self.database_indices['workflow_status'][status].append(workflow_id)
+        for step_id, agent_id in state.assigned_agents.items():
+            if agent_id and workflow_id not in self.database_indices['agent_assignments'][agent_id]:
+                self.database_indices['agent_assignments'][agent_id].append(workflow_id)
+        self.database_indices['temporal_queries'].append((state.updated_at, workflow_id))
+        self.database_indices['temporal_queries'].sort(key=lambda x: x[0])
+        if len(self.database_indices['temporal_queries']) > 10000:
+            self.database_indices['temporal_queries'] = self.database_indices['temporal_queries'][-10000:]
+
+    def query_workflows_by_status(self, status):
+        return self.database_indices['workflow_status'][status.value].copy()
+
+class TestEventLog:
+    """Segmented append-only event log behind WorkflowEventStore"""
+
+    def test_workflows_survive_restart(self, tmp_path):
+        """Engine state is rebuilt from the persisted snapshot and later events"""
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        engine.create_workflow(make_definition("wf_restart"))
+        engine.assign_agent_to_step("wf_restart", "step_0", "agent_7")
+        engine.complete_step("wf_restart", "step_0", {"ok": True})
+        engine.event_store.append_event("wf_restart", make_event("wf_restart", "step_1"))
+        expected = engine.get_workflow_state("wf_restart")
+        engine.event_store.close()
+
+        recovered_engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        assert recovered_engine.recover_workflows() == 1
+        state = recovered_engine.get_workflow_state("wf_restart")
+
+        assert state.step_states == expected.step_states
+        assert state.assigned_agents == {"step_0": "agent_7", "step_1": "agent_1"}
+        assert recovered_engine.event_store.sequence_numbers["wf_restart"] == 4
+        events = recovered_engine.event_store.get_events("wf_restart")
+        assert [e.sequence_number for e in events] == [1, 2, 3, 4]
+        assert events[0].event_type == svc.EventType.WORKFLOW_CREATED
+        recovered_engine.event_store.close()
+
+    def test_get_events_from_sequence(self, tmp_path):
+        """Range reads return exactly the events after the requested sequence"""
+        store = svc.WorkflowEventStore(str(tmp_path))
+        for i in range(300):
+            store.append_event(f"wf_{i % 3}", make_event(f"wf_{i % 3}", f"step_{i}"))
+
+        assert [e.sequence_number for e in store.get_events("wf_1", 95)] == [96, 97, 98, 99, 100]
+        assert len(store.get_events("wf_2")) == 100
+        assert store.get_events("wf_0", 100) == []
+        assert store.get_events("missing") == []
+        assert store.get_events("wf_0", 0)[10].event_data["step_id"] == "step_30"
+        store.close()
+
+    def test_segments_roll_and_sealed_indexes_reload(self, tmp_path):
+        """Sealed segments get sidecar indexes; a missing sidecar is rebuilt by scanning"""
+        store = svc.WorkflowEventStore(str(tmp_path), segment_max_bytes=4096)
+        for i in range(400):
+            store.append_event(f"wf_{i % 7}", make_event(f"wf_{i % 7}"))
+        store.close()
+
+        files = sorted(os.listdir(tmp_path))
+        logs = [name for name in files if name.endswith(".log")]
+        indexes = [name for name in files if name.endswith(".idx")]
+        assert len(logs) > 5 and len(indexes) == len(logs) - 1
+
+        os.remove(tmp_path / indexes[1])
+        reopened = svc.WorkflowEventStore(str(tmp_path), segment_max_bytes=4096)
+        assert os.path.exists(tmp_path / indexes[1])
+        for i in range(7):
+            events = reopened.get_events(f"wf_{i}")
+            assert [e.sequence_number for e in events] == list(range(1, len(events) + 1))
+        assert sum(len(reopened.get_events(f"wf_{i}")) for i in range(7)) == 400
+        reopened.close()
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """A partial record left by a crash is dropped and appends continue after it"""
+        store = svc.WorkflowEventStore(str(tmp_path))
+        for _ in range(10):
+            store.append_event("wf_torn", make_event("wf_torn"))
+        store.close()
+
+        segment = tmp_path / "0000000000.log"
+        intact_size = segment.stat().st_size
+        with open(segment, "ab") as segment_file:
+            segment_file.write(b"\x01\x00\x00\x01\x00partial")
+
+        reopened = svc.WorkflowEventStore(str(tmp_path))
+        assert segment.stat().st_size == intact_size
+        assert reopened.stats['truncated_bytes'] == 12
+        reopened.append_event("wf_torn", make_event("wf_torn"))
+        assert [e.sequence_number for e in reopened.get_events("wf_torn", 8)] == [9, 10, 11]
+        reopened.close()
+
+    def test_group_commit_batches_fsyncs(self, tmp_path):
+        """Many appends share a handful of fsyncs"""
+        store = svc.WorkflowEventStore(str(tmp_path), group_commit_interval=0.05)
+        for i in range(5000):
+            store.append_event(f"wf_{i % 50}", make_event(f"wf_{i % 50}"), durable=False)
+        store.flush()
+
+        assert store.stats['events_appended'] == 5000
+        assert 1 <= store.stats['fsyncs'] < 100
+        assert store.get_stats()['buffered_bytes'] == 0
+        store.close()
+
+    def test_durable_appends_wait_for_their_commit(self, tmp_path, monkeypatch):
+        """A durable append returns fsynced; concurrent durable appenders share fsyncs"""
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            # A disk-like fsync, long enough for every other appender to queue behind it
+            time.sleep(0.002)
+            fsync(fd)
+
+        monkeypatch.setattr(svc.os, "fsync", slow_fsync)
+        store = svc.WorkflowEventStore(str(tmp_path), group_commit_interval=60)
+        store.append_event("wf_durable", make_event("wf_durable"))
+        assert store.get_stats()['buffered_bytes'] == 0
+        assert store.stats['fsyncs'] == 1
+
+        store.append_event("wf_durable", make_event("wf_durable"), durable=False)
+        assert store.get_stats()['buffered_bytes'] > 0
+        assert store.stats['fsyncs'] == 1
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: store.append_event(f"wf_{i % 8}", make_event(f"wf_{i % 8}")), range(2000)))
+
+        assert store.stats['events_appended'] == 2002
+        assert store.get_stats()['buffered_bytes'] == 0
+        assert store.stats['fsyncs'] < 1000
+        store.close()
+
+    def test_log_opens_on_open_not_construction(self, tmp_path):
+        """A store built with open_log=False touches nothing until open()"""
+        data_dir = tmp_path / "events"
+        store = svc.WorkflowEventStore(str(data_dir), open_log=False)
+        assert not data_dir.exists()
+        with pytest.raises(RuntimeError):
+            store.append_event("wf_closed", make_event("wf_closed"))
+
+        store.open()
+        store.append_event("wf_open", make_event("wf_open"))
+        store.close()
+        assert not store._committer.is_alive()
+        assert len(svc.WorkflowEventStore(str(data_dir)).get_events("wf_open")) == 1
+
+    def test_event_log_benchmark(self):
+        """Append and replay throughput (EVENT_LOG_BENCH_EVENTS, default 200k events)"""
+        event_count = int(os.getenv("EVENT_LOG_BENCH_EVENTS", "200000"))
+        workflow_count = max(event_count // 100, 1)
+        template = make_event("template")
+
+        with tempfile.TemporaryDirectory(prefix="event_log_bench_") as data_dir:
+            store = svc.WorkflowEventStore(data_dir)
+            start_time = time.perf_counter()
+            for i in range(event_count):
+                event = template.model_copy()
+                store.append_event(f"wf_{i % workflow_count:08d}", event, durable=False)
+            store.flush()
+            append_seconds = time.perf_counter() - start_time
+            store.close()
+
+            start_time = time.perf_counter()
+            reopened = svc.WorkflowEventStore(data_dir)
+            recovery_seconds = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            replayed = sum(len(reopened.get_events(workflow_id)) for workflow_id in reopened.workflow_ids())
+            replay_seconds = time.perf_counter() - start_time
+
+            # Tail reads on one long stream: binary search versus the previous linear scan
+            legacy = LegacyEventStore()
+            for _ in range(100000):
+                reopened.append_event("wf_long", template.model_copy(), durable=False)
+                legacy.append_event("wf_long", template.model_copy())
+            start_time = time.perf_counter()
+            for _ in range(100):
+                tail = reopened.get_events("wf_long", 99990)
+            tail_ms = (time.perf_counter() - start_time) * 10
+            start_time = time.perf_counter()
+            for _ in range(100):
+                legacy_tail = legacy.get_events("wf_long", 99990)
+            legacy_tail_ms = (time.perf_counter() - start_time) * 10
+            segments = reopened.get_stats()['active_segment'] + 1
+            reopened.close()
+
+        print(f"\n📼 Event Log @{event_count:,} events, {workflow_count:,} workflows, {segments} segments:")
+        print(f"   Append (buffered): {event_count / append_seconds:12,.0f} events/s")
+        print(f"   Recovery:          {recovery_seconds:12.2f} s")
+        print(f"   Replay:            {replayed / replay_seconds:12,.0f} events/s")
+        print(f"   Tail read (100k stream): {tail_ms:.3f} ms vs {legacy_tail_ms:.3f} ms linear scan")
+
+        assert replayed == event_count
+        assert len(tail) == len(legacy_tail) == 10
+        assert tail_ms < legacy_tail_ms
+
+class TestSnapshotPolicy:
+    """Policy-driven snapshots, copy-on-write event application and bounded rebuilds"""
+
+    def test_apply_event_is_copy_on_write(self, tmp_path):
+        """Applying an event leaves the old state intact and shares untouched fields"""
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        state = engine.create_workflow(make_definition("wf_cow"))
+
+        event = make_event("wf_cow", "step_2")
+        assigned = engine._apply_event_to_state(state, event)
+        event.event_type = svc.EventType.STEP_COMPLETED
+        completed = engine._apply_event_to_state(assigned, event)
+
+        assert state.assigned_agents == {} and state.step_states["step_2"] == "pending"
+        assert assigned.assigned_agents == {"step_2": "agent_1"}
+        assert assigned.step_states is state.step_states
+        assert completed.step_states["step_2"] == "completed"
+        assert completed.assigned_agents is assigned.assigned_agents
+        engine.event_store.close()
+
+    def test_rebuild_replays_at_most_every_events(self, tmp_path):
+        """Any workflow recovers with no more than N event applications"""
+        policy = svc.SnapshotPolicy(every_events=20, interval_seconds=None, max_replay_bytes=None)
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), policy)
+        engine.create_workflow(make_definition("wf_bounded", step_count=50))
+
+        for i in range(537):
+            engine.assign_agent_to_step("wf_bounded", f"step_{i % 50}", f"agent_{i}")
+            if i % 41 == 0:
+                expected = engine.get_workflow_state("wf_bounded")
+                del engine.active_workflows["wf_bounded"]
+                assert engine.get_workflow_state("wf_bounded") == expected
+        expected = engine.get_workflow_state("wf_bounded")
+        engine.event_store.close()
+
+        assert engine.replay_stats['max_events_replayed'] < 20
+        assert engine.replay_stats['snapshots_taken'] == 1 + 537 // 20
+
+        recovered_engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), policy)
+        recovered_engine.recover_workflows()
+        assert recovered_engine.get_workflow_state("wf_bounded") == expected
+        assert recovered_engine.replay_stats['events_replayed'] == 537 % 20
+        recovered_engine.event_store.close()
+
+    def test_unbounded_stream_is_resnapshotted_on_rebuild(self, tmp_path):
+        """A long tail written outside the policy is replayed once, then snapshotted"""
+        policy = svc.SnapshotPolicy(every_events=10, interval_seconds=None, max_replay_bytes=None)
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), policy)
+        engine.create_workflow(make_definition("wf_tail"))
+        for _ in range(50):
+            engine.event_store.append_event("wf_tail", make_event("wf_tail"))
+
+        del engine.active_workflows["wf_tail"]
+        engine.get_workflow_state("wf_tail")
+        del engine.active_workflows["wf_tail"]
+        engine.get_workflow_state("wf_tail")
+
+        assert engine.replay_stats['events_replayed'] == 50
+        assert engine.event_store.pending_since_snapshot("wf_tail") == (0, 0)
+        engine.event_store.close()
+
+    def test_size_and_time_triggers(self, tmp_path):
+        """Byte and interval thresholds snapshot before the event count is reached"""
+        by_size = svc.WorkflowEngine(
+            svc.WorkflowEventStore(str(tmp_path / "size")),
+            svc.SnapshotPolicy(every_events=1000, interval_seconds=None, max_replay_bytes=2000)
+        )
+        by_size.create_workflow(make_definition("wf_size"))
+        for i in range(100):
+            by_size.assign_agent_to_step("wf_size", "step_0", f"agent_{i}")
+            assert by_size.event_store.pending_since_snapshot("wf_size")[1] < 2000
+        assert by_size.replay_stats['snapshots_taken'] > 5
+
+        by_time = svc.WorkflowEngine(
+            svc.WorkflowEventStore(str(tmp_path / "time")),
+            svc.SnapshotPolicy(every_events=1000, interval_seconds=0.0, max_replay_bytes=None)
+        )
+        by_time.create_workflow(make_definition("wf_time"))
+        for i in range(5):
+            by_time.assign_agent_to_step("wf_time", "step_0", f"agent_{i}")
+        assert by_time.replay_stats['snapshots_taken'] == 6
+        by_size.event_store.close()
+        by_time.event_store.close()
+
+    def test_snapshot_policy_benchmark(self, tmp_path):
+        """Event write throughput and rebuild cost: snapshot per event versus the default policy"""
+        step_count, event_count, rounds = 50, 3000, 3
+        results = {}
+        for label, policy in (("every event", svc.SnapshotPolicy(every_events=1)),
+                              ("default policy", svc.SnapshotPolicy()),
+                              ("never", svc.SnapshotPolicy(every_events=10 ** 9, interval_seconds=None,
+                                                           max_replay_bytes=None))):
+            # Best of several rounds for the timings; the counters are the same every round
+            write_timings, rebuild_timings = [], []
+            for round_number in range(rounds):
+                data_dir = tmp_path / f"{label.replace(' ', '_')}_{round_number}"
+                engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(data_dir)), policy)
+                engine.create_workflow(make_definition("wf_bench", step_count))
+
+                start_time = time.perf_counter()
+                for i in range(event_count):
+                    engine.assign_agent_to_step("wf_bench", f"step_{i % step_count}", f"agent_{i}")
+                write_timings.append(time.perf_counter() - start_time)
+                write_stats = dict(engine.replay_stats)
+
+                start_time = time.perf_counter()
+                for _ in range(10):
+                    del engine.active_workflows["wf_bench"]
+                    engine.event_store.snapshots.pop("wf_bench")
+                    engine.get_workflow_state("wf_bench")
+                rebuild_timings.append(time.perf_counter() - start_time)
+                log_bytes = engine.event_store.get_stats()['active_segment_bytes']
+                engine.event_store.close()
+            results[label] = {
+                'events_per_second': event_count / min(write_timings),
+                'rebuild_ms': min(rebuild_timings) * 100,
+                'log_bytes': log_bytes,
+                'snapshots_taken': write_stats['snapshots_taken'],
+                'max_events_replayed': engine.replay_stats['max_events_replayed'],
+                'bytes_replayed': engine.replay_stats['bytes_replayed']
+            }
+
+        print(f"\n📸 Snapshot Policy @{event_count} events on a {step_count}-step workflow:")
+        for label, result in results.items():
+            print(f"   {label:<15} {result['events_per_second']:9,.0f} events/s"
+                  f"   rebuild {result['rebuild_ms']:6.2f} ms   log {result['log_bytes'] / 1024:8.0f} KiB"
+                  f"   {result['snapshots_taken']:5d} snapshots")
+
+        every_event, default, never = results["every event"], results["default policy"], results["never"]
+        # One snapshot at creation, then one per policy trigger
+        assert every_event['snapshots_taken'] == 1 + event_count
+        assert default['snapshots_taken'] == 1 + event_count // 100
+        assert never['snapshots_taken'] == 1
+        assert default['log_bytes'] < every_event['log_bytes'] / 3
+        assert default['max_events_replayed'] <= 100
+        assert never['max_events_replayed'] >= event_count
+        assert default['bytes_replayed'] * 10 < never['bytes_replayed']
+
+class TestWorkflowStateCache:
+    """LRU tier, moving status/agent indexes and the sorted temporal index"""
+
+    def test_status_and_agent_indexes_move_on_update(self):
+        cache = svc.WorkflowStateCache()
+        cache.update_workflow_state(make_state("wf_1", agents={"s0": "agent_a", "s1": "agent_b"}))
+        cache.update_workflow_state(make_state("wf_1", svc.WorkflowState.ACTIVE, {"s0": "agent_c", "s1": "agent_b"}))
+
+        assert cache.query_workflows_by_status(svc.WorkflowState.PENDING) == []
+        assert cache.query_workflows_by_status(svc.WorkflowState.ACTIVE) == ["wf_1"]
+        assert cache.query_workflows_by_agent("agent_a") == []
+        assert cache.query_workflows_by_agent("agent_b") == ["wf_1"]
+        assert cache.query_workflows_by_agent("agent_c") == ["wf_1"]
+        assert cache.get_cache_stats()['temporal_index_size'] == 1
+
+    def test_temporal_range_and_recency_queries(self):
+        cache = svc.WorkflowStateCache(max_temporal_entries=50)
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(60):
+            cache.update_workflow_state(make_state(f"wf_{i}", updated_at=base + timedelta(minutes=i)))
+        # Re-touching a workflow moves its entry instead of adding a second one
+        cache.update_workflow_state(make_state("wf_20", updated_at=base + timedelta(hours=2)))
+
+        temporal_index = cache.database_indices['temporal_queries']
+        assert len(temporal_index) == 50 and temporal_index == sorted(temporal_index)
+        assert cache.query_workflows_by_time(base + timedelta(minutes=30), base + timedelta(minutes=32)) == \
+            ["wf_30", "wf_31", "wf_32"]
+        assert cache.query_workflows_by_time(start=base + timedelta(hours=1)) == ["wf_20"]
+        assert cache.query_workflows_by_status(svc.WorkflowState.PENDING, limit=3) == ["wf_20", "wf_59", "wf_58"]
+
+    def test_lru_eviction_and_hit_ratios(self):
+        cache = svc.WorkflowStateCache(max_memory_cache_size=2)
+        for workflow_id in ("wf_a", "wf_b"):
+            cache.update_workflow_state(make_state(workflow_id))
+        cache.get_workflow_state("wf_a")
+        cache.update_workflow_state(make_state("wf_c"))
+
+        assert list(cache.memory_cache) == ["wf_a", "wf_c"]
+        assert cache.get_workflow_state("wf_b") is not None  # promoted from the redis tier
+        assert cache.get_workflow_state("wf_missing") is None
+
+        stats = cache.get_cache_stats()
+        assert (stats['memory_hits'], stats['redis_hits'], stats['misses'], stats['evictions']) == (1, 1, 1, 2)
+        assert stats['memory_hit_ratio'] == pytest.approx(1 / 3)
+        assert stats['overall_hit_ratio'] == pytest.approx(2 / 3)
+
+    def test_engine_feeds_cache_and_list_endpoint(self):
+        asyncio.run(svc.recover_workflow_state())  # startup hook opens the event log
+        workflow_id = f"wf_{uuid.uuid4().hex}"
+        svc.workflow_engine.create_workflow(make_definition(workflow_id))
+        svc.workflow_engine.assign_agent_to_step(workflow_id, "step_0", "agent_index_test")
+
+        async def start_and_list():
+            # start_workflow schedules step execution on the running loop
+            svc.workflow_engine.start_workflow(workflow_id)
+            listed = await svc.list_workflows(status=svc.WorkflowState.ACTIVE, limit=10)
+            for task in asyncio.all_tasks() - {asyncio.current_task()}:
+                task.cancel()
+            return listed
+
+        listed = asyncio.run(start_and_list())
+        assert listed["workflows"][0]["workflow_id"] == workflow_id
+        assert workflow_id not in svc.state_cache.query_workflows_by_status(svc.WorkflowState.PENDING)
+        assert workflow_id in svc.state_cache.query_workflows_by_agent("agent_index_test")
+        # The module defines this path twice; the first registration serves requests
+        cache_route = next(route for route in svc.app.routes if getattr(route, "path", None) == "/api/v1/performance/cache")
+        assert asyncio.run(cache_route.endpoint())["memory_hit_ratio"] > 0
+
+    def test_state_cache_benchmark(self):
+        """Index maintenance and lookups: previous cache versus the indexed LRU cache"""
+        workflow_count, update_count = 5000, 20000
+        rng = random.Random(13)
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        statuses = [svc.WorkflowState.PENDING, svc.WorkflowState.ACTIVE, svc.WorkflowState.COMPLETED]
+        updates = [
+            make_state(f"wf_{rng.randrange(workflow_count)}", statuses[i % 3],
+                       {"step_0": f"agent_{rng.randrange(100)}"}, base + timedelta(seconds=i))
+            for i in range(update_count)
+        ]
+        lookups = [f"wf_{rng.randrange(workflow_count)}" for _ in range(update_count)]
+
+        results = {}
+        for label, cache in (("legacy", LegacyWorkflowStateCache()), ("indexed", svc.WorkflowStateCache())):
+            start_time = time.perf_counter()
+            for state in updates:
+                cache.redis_cache[state.workflow_id] = state
+                cache.put_memory_cache(state.workflow_id, state)
+                cache.update_indices(state.workflow_id, state)
+            for workflow_id in lookups:
+                cache.get_workflow_state(workflow_id)
+            results[label] = time.perf_counter() - start_time
+            results[label + " active"] = len(cache.query_workflows_by_status(svc.WorkflowState.ACTIVE))
+
+        print(f"\n🗂️  Workflow State Cache @{update_count} updates over {workflow_count} workflows:")
+        print(f"   legacy:  {results['legacy']:.3f}s ({results['legacy active']} ids under ACTIVE)")
+        print(f"   indexed: {results['indexed']:.3f}s ({results['indexed active']} ids under ACTIVE)")
+        print(f"   speedup: {results['legacy'] / results['indexed']:.1f}x")
+
+        assert results['indexed active'] < workflow_count
+        assert results['indexed'] * 5 < results['legacy']
+
+class TestStepScheduler:
+    """DAG-aware parallel execution of workflow steps"""
+
+    def test_invalid_graphs_are_rejected(self, tmp_path):
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        with pytest.raises(ValueError, match="cycle"):
+            engine.create_workflow(make_dag_definition("wf_cycle", {"a": ["c"], "b": ["a"], "c": ["b"], "d": []}))
+        with pytest.raises(ValueError, match="unknown"):
+            engine.create_workflow(make_dag_definition("wf_unknown", {"a": ["missing"]}))
+        assert engine.event_store.workflow_ids() == []
+        engine.event_store.close()
+
+    def test_dependencies_run_in_order_and_siblings_overlap(self, tmp_path):
+        intervals = {}
+
+        async def executor(workflow_id, step):
+            start = time.perf_counter()
+            await asyncio.sleep(0.02)
+            intervals[step.step_id] = (start, time.perf_counter())
+            return {"ran": step.step_id}
+
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), step_executor=executor)
+        engine.create_workflow(make_dag_definition("wf_diamond", {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}))
+        run_workflows(engine, "wf_diamond")
+
+        assert intervals["a"][1] <= min(intervals["b"][0], intervals["c"][0])
+        assert max(intervals["b"][1], intervals["c"][1]) <= intervals["d"][0]
+        assert intervals["b"][0] < intervals["c"][1] and intervals["c"][0] < intervals["b"][1]
+        assert engine.get_workflow_state("wf_diamond").current_state == svc.WorkflowState.COMPLETED
+        engine.event_store.close()
+
+    def test_per_workflow_and_global_limits(self, tmp_path):
+        running = {"wf_x": 0, "wf_y": 0, "total": 0}
+        peaks = dict(running)
+
+        async def executor(workflow_id, step):
+            for key in (workflow_id, "total"):
+                running[key] += 1
+                peaks[key] = max(peaks[key], running[key])
+            await asyncio.sleep(0.005)
+            for key in (workflow_id, "total"):
+                running[key] -= 1
+
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), max_parallel_steps=3,
+                                    max_concurrent_steps=5, step_executor=executor)
+        wide = {f"s{i}": [] for i in range(20)}
+        engine.create_workflow(make_dag_definition("wf_x", wide))
+        engine.create_workflow(make_dag_definition("wf_y", wide, max_parallel_steps=4))
+        run_workflows(engine, "wf_x", "wf_y")
+
+        assert (peaks["wf_x"], peaks["wf_y"], peaks["total"]) == (3, 4, 5)
+        assert engine.scheduler_stats['steps_started'] == 40
+        assert all(engine.get_workflow_state(wf).current_state == svc.WorkflowState.COMPLETED for wf in ("wf_x", "wf_y"))
+        engine.event_store.close()
+
+    def test_failed_step_blocks_successors(self, tmp_path):
+        started = []
+
+        async def executor(workflow_id, step):
+            started.append(step.step_id)
+            if step.step_id == "b":
+                raise RuntimeError("agent unavailable")
+
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)), step_executor=executor)
+        engine.create_workflow(make_dag_definition("wf_fail", {"a": [], "b": ["a"], "c": ["b"]}))
+        run_workflows(engine, "wf_fail")
+
+        state = engine.get_workflow_state("wf_fail")
+        assert started == ["a", "b"]
+        assert state.current_state == svc.WorkflowState.FAILED
+        assert state.step_states == {"a": "completed", "b": "failed", "c": "pending"}
+        engine.event_store.close()
+
+    def test_critical_path_estimate(self, tmp_path):
+        engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        definition = make_dag_definition("wf_cp", {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}, duration=1.0)
+        definition.steps[2].parameters["estimated_duration"] = 5.0
+        engine.create_workflow(definition)
+
+        estimate = engine.estimate_critical_path("wf_cp")
+        assert estimate["critical_path"] == ["a", "c", "d"]
+        assert estimate["estimated_makespan"] == 7.0
+        assert estimate["total_work"] == 8.0
+
+        engine.complete_step("wf_cp", "a", {})
+        engine.complete_step("wf_cp", "c", {})
+        engine.event_store.close()
+
+        # Estimates survive a restart: the step graph is rebuilt from the creation event
+        restarted = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path)))
+        estimate = restarted.estimate_critical_path("wf_cp")
+        assert (estimate["remaining_critical_path"], estimate["estimated_remaining"]) == (["b", "d"], 2.0)
+        restarted.event_store.close()
+
+        route = next(route for route in svc.app.routes
+                     if getattr(route, "path", None) == "/api/v1/workflows/{workflow_id}/critical-path")
+        with pytest.raises(svc.HTTPException) as missing:
+            asyncio.run(route.endpoint("wf_does_not_exist"))
+        assert missing.value.status_code == 404
+
+    def test_scheduler_makespan_benchmark(self, tmp_path):
+        """Makespan on wide, deep and layered DAGs versus running steps one at a time"""
+        duration, limit = 0.01, 16
+        shapes = {
+            "wide 128": {f"s{i}": [] for i in range(128)},
+            "deep 64": {f"s{i}": [f"s{i - 1}"] if i else [] for i in range(64)},
+            "layered 8x16": {f"s{layer}_{i}": [f"s{layer - 1}_{j}" for j in range(16)] if layer else []
+                             for layer in range(8) for i in range(16)},
+        }
+
+        print(f"\n🧭 DAG Step Scheduler ({duration * 1000:.0f} ms steps, {limit} parallel per workflow):")
+        for label, dependencies in shapes.items():
+            engine = svc.WorkflowEngine(svc.WorkflowEventStore(str(tmp_path / label.replace(" ", "_")), fsync=False),
+                                        max_parallel_steps=limit, default_step_duration=duration)
+            engine.create_workflow(make_dag_definition("wf_bench", dependencies, duration))
+            estimate = engine.estimate_critical_path("wf_bench")
+            makespan = run_workflows(engine, "wf_bench")
+            engine.event_store.close()
+
+            sequential = estimate["total_work"]  # the previous loop ran steps one at a time
+            lower_bound = max(estimate["estimated_makespan"], estimate["total_work"] / limit)
+            print(f"   {label:<13} makespan {makespan * 1000:7.1f} ms   lower bound {lower_bound * 1000:6.1f} ms"
+                  f"   sequential {sequential * 1000:7.1f} ms   speedup {sequential / makespan:5.1f}x")
+
+            assert makespan >= lower_bound * 0.9
+            if estimate["average_parallelism"] > 1:
+                assert makespan < sequential / 3
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s"])